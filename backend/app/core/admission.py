@@ -0,0 +1,205 @@
+# backend/app/core/admission.py
+"""
+Admission control: a per-process concurrency budget per route class, so expensive
+requests cannot starve cheap, critical ones under load.
+
+    checkout   POST /orders                                  priority 3
+    default    everything not listed here                    priority 2
+    auth       POST /token (bcrypt)                          priority 1
+    search     GET /books and /books/facets with ?search=    priority 0
+
+A request runs at once when its class is under its ADMISSION_<CLASS>_LIMIT and the
+process is under ADMISSION_TOTAL_LIMIT. Otherwise it waits in its class queue (FIFO).
+Freed slots go to the highest-priority class with waiters, so under a flash sale
+checkouts are admitted ahead of queued searches. A request is shed with 429 when its
+class queue already holds ADMISSION_<CLASS>_QUEUE requests, and with 503 when it
+waits longer than ADMISSION_<CLASS>_TIMEOUT_MS. Both carry Retry-After. /metrics
+and / are never limited.
+"""
+import asyncio
+import collections
+import time
+from dataclasses import dataclass, field
+from typing import Deque, Dict, Optional
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.metrics import REGISTRY
+
+ADMISSION_ADMITTED = REGISTRY.counter(
+    "admission_admitted_total", "Requests admitted, by route class and whether they queued first.", ("route_class", "queued")
+)
+ADMISSION_SHED = REGISTRY.counter(
+    "admission_shed_total", "Requests rejected by admission control (queue_full = 429, timeout = 503).", ("route_class", "reason")
+)
+ADMISSION_QUEUED = REGISTRY.gauge("admission_queued", "Requests waiting for admission.", ("route_class",))
+ADMISSION_IN_FLIGHT = REGISTRY.gauge("admission_in_flight", "Admitted requests still running.", ("route_class",))
+ADMISSION_WAIT = REGISTRY.histogram(
+    "admission_queue_wait_seconds", "Time spent queued by requests that were admitted.", ("route_class",)
+)
+
+# Never limited: scrapes and health checks must answer under load
+_EXEMPT_PATHS = {"/", "/metrics"}
+
+
+@dataclass
+class RouteClass:
+    name: str
+    priority: int
+    limit: int
+    queue_size: int
+    timeout: float
+    in_flight: int = 0
+    waiters: Deque[asyncio.Future] = field(default_factory=collections.deque)
+
+
+def route_class_name(scope: Scope) -> Optional[str]:
+    """ Route class of a request, from its method, path and query (routing has not run yet). None = exempt. """
+    method, path = scope["method"], scope["path"].rstrip("/") or "/"
+    if path in _EXEMPT_PATHS:
+        return None
+    if method == "POST" and path == "/orders":
+        return "checkout"
+    if method == "POST" and path == "/token":
+        return "auth"
+    if method == "GET" and path in ("/books", "/books/facets") and _has_search(scope.get("query_string", b"")):
+        return "search"
+    return "default"
+
+
+def _has_search(query_string: bytes) -> bool:
+    return any(
+        name == b"search" and value
+        for name, _, value in (pair.partition(b"=") for pair in query_string.split(b"&"))
+    )
+
+
+class AdmissionController:
+    """
+    Slot accounting for one process (one event loop). acquire() waits for a slot or
+    returns a shedding reason; every successful acquire() is paired with release().
+    """
+    def __init__(self, classes: Dict[str, RouteClass], total_limit: int):
+        self.classes = classes
+        self.total_limit = total_limit
+        self.in_flight = 0
+        # Highest priority first, for handing out freed slots
+        self._by_priority = sorted(classes.values(), key=lambda route_class: -route_class.priority)
+
+    def _has_room(self, route_class: RouteClass) -> bool:
+        return route_class.in_flight < route_class.limit and self.in_flight < self.total_limit
+
+    def _admit(self, route_class: RouteClass) -> None:
+        route_class.in_flight += 1
+        self.in_flight += 1
+        ADMISSION_IN_FLIGHT.inc(route_class=route_class.name)
+
+    async def acquire(self, route_class: RouteClass) -> Optional[str]:
+        """ None once admitted, else why the request is shed ("queue_full" or "timeout"). """
+        # Waiters of other classes are only ever held by their own class limit (release()
+        # hands out free total slots at once), so only this class's queue can be overtaken
+        if self._has_room(route_class) and not route_class.waiters:
+            self._admit(route_class)
+            ADMISSION_ADMITTED.inc(route_class=route_class.name, queued="false")
+            return None
+        if len(route_class.waiters) >= route_class.queue_size:
+            return "queue_full"
+
+        waiter = asyncio.get_running_loop().create_future()
+        route_class.waiters.append(waiter)
+        ADMISSION_QUEUED.inc(route_class=route_class.name)
+        started = time.perf_counter()
+        try:
+            # Shielded: the waiter is only resolved by _dispatch, which also takes it off the queue
+            await asyncio.wait_for(asyncio.shield(waiter), route_class.timeout)
+        except asyncio.TimeoutError:
+            if not waiter.done():
+                route_class.waiters.remove(waiter)
+                waiter.cancel()
+                return "timeout"
+            # Admitted as the wait ran out: go ahead
+        except asyncio.CancelledError:
+            # Client gone: give back a slot handed to us, or leave the queue
+            if waiter.done():
+                self.release(route_class)
+            else:
+                route_class.waiters.remove(waiter)
+                waiter.cancel()
+            raise
+        finally:
+            ADMISSION_QUEUED.dec(route_class=route_class.name)
+        ADMISSION_WAIT.observe(time.perf_counter() - started, route_class=route_class.name)
+        ADMISSION_ADMITTED.inc(route_class=route_class.name, queued="true")
+        return None
+
+    def release(self, route_class: RouteClass) -> None:
+        route_class.in_flight -= 1
+        self.in_flight -= 1
+        ADMISSION_IN_FLIGHT.dec(route_class=route_class.name)
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        """ Hands free slots to waiters, highest-priority class first. """
+        for route_class in self._by_priority:
+            while route_class.waiters and self._has_room(route_class):
+                waiter = route_class.waiters.popleft()
+                self._admit(route_class)
+                waiter.set_result(None)
+            if self.in_flight >= self.total_limit:
+                return
+
+
+def controller_from_settings() -> AdmissionController:
+    classes = [
+        RouteClass("checkout", 3, settings.ADMISSION_CHECKOUT_LIMIT, settings.ADMISSION_CHECKOUT_QUEUE,
+                   settings.ADMISSION_CHECKOUT_TIMEOUT_MS / 1000),
+        RouteClass("default", 2, settings.ADMISSION_DEFAULT_LIMIT, settings.ADMISSION_DEFAULT_QUEUE,
+                   settings.ADMISSION_DEFAULT_TIMEOUT_MS / 1000),
+        RouteClass("auth", 1, settings.ADMISSION_AUTH_LIMIT, settings.ADMISSION_AUTH_QUEUE,
+                   settings.ADMISSION_AUTH_TIMEOUT_MS / 1000),
+        RouteClass("search", 0, settings.ADMISSION_SEARCH_LIMIT, settings.ADMISSION_SEARCH_QUEUE,
+                   settings.ADMISSION_SEARCH_TIMEOUT_MS / 1000),
+    ]
+    return AdmissionController({route_class.name: route_class for route_class in classes}, settings.ADMISSION_TOTAL_LIMIT)
+
+
+class AdmissionMiddleware:
+    """
+    Pure ASGI middleware applying the AdmissionController. Shed requests get a small
+    JSON body and Retry-After without reaching routing or the database.
+    """
+    def __init__(self, app: ASGIApp, controller: Optional[AdmissionController] = None):
+        self.app = app
+        self.controller = controller or controller_from_settings()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        name = route_class_name(scope) if scope["type"] == "http" and settings.ADMISSION_ENABLED else None
+        if name is None:
+            await self.app(scope, receive, send)
+            return
+
+        route_class = self.controller.classes[name]
+        shed_reason = await self.controller.acquire(route_class)
+        if shed_reason is not None:
+            ADMISSION_SHED.inc(route_class=name, reason=shed_reason)
+            await _reject(send, 429 if shed_reason == "queue_full" else 503)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.release(route_class)
+
+
+async def _reject(send: Send, status_code: int) -> None:
+    body = b'{"detail":"Server busy, retry later"}'
+    await send({
+        "type": "http.response.start",
+        "status": status_code,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"retry-after", str(settings.ADMISSION_RETRY_AFTER_SECONDS).encode()),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,140 @@
+# backend/app/core/coalescing.py
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Hashable, Set
+
+from app.core.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+COALESCING_REQUESTS = REGISTRY.counter(
+    "coalescing_requests_total",
+    "Reads through a coalescing cache by outcome (fresh, stale, coalesced, executed, revalidated).",
+    ("cache", "outcome"),
+)
+COALESCING_SAVED = REGISTRY.counter(
+    "coalescing_executions_saved_total",
+    "Reads answered without running their own computation (cache hits and coalesced waits).",
+    ("cache",),
+)
+COALESCING_INFLIGHT = REGISTRY.gauge(
+    "coalescing_inflight", "Computations currently running per coalescing cache.", ("cache",)
+)
+
+
+class SingleFlight:
+    """
+    Concurrent calls with the same key share one running computation. The computation
+    runs as its own task, so a caller that disconnects does not cancel it for the others.
+    """
+    def __init__(self, name: str):
+        self.name = name
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+
+    def running(self, key: Hashable) -> bool:
+        return key in self._inflight
+
+    def start(self, key: Hashable, compute: Callable[[], Awaitable[Any]]) -> "asyncio.Task":
+        """ Returns the running task for key, starting compute() if there is none. """
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(compute())
+            self._inflight[key] = task
+            COALESCING_INFLIGHT.inc(cache=self.name)
+            task.add_done_callback(lambda done, key=key: self._finished(key, done))
+        return task
+
+    def _finished(self, key: Hashable, task: "asyncio.Task") -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        COALESCING_INFLIGHT.dec(cache=self.name)
+        if not task.cancelled() and task.exception() is not None:
+            # Retrieved here so an unobserved background failure is logged once
+            logger.debug("Coalesced computation %s failed: %r", key, task.exception())
+
+    async def do(self, key: Hashable, compute: Callable[[], Awaitable[Any]]) -> Any:
+        """ Runs compute() once for all concurrent callers of key and returns its result. """
+        joined = key in self._inflight
+        task = self.start(key, compute)
+        outcome = "coalesced" if joined else "executed"
+        COALESCING_REQUESTS.inc(cache=self.name, outcome=outcome)
+        if joined:
+            COALESCING_SAVED.inc(cache=self.name)
+        return await asyncio.shield(task)
+
+
+@dataclass
+class _Entry:
+    value: Any
+    fresh_until: float
+    stale_until: float
+
+
+class CoalescingCache:
+    """
+    Small in-process LRU in front of SingleFlight with stale-while-revalidate:
+    - fresh entries (younger than ttl) are returned directly;
+    - stale entries (up to ttl + stale_ttl old) are returned while one background refresh runs;
+    - misses wait for a single shared computation.
+    With ttl=0 nothing is cached and only concurrent identical reads are coalesced.
+    """
+    def __init__(self, name: str, ttl: float, stale_ttl: float = 0, max_entries: int = 1024):
+        self.name = name
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._flight = SingleFlight(name)
+        self._background: Set[asyncio.Task] = set()
+
+    async def get(self, key: Hashable, compute: Callable[[], Awaitable[Any]]) -> Any:
+        entry = self._entries.get(key)
+        now = time.monotonic()
+        if entry is not None:
+            if now < entry.fresh_until:
+                self._entries.move_to_end(key)
+                self._hit("fresh")
+                return entry.value
+            if now < entry.stale_until:
+                self._entries.move_to_end(key)
+                self._hit("stale")
+                self._revalidate(key, compute)
+                return entry.value
+        return await self._flight.do(key, lambda: self._load(key, compute))
+
+    def expire(self) -> None:
+        """
+        Marks every entry stale (e.g. after a write). Readers keep getting the previous
+        result inside the stale window while one refresh per key runs.
+        """
+        for entry in self._entries.values():
+            entry.fresh_until = 0.0
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def _hit(self, outcome: str) -> None:
+        COALESCING_REQUESTS.inc(cache=self.name, outcome=outcome)
+        COALESCING_SAVED.inc(cache=self.name)
+
+    def _revalidate(self, key: Hashable, compute: Callable[[], Awaitable[Any]]) -> None:
+        if self._flight.running(key):
+            return
+        task = self._flight.start(key, lambda: self._load(key, compute))
+        COALESCING_REQUESTS.inc(cache=self.name, outcome="revalidated")
+        # Keep a reference until the refresh finishes
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    async def _load(self, key: Hashable, compute: Callable[[], Awaitable[Any]]) -> Any:
+        value = await compute()
+        if self.ttl > 0:
+            now = time.monotonic()
+            self._entries[key] = _Entry(value, now + self.ttl, now + self.ttl + self.stale_ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
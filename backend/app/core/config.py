@@ -8,10 +8,137 @@ load_dotenv(dotenv_path=dotenv_path)
 
 class Settings(BaseSettings):
     DATABASE_URL: str = os.getenv("DATABASE_URL", "")
+    SQL_COMPILED_CACHE_SIZE: int = int(os.getenv("SQL_COMPILED_CACHE_SIZE", 500)) # SQLAlchemy query_cache_size
     # --- Add Auth Settings ---
     SECRET_KEY: str = os.getenv("SECRET_KEY", "default_secret_key_change_me") # Provide default only for safety
     ALGORITHM: str = os.getenv("ALGORITHM", "HS256")
     ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 30))
+    # --- Instrumentation Settings ---
+    LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
+    SLOW_QUERY_MS: float = float(os.getenv("SLOW_QUERY_MS", 200))
+    SERVER_TIMING_ENABLED: bool = os.getenv("SERVER_TIMING_ENABLED", "true").lower() == "true"
+    METRICS_ENABLED: bool = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+    # N+1 guard: "off", "warn" or "raise" when a relationship lazy load emits SQL
+    LAZY_LOAD_POLICY: str = os.getenv("LAZY_LOAD_POLICY", "off")
+    MAX_STATEMENTS_PER_REQUEST: int = int(os.getenv("MAX_STATEMENTS_PER_REQUEST", 0)) # 0 disables the budget
+    # --- Home Page Rails ---
+    HOME_RAILS_REFRESH_SECONDS: int = int(os.getenv("HOME_RAILS_REFRESH_SECONDS", 300)) # Full refresh interval
+    HOME_RAILS_POLL_SECONDS: float = float(os.getenv("HOME_RAILS_POLL_SECONDS", 5)) # Debounce for write-triggered refreshes
+    # --- Catalog Listing Engine ---
+    # "sql" queries the database for every /books call; "memory" answers filters, sorting and
+    # counts from an in-process NumPy snapshot and only fetches the page's rows by id;
+    # "shared" memory-maps one snapshot (with pre-rendered items) published for all workers
+    CATALOG_ENGINE: str = os.getenv("CATALOG_ENGINE", "sql")
+    CATALOG_SNAPSHOT_DIR: str = os.getenv("CATALOG_SNAPSHOT_DIR", "/dev/shm/bookworm-catalog") # Per host, tmpfs recommended
+    CATALOG_SNAPSHOT_REFRESH_SECONDS: int = int(os.getenv("CATALOG_SNAPSHOT_REFRESH_SECONDS", 600)) # Full rebuild interval
+    CATALOG_SNAPSHOT_POLL_SECONDS: float = float(os.getenv("CATALOG_SNAPSHOT_POLL_SECONDS", 2)) # Incremental update interval
+    # --- Listing Coalescing ---
+    # Concurrent identical /books queries share one execution; with a TTL the result is also
+    # cached and served stale for up to LISTING_CACHE_STALE_SECONDS while one refresh runs
+    LISTING_COALESCING_ENABLED: bool = os.getenv("LISTING_COALESCING_ENABLED", "true").lower() == "true"
+    LISTING_CACHE_TTL_SECONDS: float = float(os.getenv("LISTING_CACHE_TTL_SECONDS", 0)) # 0 = coalesce only, no caching
+    LISTING_CACHE_STALE_SECONDS: float = float(os.getenv("LISTING_CACHE_STALE_SECONDS", 30))
+    LISTING_CACHE_MAX_ENTRIES: int = int(os.getenv("LISTING_CACHE_MAX_ENTRIES", 2048))
+    # /books/facets results, keyed on the filter signature
+    FACETS_CACHE_TTL_SECONDS: float = float(os.getenv("FACETS_CACHE_TTL_SECONDS", 30))
+    FACETS_CACHE_STALE_SECONDS: float = float(os.getenv("FACETS_CACHE_STALE_SECONDS", 300))
+    # --- Best Sellers ---
+    # book_sales_stats is updated with every order; the 7d/30d windows roll forward once a day
+    SALES_WINDOWS_POLL_SECONDS: float = float(os.getenv("SALES_WINDOWS_POLL_SECONDS", 300)) # How often to check for a new day
+    # --- Co-purchase Recommendations ---
+    # book_related is rebuilt offline (python -m app.jobs.copurchase build) and then kept
+    # up to date from new orders every COPURCHASE_UPDATE_SECONDS (0 disables the loop)
+    COPURCHASE_TOP_K: int = int(os.getenv("COPURCHASE_TOP_K", 20)) # Neighbours stored per book
+    COPURCHASE_MAX_ORDER_ITEMS: int = int(os.getenv("COPURCHASE_MAX_ORDER_ITEMS", 50)) # Larger orders are ignored
+    COPURCHASE_UPDATE_SECONDS: float = float(os.getenv("COPURCHASE_UPDATE_SECONDS", 600))
+    COPURCHASE_SETTLE_SECONDS: float = float(os.getenv("COPURCHASE_SETTLE_SECONDS", 60)) # Skip orders younger than this
+    RELATED_CACHE_TTL_SECONDS: float = float(os.getenv("RELATED_CACHE_TTL_SECONDS", 300))
+    # --- Background Jobs ---
+    # Side effects of orders are queued in job_outbox and run by a worker in
+    # every API process (disable to run only dedicated `python -m app.jobs.outbox` workers)
+    JOB_WORKER_ENABLED: bool = os.getenv("JOB_WORKER_ENABLED", "true").lower() == "true"
+    JOB_WORKER_CONCURRENCY: int = int(os.getenv("JOB_WORKER_CONCURRENCY", 4)) # Handlers running at once per process
+    JOB_POLL_SECONDS: float = float(os.getenv("JOB_POLL_SECONDS", 1))
+    JOB_MAX_ATTEMPTS: int = int(os.getenv("JOB_MAX_ATTEMPTS", 5)) # Then the job is kept as "failed"
+    JOB_RETRY_BASE_SECONDS: float = float(os.getenv("JOB_RETRY_BASE_SECONDS", 2)) # Doubled after each failure
+    JOB_LEASE_SECONDS: float = float(os.getenv("JOB_LEASE_SECONDS", 300)) # Running longer = worker presumed dead
+    JOB_STATS_SECONDS: float = float(os.getenv("JOB_STATS_SECONDS", 15)) # Queue depth/lag metrics refresh
+
+    # --- Change Feed ---
+    # Catalog writes are captured into change_event; each API process tails it to invalidate its caches
+    CHANGE_FEED_POLL_SECONDS: float = float(os.getenv("CHANGE_FEED_POLL_SECONDS", 1))
+    CHANGE_FEED_BATCH_SIZE: int = int(os.getenv("CHANGE_FEED_BATCH_SIZE", 1000)) # Events per read
+    CHANGE_FEED_RETENTION_HOURS: float = float(os.getenv("CHANGE_FEED_RETENTION_HOURS", 72)) # Max consumer downtime
+    CHANGE_FEED_PRUNE_SECONDS: float = float(os.getenv("CHANGE_FEED_PRUNE_SECONDS", 3600))
+
+    # --- Catalog Import ---
+    IMPORT_BATCH_ROWS: int = int(os.getenv("IMPORT_BATCH_ROWS", 50_000)) # Rows staged, merged and committed at once
+    IMPORT_MAX_REPORTED_REJECTS: int = int(os.getenv("IMPORT_MAX_REPORTED_REJECTS", 1000)) # All are counted
+
+    # --- Exports ---
+    EXPORT_FETCH_ROWS: int = int(os.getenv("EXPORT_FETCH_ROWS", 5000)) # Rows per server-side cursor fetch
+    EXPORT_SLICE_ROWS: int = int(os.getenv("EXPORT_SLICE_ROWS", 500_000)) # Rows per transaction (bounds snapshot age)
+    EXPORT_CHUNK_BYTES: int = int(os.getenv("EXPORT_CHUNK_BYTES", 256 * 1024)) # Response chunk size
+
+    # --- Cart Write-Behind ---
+    # Cart syncs land in the UNLOGGED cart_buffer and are written to cart_item after a debounce
+    CART_WRITE_BEHIND_ENABLED: bool = os.getenv("CART_WRITE_BEHIND_ENABLED", "true").lower() == "true"
+    CART_FLUSH_DELAY_SECONDS: float = float(os.getenv("CART_FLUSH_DELAY_SECONDS", 5)) # Idle time before a flush
+    CART_FLUSH_MAX_DELAY_SECONDS: float = float(os.getenv("CART_FLUSH_MAX_DELAY_SECONDS", 30)) # Most changes a crash can lose
+    CART_FLUSH_POLL_SECONDS: float = float(os.getenv("CART_FLUSH_POLL_SECONDS", 1))
+    CART_FLUSH_BATCH: int = int(os.getenv("CART_FLUSH_BATCH", 500)) # Carts per flush transaction
+
+    # --- Maintenance ---
+    MAINTENANCE_INTERVAL_SECONDS: float = float(os.getenv("MAINTENANCE_INTERVAL_SECONDS", 3600))
+    MAINTENANCE_BATCH_ROWS: int = int(os.getenv("MAINTENANCE_BATCH_ROWS", 1000)) # Rows per cleanup transaction
+    MAINTENANCE_BATCH_PAUSE_SECONDS: float = float(os.getenv("MAINTENANCE_BATCH_PAUSE_SECONDS", 0.1)) # Between batches
+    CART_RETENTION_DAYS: int = int(os.getenv("CART_RETENTION_DAYS", 30)) # Untouched cart lines are deleted after this
+    DISCOUNT_ARCHIVE_AFTER_DAYS: int = int(os.getenv("DISCOUNT_ARCHIVE_AFTER_DAYS", 30)) # Days after a discount ends
+
+    # --- Partitioning ---
+    # order, order_item and review are range-partitioned by month (app.jobs.partitions)
+    PARTITION_CHECK_SECONDS: float = float(os.getenv("PARTITION_CHECK_SECONDS", 3600))
+    PARTITION_MONTHS_AHEAD: int = int(os.getenv("PARTITION_MONTHS_AHEAD", 3)) # Future months kept created
+    PARTITION_ARCHIVE_AFTER_MONTHS: int = int(os.getenv("PARTITION_ARCHIVE_AFTER_MONTHS", 24)) # Then moved to the archive schema
+    PARTITION_ARCHIVE_SCHEMA: str = os.getenv("PARTITION_ARCHIVE_SCHEMA", "archive")
+    PARTITION_LOCK_TIMEOUT_MS: int = int(os.getenv("PARTITION_LOCK_TIMEOUT_MS", 2000)) # DDL gives up rather than queue behind traffic
+
+    # --- Sharding ---
+    # Orders and carts of a user live on one shard (app.db.shards); shard 0 is DATABASE_URL
+    SHARD_DATABASE_URLS: str = os.getenv("SHARD_DATABASE_URLS", "") # Comma-separated shards 1..N; empty = unsharded
+    SHARD_ORDER_SETTLE_SECONDS: float = float(os.getenv("SHARD_ORDER_SETTLE_SECONDS", 30)) # Delay of order_placed for other shards
+    SHARD_ORDER_MAX_WAIT_SECONDS: float = float(os.getenv("SHARD_ORDER_MAX_WAIT_SECONDS", 300)) # order_placed retries a missing order this long
+    SHARD_COPY_SPOOL_BYTES: int = int(os.getenv("SHARD_COPY_SPOOL_BYTES", 64 * 1024 * 1024)) # In memory, then on disk
+
+    # --- Admission Control ---
+    # Concurrent requests per worker process and route class (app.core.admission); the lower
+    # classes' limits add up to less than the total, so checkouts always have slots left
+    ADMISSION_ENABLED: bool = os.getenv("ADMISSION_ENABLED", "true").lower() == "true"
+    ADMISSION_TOTAL_LIMIT: int = int(os.getenv("ADMISSION_TOTAL_LIMIT", 64))
+    ADMISSION_RETRY_AFTER_SECONDS: int = int(os.getenv("ADMISSION_RETRY_AFTER_SECONDS", 2)) # Sent with 429 / 503
+    ADMISSION_CHECKOUT_LIMIT: int = int(os.getenv("ADMISSION_CHECKOUT_LIMIT", 32))
+    ADMISSION_CHECKOUT_QUEUE: int = int(os.getenv("ADMISSION_CHECKOUT_QUEUE", 256)) # Waiting requests; more get 429
+    ADMISSION_CHECKOUT_TIMEOUT_MS: float = float(os.getenv("ADMISSION_CHECKOUT_TIMEOUT_MS", 10_000)) # Longer waits get 503
+    ADMISSION_DEFAULT_LIMIT: int = int(os.getenv("ADMISSION_DEFAULT_LIMIT", 40))
+    ADMISSION_DEFAULT_QUEUE: int = int(os.getenv("ADMISSION_DEFAULT_QUEUE", 256))
+    ADMISSION_DEFAULT_TIMEOUT_MS: float = float(os.getenv("ADMISSION_DEFAULT_TIMEOUT_MS", 2000))
+    ADMISSION_AUTH_LIMIT: int = int(os.getenv("ADMISSION_AUTH_LIMIT", 4)) # bcrypt is CPU-bound: about one per core
+    ADMISSION_AUTH_QUEUE: int = int(os.getenv("ADMISSION_AUTH_QUEUE", 64))
+    ADMISSION_AUTH_TIMEOUT_MS: float = float(os.getenv("ADMISSION_AUTH_TIMEOUT_MS", 3000))
+    ADMISSION_SEARCH_LIMIT: int = int(os.getenv("ADMISSION_SEARCH_LIMIT", 8))
+    ADMISSION_SEARCH_QUEUE: int = int(os.getenv("ADMISSION_SEARCH_QUEUE", 32))
+    ADMISSION_SEARCH_TIMEOUT_MS: float = float(os.getenv("ADMISSION_SEARCH_TIMEOUT_MS", 1000))
+
+    # --- Profiling ---
+    # Sampling profiles of selected requests or a whole worker, read through /admin/profiles (app.core.profiling)
+    PROFILING_ENABLED: bool = os.getenv("PROFILING_ENABLED", "true").lower() == "true"
+    PROFILING_TOKEN: str = os.getenv("PROFILING_TOKEN", "") # X-Profile header value that profiles a request; empty = off
+    PROFILING_SAMPLE_RATE: float = float(os.getenv("PROFILING_SAMPLE_RATE", 0)) # Fraction of requests profiled
+    PROFILING_INTERVAL_MS: float = float(os.getenv("PROFILING_INTERVAL_MS", 5)) # Between stack samples
+    PROFILING_MAX_ACTIVE: int = int(os.getenv("PROFILING_MAX_ACTIVE", 4)) # Profiles running at once per process
+    PROFILING_MAX_SECONDS: float = float(os.getenv("PROFILING_MAX_SECONDS", 60)) # Longest worker profile
+    PROFILING_MAX_DEPTH: int = int(os.getenv("PROFILING_MAX_DEPTH", 128)) # Innermost frames kept per sample
+    PROFILING_KEEP: int = int(os.getenv("PROFILING_KEEP", 100)) # Finished profiles kept per process
 
     class Config:
         env_file = ".env"
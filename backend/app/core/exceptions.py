@@ -19,4 +19,34 @@ class InvalidQuantityError(OrderCreationError):
     def __init__(self, book_id: int, quantity: int):
         self.book_id = book_id
         self.quantity = quantity
-        super().__init__(f"Invalid quantity {quantity} for book ID {book_id}. Must be between 1 and 8.")
\ No newline at end of file
+        super().__init__(f"Invalid quantity {quantity} for book ID {book_id}. Must be between 1 and 8.")
+
+class LazyLoadError(Exception):
+    """Exception raised by the query guard when a relationship is lazy loaded."""
+    def __init__(self, relationship: str):
+        self.relationship = relationship
+        super().__init__(f"Lazy load of {relationship} emitted SQL; eager load it in the query instead.")
+
+class QueryBudgetExceededError(Exception):
+    """Exception raised by the query guard when a request runs more statements than allowed."""
+    def __init__(self, route: str, budget: int):
+        self.route = route
+        self.budget = budget
+        super().__init__(f"{route} executed more than {budget} SQL statements.")
+
+class InvalidDateRangeError(Exception):
+    """Exception raised when a reporting date range is reversed or too long."""
+    pass
+
+class DiscountConflictError(Exception):
+    """Exception raised when a discount campaign overlaps discounts that already exist."""
+    def __init__(self, conflict_count: int, conflicts: list):
+        self.conflict_count = conflict_count
+        self.conflicts = conflicts
+        super().__init__(f"{conflict_count} books already have a discount overlapping the campaign.")
+
+class BookNotFoundError(Exception):
+    """Exception raised when a book-scoped lookup is given an unknown book ID."""
+    def __init__(self, book_id: int):
+        self.book_id = book_id
+        super().__init__(f"Book {book_id} not found.")
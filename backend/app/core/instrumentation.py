@@ -0,0 +1,270 @@
+# backend/app/core/instrumentation.py
+import asyncio
+import contextvars
+import functools
+import logging
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from fastapi.routing import APIRoute
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.metrics import REGISTRY
+from app.core.profiling import profiled_thread
+
+logger = logging.getLogger(__name__)
+
+# --- Metrics ---
+REQUEST_DURATION = REGISTRY.histogram(
+    "http_request_duration_seconds",
+    "Total request latency, from first byte in to response start.",
+    ("method", "route", "status"),
+)
+REQUEST_DB_DURATION = REGISTRY.histogram(
+    "http_request_db_seconds",
+    "Time spent executing SQL statements per request.",
+    ("method", "route"),
+)
+REQUEST_DB_STATEMENTS = REGISTRY.histogram(
+    "http_request_db_statements",
+    "Number of SQL statements executed per request.",
+    ("method", "route"),
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 50, 100),
+)
+REQUEST_SERIALIZATION_DURATION = REGISTRY.histogram(
+    "http_request_serialization_seconds",
+    "Time between the endpoint returning and the response being started (validation + encoding).",
+    ("method", "route"),
+)
+SPAN_DURATION = REGISTRY.histogram(
+    "app_span_duration_seconds",
+    "Duration of named code spans (repository calls, auth lookups, ...).",
+    ("span",),
+)
+DB_STATEMENT_DURATION = REGISTRY.histogram(
+    "db_statement_duration_seconds",
+    "Latency of individual SQL statements.",
+)
+DB_COMPILED_CACHE = REGISTRY.counter(
+    "db_compiled_cache_total",
+    "Statements by SQLAlchemy compiled-cache outcome (cache_hit, cache_miss, no_cache_key, ...).",
+    ("result",),
+)
+SLOW_STATEMENTS = REGISTRY.counter(
+    "db_slow_statements_total",
+    "SQL statements slower than SLOW_QUERY_MS.",
+    ("route",),
+)
+
+
+@dataclass
+class RequestStats:
+    """Timing data accumulated for the request currently being served."""
+    method: str
+    path: str
+    query_string: str
+    scope: Optional[Scope] = field(default=None, repr=False)
+    started_at: float = field(default_factory=time.perf_counter)
+    statement_count: int = 0
+    db_time: float = 0.0
+    endpoint_finished_at: Optional[float] = None
+    serialization_time: float = 0.0
+    spans: Dict[str, float] = field(default_factory=dict)
+
+    @property
+    def route(self) -> str:
+        """ Route template once routing has happened (e.g. /books/{book_id}). """
+        return _route_template(self.scope) if self.scope is not None else "unmatched"
+
+    def server_timing(self, total: float) -> str:
+        """Render the collected timings as a Server-Timing header value (durations in ms)."""
+        parts = [
+            f'db;dur={self.db_time * 1000:.2f};desc="{self.statement_count} statements"',
+            f"ser;dur={self.serialization_time * 1000:.2f}",
+        ]
+        parts.extend(f"{name};dur={duration * 1000:.2f}" for name, duration in self.spans.items())
+        parts.append(f"total;dur={total * 1000:.2f}")
+        return ", ".join(parts)
+
+
+_current_stats: contextvars.ContextVar[Optional[RequestStats]] = contextvars.ContextVar(
+    "request_stats", default=None
+)
+
+
+def current_request_stats() -> Optional[RequestStats]:
+    """ Returns the stats object of the request being served, or None outside a request. """
+    return _current_stats.get()
+
+
+@contextmanager
+def timed_span(name: str) -> Iterator[None]:
+    """
+    Times a block of code, reporting it as a Server-Timing entry for the current
+    request and as an observation of app_span_duration_seconds.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        SPAN_DURATION.observe(elapsed, span=name)
+        stats = _current_stats.get()
+        if stats is not None:
+            stats.spans[name] = stats.spans.get(name, 0.0) + elapsed
+
+
+# --- SQLAlchemy engine hooks ---
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_times", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start_times = conn.info.get("query_start_times")
+    if not start_times:
+        return
+    elapsed = time.perf_counter() - start_times.pop()
+    DB_STATEMENT_DURATION.observe(elapsed)
+    cache_hit = getattr(context, "cache_hit", None)
+    if cache_hit is not None:
+        # One of SQLAlchemy's CACHE_HIT / CACHE_MISS / NO_CACHE_KEY / ... symbols
+        DB_COMPILED_CACHE.inc(result=getattr(cache_hit, "name", str(cache_hit)).lower())
+
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.statement_count += 1
+        stats.db_time += elapsed
+
+    if elapsed * 1000 >= settings.SLOW_QUERY_MS:
+        route = stats.route if stats is not None else "-"
+        SLOW_STATEMENTS.inc(route=route)
+        logger.warning(
+            "Slow query (%.1f ms) on %s %s?%s: %s | parameters=%.500r",
+            elapsed * 1000,
+            stats.method if stats is not None else "-",
+            stats.path if stats is not None else "-",
+            stats.query_string if stats is not None else "",
+            " ".join(statement.split()),
+            parameters,
+        )
+
+
+def _handle_error(exception_context):
+    # The statement failed, so after_cursor_execute will not pop its start time
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("query_start_times"):
+        conn.info["query_start_times"].pop()
+
+
+def install_query_hooks(engine: Engine) -> None:
+    """ Attaches per-statement timing hooks to an engine. """
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+
+# --- Route class ---
+def _mark_endpoint_finished() -> None:
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.endpoint_finished_at = time.perf_counter()
+
+
+def _track_endpoint_return(call: Callable[..., Any]) -> Callable[..., Any]:
+    """ Wraps an endpoint so the time it returns is recorded, keeping its sync/async nature. """
+    if asyncio.iscoroutinefunction(call):
+        @functools.wraps(call)
+        async def async_wrapper(*args, **kwargs):
+            try:
+                return await call(*args, **kwargs)
+            finally:
+                _mark_endpoint_finished()
+        return async_wrapper
+
+    @functools.wraps(call)
+    def sync_wrapper(*args, **kwargs):
+        try:
+            # Runs in the threadpool: lets a request profile sample this thread
+            with profiled_thread():
+                return call(*args, **kwargs)
+        finally:
+            _mark_endpoint_finished()
+    return sync_wrapper
+
+
+class InstrumentedRoute(APIRoute):
+    """
+    APIRoute that records when the endpoint function returns, so the time spent
+    validating and encoding the response can be reported separately.
+    """
+    def get_route_handler(self) -> Callable:
+        self.dependant.call = _track_endpoint_return(self.dependant.call)
+        return super().get_route_handler()
+
+
+# --- Middleware ---
+def _route_template(scope: Scope) -> str:
+    route = scope.get("route")
+    path = getattr(route, "path", None)
+    # Unmatched paths are bucketed together to keep label cardinality bounded
+    return path if path else "unmatched"
+
+
+class RequestTimingMiddleware:
+    """
+    Pure ASGI middleware measuring per-request latency, SQL statement count,
+    DB time and serialization time. Adds a Server-Timing header to each response
+    and feeds the histograms exposed on /metrics.
+    """
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats(
+            method=scope["method"],
+            path=scope["path"],
+            query_string=scope.get("query_string", b"").decode("latin-1"),
+            scope=scope,
+        )
+        token = _current_stats.set(stats)
+        status_code = 500
+        response_started_at: Optional[float] = None
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status_code, response_started_at
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                response_started_at = time.perf_counter()
+                if stats.endpoint_finished_at is not None:
+                    stats.serialization_time = response_started_at - stats.endpoint_finished_at
+                if settings.SERVER_TIMING_ENABLED:
+                    headers = MutableHeaders(scope=message)
+                    headers.append("Server-Timing", stats.server_timing(response_started_at - stats.started_at))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current_stats.reset(token)
+            finished_at = response_started_at or time.perf_counter()
+            route = stats.route
+            REQUEST_DURATION.observe(
+                finished_at - stats.started_at,
+                method=stats.method, route=route, status=str(status_code)
+            )
+            REQUEST_DB_DURATION.observe(stats.db_time, method=stats.method, route=route)
+            REQUEST_DB_STATEMENTS.observe(stats.statement_count, method=stats.method, route=route)
+            if stats.endpoint_finished_at is not None:
+                REQUEST_SERIALIZATION_DURATION.observe(
+                    stats.serialization_time, method=stats.method, route=route
+                )
@@ -0,0 +1,273 @@
+# backend/app/core/profiling.py
+"""
+On-demand sampling profiler for live requests and whole workers.
+
+Profiles are taken by a sampler thread reading the stacks of the profiled threads
+(sys._current_frames) every PROFILING_INTERVAL_MS; nothing is traced, so the
+profiled code runs at full speed and unprofiled requests pay one header lookup.
+
+* A request is profiled when it carries `X-Profile: <PROFILING_TOKEN>` or is drawn by
+  PROFILING_SAMPLE_RATE. Its response gets an X-Profile-Id header. Samples of the event
+  loop thread count only while the request's own coroutine is running (its frame
+  chain reaches ProfilingMiddleware for this request); sync endpoints are followed
+  into the threadpool. Work a request hands to run_in_threadpool itself is only seen
+  by worker profiles.
+* A worker profile samples every thread of the process for N seconds
+  (POST /admin/profiles/worker).
+
+At most PROFILING_MAX_ACTIVE profiles run at once; the last PROFILING_KEEP are kept
+per process and read through /admin/profiles (admins only). The output is folded
+stacks ("frame;frame;frame count" per line, for flamegraph.pl, inferno or
+speedscope) whose root frame is the phase of the sample, taken from its innermost
+recognised frame: db (SQLAlchemy engine / pool, psycopg2: waiting on PostgreSQL),
+orm (rest of SQLAlchemy: statement compilation and row hydration), validation
+(Pydantic), json (response encoding), app (this codebase) or other.
+"""
+import asyncio
+import collections
+import contextlib
+import contextvars
+import datetime
+import itertools
+import os
+import random
+import sys
+import threading
+import time
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.metrics import REGISTRY
+
+PROFILES_TAKEN = REGISTRY.counter(
+    "profiling_profiles_total", "Profiles taken, by trigger (header, sampled, worker).", ("trigger",)
+)
+
+_APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__))) + os.sep
+# (phase, path fragments): the first one matching the innermost recognised frame wins
+_PHASES = (
+    ("db", ("/sqlalchemy/engine/", "/sqlalchemy/pool/", "/psycopg2/")),
+    ("orm", ("/sqlalchemy/",)),
+    ("validation", ("/pydantic/", "/pydantic_core/", "/fastapi/_compat")),
+    ("json", ("/json/", "/fastapi/encoders.py", "/fastapi/responses.py", "/starlette/responses.py")),
+)
+# Innermost frames of threads waiting for work; such samples are dropped
+_IDLE_FILES = ("selectors.py", "threading.py", "queue.py", "concurrent/futures/thread.py")
+
+_active_profile: contextvars.ContextVar[Optional["Profile"]] = contextvars.ContextVar("active_profile", default=None)
+_ids = itertools.count(1)
+
+
+def _frame_label(code) -> str:
+    filename = code.co_filename
+    if filename.startswith(_APP_DIR):
+        short = "app/" + filename[len(_APP_DIR):]
+    else:
+        short = filename.rpartition("site-packages/")[2] if "site-packages/" in filename else os.path.basename(filename)
+    return f"{code.co_name} ({short}:{code.co_firstlineno})".replace(";", ":")
+
+
+def _phase(frames: List) -> str:
+    """ Phase of a sample, from its frames innermost first. """
+    for frame in frames:
+        filename = frame.f_code.co_filename
+        if filename.startswith(_APP_DIR):
+            return "app"
+        for phase, fragments in _PHASES:
+            if any(fragment in filename for fragment in fragments):
+                return phase
+    return "other"
+
+
+class Profile:
+    """ Folded-stack counts of one profiled request or worker. """
+    def __init__(self, trigger: str, label: str, anchor=None, loop_thread: Optional[int] = None):
+        self.id = f"{os.getpid()}-{next(_ids)}"
+        self.trigger = trigger
+        self.label = label
+        self.route: Optional[str] = None
+        self.started_at = datetime.datetime.now()
+        self.duration = 0.0 # Seconds, once stopped
+        self._started = time.perf_counter()
+        self.samples = 0
+        self.stacks: Dict[Tuple[str, ...], int] = collections.Counter()
+        # Request profiles: this request's middleware frame, the event loop thread and
+        # the threadpool threads currently running its sync endpoint (ident -> depth)
+        self.anchor = anchor
+        self.loop_thread = loop_thread
+        self.threads: Dict[int, int] = {}
+        # Fixed at creation: stop() releases the anchor but the kind must not change
+        self.worker = anchor is None
+        self.stopped = False # Set under the sampler lock; no samples are added after it
+
+    def sample(self, frames: Dict[int, object], sampler_thread: int) -> None:
+        anchor = self.anchor # stop() may clear it meanwhile
+        if self.worker:
+            threads = [ident for ident in frames if ident != sampler_thread]
+        elif anchor is None:
+            return
+        else:
+            threads = [self.loop_thread, *self.threads]
+        for ident in threads:
+            frame = frames.get(ident)
+            if frame is None:
+                continue
+            stack = [] # Innermost first, up to this request's middleware frame
+            while frame is not None:
+                stack.append(frame)
+                if frame is anchor:
+                    break
+                frame = frame.f_back
+            if not self.worker and ident == self.loop_thread and stack[-1] is not anchor:
+                continue # The loop is running another request (or idling)
+            if stack[0].f_code.co_filename.endswith(_IDLE_FILES):
+                continue
+            del stack[settings.PROFILING_MAX_DEPTH:] # Deep stacks keep their innermost frames
+            key = (_phase(stack), *(_frame_label(frame.f_code) for frame in reversed(stack)))
+            self.stacks[key] += 1
+            self.samples += 1
+
+    def folded(self) -> str:
+        """ Folded stacks, most frequent first: "phase;outermost;...;innermost count". """
+        return "".join(
+            f"{';'.join(stack)} {count}\n"
+            for stack, count in sorted(self.stacks.items(), key=lambda item: -item[1])
+        )
+
+    def phases(self) -> Dict[str, int]:
+        totals: Dict[str, int] = collections.Counter()
+        for stack, count in self.stacks.items():
+            totals[stack[0]] += count
+        return dict(totals)
+
+
+class _Sampler:
+    """ One daemon thread sampling every running profile; it exits when none is left. """
+    def __init__(self):
+        self._profiles: List[Profile] = []
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self.recent: "collections.OrderedDict[str, Profile]" = collections.OrderedDict()
+
+    def start(self, profile: Profile) -> bool:
+        """ Starts sampling a profile, unless PROFILING_MAX_ACTIVE are running (then False). """
+        with self._lock:
+            if len(self._profiles) >= settings.PROFILING_MAX_ACTIVE:
+                return False
+            self._profiles.append(profile)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+                self._thread.start()
+        PROFILES_TAKEN.inc(trigger=profile.trigger)
+        return True
+
+    def stop(self, profile: Profile) -> None:
+        with self._lock:
+            # Waits for a sample() in progress; later ones skip the profile
+            profile.stopped = True
+            profile.duration = time.perf_counter() - profile._started
+            profile.anchor = None # Releases the request's frames
+            self._profiles.remove(profile)
+            self.recent[profile.id] = profile
+            while len(self.recent) > settings.PROFILING_KEEP:
+                self.recent.popitem(last=False)
+
+    def _run(self) -> None:
+        sampler_thread = threading.get_ident()
+        while True:
+            with self._lock:
+                profiles = list(self._profiles)
+                if not profiles:
+                    self._thread = None
+                    return
+            frames = sys._current_frames()
+            for profile in profiles:
+                with self._lock:
+                    if not profile.stopped:
+                        profile.sample(frames, sampler_thread)
+            del frames
+            time.sleep(settings.PROFILING_INTERVAL_MS / 1000)
+
+
+sampler = _Sampler()
+
+
+@contextlib.contextmanager
+def profiled_thread() -> Iterator[None]:
+    """ Marks the current (threadpool) thread as working for the profiled request, if any. """
+    profile = _active_profile.get()
+    if profile is None or profile.anchor is None:
+        yield
+        return
+    ident = threading.get_ident()
+    profile.threads[ident] = profile.threads.get(ident, 0) + 1
+    try:
+        yield
+    finally:
+        if profile.threads[ident] == 1:
+            del profile.threads[ident]
+        else:
+            profile.threads[ident] -= 1
+
+
+async def profile_worker(seconds: float) -> Optional[Profile]:
+    """ Samples every thread of this process for `seconds`. None when too many profiles are running. """
+    profile = Profile("worker", f"worker pid {os.getpid()}, {seconds:g}s")
+    if not sampler.start(profile):
+        return None
+    try:
+        await asyncio.sleep(seconds)
+    finally:
+        sampler.stop(profile)
+    return profile
+
+
+def _trigger(scope: Scope) -> Optional[str]:
+    token = settings.PROFILING_TOKEN
+    if token and Headers(scope=scope).get("x-profile") == token:
+        return "header"
+    if settings.PROFILING_SAMPLE_RATE > 0 and random.random() < settings.PROFILING_SAMPLE_RATE:
+        return "sampled"
+    return None
+
+
+class ProfilingMiddleware:
+    """
+    Pure ASGI middleware profiling the requests selected by header or sample rate.
+    Added innermost, so the stacks start at routing and shed requests are not profiled.
+    """
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        trigger = _trigger(scope) if scope["type"] == "http" and settings.PROFILING_ENABLED else None
+        if trigger is None:
+            await self.app(scope, receive, send)
+            return
+
+        query_string = scope.get("query_string", b"").decode("latin-1")
+        profile = Profile(
+            trigger,
+            f"{scope['method']} {scope['path']}" + (f"?{query_string}" if query_string else ""),
+            anchor=sys._getframe(),
+            loop_thread=threading.get_ident(),
+        )
+        if not sampler.start(profile):
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_profile_id(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append("X-Profile-Id", profile.id)
+            await send(message)
+
+        token = _active_profile.set(profile)
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            _active_profile.reset(token)
+            profile.route = getattr(scope.get("route"), "path", None) or "unmatched"
+            sampler.stop(profile)
@@ -0,0 +1,81 @@
+# backend/app/db/change_capture.py
+import functools
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import event, insert
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.metrics import REGISTRY
+
+CHANGES_CAPTURED = REGISTRY.counter(
+    "change_events_captured_total", "Change events written to the change feed.", ("entity", "kind")
+)
+
+
+@functools.lru_cache(maxsize=None)
+def tracked_models() -> Dict[type, Tuple[str, Callable[[object], Optional[int]]]]:
+    """ Tracked model -> (entity name, the affected book id of a row). """
+    # Resolved on first use: app.db.session installs the hook before the models are imported
+    from app.models import database_models
+    return {
+        database_models.Book: ("book", lambda row: row.id),
+        database_models.Discount: ("discount", lambda row: row.book_id),
+        database_models.Review: ("review", lambda row: row.book_id),
+        database_models.Author: ("author", lambda row: None),
+        database_models.Category: ("category", lambda row: None),
+    }
+
+
+def _event(obj, kind: str) -> Optional[dict]:
+    tracked = tracked_models().get(type(obj))
+    if tracked is None:
+        return None
+    entity, book_of = tracked
+    return {"entity": entity, "entity_id": obj.id, "kind": kind, "book_id": book_of(obj)}
+
+
+def _after_flush(session: Session, flush_context) -> None:
+    """ Writes one change event per tracked row the flush inserted, updated or deleted. """
+    events: List[dict] = []
+    for kind, objects in (("insert", session.new), ("update", session.dirty), ("delete", session.deleted)):
+        for obj in objects:
+            if kind == "update" and not session.is_modified(obj, include_collections=False):
+                continue
+            change = _event(obj, kind)
+            if change is not None:
+                events.append(change)
+    if events:
+        _write(session, events)
+
+
+def _write(session: Session, events: List[dict]) -> None:
+    # Through the connection: the flush is in progress, so no ORM operations here
+    from app.models.database_models import ChangeEvent
+    session.connection().execute(insert(ChangeEvent), events)
+    for change in events:
+        CHANGES_CAPTURED.inc(entity=change["entity"], kind=change["kind"])
+
+
+def record_changes(
+    db: Session, entity: str, entity_ids: Iterable[int], kind: str = "update", book_ids: Optional[Iterable[int]] = None
+) -> None:
+    """
+    Adds change events for writes the flush hook cannot see: Core/bulk UPDATE and DELETE
+    statements and derived tables (e.g. entity="book_sales"). Runs in db's transaction.
+    """
+    entity_ids = list(entity_ids)
+    book_ids = list(book_ids) if book_ids is not None else [None] * len(entity_ids)
+    events = [
+        {"entity": entity, "entity_id": entity_id, "kind": kind, "book_id": book_id}
+        for entity_id, book_id in zip(entity_ids, book_ids)
+    ]
+    if events:
+        _write(db, events)
+
+
+def install_change_capture(session_factory: sessionmaker) -> None:
+    """
+    Emits change events for ORM inserts/updates/deletes of the catalog models (tracked_models())
+    on sessions from session_factory, in the same transaction as the change.
+    """
+    event.listen(session_factory, "after_flush", _after_flush)
@@ -0,0 +1,129 @@
+# backend/app/db/query_guard.py
+import logging
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Iterator, List
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import ORMExecuteState, sessionmaker
+
+from app.core.config import settings
+from app.core.exceptions import LazyLoadError, QueryBudgetExceededError
+from app.core.instrumentation import current_request_stats
+from app.core.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+LAZY_LOADS = REGISTRY.counter(
+    "db_lazy_loads_total",
+    "Relationship lazy loads that emitted SQL.",
+    ("relationship",),
+)
+BUDGET_VIOLATIONS = REGISTRY.counter(
+    "db_statement_budget_exceeded_total",
+    "Requests that executed more SQL statements than MAX_STATEMENTS_PER_REQUEST.",
+    ("route",),
+)
+
+# Policies for LAZY_LOAD_POLICY: "off" (no checks), "warn" (log), "raise" (fail the statement)
+_POLICIES = ("off", "warn", "raise")
+
+
+@dataclass
+class StatementCounter:
+    """ Statements and lazy loads observed while a count_statements() block is active. """
+    statements: List[str] = field(default_factory=list)
+    lazy_loads: List[str] = field(default_factory=list)
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+
+_active_counters: List[StatementCounter] = []
+_counters_lock = threading.Lock()
+
+
+def _policy() -> str:
+    policy = settings.LAZY_LOAD_POLICY.lower()
+    return policy if policy in _POLICIES else "off"
+
+
+def _violation(error: Exception) -> None:
+    if _policy() == "raise":
+        raise error
+    logger.warning("%s", error)
+
+
+def _on_orm_execute(orm_execute_state: ORMExecuteState) -> None:
+    state = orm_execute_state.lazy_loaded_from
+    if state is None:
+        return
+    target = orm_execute_state.bind_mapper
+    relationship = f"{state.class_.__name__} -> {target.class_.__name__ if target is not None else '?'}"
+    LAZY_LOADS.inc(relationship=relationship)
+    with _counters_lock:
+        for counter in _active_counters:
+            counter.lazy_loads.append(relationship)
+    if _policy() != "off":
+        _violation(LazyLoadError(relationship))
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _active_counters:
+        with _counters_lock:
+            for counter in _active_counters:
+                counter.statements.append(statement)
+
+    budget = settings.MAX_STATEMENTS_PER_REQUEST
+    if budget <= 0:
+        return
+    stats = current_request_stats()
+    # Report each request once, on the first statement over budget
+    if stats is not None and stats.statement_count == budget + 1:
+        BUDGET_VIOLATIONS.inc(route=stats.route)
+        _violation(QueryBudgetExceededError(f"{stats.method} {stats.route}", budget))
+
+
+def install_query_guard(engine: Engine, session_factory: sessionmaker) -> None:
+    """
+    Attaches the N+1 guard: lazy-load detection on sessions from session_factory
+    and statement counting / per-request budgets on the engine.
+    Must be installed after the instrumentation hooks so request stats are up to date.
+    """
+    event.listen(session_factory, "do_orm_execute", _on_orm_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+@contextmanager
+def count_statements() -> Iterator[StatementCounter]:
+    """
+    Counts every SQL statement (and lazy load) executed in the process while active.
+    Intended for tests, e.g.:
+
+        with count_statements() as counter:
+            client.get("/books")
+        assert counter.count <= 2, counter.statements
+    """
+    counter = StatementCounter()
+    with _counters_lock:
+        _active_counters.append(counter)
+    try:
+        yield counter
+    finally:
+        with _counters_lock:
+            _active_counters.remove(counter)
+
+
+@contextmanager
+def assert_max_statements(limit: int, allow_lazy_loads: bool = False) -> Iterator[StatementCounter]:
+    """ Fails with AssertionError if the block runs more than `limit` statements or any lazy load. """
+    with count_statements() as counter:
+        yield counter
+    if counter.count > limit:
+        executed = "\n".join(f"  {i + 1}. {' '.join(s.split())}" for i, s in enumerate(counter.statements))
+        raise AssertionError(f"Expected at most {limit} SQL statements, got {counter.count}:\n{executed}")
+    if counter.lazy_loads and not allow_lazy_loads:
+        raise AssertionError(f"Unexpected lazy loads: {', '.join(counter.lazy_loads)}")
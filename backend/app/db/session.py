@@ -3,12 +3,25 @@ from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 from app.core.config import settings # Import settings
+from app.core.instrumentation import install_query_hooks
+from app.db.query_guard import install_query_guard
+from app.db.change_capture import install_change_capture
 
 # Create engine using the DATABASE_URL from settings
-engine = create_engine(settings.DATABASE_URL, pool_pre_ping=True)
+engine = create_engine(
+    settings.DATABASE_URL,
+    pool_pre_ping=True,
+    query_cache_size=settings.SQL_COMPILED_CACHE_SIZE
+)
+# Per-statement timing, slow-query logging and request-level DB stats
+install_query_hooks(engine)
 
 # Create session local class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Opt-in N+1 detection (LAZY_LOAD_POLICY / MAX_STATEMENTS_PER_REQUEST)
+install_query_guard(engine, SessionLocal)
+# Catalog writes add change feed events in the same transaction
+install_change_capture(SessionLocal)
 
 # Base class for declarative class definitions
 Base = declarative_base()
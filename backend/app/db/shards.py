@@ -0,0 +1,150 @@
+# backend/app/db/shards.py
+"""
+Horizontal sharding of the per-user tables (SHARDED_TABLES) by user id.
+
+Shard 0 is the primary database (DATABASE_URL), which also keeps everything global:
+catalog, users, reviews, jobs, change feed and sales rollups. SHARD_DATABASE_URLS adds
+shards 1..N. A user belongs to bucket user_id % SHARD_BUCKETS and the shard_bucket table
+on the primary maps every bucket to a shard, so moving users between shards
+(app.jobs.shards) is a matter of copying a bucket and updating one row. With no
+extra shards configured nothing is looked up and every session is the primary's.
+
+Writers hold their bucket's shard_bucket row FOR SHARE (on a connection of its own)
+until the shard transaction has committed; a move holds it FOR UPDATE while copying,
+so no write can land on the old shard after it was copied. Reads take no lock.
+
+Order and order item ids are drawn from the primary's sequences for every shard, so
+they stay unique across shards (exports and jobs refer to orders by id alone). The
+shard schema is created from the models by `python -m app.jobs.shards init`; later
+changes to the sharded tables have to be applied on every shard.
+"""
+import contextlib
+import tempfile
+from typing import Any, Dict, Iterator, List, Sequence
+
+from sqlalchemy import MetaData, Table, create_engine, select, text
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.config import settings
+from app.core.instrumentation import install_query_hooks
+from app.db.session import Base, SessionLocal, engine
+from app.models import database_models
+
+# Buckets users are spread over; fixed for good once data is sharded (migration 0011 creates the rows)
+SHARD_BUCKETS = 1024
+# Tables holding per-user data, in dependency order
+SHARDED_TABLES = ("order", "order_item", "cart_item", "cart_buffer")
+
+engines = [engine] + [
+    create_engine(url.strip(), pool_pre_ping=True, query_cache_size=settings.SQL_COMPILED_CACHE_SIZE)
+    for url in settings.SHARD_DATABASE_URLS.split(",") if url.strip()
+]
+for _engine in engines[1:]:
+    install_query_hooks(_engine)
+
+# Shard number -> session factory (shard 0 is SessionLocal itself)
+session_factories: List[sessionmaker] = [SessionLocal] + [
+    sessionmaker(autocommit=False, autoflush=False, bind=shard_engine) for shard_engine in engines[1:]
+]
+
+
+def is_sharded() -> bool:
+    return len(engines) > 1
+
+
+def bucket_of(user_id: int) -> int:
+    return user_id % SHARD_BUCKETS
+
+
+def factories_for(table: str) -> List[sessionmaker]:
+    """ Session factories of every database holding rows of `table`. """
+    return session_factories if table in SHARDED_TABLES else [SessionLocal]
+
+
+def shard_of(db: Session, user_id: int, lock: bool = False) -> int:
+    """ Shard of a user, read through db (a primary session). lock=True takes the bucket row FOR SHARE. """
+    if not is_sharded():
+        return 0
+    stmt = select(database_models.ShardBucket.shard).where(database_models.ShardBucket.bucket == bucket_of(user_id))
+    if lock:
+        stmt = stmt.with_for_update(read=True)
+    shard = db.scalar(stmt)
+    if shard is None:
+        return 0
+    if shard >= len(session_factories):
+        raise RuntimeError(f"Bucket {bucket_of(user_id)} is on shard {shard}, which SHARD_DATABASE_URLS does not list")
+    return shard
+
+
+@contextlib.contextmanager
+def user_session(db: Session, user_id: int, write: bool = False) -> Iterator[Session]:
+    """
+    Session on the shard holding the user's orders and cart: db itself when that is the
+    primary, otherwise a new session closed on exit. The caller commits it.
+    write=True keeps the user's bucket from moving until the block exits.
+    """
+    if not is_sharded():
+        yield db
+        return
+    lock_db = SessionLocal() if write else None
+    try:
+        shard = shard_of(lock_db or db, user_id, lock=write)
+        if shard == 0:
+            yield db
+            return
+        shard_db = session_factories[shard]()
+        try:
+            yield shard_db
+        finally:
+            shard_db.close()
+    finally:
+        if lock_db is not None:
+            lock_db.rollback()
+            lock_db.close()
+
+
+def next_ids(db: Session, table: str, count: int) -> List[int]:
+    """ `count` values of the primary's id sequence of `table` (db is a primary session). """
+    if count <= 0:
+        return []
+    return list(db.scalars(
+        text("SELECT nextval(pg_get_serial_sequence(:table, 'id')) FROM generate_series(1, :count)"),
+        {"table": f'"{table}"', "count": count},
+    ))
+
+
+def copy_rows(
+    source: Session, query: str, params: Dict[str, Any], target: Session, table: str, columns: Sequence[str]
+) -> int:
+    """
+    Streams the rows of `query` (run on source) into `table` on target with COPY, spooled
+    through memory / a temporary file. Runs in both sessions' transactions. Returns the rows copied.
+    """
+    source_cursor = source.connection().connection.cursor()
+    target_cursor = target.connection().connection.cursor()
+    column_list = ", ".join(f'"{column}"' for column in columns)
+    with tempfile.SpooledTemporaryFile(max_size=settings.SHARD_COPY_SPOOL_BYTES, mode="w+b") as spool:
+        source_cursor.copy_expert(
+            source_cursor.mogrify(f"COPY ({query}) TO STDOUT", params or None).decode(), spool
+        )
+        spool.seek(0)
+        target_cursor.copy_expert(f'COPY "{table}" ({column_list}) FROM STDIN', spool)
+        return target_cursor.rowcount
+
+
+def shard_metadata() -> MetaData:
+    """
+    SHARDED_TABLES as created on shards 1..N: the models' tables (partitioning and
+    indexes included) without the foreign keys to global tables, which live on the primary.
+    """
+    metadata = MetaData()
+    for name in SHARDED_TABLES:
+        table: Table = Base.metadata.tables[name].to_metadata(metadata)
+        for constraint in list(table.foreign_key_constraints):
+            if constraint.elements[0].target_fullname.split(".")[0] in SHARDED_TABLES:
+                continue
+            table.constraints.discard(constraint)
+            for foreign_key in constraint.elements:
+                foreign_key.parent.foreign_keys.discard(foreign_key)
+                table.foreign_keys.discard(foreign_key)
+    return metadata
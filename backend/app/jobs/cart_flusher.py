@@ -0,0 +1,47 @@
+# backend/app/jobs/cart_flusher.py
+"""
+Writes buffered carts (cart_buffer) to cart_item once they have been idle for
+CART_FLUSH_DELAY_SECONDS, or buffered for CART_FLUSH_MAX_DELAY_SECONDS.
+
+Every API process runs run_flusher() from its lifespan; buffers are claimed with
+FOR UPDATE SKIP LOCKED, so the flushers share the work. Reads of a cart and checkout
+flush that user's buffer themselves (app.services.cart_service).
+
+    python -m app.jobs.cart_flusher     # flush every due buffer once
+"""
+import asyncio
+import logging
+
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.services import cart_service
+
+logger = logging.getLogger(__name__)
+
+
+async def run_flusher() -> None:
+    """ Background loop started from the application lifespan. """
+    while True:
+        try:
+            flushed = await run_in_threadpool(cart_service.flush_due)
+        except Exception:
+            logger.exception("Cart buffer flush failed")
+            flushed = 0
+        if flushed < settings.CART_FLUSH_BATCH:
+            await asyncio.sleep(settings.CART_FLUSH_POLL_SECONDS)
+
+
+def main() -> None:
+    logging.basicConfig(level=settings.LOG_LEVEL)
+    total = 0
+    while True:
+        flushed = cart_service.flush_due()
+        total += flushed
+        if flushed < settings.CART_FLUSH_BATCH:
+            break
+    print(f"Flushed {total} buffered carts")
+
+
+if __name__ == "__main__":
+    main()
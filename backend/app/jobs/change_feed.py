@@ -0,0 +1,152 @@
+# backend/app/jobs/change_feed.py
+"""
+Consumers of the change feed (change_event, see app.db.change_capture).
+
+Every tracked catalog write adds events in its own transaction. Consumers read them
+in commit-safe (txid, id) order, at least once:
+
+* durable consumers store their cursor in change_consumer after handling a batch and
+  resume from it after a restart (a crash between the two re-delivers that batch);
+* in-process consumers (cache invalidation in each API worker) start at the head of
+  the feed, since their caches start empty anyway.
+
+Events are kept CHANGE_FEED_RETENTION_HOURS. To follow the feed from a shell:
+
+    python -m app.jobs.change_feed tail [--consumer NAME]
+"""
+import argparse
+import asyncio
+import datetime
+import json
+import logging
+import time
+from typing import Callable, Optional, Sequence
+
+from sqlalchemy import func, select
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.metrics import REGISTRY
+from app.db.session import SessionLocal
+from app.models import database_models
+from app.repositories.change_feed_repository import ChangeFeedRepository, Cursor
+
+logger = logging.getLogger(__name__)
+
+CHANGE_EVENTS_CONSUMED = REGISTRY.counter(
+    "change_feed_events_total", "Change feed events handled, by consumer.", ("consumer",)
+)
+CHANGE_FEED_LAG = REGISTRY.gauge(
+    "change_feed_lag_seconds", "Age of the last event a consumer handled when it was read.", ("consumer",)
+)
+
+# pg advisory lock key of the retention prune
+CHANGE_FEED_PRUNE_LOCK_ID = 400_001
+
+EventHandler = Callable[[Sequence[database_models.ChangeEvent]], None]
+
+
+class ChangeFeedConsumer:
+    """ Polls the feed every CHANGE_FEED_POLL_SECONDS and passes batches to handle(). """
+    def __init__(self, name: str, handle: EventHandler, durable: bool = True, batch_size: Optional[int] = None):
+        self.name = name
+        self.handle = handle
+        self.durable = durable
+        self.batch_size = batch_size or settings.CHANGE_FEED_BATCH_SIZE
+        self.cursor: Optional[Cursor] = None
+
+    def poll(self) -> int:
+        """ Handles the next batch and returns its size (0 when caught up). """
+        db = SessionLocal()
+        try:
+            repo = ChangeFeedRepository(db)
+            if self.cursor is None:
+                self.cursor = (repo.get_cursor(self.name) if self.durable else None) or repo.head()
+            events = repo.read(self.cursor, self.batch_size)
+            if not events:
+                db.rollback()
+                return 0
+            # Detached copies, so handlers can keep them after the session closes
+            db.expunge_all()
+            self.handle(events)
+            last = events[-1]
+            if self.durable:
+                repo.save_cursor(self.name, (last.txid, last.id))
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+        self.cursor = (last.txid, last.id)
+        CHANGE_EVENTS_CONSUMED.inc(len(events), consumer=self.name)
+        CHANGE_FEED_LAG.set((datetime.datetime.now() - last.changed_at).total_seconds(), consumer=self.name)
+        return len(events)
+
+    async def run(self) -> None:
+        """ Background loop started from the application lifespan. """
+        while True:
+            try:
+                handled = await run_in_threadpool(self.poll)
+            except Exception:
+                logger.exception("Change feed consumer %s failed", self.name)
+                handled = 0
+            if handled < self.batch_size:
+                await asyncio.sleep(settings.CHANGE_FEED_POLL_SECONDS)
+
+
+def prune() -> int:
+    """ Deletes events older than the retention unless another worker is doing it. """
+    db = SessionLocal()
+    try:
+        if not db.scalar(select(func.pg_try_advisory_xact_lock(CHANGE_FEED_PRUNE_LOCK_ID))):
+            db.rollback()
+            return 0
+        deleted = ChangeFeedRepository(db).prune(datetime.timedelta(hours=settings.CHANGE_FEED_RETENTION_HOURS))
+        db.commit()
+        return deleted
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+async def run_pruner() -> None:
+    """ Background loop started from the application lifespan. """
+    while True:
+        try:
+            deleted = await run_in_threadpool(prune)
+            if deleted:
+                logger.info("Pruned %d change feed events", deleted)
+        except Exception:
+            logger.exception("Change feed prune failed")
+        await asyncio.sleep(settings.CHANGE_FEED_PRUNE_SECONDS)
+
+
+def _print_events(events: Sequence[database_models.ChangeEvent]) -> None:
+    for event in events:
+        print(json.dumps({
+            "txid": event.txid, "id": event.id, "entity": event.entity, "entity_id": event.entity_id,
+            "kind": event.kind, "book_id": event.book_id, "changed_at": event.changed_at.isoformat(),
+        }), flush=True)
+
+
+def main(argv: Sequence[str] = None) -> None:
+    parser = argparse.ArgumentParser(description="Follow the catalog change feed.")
+    parser.add_argument("command", choices=["tail"])
+    parser.add_argument("--consumer", help="Durable consumer name: resume from (and save) its cursor")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=settings.LOG_LEVEL)
+
+    consumer = ChangeFeedConsumer(args.consumer or "tail", _print_events, durable=args.consumer is not None)
+    try:
+        while True:
+            if consumer.poll() < consumer.batch_size:
+                time.sleep(settings.CHANGE_FEED_POLL_SECONDS)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
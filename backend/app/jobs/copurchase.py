@@ -0,0 +1,140 @@
+# backend/app/jobs/copurchase.py
+"""
+Builds the "customers also bought" model (book_copurchase / book_related).
+
+    python -m app.jobs.copurchase build     # full rebuild from every order
+    python -m app.jobs.copurchase update    # fold in orders placed since the last run
+
+Both read order_item in order id ranges (on every shard) and count pairs with NumPy
+(app.services.copurchase). A build replaces both tables with COPY; an update adds the
+new pair counts and re-ranks only the books they touch. The API runs run_updater()
+from its lifespan; an advisory lock keeps runs from overlapping across workers.
+"""
+import argparse
+import asyncio
+import logging
+import time
+from typing import Iterator, Sequence
+
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.db import shards
+from app.db.session import SessionLocal
+from app.repositories.recommendation_repository import RecommendationRepository
+from app.services import copurchase
+
+logger = logging.getLogger(__name__)
+
+JOB_NAME = "copurchase"
+# pg advisory lock key shared by build and update
+COPURCHASE_LOCK_ID = 370_001
+# Orders read per order_item query
+ORDERS_PER_CHUNK = 100_000
+
+
+def _shard_sessions(db: Session) -> Iterator[Session]:
+    """ db, then a session on each further shard holding order_item (closed after use). """
+    yield db
+    for factory in shards.factories_for("order_item")[1:]:
+        shard_db = factory()
+        try:
+            yield shard_db
+        finally:
+            shard_db.close()
+
+
+def _settled_order_id(db: Session, settle_seconds: float) -> int:
+    # Ids come from the primary's sequence on every shard, so the highest settled one is taken
+    return max(RecommendationRepository(shard_db).settled_order_id(settle_seconds) for shard_db in _shard_sessions(db))
+
+
+def _count_pairs(db: Session, after: int, up_to: int) -> copurchase.PairCounts:
+    accumulator = copurchase.PairAccumulator()
+    for shard_db in _shard_sessions(db):
+        # Orders live on one shard each, so counting per shard splits none of them
+        for order_ids, book_ids in RecommendationRepository(shard_db).iter_order_items(after, up_to, ORDERS_PER_CHUNK):
+            accumulator.add(copurchase.count_pairs(order_ids, book_ids, settings.COPURCHASE_MAX_ORDER_ITEMS))
+    return accumulator.result()
+
+
+def build() -> int:
+    """ Recomputes the whole model from order_item. Returns the number of books with neighbours. """
+    db = SessionLocal()
+    try:
+        db.execute(select(func.pg_advisory_xact_lock(COPURCHASE_LOCK_ID)))
+        repo = RecommendationRepository(db)
+        up_to = _settled_order_id(db, 0)
+        pairs = _count_pairs(db, 0, up_to)
+        top = copurchase.top_k(pairs, settings.COPURCHASE_TOP_K)
+        repo.replace_pairs(pairs, top)
+        repo.set_watermark(JOB_NAME, up_to)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+    return len(np.unique(top[0]))
+
+
+def update() -> int:
+    """ Adds orders placed since the last run. Returns the number of books re-ranked. """
+    db = SessionLocal()
+    try:
+        if not db.scalar(select(func.pg_try_advisory_xact_lock(COPURCHASE_LOCK_ID))):
+            db.rollback()
+            return 0 # A build or another update is running
+        repo = RecommendationRepository(db)
+        after = repo.get_watermark(JOB_NAME)
+        up_to = _settled_order_id(db, settings.COPURCHASE_SETTLE_SECONDS)
+        if up_to <= after:
+            db.rollback()
+            return 0
+        pairs = _count_pairs(db, after, up_to)
+        repo.add_pairs(pairs)
+        touched = np.unique(pairs[0]).tolist()
+        repo.refresh_top_k(touched, settings.COPURCHASE_TOP_K)
+        repo.set_watermark(JOB_NAME, up_to)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+    return len(touched)
+
+
+async def run_updater() -> None:
+    """ Background loop started from the application lifespan. """
+    if settings.COPURCHASE_UPDATE_SECONDS <= 0:
+        return
+    while True:
+        await asyncio.sleep(settings.COPURCHASE_UPDATE_SECONDS)
+        try:
+            books = await run_in_threadpool(update)
+            if books:
+                logger.info("Co-purchase model updated: %d books re-ranked", books)
+        except Exception:
+            logger.exception("Co-purchase update failed")
+
+
+def main(argv: Sequence[str] = None) -> None:
+    parser = argparse.ArgumentParser(description="Build or update the co-purchase recommendations.")
+    parser.add_argument("command", choices=["build", "update"])
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=settings.LOG_LEVEL)
+
+    started = time.perf_counter()
+    if args.command == "build":
+        print(f"Co-purchase model built: {build()} books with neighbours")
+    else:
+        print(f"Co-purchase model updated: {update()} books re-ranked")
+    print(f"Took {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
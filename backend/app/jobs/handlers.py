@@ -0,0 +1,50 @@
+# backend/app/jobs/handlers.py
+"""
+Handlers of the background job types (see app.jobs.outbox). Imported by the
+application and by `python -m app.jobs.outbox` so the types are registered.
+
+    order_placed    {"order_id", "user_id", "placed_at"}   sales counters and rollups
+                    (user_id locates the order's shard; older jobs carry order_id only)
+
+Cache invalidation follows from the change feed (app.jobs.change_feed), which the
+handlers' writes feed like any other transaction.
+"""
+import logging
+import time
+from typing import Any, Dict
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db import shards
+from app.db.change_capture import record_changes
+from app.jobs.outbox import RetryLater, register
+from app.repositories.order_repository import OrderRepository
+from app.repositories.sales_repository import SalesRepository
+
+logger = logging.getLogger(__name__)
+
+
+@register("order_placed")
+def order_placed(db: Session, payload: Dict[str, Any]) -> None:
+    if "user_id" in payload:
+        # Read from the user's shard. An order placed on a shard other than the primary is
+        # queued before it commits, so a missing order is retried (the delay doubling with
+        # its age) until SHARD_ORDER_MAX_WAIT_SECONDS after it was placed
+        with shards.user_session(db, payload["user_id"]) as shard_db:
+            order_date, items = OrderRepository(shard_db).list_sold_items(payload["order_id"])
+        waited = time.time() - payload.get("placed_at", 0)
+        if not items and waited < settings.SHARD_ORDER_MAX_WAIT_SECONDS:
+            raise RetryLater(
+                f"order {payload['order_id']} not committed yet after {waited:.0f}s",
+                min(max(waited, settings.JOB_RETRY_BASE_SECONDS), settings.SHARD_ORDER_MAX_WAIT_SECONDS - waited),
+            )
+    else:
+        order_date, items = OrderRepository(db).list_sold_items(payload["order_id"])
+    if not items:
+        logger.warning("order_placed: order %s has no items, dropping the job", payload["order_id"])
+        return None
+    SalesRepository(db).record_sales(items, sales_date=order_date.date() if order_date else None)
+    # Sales counters feed the best_selling sort and rail; written with Core upserts, so announced explicitly
+    book_ids = sorted({item["book_id"] for item in items})
+    record_changes(db, "book_sales", book_ids, "update", book_ids)
@@ -0,0 +1,149 @@
+# backend/app/jobs/maintenance.py
+"""
+Scheduled cleanup of data nothing reads any more:
+
+    expired_carts     cart lines not rewritten for CART_RETENTION_DAYS (abandoned carts)
+    ended_discounts   discounts that ended DISCOUNT_ARCHIVE_AFTER_DAYS ago, moved to
+                      discount_archive so the active-discount subquery scans fewer rows
+
+    python -m app.jobs.maintenance                      # every task once
+    python -m app.jobs.maintenance ended_discounts      # one task
+
+Rows go in batches of MAINTENANCE_BATCH_ROWS, each committed on its own, with a
+MAINTENANCE_BATCH_PAUSE_SECONDS pause in between, so locks stay short and the
+cleanup never monopolises the database. The API runs run_scheduler() from its
+lifespan every MAINTENANCE_INTERVAL_SECONDS; an advisory lock keeps it to one
+worker at a time. Archived discounts had already ended, so no read path shows them
+and no change feed events are emitted for them.
+"""
+import argparse
+import asyncio
+import datetime
+import logging
+import time
+from typing import Callable, Dict, Sequence
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.metrics import REGISTRY
+from app.db import shards
+from app.db.session import SessionLocal
+from app.repositories.maintenance_repository import MaintenanceRepository
+
+logger = logging.getLogger(__name__)
+
+MAINTENANCE_ROWS = REGISTRY.counter(
+    "maintenance_rows_total", "Rows deleted or archived by the maintenance job.", ("task",)
+)
+MAINTENANCE_DURATION = REGISTRY.histogram(
+    "maintenance_task_seconds", "Duration of a maintenance task run, pauses included.", ("task",)
+)
+
+# pg advisory lock key of a maintenance run
+MAINTENANCE_LOCK_ID = 460_001
+
+
+def _expired_carts(db: Session, limit: int) -> int:
+    older_than = datetime.datetime.now() - datetime.timedelta(days=settings.CART_RETENTION_DAYS)
+    return MaintenanceRepository(db).delete_expired_cart_items(older_than, limit)
+
+
+def _ended_discounts(db: Session, limit: int) -> int:
+    ended_before = datetime.date.today() - datetime.timedelta(days=settings.DISCOUNT_ARCHIVE_AFTER_DAYS)
+    return MaintenanceRepository(db).archive_ended_discounts(ended_before, limit)
+
+
+# task -> one batch(db, limit) returning the rows it handled
+TASKS: Dict[str, Callable[[Session, int], int]] = {
+    "expired_carts": _expired_carts,
+    "ended_discounts": _ended_discounts,
+}
+# task -> table it cleans up, which decides the databases it runs on (app.db.shards)
+TASK_TABLES = {
+    "expired_carts": "cart_item",
+    "ended_discounts": "discount",
+}
+
+
+def run_task(name: str) -> int:
+    """
+    Runs batches of a task until one comes back short, on every database holding its
+    table. Returns the rows handled.
+    """
+    batch = TASKS[name]
+    limit = settings.MAINTENANCE_BATCH_ROWS
+    started = time.perf_counter()
+    total = batches = 0
+    for factory in shards.factories_for(TASK_TABLES[name]):
+        while True:
+            db = factory()
+            try:
+                handled = batch(db, limit)
+                db.commit()
+            except Exception:
+                db.rollback()
+                raise
+            finally:
+                db.close()
+            total += handled
+            batches += 1
+            MAINTENANCE_ROWS.inc(handled, task=name)
+            if handled < limit:
+                break
+            time.sleep(settings.MAINTENANCE_BATCH_PAUSE_SECONDS)
+    elapsed = time.perf_counter() - started
+    MAINTENANCE_DURATION.observe(elapsed, task=name)
+    logger.info("Maintenance %s: %d rows in %d batches, %.1fs", name, total, batches, elapsed)
+    return total
+
+
+def run_all(names: Sequence[str] = None) -> Dict[str, int]:
+    """
+    Runs the tasks unless another worker is running them (then returns {}).
+    The session-level lock is held on its own connection for the whole run.
+    """
+    lock_db = SessionLocal()
+    try:
+        if not lock_db.scalar(select(func.pg_try_advisory_lock(MAINTENANCE_LOCK_ID))):
+            return {}
+        lock_db.commit() # Session-level lock: kept, without leaving the connection idle in transaction
+        try:
+            return {name: run_task(name) for name in (names or TASKS)}
+        finally:
+            lock_db.execute(select(func.pg_advisory_unlock(MAINTENANCE_LOCK_ID)))
+    finally:
+        lock_db.rollback()
+        lock_db.close()
+
+
+async def run_scheduler() -> None:
+    """ Background loop started from the application lifespan. """
+    while True:
+        try:
+            await run_in_threadpool(run_all)
+        except Exception:
+            logger.exception("Maintenance run failed")
+        await asyncio.sleep(settings.MAINTENANCE_INTERVAL_SECONDS)
+
+
+def main(argv: Sequence[str] = None) -> None:
+    parser = argparse.ArgumentParser(description="Delete expired cart lines and archive ended discounts.")
+    parser.add_argument("tasks", nargs="*", choices=sorted(TASKS), help="Defaults to every task")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=settings.LOG_LEVEL)
+
+    started = time.perf_counter()
+    report = run_all(args.tasks)
+    if not report:
+        print("Another maintenance run holds the lock")
+        return
+    for name, rows in report.items():
+        print(f"{name:<16} {rows:>10,} rows")
+    print(f"{'total':<16} {sum(report.values()):>10,} rows in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+# backend/app/jobs/outbox.py
+"""
+Background jobs backed by the job_outbox table.
+
+Request handlers call enqueue() before committing, so a side effect is queued if and
+only if the change that caused it commits. Each API worker runs a JobWorker from its
+lifespan (JOB_WORKER_ENABLED); dedicated workers can run
+
+    python -m app.jobs.outbox
+
+Workers claim jobs with FOR UPDATE SKIP LOCKED, run at most JOB_WORKER_CONCURRENCY
+handlers at a time, and delete a job in the same transaction as its handler's writes,
+so a job's database effects are applied once. Failures are retried with exponential
+backoff up to JOB_MAX_ATTEMPTS (a handler raising RetryLater picks its own delay and
+bound instead); jobs of a worker that died are picked up again after
+JOB_LEASE_SECONDS. Handlers should therefore be safe to run again after a crash.
+"""
+import asyncio
+import logging
+import time
+from typing import Any, Callable, Dict, Optional, Set
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.metrics import REGISTRY
+from app.db.session import SessionLocal
+from app.repositories.job_repository import JobRepository
+
+logger = logging.getLogger(__name__)
+
+JOBS_PROCESSED = REGISTRY.counter(
+    "jobs_processed_total", "Background jobs run, by outcome (done, retried, failed, lost).", ("job_type", "outcome")
+)
+JOB_DURATION = REGISTRY.histogram(
+    "job_duration_seconds", "Background job handler latency.", ("job_type",)
+)
+JOB_QUEUE_DEPTH = REGISTRY.gauge(
+    "job_queue_depth", "Jobs in the outbox by status, as last seen by this worker.", ("status",)
+)
+JOB_QUEUE_LAG = REGISTRY.gauge(
+    "job_queue_lag_seconds", "How long the oldest runnable pending job has been waiting."
+)
+JOBS_RUNNING = REGISTRY.gauge("jobs_running", "Job handlers currently running in this process.")
+
+# job_type -> handler(db, payload). The handler must not commit; it may return a callback
+# to run once its writes are committed (e.g. invalidating in-process caches)
+JobHandler = Callable[[Session, Dict[str, Any]], Optional[Callable[[], None]]]
+_handlers: Dict[str, JobHandler] = {}
+
+
+class RetryLater(Exception):
+    """ Raised by a handler whose input is not there yet: the job runs again after `seconds`, attempts left or not. """
+    def __init__(self, reason: str, seconds: float):
+        super().__init__(reason)
+        self.seconds = seconds
+
+
+def register(job_type: str) -> Callable[[JobHandler], JobHandler]:
+    """ Decorator registering the handler of a job type. """
+    def decorator(handler: JobHandler) -> JobHandler:
+        _handlers[job_type] = handler
+        return handler
+    return decorator
+
+
+def enqueue(db: Session, job_type: str, payload: Dict[str, Any], delay_seconds: float = 0) -> None:
+    """ Queues a job in db's transaction. Nothing runs until the caller commits. """
+    JobRepository(db).add(job_type, payload, delay_seconds)
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _wake_after_commit(session: Session) -> None:
+    # The local worker picks the new jobs up now instead of at its next poll
+    if session.info.pop("jobs_enqueued", False):
+        job_worker.wake()
+
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _forget_after_rollback(session: Session) -> None:
+    session.info.pop("jobs_enqueued", None)
+
+
+def _retry_delay(attempts: int) -> Optional[float]:
+    if attempts >= settings.JOB_MAX_ATTEMPTS:
+        return None
+    return settings.JOB_RETRY_BASE_SECONDS * 2 ** (attempts - 1)
+
+
+def run_job(job_id: int, job_type: str, payload: Dict[str, Any], attempts: int) -> str:
+    """ Runs one claimed job in its own transaction and returns the outcome. """
+    started = time.perf_counter()
+    db = SessionLocal()
+    try:
+        handler = _handlers.get(job_type)
+        if handler is None:
+            raise LookupError(f"No handler registered for job type {job_type!r}")
+        after_commit = handler(db, payload)
+        if not JobRepository(db).complete(job_id, attempts):
+            # Our lease expired and another worker claimed the job; its run wins
+            db.rollback()
+            return "lost"
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        retry_in = e.seconds if isinstance(e, RetryLater) else _retry_delay(attempts)
+        logger.warning("Job %s (%s) attempt %d failed: %r", job_id, job_type, attempts, e)
+        JobRepository(db).reschedule(job_id, attempts, repr(e)[:2000], retry_in)
+        db.commit()
+        return "retried" if retry_in is not None else "failed"
+    finally:
+        db.close()
+        JOB_DURATION.observe(time.perf_counter() - started, job_type=job_type)
+    if after_commit is not None:
+        try:
+            after_commit()
+        except Exception:
+            logger.exception("After-commit callback of job %s (%s) failed", job_id, job_type)
+    return "done"
+
+
+class JobWorker:
+    """
+    Polls the outbox every JOB_POLL_SECONDS, or right away after enqueue() in this
+    process, and runs claimed jobs in the threadpool.
+    """
+    def __init__(self):
+        self._wakeup: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._running: Set[asyncio.Task] = set()
+        self._stats_at = 0.0
+
+    def wake(self) -> None:
+        """ Safe to call from any thread; a no-op when no worker runs in this process. """
+        if self._loop is None or self._wakeup is None:
+            return
+        try:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+        except RuntimeError:
+            pass # Loop already closed
+
+    def _claim(self, limit: int):
+        db = SessionLocal()
+        try:
+            repo = JobRepository(db)
+            now = time.monotonic()
+            if now - self._stats_at >= settings.JOB_STATS_SECONDS:
+                self._stats_at = now
+                released = repo.release_expired(settings.JOB_LEASE_SECONDS)
+                if released:
+                    logger.warning("Re-queued %d jobs whose lease expired", released)
+                pending, running, failed, lag = repo.queue_stats()
+                for status, depth in (("pending", pending), ("running", running), ("failed", failed)):
+                    JOB_QUEUE_DEPTH.set(depth, status=status)
+                JOB_QUEUE_LAG.set(lag)
+            jobs = repo.claim(limit)
+            db.commit()
+            return jobs
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    async def _run(self, job) -> None:
+        JOBS_RUNNING.inc()
+        try:
+            outcome = await run_in_threadpool(run_job, *job)
+            JOBS_PROCESSED.inc(job_type=job[1], outcome=outcome)
+        except Exception:
+            logger.exception("Job %s could not be run", job[0])
+        finally:
+            JOBS_RUNNING.dec()
+
+    async def run(self) -> None:
+        """ Background loop started from the application lifespan (or main()). """
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        concurrency = settings.JOB_WORKER_CONCURRENCY
+        try:
+            while True:
+                self._wakeup.clear()
+                free = concurrency - len(self._running)
+                jobs = []
+                if free > 0:
+                    try:
+                        jobs = await run_in_threadpool(self._claim, free)
+                    except Exception:
+                        logger.exception("Claiming jobs failed")
+                for job in jobs:
+                    task = asyncio.create_task(self._run(job))
+                    self._running.add(task)
+                    task.add_done_callback(self._done)
+                if len(jobs) == free and free > 0:
+                    continue # Probably more waiting
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=settings.JOB_POLL_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            self._loop = None
+            # Claimed jobs finish in their threads; unclaimed ones wait for the next worker
+            if self._running:
+                await asyncio.gather(*self._running, return_exceptions=True)
+
+    def _done(self, task: "asyncio.Task") -> None:
+        self._running.discard(task)
+        if self._wakeup is not None:
+            self._wakeup.set() # A slot is free
+
+
+# One per process
+job_worker = JobWorker()
+
+
+def main() -> None:
+    logging.basicConfig(level=settings.LOG_LEVEL)
+    from app.jobs import handlers # noqa: F401  (registers the job types)
+    asyncio.run(job_worker.run())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+# backend/app/jobs/partitions.py
+"""
+Upkeep of the monthly range partitions of order, order_item and review:
+
+    python -m app.jobs.partitions status                     # partitions, schema and estimated rows
+    python -m app.jobs.partitions create --from 2020-01-01   # months back to a day (before loading history)
+    python -m app.jobs.partitions maintain                   # what the API runs every PARTITION_CHECK_SECONDS
+
+maintain() creates the partitions of the next PARTITION_MONTHS_AHEAD months and moves
+partitions older than PARTITION_ARCHIVE_AFTER_MONTHS to the PARTITION_ARCHIVE_SCHEMA
+schema. Archived partitions stay attached: the models and repositories keep reading
+through the parent tables, and queries filtered or ordered by date skip them.
+
+There is no default partition. Rows dated outside every partition fail to insert,
+which is why months are created well ahead; in exchange the planner can scan the
+partitions in date order and stop early for ORDER BY date ... LIMIT, which a default
+partition (possibly holding any date) would prevent.
+"""
+import argparse
+import asyncio
+import datetime
+import logging
+from typing import Dict, Optional, Sequence, Tuple
+
+from sqlalchemy import func, select
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.metrics import REGISTRY
+from app.db import shards
+from app.db.session import SessionLocal
+from app.repositories.partition_repository import (
+    PARTITIONED_TABLES, PartitionRepository, add_months, month_start
+)
+
+logger = logging.getLogger(__name__)
+
+PARTITIONS_CREATED = REGISTRY.counter("partitions_created_total", "Monthly partitions created.", ("table",))
+PARTITIONS_ARCHIVED = REGISTRY.counter(
+    "partitions_archived_total", "Partitions moved to the archive schema.", ("table",)
+)
+
+# pg advisory lock key of partition upkeep
+PARTITION_LOCK_ID = 470_001
+
+
+def create_months(first: datetime.date, last: datetime.date) -> Dict[str, int]:
+    """
+    Creates the missing partitions of every partitioned table (on every shard holding it)
+    for the months from `first` to `last` (inclusive). Each partition is committed on its
+    own. Returns the number created per table.
+    """
+    created = {table: 0 for table in PARTITIONED_TABLES}
+    for table in PARTITIONED_TABLES:
+        for factory in shards.factories_for(table):
+            db = factory()
+            try:
+                repo = PartitionRepository(db)
+                covered = {partition.start for partition in repo.list_partitions(table)}
+                db.commit()
+                month = month_start(first)
+                while month <= last:
+                    if month not in covered:
+                        repo.set_lock_timeout(settings.PARTITION_LOCK_TIMEOUT_MS)
+                        name = repo.create_partition(table, month)
+                        db.commit()
+                        created[table] += 1
+                        PARTITIONS_CREATED.inc(table=table)
+                        logger.info("Created partition %s", name)
+                    month = add_months(month, 1)
+            except Exception:
+                db.rollback()
+                raise
+            finally:
+                db.close()
+    return created
+
+
+def archive_before(before: datetime.date) -> Dict[str, int]:
+    """
+    Moves partitions holding only dates before `before` to PARTITION_ARCHIVE_SCHEMA, each
+    in its own transaction. Returns the number moved per table.
+    """
+    schema = settings.PARTITION_ARCHIVE_SCHEMA
+    archived = {table: 0 for table in PARTITIONED_TABLES}
+    for table in PARTITIONED_TABLES:
+        for factory in shards.factories_for(table):
+            db = factory()
+            try:
+                repo = PartitionRepository(db)
+                due = [
+                    partition for partition in repo.list_partitions(table)
+                    if partition.end <= before and partition.schema != schema
+                ]
+                db.commit()
+                for partition in due:
+                    repo.set_lock_timeout(settings.PARTITION_LOCK_TIMEOUT_MS)
+                    repo.move_partition(partition, schema)
+                    db.commit()
+                    archived[table] += 1
+                    PARTITIONS_ARCHIVED.inc(table=table)
+                    logger.info("Moved partition %s to schema %s", partition.name, schema)
+            except Exception:
+                db.rollback()
+                raise
+            finally:
+                db.close()
+    return archived
+
+
+def maintain(today: Optional[datetime.date] = None) -> Optional[Tuple[Dict[str, int], Dict[str, int]]]:
+    """
+    Creates the coming months and archives old ones. Returns (created, archived) per
+    table, or None when another worker holds the lock.
+    """
+    today = today or datetime.date.today()
+    current = month_start(today)
+    lock_db = SessionLocal()
+    try:
+        if not lock_db.scalar(select(func.pg_try_advisory_lock(PARTITION_LOCK_ID))):
+            return None
+        lock_db.commit() # Session-level lock: kept, without leaving the connection idle in transaction
+        try:
+            created = create_months(current, add_months(current, settings.PARTITION_MONTHS_AHEAD))
+            archived = archive_before(add_months(current, -settings.PARTITION_ARCHIVE_AFTER_MONTHS))
+            return created, archived
+        finally:
+            lock_db.execute(select(func.pg_advisory_unlock(PARTITION_LOCK_ID)))
+    finally:
+        lock_db.rollback()
+        lock_db.close()
+
+
+async def run_scheduler() -> None:
+    """ Background loop started from the application lifespan. """
+    while True:
+        try:
+            await run_in_threadpool(maintain)
+        except Exception:
+            logger.exception("Partition upkeep failed")
+        await asyncio.sleep(settings.PARTITION_CHECK_SECONDS)
+
+
+def status() -> None:
+    db = SessionLocal()
+    try:
+        repo = PartitionRepository(db)
+        for table in PARTITIONED_TABLES:
+            partitions = repo.list_partitions(table)
+            print(f"{table}: {len(partitions)} partitions")
+            for partition in partitions:
+                print(f"  {partition.schema + '.' + partition.name:<34} {partition.start} .. {partition.end} {partition.rows:>12,} rows")
+    finally:
+        db.close()
+
+
+def main(argv: Sequence[str] = None) -> None:
+    parser = argparse.ArgumentParser(description="Create and archive the monthly partitions.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("status", help="List the partitions of every partitioned table")
+    create = commands.add_parser("create", help="Create the months from a day to PARTITION_MONTHS_AHEAD ahead")
+    create.add_argument("--from", dest="first", type=datetime.date.fromisoformat, required=True)
+    commands.add_parser("maintain", help="Create the coming months and archive old ones")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=settings.LOG_LEVEL)
+
+    if args.command == "status":
+        status()
+    elif args.command == "create":
+        last = add_months(month_start(datetime.date.today()), settings.PARTITION_MONTHS_AHEAD)
+        for table, count in create_months(args.first, last).items():
+            print(f"{table:<12} {count:>4} created")
+    else:
+        report = maintain()
+        if report is None:
+            print("Another worker holds the partition lock")
+            return
+        created, archived = report
+        for table in PARTITIONED_TABLES:
+            print(f"{table:<12} {created[table]:>4} created {archived[table]:>4} archived")
+
+
+if __name__ == "__main__":
+    main()
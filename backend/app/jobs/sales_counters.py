@@ -0,0 +1,129 @@
+# backend/app/jobs/sales_counters.py
+"""
+Best-seller counter and sales analytics rollup maintenance (book_sales_daily,
+book_sales_stats, sales_daily, category_sales_daily, author_sales_daily).
+
+    python -m app.jobs.sales_counters rebuild            # backfill everything from order_item (every shard)
+    python -m app.jobs.sales_counters refresh-windows    # re-derive the 7d/30d windows now
+
+The API runs run_window_refresher() from its lifespan, which rolls the windows
+forward once per day; an advisory lock makes sure only one worker does it.
+"""
+import argparse
+import asyncio
+import datetime
+import logging
+from typing import Optional, Sequence
+
+from sqlalchemy import TableClause, column, func, select, table, text
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.db import shards
+from app.db.change_capture import record_changes
+from app.db.session import SessionLocal
+from app.repositories.sales_repository import SalesRepository
+
+logger = logging.getLogger(__name__)
+
+# pg advisory lock key of the window refresh
+SALES_WINDOWS_LOCK_ID = 360_001
+
+
+def _sales_counters_changed(db) -> None:
+    """ The best_selling orderings changed for many books at once; every process rebuilds. """
+    record_changes(db, "sales_windows", [0])
+
+
+def refresh_windows_if_due(today: Optional[datetime.date] = None) -> bool:
+    """ Rolls the 7d/30d windows to today unless that already happened. Returns True if it ran. """
+    today = today or datetime.date.today()
+    db = SessionLocal()
+    try:
+        sales_repo = SalesRepository(db)
+        oldest = sales_repo.oldest_windows_as_of()
+        if oldest is None or oldest >= today:
+            return False
+        if not db.scalar(select(func.pg_try_advisory_xact_lock(SALES_WINDOWS_LOCK_ID))):
+            db.rollback()
+            return False # Another worker is refreshing
+        books = sales_repo.refresh_windows(today)
+        _sales_counters_changed(db)
+        db.commit()
+        logger.info("Sales windows refreshed for %s: %d books with recent sales", today, books)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+    return True
+
+
+async def run_window_refresher() -> None:
+    """ Background loop started from the application lifespan. """
+    while True:
+        try:
+            await run_in_threadpool(refresh_windows_if_due)
+        except Exception:
+            logger.exception("Sales window refresh failed")
+        await asyncio.sleep(settings.SALES_WINDOWS_POLL_SECONDS)
+
+
+# order_item columns the rebuild reads, gathered from every shard when sharded
+_ITEM_COLUMNS = ("order_id", "order_date", "book_id", "quantity", "price")
+
+
+def _gather_order_items(db: Session) -> TableClause:
+    """ Copies the order items of every shard into a temporary table of db's transaction. """
+    db.execute(text(
+        "CREATE TEMPORARY TABLE rebuild_order_item ON COMMIT DROP AS "
+        f"SELECT {', '.join(_ITEM_COLUMNS)} FROM order_item WITH NO DATA"
+    ))
+    for factory in shards.session_factories:
+        shard_db = factory()
+        try:
+            shards.copy_rows(
+                shard_db, f"SELECT {', '.join(_ITEM_COLUMNS)} FROM order_item", {},
+                db, "rebuild_order_item", _ITEM_COLUMNS,
+            )
+            shard_db.rollback()
+        finally:
+            shard_db.close()
+    return table("rebuild_order_item", *(column(name) for name in _ITEM_COLUMNS))
+
+
+def rebuild() -> int:
+    db = SessionLocal()
+    try:
+        sales_repo = SalesRepository(db)
+        items = None
+        if shards.is_sharded():
+            sales_repo.lock_for_rebuild() # Before reading the shards, as the unsharded rebuild does
+            items = _gather_order_items(db)
+        books = sales_repo.rebuild_from_orders(datetime.date.today(), items)
+        _sales_counters_changed(db)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+    return books
+
+
+def main(argv: Sequence[str] = None) -> None:
+    parser = argparse.ArgumentParser(description="Maintain the sales counters and analytics rollups.")
+    parser.add_argument("command", choices=["rebuild", "refresh-windows"])
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=settings.LOG_LEVEL)
+
+    if args.command == "rebuild":
+        print(f"Sales counters rebuilt: {rebuild()} books with sales")
+    else:
+        ran = refresh_windows_if_due()
+        print("Sales windows refreshed" if ran else "Sales windows already current")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,342 @@
+# backend/app/jobs/shards.py
+"""
+Setup and resharding of the per-user tables (app.db.shards):
+
+    python -m app.jobs.shards init                           # create the tables and partitions on shards 1..N
+    python -m app.jobs.shards status                         # buckets and estimated rows per shard
+    python -m app.jobs.shards move --buckets 0-255 --to 1    # move buckets (users) to a shard
+    python -m app.jobs.shards rebalance [--dry-run]          # spread the buckets evenly over every shard
+    python -m app.jobs.shards cleanup                        # drop rows a shard no longer owns
+
+A bucket moves while the API keeps running. Its shard_bucket row is locked FOR UPDATE,
+which waits for the writes in flight and holds new ones (checkout and cart syncs of
+about 1/SHARD_BUCKETS of the users) until the move commits; reads carry on from the old
+shard. The rows are streamed to the new shard with COPY and committed, the map is
+updated, then the old copies are deleted. A move that fails midway leaves the map
+unchanged and is simply run again; old copies left by a failure after the map update
+are removed by cleanup. Moves, rebalance and cleanup take an advisory lock, so only
+one runs at a time.
+
+Trying it out with several local databases:
+
+    createdb bookstore_shard1 && createdb bookstore_shard2
+    export SHARD_DATABASE_URLS=postgresql://localhost/bookstore_shard1,postgresql://localhost/bookstore_shard2
+    python -m app.jobs.shards init && python -m app.jobs.shards rebalance
+
+Every process (API workers and jobs) needs the same SHARD_DATABASE_URLS. Shards can be
+added later (init, then rebalance); removing one means moving its buckets away first.
+"""
+import argparse
+import datetime
+import logging
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import delete, func, select, text, tuple_, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.metrics import REGISTRY
+from app.db import shards
+from app.db.session import Base, SessionLocal
+from app.jobs import partitions
+from app.models import database_models
+from app.repositories.partition_repository import PartitionRepository, add_months, month_start
+
+logger = logging.getLogger(__name__)
+
+SHARD_BUCKET_MOVES = REGISTRY.counter("shard_bucket_moves_total", "Buckets moved to another shard.")
+SHARD_ROWS_MOVED = REGISTRY.counter("shard_rows_moved_total", "Rows copied to another shard by moves.", ("table",))
+
+# pg advisory lock key of moves, rebalance and cleanup
+SHARD_MOVE_LOCK_ID = 480_001
+
+# Columns copied per table; cart_item rows get new ids from the target's sequence
+_MOVE_COLUMNS = {
+    table: tuple(column.name for column in Base.metadata.tables[table].columns if (table, column.name) != ("cart_item", "id"))
+    for table in shards.SHARDED_TABLES
+}
+# Rows of the given users, per table (order_item through its orders, which hold the user id)
+_USER_ROWS = {
+    "order": 'SELECT {columns} FROM "order" WHERE user_id = ANY(%(user_ids)s)',
+    "order_item": (
+        "SELECT {columns} FROM order_item WHERE (order_id, order_date) IN "
+        '(SELECT id, order_date FROM "order" WHERE user_id = ANY(%(user_ids)s))'
+    ),
+    "cart_item": "SELECT {columns} FROM cart_item WHERE user_id = ANY(%(user_ids)s)",
+    "cart_buffer": "SELECT {columns} FROM cart_buffer WHERE user_id = ANY(%(user_ids)s)",
+}
+
+
+def _delete_users(db: Session, user_ids: List[int]) -> None:
+    """ Deletes the rows of the given users from db's sharded tables (items before their orders). """
+    order = database_models.Order
+    order_item = database_models.OrderItem
+    db.execute(
+        delete(order_item)
+        .where(tuple_(order_item.order_id, order_item.order_date).in_(
+            select(order.id, order.order_date).where(order.user_id.in_(user_ids))
+        ))
+        .execution_options(synchronize_session=False)
+    )
+    for model in (order, database_models.CartItem, database_models.CartBuffer):
+        db.execute(delete(model).where(model.user_id.in_(user_ids)).execution_options(synchronize_session=False))
+
+
+def _with_move_lock(run):
+    """ Runs run() holding the session-level advisory lock of moves (waits for it). """
+    lock_db = SessionLocal()
+    try:
+        lock_db.execute(select(func.pg_advisory_lock(SHARD_MOVE_LOCK_ID)))
+        lock_db.commit() # Session-level lock: kept, without leaving the connection idle in transaction
+        try:
+            return run()
+        finally:
+            lock_db.execute(select(func.pg_advisory_unlock(SHARD_MOVE_LOCK_ID)))
+    finally:
+        lock_db.rollback()
+        lock_db.close()
+
+
+def _move_bucket(bucket: int, target: int) -> Optional[Dict[str, int]]:
+    """ Moves one bucket to shard `target`. Returns the rows copied per table, or None if it was there already. """
+    bucket_row = database_models.ShardBucket
+    map_db = SessionLocal()
+    try:
+        source = map_db.scalar(select(bucket_row.shard).where(bucket_row.bucket == bucket).with_for_update())
+        if source is None or source == target:
+            return None
+        user_ids = list(map_db.scalars(
+            select(database_models.User.id).where(database_models.User.id % shards.SHARD_BUCKETS == bucket)
+        ))
+        copied = {}
+        source_db = shards.session_factories[source]()
+        target_db = shards.session_factories[target]()
+        try:
+            if user_ids:
+                _delete_users(target_db, user_ids) # Leftovers of an earlier, failed move
+                # Keeps the cart flusher (which skips locked buffers) off the rows being moved
+                source_db.execute(
+                    select(database_models.CartBuffer.user_id)
+                    .where(database_models.CartBuffer.user_id.in_(user_ids))
+                    .with_for_update()
+                ).all()
+                for table in shards.SHARDED_TABLES:
+                    columns = _MOVE_COLUMNS[table]
+                    query = _USER_ROWS[table].format(columns=", ".join(f'"{column}"' for column in columns))
+                    copied[table] = shards.copy_rows(source_db, query, {"user_ids": user_ids}, target_db, table, columns)
+                target_db.commit()
+            map_db.execute(update(bucket_row).where(bucket_row.bucket == bucket).values(shard=target, moved_at=func.now()))
+            map_db.commit()
+            if user_ids:
+                _delete_users(source_db, user_ids)
+            source_db.commit()
+        except Exception:
+            source_db.rollback()
+            target_db.rollback()
+            raise
+        finally:
+            source_db.close()
+            target_db.close()
+    except Exception:
+        map_db.rollback()
+        raise
+    finally:
+        map_db.close()
+    SHARD_BUCKET_MOVES.inc()
+    for table, rows in copied.items():
+        SHARD_ROWS_MOVED.inc(rows, table=table)
+    logger.info("Moved bucket %d from shard %d to %d: %s", bucket, source, target, copied)
+    return copied
+
+
+def _check_shard(shard: int) -> None:
+    if not 0 <= shard < len(shards.session_factories):
+        raise ValueError(f"Shard {shard} is not configured (SHARD_DATABASE_URLS lists {len(shards.engines) - 1})")
+
+
+def _move_all(moves: Sequence[Tuple[int, int]]) -> int:
+    """ Moves each (bucket, shard) in turn, under the move lock. Returns the number of buckets moved. """
+    def run() -> int:
+        moved = 0
+        for bucket, target in moves:
+            started = time.perf_counter()
+            copied = _move_bucket(bucket, target)
+            if copied is None:
+                continue
+            moved += 1
+            print(f"bucket {bucket:>4} -> shard {target}: {sum(copied.values()):>10,} rows in {time.perf_counter() - started:.1f}s")
+        return moved
+    return _with_move_lock(run)
+
+
+def move(buckets: Sequence[int], target: int) -> int:
+    """ Moves the buckets to shard `target`. Returns the number moved. """
+    _check_shard(target)
+    return _move_all([(bucket, target) for bucket in buckets])
+
+
+def _bucket_map() -> Dict[int, int]:
+    db = SessionLocal()
+    try:
+        return dict(db.execute(select(database_models.ShardBucket.bucket, database_models.ShardBucket.shard)).all())
+    finally:
+        db.close()
+
+
+def plan_rebalance(bucket_map: Dict[int, int], shard_count: int) -> List[Tuple[int, int]]:
+    """
+    Fewest (bucket, shard) moves that leave every shard with SHARD_BUCKETS / shard_count
+    buckets (the first shards take the remainder). Buckets on unconfigured shards move too.
+    """
+    share, extra = divmod(len(bucket_map), shard_count)
+    wanted = {shard: share + (shard < extra) for shard in range(shard_count)}
+    held: Dict[int, List[int]] = {shard: [] for shard in range(shard_count)}
+    surplus = []
+    for bucket, shard in sorted(bucket_map.items()):
+        if shard in held and len(held[shard]) < wanted[shard]:
+            held[shard].append(bucket)
+        else:
+            surplus.append(bucket)
+    moves = []
+    for shard in range(shard_count):
+        while len(held[shard]) < wanted[shard]:
+            bucket = surplus.pop()
+            held[shard].append(bucket)
+            moves.append((bucket, shard))
+    return sorted(moves)
+
+
+def rebalance(dry_run: bool = False) -> int:
+    """ Spreads the buckets evenly over the configured shards. Returns the number of buckets (to be) moved. """
+    moves = plan_rebalance(_bucket_map(), len(shards.session_factories))
+    if dry_run:
+        for bucket, target in moves:
+            print(f"bucket {bucket:>4} -> shard {target}")
+        return len(moves)
+    return _move_all(moves)
+
+
+def cleanup() -> Dict[int, int]:
+    """ Deletes, on every shard, the rows of users whose bucket is mapped elsewhere. Returns the orders deleted per shard. """
+    def run() -> Dict[int, int]:
+        bucket_map = _bucket_map()
+        deleted = {}
+        for shard, factory in enumerate(shards.session_factories):
+            owned = [bucket for bucket, owner in bucket_map.items() if owner == shard]
+            db = factory()
+            try:
+                order = database_models.Order
+                order_item = database_models.OrderItem
+                foreign_orders = select(order.id, order.order_date).where(
+                    (order.user_id % shards.SHARD_BUCKETS).not_in(owned)
+                )
+                db.execute(
+                    delete(order_item)
+                    .where(tuple_(order_item.order_id, order_item.order_date).in_(foreign_orders))
+                    .execution_options(synchronize_session=False)
+                )
+                deleted[shard] = db.execute(
+                    delete(order).where((order.user_id % shards.SHARD_BUCKETS).not_in(owned))
+                    .execution_options(synchronize_session=False)
+                ).rowcount
+                for model in (database_models.CartItem, database_models.CartBuffer):
+                    db.execute(
+                        delete(model).where((model.user_id % shards.SHARD_BUCKETS).not_in(owned))
+                        .execution_options(synchronize_session=False)
+                    )
+                db.commit()
+            except Exception:
+                db.rollback()
+                raise
+            finally:
+                db.close()
+        return deleted
+    return _with_move_lock(run)
+
+
+def init() -> None:
+    """
+    Creates the sharded tables on shards 1..N (existing ones are left alone) and the
+    partitions from the primary's oldest month to PARTITION_MONTHS_AHEAD ahead.
+    """
+    metadata = shards.shard_metadata()
+    for shard_engine in shards.engines[1:]:
+        with shard_engine.begin() as connection:
+            connection.execute(text(f'CREATE SCHEMA IF NOT EXISTS "{settings.PARTITION_ARCHIVE_SCHEMA}"'))
+        metadata.create_all(shard_engine)
+    db = SessionLocal()
+    try:
+        existing = PartitionRepository(db).list_partitions("order")
+    finally:
+        db.close()
+    current = month_start(datetime.date.today())
+    first = existing[0].start if existing else current
+    partitions.create_months(first, add_months(current, settings.PARTITION_MONTHS_AHEAD))
+
+
+def _estimated_rows(db: Session, table: str) -> int:
+    """ Planner estimate of the rows of a table and its partitions. """
+    return int(db.scalar(
+        text(
+            "SELECT COALESCE(SUM(GREATEST(reltuples, 0)), 0) FROM pg_class WHERE oid = CAST(:table AS regclass) "
+            "OR oid IN (SELECT inhrelid FROM pg_inherits WHERE inhparent = CAST(:table AS regclass))"
+        ),
+        {"table": f'"{table}"'},
+    ))
+
+
+def status() -> None:
+    buckets: Dict[int, int] = {}
+    for shard in _bucket_map().values():
+        buckets[shard] = buckets.get(shard, 0) + 1
+    print(f"{'shard':<6} {'buckets':>8} " + " ".join(f"{table:>12}" for table in shards.SHARDED_TABLES))
+    for shard, factory in enumerate(shards.session_factories):
+        db = factory()
+        try:
+            rows = [_estimated_rows(db, table) for table in shards.SHARDED_TABLES]
+        finally:
+            db.close()
+        print(f"{shard:<6} {buckets.pop(shard, 0):>8} " + " ".join(f"{count:>12,}" for count in rows))
+    for shard, count in sorted(buckets.items()):
+        print(f"{shard:<6} {count:>8}  (not in SHARD_DATABASE_URLS)")
+
+
+def _bucket_range(value: str) -> List[int]:
+    first, _, last = value.partition("-")
+    buckets = list(range(int(first), int(last or first) + 1))
+    if not buckets or buckets[0] < 0 or buckets[-1] >= shards.SHARD_BUCKETS:
+        raise argparse.ArgumentTypeError(f"Buckets are 0-{shards.SHARD_BUCKETS - 1}")
+    return buckets
+
+
+def main(argv: Sequence[str] = None) -> None:
+    parser = argparse.ArgumentParser(description="Set up shards and move user buckets between them.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("init", help="Create the sharded tables and partitions on shards 1..N")
+    commands.add_parser("status", help="Buckets and estimated rows per shard")
+    move_parser = commands.add_parser("move", help="Move buckets to a shard")
+    move_parser.add_argument("--buckets", type=_bucket_range, required=True, help="A bucket or a range, e.g. 0-255")
+    move_parser.add_argument("--to", dest="target", type=int, required=True)
+    rebalance_parser = commands.add_parser("rebalance", help="Spread the buckets evenly over every shard")
+    rebalance_parser.add_argument("--dry-run", action="store_true", help="Only print the moves")
+    commands.add_parser("cleanup", help="Delete rows a shard no longer owns")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=settings.LOG_LEVEL)
+
+    if args.command == "init":
+        init()
+        print(f"Initialised {len(shards.engines) - 1} shards")
+    elif args.command == "status":
+        status()
+    elif args.command == "move":
+        print(f"Moved {move(args.buckets, args.target)} buckets")
+    elif args.command == "rebalance":
+        print(f"{'Would move' if args.dry_run else 'Moved'} {rebalance(args.dry_run)} buckets")
+    else:
+        for shard, orders in cleanup().items():
+            print(f"shard {shard}: {orders:,} orders removed")
+
+
+if __name__ == "__main__":
+    main()
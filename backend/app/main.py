@@ -1,20 +1,64 @@
 # backend/app/main.py
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, Depends
+from fastapi.responses import PlainTextResponse
 from fastapi.security import OAuth2PasswordBearer
 from fastapi.openapi.utils import get_openapi
 from fastapi.middleware.cors import CORSMiddleware
 
 # Import all routers
-from app.routers import categories, authors, books, auth, orders, reviews, carts # Add reviews router
+from app.routers import categories, authors, books, auth, orders, reviews, carts, home, admin # Add reviews router
 
 # Import oauth2_scheme from auth module
 from app.routers.auth import oauth2_scheme
+from app.core.admission import AdmissionMiddleware
+from app.core.config import settings
+from app.core.instrumentation import InstrumentedRoute, RequestTimingMiddleware
+from app.core.metrics import REGISTRY
+from app.core.profiling import ProfilingMiddleware
+from app.services import home_service
+from app.services.catalog_snapshot import catalog_engine
+from app.jobs import cart_flusher, change_feed, copurchase, handlers, maintenance, partitions, sales_counters # handlers registers the job types
+from app.jobs.outbox import job_worker
+from app.services.cache_invalidation import apply_changes
+
+logging.basicConfig(level=settings.LOG_LEVEL)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Starts the background refreshers and stops them on shutdown."""
+    tasks = [
+        asyncio.create_task(home_service.rails_cache.run_refresher()),
+        asyncio.create_task(catalog_engine.run_refresher()),
+        asyncio.create_task(sales_counters.run_window_refresher()),
+        asyncio.create_task(copurchase.run_updater()),
+        # Each process invalidates its own caches from the change feed, starting at its head
+        asyncio.create_task(change_feed.ChangeFeedConsumer("cache_invalidation", apply_changes, durable=False).run()),
+        asyncio.create_task(change_feed.run_pruner()),
+        asyncio.create_task(cart_flusher.run_flusher()),
+        asyncio.create_task(maintenance.run_scheduler()),
+        asyncio.create_task(partitions.run_scheduler()),
+    ]
+    if settings.JOB_WORKER_ENABLED:
+        tasks.append(asyncio.create_task(job_worker.run()))
+    try:
+        yield
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
 
 app = FastAPI(
     title="Bookworm API",
     description="API for the Bookworm bookstore application",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
+# App-level routes (/, /metrics) get the same endpoint timing as the routers
+app.router.route_class = InstrumentedRoute
 
 # Define CORS origins
 origins = [
@@ -22,6 +66,12 @@ origins = [
     "http://localhost:5173",  # Default Vite dev server port
 ]
 
+# Request profiling (opt-in per request), innermost so shed requests are never profiled
+app.add_middleware(ProfilingMiddleware)
+
+# Admission control, inside CORS so shed responses still carry the CORS headers
+app.add_middleware(AdmissionMiddleware)
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -29,8 +79,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing", "Retry-After", "X-Profile-Id"],
 )
 
+# Request timing (added last so it wraps CORS and sees the full request)
+app.add_middleware(RequestTimingMiddleware)
+
 # Custom OpenAPI schema setup
 def custom_openapi():
     if app.openapi_schema:
@@ -77,11 +131,20 @@ app.include_router(
 app.include_router(authors.router, tags=["Authors"])
 app.include_router(books.router, tags=["Books"])
 app.include_router(carts.router, tags=["cart"], prefix="/api")
+app.include_router(home.router, tags=["Home"])
+app.include_router(admin.router, tags=["Admin"])
 
 @app.get("/")
 async def read_root():
     return {"message": "Welcome to the Bookworm Backend!"} # Updated message
 
+@app.get("/metrics", include_in_schema=False)
+async def read_metrics():
+    """Prometheus-style metrics for this worker process."""
+    if not settings.METRICS_ENABLED:
+        return PlainTextResponse("metrics disabled\n", status_code=404)
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
 # Run command: uvicorn main:app --reload --port 8000 --app-dir backend
 # Note the --app-dir backend which helps with imports if main.py is in the root
 # If main.py is inside app/, run: uvicorn app.main:app --reload --port 8000
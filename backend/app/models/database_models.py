@@ -1,10 +1,11 @@
 # backend/app/models/database_models.py
 from sqlalchemy import (
-    Column, Integer, String, Text, Numeric, ForeignKey, 
-    Date, TIMESTAMP, Boolean, BigInteger, SmallInteger, UniqueConstraint
+    Column, Integer, String, Text, Numeric, ForeignKey, ForeignKeyConstraint,
+    Date, TIMESTAMP, Boolean, BigInteger, SmallInteger, UniqueConstraint, Index
 )
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
-from sqlalchemy.sql import func
+from sqlalchemy.sql import func, text
 from app.db.session import Base
 import datetime
 
@@ -22,12 +23,20 @@ class Author(Base):
     author_bio = Column(Text)
     books = relationship("Book", back_populates="author")
 
+    __table_args__ = (
+        # Author-name substring search in BookRepository.list_and_count_books
+        Index(
+            "ix_author_author_name_trgm", "author_name",
+            postgresql_using="gin", postgresql_ops={"author_name": "gin_trgm_ops"}
+        ),
+    )
+
 class Book(Base):
     __tablename__ = "book"
     # ... book columns ...
     id = Column(BigInteger, primary_key=True, index=True)
-    category_id = Column(BigInteger, ForeignKey("category.id"), nullable=False)
-    author_id = Column(BigInteger, ForeignKey("author.id"), nullable=False)
+    category_id = Column(BigInteger, ForeignKey("category.id"), nullable=False, index=True)
+    author_id = Column(BigInteger, ForeignKey("author.id"), nullable=False, index=True)
     book_title = Column(String(255), nullable=False, index=True)
     book_summary = Column(Text)
     book_price = Column(Numeric(5, 2), nullable=False)
@@ -40,16 +49,53 @@ class Book(Base):
     # Add relationship to Review
     reviews = relationship("Review", back_populates="book")
 
+    __table_args__ = (
+        # Substring search (ILIKE '%term%') in BookRepository.list_and_count_books
+        Index(
+            "ix_book_book_title_trgm", "book_title",
+            postgresql_using="gin", postgresql_ops={"book_title": "gin_trgm_ops"}
+        ),
+    )
+
 # New Discount Model
 class Discount(Base):
     __tablename__ = "discount"
     id = Column(BigInteger, primary_key=True, index=True)
-    book_id = Column(BigInteger, ForeignKey("book.id"), nullable=False, index=True)
+    book_id = Column(BigInteger, ForeignKey("book.id"), nullable=False)
     discount_start_date = Column(Date, nullable=False)
     discount_end_date = Column(Date, nullable=True)
     discount_price = Column(Numeric(5, 2), nullable=False)
     book = relationship("Book", back_populates="discounts")
 
+    __table_args__ = (
+        # Per-book lookups (Book.discounts, active discount of one book); also replaces ix_discount_book_id
+        Index(
+            "ix_discount_book_id_dates", "book_id", "discount_start_date", "discount_end_date",
+            postgresql_include=["discount_price"]
+        ),
+        # Active-discount subquery: "end_date >= today" range ...
+        Index(
+            "ix_discount_end_date", "discount_end_date", "book_id",
+            postgresql_include=["discount_start_date", "discount_price"]
+        ),
+        # ... OR'ed with open-ended discounts
+        Index(
+            "ix_discount_open_ended", "book_id",
+            postgresql_include=["discount_start_date", "discount_price"],
+            postgresql_where=discount_end_date.is_(None)
+        ),
+    )
+
+class DiscountArchive(Base):
+    """ Discounts that ended long ago, moved out of discount by app.jobs.maintenance. """
+    __tablename__ = "discount_archive"
+    id = Column(BigInteger, primary_key=True) # Id the row had in discount
+    book_id = Column(BigInteger, nullable=False, index=True)
+    discount_start_date = Column(Date, nullable=False)
+    discount_end_date = Column(Date, nullable=False)
+    discount_price = Column(Numeric(5, 2), nullable=False)
+    archived_at = Column(TIMESTAMP(timezone=False), nullable=False, server_default=func.now())
+
 class User(Base):
     __tablename__ = "user"
     # ... user columns ...
@@ -69,42 +115,66 @@ class User(Base):
 class Order(Base): # Ensure Order is defined before OrderItem if not already
      __tablename__ = "order"
      # ... order columns ...
-     id = Column(BigInteger, primary_key=True, index=True)
+     # Monthly range partitions (app.jobs.partitions), so the partition key is part of the primary key
+     id = Column(BigInteger, primary_key=True, autoincrement=True)
      user_id = Column(BigInteger, ForeignKey("user.id"), nullable=False)
-     order_date = Column(TIMESTAMP(timezone=False), server_default=func.now())
+     order_date = Column(TIMESTAMP(timezone=False), primary_key=True, server_default=func.now())
      order_amount = Column(Numeric(8, 2), nullable=False)
 
      user = relationship("User", back_populates="orders")
      items = relationship("OrderItem", back_populates="order", cascade="all, delete-orphan")
 
+     __table_args__ = {"postgresql_partition_by": "RANGE (order_date)"}
+
+
+# OrderRepository.list_orders_by_user_id: WHERE user_id = ? ORDER BY order_date DESC
+Index("ix_order_user_id_order_date", Order.user_id, Order.order_date.desc())
+
 
 class OrderItem(Base): # Ensure OrderItem is defined
      __tablename__ = "order_item"
      # ... order_item columns ...
-     id = Column(BigInteger, primary_key=True, index=True)
-     order_id = Column(BigInteger, ForeignKey("order.id"), nullable=False)
-     book_id = Column(BigInteger, ForeignKey("book.id"), nullable=False)
+     id = Column(BigInteger, primary_key=True, autoincrement=True)
+     order_id = Column(BigInteger, nullable=False, index=True)
+     # Copy of the order's date: items share their order's partition
+     order_date = Column(TIMESTAMP(timezone=False), primary_key=True)
+     book_id = Column(BigInteger, ForeignKey("book.id"), nullable=False, index=True)
      quantity = Column(SmallInteger, nullable=False)
      price = Column(Numeric(5, 2), nullable=False)
 
      order = relationship("Order", back_populates="items")
      book = relationship("Book", back_populates="order_items")
 
+     __table_args__ = (
+         ForeignKeyConstraint(["order_id", "order_date"], ["order.id", "order.order_date"]),
+         {"postgresql_partition_by": "RANGE (order_date)"},
+     )
+
 # --- New Review Model ---
 class Review(Base):
     __tablename__ = "review"
-    id = Column(BigInteger, primary_key=True, index=True)
-    book_id = Column(BigInteger, ForeignKey("book.id"), nullable=False, index=True)
+    # Monthly range partitions (app.jobs.partitions), so the partition key is part of the primary key
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    book_id = Column(BigInteger, ForeignKey("book.id"), nullable=False)
     user_id = Column(BigInteger, ForeignKey("user.id"), nullable=False, index=True) # Reviews must be by users
     review_title = Column(String(120), nullable=False) # Max length 120
     review_details = Column(Text, nullable=True) # Optional details
     # ERD shows rating_start as varchar(255)? Let's assume it should be integer rating 1-5
     rating_start = Column(SmallInteger, nullable=False) # Store rating as 1, 2, 3, 4, 5
-    review_date = Column(TIMESTAMP(timezone=False), server_default=func.now()) # Default to now
+    review_date = Column(TIMESTAMP(timezone=False), primary_key=True, server_default=func.now()) # Default to now
 
     book = relationship("Book", back_populates="reviews")
     user = relationship("User", back_populates="reviews")
 
+    __table_args__ = (
+        # Review count / average rating per book (index-only aggregate) and the rating filter;
+        # replaces ix_review_book_id
+        Index("ix_review_book_id_rating", "book_id", "rating_start"),
+        # read_reviews_for_book: WHERE book_id = ? ORDER BY review_date
+        Index("ix_review_book_id_review_date", "book_id", "review_date"),
+        {"postgresql_partition_by": "RANGE (review_date)"},
+    )
+
 class CartItem(Base):
     __tablename__ = "cart_item"
     
@@ -112,10 +182,203 @@ class CartItem(Base):
     user_id = Column(BigInteger, ForeignKey("user.id"), nullable=False)
     book_id = Column(BigInteger, ForeignKey("book.id"), nullable=False)
     quantity = Column(Integer, nullable=False)
+    updated_at = Column(TIMESTAMP(timezone=False), nullable=False, server_default=func.now()) # Carts are rewritten whole
     
     user = relationship("User", back_populates="cart_items")
     book = relationship("Book")
     
     __table_args__ = (
+        # Also serves "WHERE user_id = ?" lookups, so no separate user_id index
         UniqueConstraint('user_id', 'book_id', name='uq_cart_item_user_book'),
+        # Abandoned cart cleanup (app.jobs.maintenance)
+        Index("ix_cart_item_updated_at", "updated_at"),
+    )
+
+class CartBuffer(Base):
+    """
+    Latest cart a user synced, not yet written to cart_item (app.services.cart_service).
+    UNLOGGED: no WAL per update; after a crash the table is empty, which loses at most
+    CART_FLUSH_MAX_DELAY_SECONDS of cart changes.
+    """
+    __tablename__ = "cart_buffer"
+
+    user_id = Column(BigInteger, ForeignKey("user.id"), primary_key=True)
+    items = Column(JSONB, nullable=False) # [[book_id, quantity], ...]
+    updates = Column(Integer, nullable=False, server_default="1") # Syncs absorbed since the last flush
+    buffered_at = Column(TIMESTAMP(timezone=False), nullable=False, server_default=func.now()) # First unflushed sync
+    updated_at = Column(TIMESTAMP(timezone=False), nullable=False, server_default=func.now())
+
+    __table_args__ = (
+        # Flusher: buffers idle for longer than the debounce ...
+        Index("ix_cart_buffer_updated_at", "updated_at"),
+        # ... or buffered for longer than the maximum delay
+        Index("ix_cart_buffer_buffered_at", "buffered_at"),
+        {"prefixes": ["UNLOGGED"]},
+    )
+
+# --- Sales Counters ---
+class BookSalesDaily(Base):
+    """ Units sold and revenue per book and day; incremented when an order is placed. """
+    __tablename__ = "book_sales_daily"
+
+    book_id = Column(BigInteger, ForeignKey("book.id"), primary_key=True)
+    sales_date = Column(Date, primary_key=True)
+    quantity = Column(Integer, nullable=False, default=0)
+    revenue = Column(Numeric(12, 2), nullable=False, default=0)
+
+    __table_args__ = (
+        # Window refresh: WHERE sales_date > today - 30
+        Index("ix_book_sales_daily_sales_date", "sales_date"),
+    )
+
+class BookSalesStats(Base):
+    """
+    Per-book sales over rolling windows, read by the best_selling sort modes.
+    Totals and windows are incremented with each order; the 7d/30d windows are
+    recomputed from book_sales_daily once per day (windows_as_of).
+    """
+    __tablename__ = "book_sales_stats"
+
+    book_id = Column(BigInteger, ForeignKey("book.id"), primary_key=True)
+    quantity_7d = Column(Integer, nullable=False, default=0)
+    revenue_7d = Column(Numeric(12, 2), nullable=False, default=0)
+    quantity_30d = Column(Integer, nullable=False, default=0)
+    revenue_30d = Column(Numeric(12, 2), nullable=False, default=0)
+    quantity_total = Column(BigInteger, nullable=False, default=0)
+    revenue_total = Column(Numeric(14, 2), nullable=False, default=0)
+    windows_as_of = Column(Date, nullable=False)
+
+# --- Sales Analytics Rollups ---
+class SalesDaily(Base):
+    """ Orders, units and revenue per day; the admin dashboards' totals and average order value. """
+    __tablename__ = "sales_daily"
+
+    sales_date = Column(Date, primary_key=True)
+    order_count = Column(Integer, nullable=False, default=0)
+    quantity = Column(Integer, nullable=False, default=0)
+    revenue = Column(Numeric(14, 2), nullable=False, default=0)
+
+class CategorySalesDaily(Base):
+    """ Per category and day; order_count counts orders with at least one book of the category. """
+    __tablename__ = "category_sales_daily"
+
+    category_id = Column(BigInteger, ForeignKey("category.id"), primary_key=True)
+    sales_date = Column(Date, primary_key=True)
+    order_count = Column(Integer, nullable=False, default=0)
+    quantity = Column(Integer, nullable=False, default=0)
+    revenue = Column(Numeric(14, 2), nullable=False, default=0)
+
+    __table_args__ = (
+        Index("ix_category_sales_daily_sales_date", "sales_date"),
     )
+
+class AuthorSalesDaily(Base):
+    """ Per author and day, like CategorySalesDaily. """
+    __tablename__ = "author_sales_daily"
+
+    author_id = Column(BigInteger, ForeignKey("author.id"), primary_key=True)
+    sales_date = Column(Date, primary_key=True)
+    order_count = Column(Integer, nullable=False, default=0)
+    quantity = Column(Integer, nullable=False, default=0)
+    revenue = Column(Numeric(14, 2), nullable=False, default=0)
+
+    __table_args__ = (
+        Index("ix_author_sales_daily_sales_date", "sales_date"),
+    )
+
+# --- Co-purchase Recommendations ---
+class BookCopurchase(Base):
+    """
+    Number of orders containing both books. Stored in both directions so the
+    neighbours of a book are one index range; maintained by app.jobs.copurchase.
+    """
+    __tablename__ = "book_copurchase"
+
+    book_id = Column(BigInteger, ForeignKey("book.id"), primary_key=True)
+    related_book_id = Column(BigInteger, ForeignKey("book.id"), primary_key=True)
+    orders_together = Column(Integer, nullable=False)
+
+class BookRelated(Base):
+    """ Top-K co-purchased books per book, read by GET /books/{book_id}/related. """
+    __tablename__ = "book_related"
+
+    book_id = Column(BigInteger, ForeignKey("book.id"), primary_key=True)
+    rank = Column(SmallInteger, primary_key=True)
+    related_book_id = Column(BigInteger, ForeignKey("book.id"), nullable=False)
+    score = Column(Integer, nullable=False) # orders_together
+
+class JobWatermark(Base):
+    """ How far an incremental batch job has got (e.g. the last order id it processed). """
+    __tablename__ = "job_watermark"
+
+    job_name = Column(String(64), primary_key=True)
+    position = Column(BigInteger, nullable=False)
+    updated_at = Column(TIMESTAMP(timezone=False), nullable=False, server_default=func.now())
+
+# --- Background Jobs ---
+class JobOutbox(Base):
+    """
+    Durable queue of side effects (app.jobs.outbox). Rows are inserted in the same
+    transaction as the change that caused them, claimed with FOR UPDATE SKIP LOCKED
+    and deleted when the handler commits; failed jobs stay with status "failed".
+    """
+    __tablename__ = "job_outbox"
+
+    id = Column(BigInteger, primary_key=True)
+    job_type = Column(String(64), nullable=False)
+    payload = Column(JSONB, nullable=False)
+    status = Column(String(16), nullable=False, default="pending") # pending, running, failed
+    attempts = Column(SmallInteger, nullable=False, default=0)
+    run_after = Column(TIMESTAMP(timezone=False), nullable=False, server_default=func.now())
+    created_at = Column(TIMESTAMP(timezone=False), nullable=False, server_default=func.now())
+    locked_at = Column(TIMESTAMP(timezone=False))
+    last_error = Column(Text)
+
+    __table_args__ = (
+        # Claiming: the runnable pending jobs, oldest first
+        Index("ix_job_outbox_pending", "run_after", "id", postgresql_where=status == "pending"),
+        # Reclaiming jobs whose worker died
+        Index("ix_job_outbox_running", "locked_at", postgresql_where=status == "running"),
+    )
+
+# --- Change Feed ---
+class ChangeEvent(Base):
+    """
+    One inserted/updated/deleted catalog row (app.db.change_capture), written in the
+    transaction that changed it. Consumers read in (txid, id) order, see app.jobs.change_feed.
+    """
+    __tablename__ = "change_event"
+
+    id = Column(BigInteger, primary_key=True)
+    txid = Column(BigInteger, nullable=False, server_default=text("txid_current()")) # Writing transaction
+    entity = Column(String(32), nullable=False) # book, discount, review, author, category, book_sales
+    entity_id = Column(BigInteger, nullable=False)
+    kind = Column(String(8), nullable=False) # insert, update, delete
+    book_id = Column(BigInteger) # The book whose derived data is affected, if any
+    changed_at = Column(TIMESTAMP(timezone=False), nullable=False, server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_change_event_txid_id", "txid", "id"),
+        Index("ix_change_event_changed_at", "changed_at"),
+    )
+
+class ChangeConsumer(Base):
+    """ Resumable position of a durable change feed consumer. """
+    __tablename__ = "change_consumer"
+
+    name = Column(String(64), primary_key=True)
+    txid = Column(BigInteger, nullable=False)
+    event_id = Column(BigInteger, nullable=False)
+    updated_at = Column(TIMESTAMP(timezone=False), nullable=False, server_default=func.now())
+
+# --- Sharding ---
+class ShardBucket(Base):
+    """
+    Shard holding the orders and carts of the users in a bucket (user_id % SHARD_BUCKETS),
+    see app.db.shards. Writers lock their bucket's row FOR SHARE; a move locks it FOR UPDATE.
+    """
+    __tablename__ = "shard_bucket"
+
+    bucket = Column(Integer, primary_key=True, autoincrement=False)
+    shard = Column(SmallInteger, nullable=False, server_default="0")
+    moved_at = Column(TIMESTAMP(timezone=False))
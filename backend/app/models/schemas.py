@@ -1,6 +1,6 @@
 # backend/app/models/schemas.py
-from pydantic import BaseModel, Field, EmailStr, field_validator # Import field_validator
-from typing import Optional, List
+from pydantic import BaseModel, Field, EmailStr, field_validator, model_validator # Import field_validator
+from typing import Dict, Optional, List
 from decimal import Decimal
 import datetime
 
@@ -143,6 +143,122 @@ class Review(ReviewBase): # Schema for reading a review
 class BookListResponse(BaseModel):
     items: List[Book] # Use the existing Book schema for items
     total_count: int
+
+# --- Shop Sidebar Facets ---
+class FacetCount(BaseModel):
+    id: int
+    count: int
+
+class RatingFacetCount(BaseModel):
+    min_rating: int
+    count: int # Books whose average rating is at least min_rating
+
+class BookFacets(BaseModel):
+    categories: List[FacetCount] = []
+    authors: List[FacetCount] = []
+    ratings: List[RatingFacetCount] = []
+    total_count: int
+
+# --- Admin Sales Analytics ---
+class SalesPeriod(BaseModel):
+    period: datetime.date # First day of the day/week/month
+    order_count: int
+    units: int
+    revenue: Decimal
+    average_order_value: Decimal
+
+class SalesSummary(BaseModel):
+    granularity: str
+    start: datetime.date
+    end: datetime.date
+    periods: List[SalesPeriod] = []
+    order_count: int
+    units: int
+    revenue: Decimal
+    average_order_value: Decimal
+
+class TopSeller(BaseModel):
+    id: int
+    name: str
+    units: int
+    revenue: Decimal
+
+class TopSellersPeriod(BaseModel):
+    period: datetime.date
+    items: List[TopSeller] = []
+
+class TopSellers(BaseModel):
+    dimension: str # book, author or category
+    granularity: str
+    metric: str # revenue or units
+    periods: List[TopSellersPeriod] = []
+
+# --- Admin Discount Campaigns ---
+class DiscountSelection(BaseModel):
+    """ The books a campaign applies to: exactly one of the three. """
+    book_ids: Optional[List[int]] = Field(None, min_length=1, max_length=10_000)
+    category_id: Optional[int] = None
+    author_id: Optional[int] = None
+
+    @model_validator(mode="after")
+    def check_one_selector(self):
+        if sum(value is not None for value in (self.book_ids, self.category_id, self.author_id)) != 1:
+            raise ValueError("Give exactly one of book_ids, category_id or author_id")
+        return self
+
+class DiscountCampaignCreate(DiscountSelection):
+    percent_off: Decimal = Field(..., gt=0, lt=100, decimal_places=2)
+    discount_start_date: datetime.date
+    discount_end_date: Optional[datetime.date] = None # Open-ended when omitted
+    skip_conflicts: bool = False # Leave out books with an overlapping discount instead of failing
+
+    @model_validator(mode="after")
+    def check_dates(self):
+        if self.discount_end_date is not None and self.discount_end_date < self.discount_start_date:
+            raise ValueError("discount_end_date must not be before discount_start_date")
+        return self
+
+class DiscountConflict(BaseModel):
+    book_id: int
+    discount_id: int
+    discount_start_date: datetime.date
+    discount_end_date: Optional[datetime.date] = None
+
+class DiscountCampaignResult(BaseModel):
+    created: int
+    skipped: int # Books left out because of an overlapping discount
+    conflicts: List[DiscountConflict] = [] # The first of them
+
+class DiscountEnd(DiscountSelection):
+    last_day: Optional[datetime.date] = None # Last day discounts still apply; defaults to yesterday (end now)
+
+class DiscountEndResult(BaseModel):
+    ended: int # Running or open-ended discounts cut off after last_day
+    cancelled: int # Discounts that would only have started after last_day
+
+# --- Admin Catalog Import ---
+class ImportReject(BaseModel):
+    line: int # Line of the input file (CSV lines count the header)
+    error: str
+
+class ImportReport(BaseModel):
+    entity: str # category, author, book or discount
+    rows_read: int
+    inserted: int
+    updated: int
+    unchanged: int # Already identical in the database
+    rejected: int
+    rejects: List[ImportReject] = [] # The first IMPORT_MAX_REPORTED_REJECTS of them
+    seconds: float
+
+# --- Home Page Rails ---
+class HomeRails(BaseModel):
+    on_sale: List[Book] = []
+    popular: List[Book] = []
+    recommended: List[Book] = []
+    best_selling: List[Book] = []
+    category_id: Optional[int] = None # Set when the rails are scoped to one category
+    generated_at: datetime.datetime
     
 # --- Token Schemas ---
 class Token(BaseModel):
@@ -169,3 +285,41 @@ class CartItem(CartItemBase):
         from_attributes = True
 
         
+
+# --- Cart Quote Schemas ---
+class CartQuoteCart(BaseModel):
+    items: List[OrderItemCreate] = Field(..., max_length=100)
+
+class CartQuoteRequest(BaseModel):
+    carts: List[CartQuoteCart] = Field(..., min_length=1, max_length=100)
+
+class QuotedLine(BaseModel):
+    book_id: int
+    quantity: int
+    list_price: Decimal
+    unit_price: Decimal # What place_order would charge per unit today
+    line_total: Decimal
+    savings: Decimal
+
+class CartQuote(BaseModel):
+    items: List[QuotedLine] = []
+    unavailable_book_ids: List[int] = []
+    subtotal: Decimal # At list prices
+    savings: Decimal
+    total: Decimal
+
+class CartQuoteResponse(BaseModel):
+    carts: List[CartQuote] = []
+    priced_on: datetime.date
+
+
+# --- Profiling Schemas ---
+class ProfileSummary(BaseModel):
+    id: str
+    trigger: str # header, sampled or worker
+    label: str # Request line, or the profiled worker
+    route: Optional[str] = None # Route template of a profiled request
+    started_at: datetime.datetime
+    duration_ms: float
+    samples: int
+    phases: Dict[str, int] # db / orm / validation / json / app / other -> samples
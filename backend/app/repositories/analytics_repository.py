@@ -0,0 +1,93 @@
+# backend/app/repositories/analytics_repository.py
+import datetime
+from typing import Dict, Sequence, Tuple
+
+from sqlalchemy import select, func, desc, asc, cast, Date
+from sqlalchemy.orm import Session
+
+from app.models import database_models
+
+GRANULARITIES = ("day", "week", "month")
+
+# dimension -> (daily rollup, its key column, the named entity, its name column)
+TOP_SELLER_DIMENSIONS: Dict[str, Tuple] = {
+    "book": (
+        database_models.BookSalesDaily, database_models.BookSalesDaily.book_id,
+        database_models.Book, database_models.Book.book_title,
+    ),
+    "author": (
+        database_models.AuthorSalesDaily, database_models.AuthorSalesDaily.author_id,
+        database_models.Author, database_models.Author.author_name,
+    ),
+    "category": (
+        database_models.CategorySalesDaily, database_models.CategorySalesDaily.category_id,
+        database_models.Category, database_models.Category.category_name,
+    ),
+}
+
+
+def period_start(granularity: str, sales_date_column):
+    """ First day of the day/week (Monday)/month containing sales_date_column. """
+    return cast(func.date_trunc(granularity, sales_date_column), Date)
+
+
+class AnalyticsRepository:
+    """
+    Admin reporting queries. They only read the daily rollup tables maintained by
+    SalesRepository, so their cost depends on the date range, not on the order history.
+    """
+    def __init__(self, db: Session):
+        self.db = db
+
+    def sales_by_period(self, granularity: str, start: datetime.date, end: datetime.date) -> Sequence[Tuple]:
+        """ (period, order_count, quantity, revenue) per period with sales in [start, end]. """
+        daily = database_models.SalesDaily
+        period = period_start(granularity, daily.sales_date).label("period")
+        stmt = (
+            select(period, func.sum(daily.order_count), func.sum(daily.quantity), func.sum(daily.revenue))
+            .where(daily.sales_date.between(start, end))
+            .group_by(period)
+            .order_by(period)
+        )
+        return self.db.execute(stmt).all()
+
+    def top_sellers(
+        self,
+        dimension: str,
+        granularity: str,
+        start: datetime.date,
+        end: datetime.date,
+        limit: int,
+        metric: str = "revenue"
+    ) -> Sequence[Tuple]:
+        """
+        The `limit` best books/authors/categories of each period by revenue or units, as
+        (period, id, name, quantity, revenue) rows ordered by period then rank.
+        """
+        rollup, key_column, entity, name_column = TOP_SELLER_DIMENSIONS[dimension]
+        period = period_start(granularity, rollup.sales_date).label("period")
+        quantity = func.sum(rollup.quantity).label("quantity")
+        revenue = func.sum(rollup.revenue).label("revenue")
+        ranked_by = (revenue, quantity) if metric == "revenue" else (quantity, revenue)
+        ranked = (
+            select(
+                period,
+                key_column.label("key_id"),
+                quantity,
+                revenue,
+                func.row_number().over(
+                    partition_by=period,
+                    order_by=(desc(ranked_by[0]), desc(ranked_by[1]), asc(key_column))
+                ).label("rank")
+            )
+            .where(rollup.sales_date.between(start, end))
+            .group_by(period, key_column)
+            .subquery("ranked")
+        )
+        stmt = (
+            select(ranked.c.period, ranked.c.key_id, name_column, ranked.c.quantity, ranked.c.revenue)
+            .join(entity, entity.id == ranked.c.key_id)
+            .where(ranked.c.rank <= limit)
+            .order_by(ranked.c.period, ranked.c.rank)
+        )
+        return self.db.execute(stmt).all()
@@ -1,14 +1,311 @@
 # backend/app/repositories/book_repository.py
 import datetime
 from decimal import Decimal
-from typing import List, Optional, Tuple, Sequence
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Sequence
 
 # Remove 'ilike' from this import
-from sqlalchemy import select, func, desc, asc, case, and_, or_, literal_column, distinct, Column
+from sqlalchemy import select, func, desc, asc, case, and_, or_, literal_column, distinct, Column, bindparam, Date, Integer, String
 from sqlalchemy.orm import Session, joinedload, selectinload, contains_eager
 
 from app.models import database_models
 
+
+def review_stats_subquery():
+    """ Per-book review count and average rating. """
+    return (
+        select(
+            database_models.Review.book_id,
+            func.count(database_models.Review.id).label("review_count"),
+            func.avg(database_models.Review.rating_start).label("average_rating")
+        )
+        .group_by(database_models.Review.book_id)
+        .subquery("review_stats")
+    )
+
+
+def active_discount_subquery_for(today: datetime.date, book_ids: Optional[Iterable[int]] = None):
+    """
+    One active discount price per book on the given day. When windows overlap, the
+    most recently started discount wins (then the newest row), as in get_active_discount_price.
+    book_ids limits it to those books: PostgreSQL cannot push an outer filter into the DISTINCT ON.
+    """
+    stmt = (
+        select(
+            database_models.Discount.book_id,
+            database_models.Discount.discount_price.label("active_discount_price")
+        )
+        .where(
+            database_models.Discount.discount_start_date <= today,
+            or_(
+                database_models.Discount.discount_end_date == None,
+                database_models.Discount.discount_end_date >= today
+            )
+        )
+        .distinct(database_models.Discount.book_id)
+        .order_by(
+            database_models.Discount.book_id,
+            database_models.Discount.discount_start_date.desc(),
+            database_models.Discount.id.desc()
+        )
+    )
+    if book_ids is not None:
+        stmt = stmt.where(database_models.Discount.book_id.in_(book_ids))
+    return stmt.subquery("active_discount")
+
+
+# best_selling sort modes -> book_sales_stats column they rank by
+SALES_SORT_COLUMNS = {
+    "best_selling": database_models.BookSalesStats.quantity_30d,
+    "best_selling_7d": database_models.BookSalesStats.quantity_7d,
+    "best_selling_all": database_models.BookSalesStats.quantity_total,
+}
+
+
+def join_sales_stats(query, sort_by: Optional[str]):
+    """ Outer joins book_sales_stats when the sort mode ranks by sales. """
+    if sort_by not in SALES_SORT_COLUMNS:
+        return query
+    return query.outerjoin(
+        database_models.BookSalesStats,
+        database_models.BookSalesStats.book_id == database_models.Book.id
+    )
+
+
+def listing_order_by(sort_by: Optional[str], review_subquery, active_discount_subquery) -> list:
+    """ ORDER BY clauses for each sort_by mode of the book listing. """
+    final_price = func.coalesce(
+        active_discount_subquery.c.active_discount_price,
+        database_models.Book.book_price
+    ).label("final_price")
+
+    if sort_by in SALES_SORT_COLUMNS:
+        # Units sold in the window (book_sales_stats must be joined, see join_sales_stats)
+        return [
+            desc(func.coalesce(SALES_SORT_COLUMNS[sort_by], 0)),
+            asc(final_price)
+        ]
+
+    if sort_by == "on_sale_home":
+        discount_amount = database_models.Book.book_price - active_discount_subquery.c.active_discount_price
+        return [desc(discount_amount)]
+    if sort_by == "popularity" or sort_by == "popular":
+        return [
+            desc(func.coalesce(review_subquery.c.review_count, 0)),
+            asc(final_price)
+        ]
+    if sort_by == "recommended":
+        return [
+            desc(func.coalesce(review_subquery.c.average_rating, 0)),
+            asc(final_price)
+        ]
+    if sort_by == "price_asc":
+        return [asc(final_price)]
+    if sort_by == "price_desc":
+        return [desc(final_price)]
+    # "on_sale" and default case: discounted books first, cheapest first
+    return [
+        desc(active_discount_subquery.c.active_discount_price.is_not(None)),
+        asc(final_price)
+    ]
+
+
+# --- Listing statement shapes ---
+# sort_by values with their own ordering; anything else lists like "on_sale"
+LISTING_SORT_MODES = (
+    "on_sale", "on_sale_home", "popularity", "recommended", "price_asc", "price_desc",
+    "best_selling", "best_selling_7d", "best_selling_all",
+)
+_SORT_BY_ALIASES = {"popular": "popularity"}
+
+# (sort mode, category?, author?, rating?, search?) -> (count statement, page statement).
+# Every value is a bind parameter, so each shape is built once per process and its
+# cache key and compiled form are reused by SQLAlchemy for every request.
+_listing_shapes: Dict[Tuple[str, bool, bool, bool, bool], Tuple[object, object]] = {}
+
+
+def listing_shape_key(
+    sort_by: Optional[str],
+    category_id: Optional[int],
+    author_id: Optional[int],
+    min_rating: Optional[int],
+    search_term: Optional[str]
+) -> Tuple[str, bool, bool, bool, bool]:
+    sort_mode = _SORT_BY_ALIASES.get(sort_by, sort_by)
+    if sort_mode not in LISTING_SORT_MODES:
+        sort_mode = "on_sale"
+    return (sort_mode, category_id is not None, author_id is not None, min_rating is not None, bool(search_term))
+
+
+def filter_params(
+    category_id: Optional[int],
+    author_id: Optional[int],
+    min_rating: Optional[int],
+    search_term: Optional[str]
+) -> dict:
+    """ Bind parameter values for the filters applied by apply_listing_filters. """
+    params = {}
+    if category_id is not None:
+        params["category_id"] = category_id
+    if author_id is not None:
+        params["author_id"] = author_id
+    if min_rating is not None:
+        params["min_rating"] = min_rating
+    if search_term:
+        params["search_pattern"] = f"%{search_term}%"
+    return params
+
+
+def listing_params(
+    skip: int,
+    limit: int,
+    category_id: Optional[int],
+    author_id: Optional[int],
+    min_rating: Optional[int],
+    search_term: Optional[str]
+) -> dict:
+    """ Bind parameter values for a listing shape. """
+    params = filter_params(category_id, author_id, min_rating, search_term)
+    params.update(today=datetime.date.today(), skip=skip, limit=limit)
+    return params
+
+
+def apply_listing_filters(
+    query,
+    review_subquery,
+    filter_category: bool,
+    filter_author: bool,
+    filter_rating: bool,
+    search: bool
+):
+    """
+    Adds the listing filters as bind parameters. The query must join Author and
+    outer join review_subquery.
+    """
+    if filter_category:
+        query = query.where(
+            database_models.Book.category_id == bindparam("category_id", type_=Integer)
+        )
+    if filter_author:
+        query = query.where(
+            database_models.Book.author_id == bindparam("author_id", type_=Integer)
+        )
+    if filter_rating:
+        query = query.where(
+            func.coalesce(review_subquery.c.average_rating, 0) >= bindparam("min_rating", type_=Integer)
+        )
+    if search:
+        search_pattern = bindparam("search_pattern", type_=String)
+        query = query.where(
+            or_(
+                database_models.Book.book_title.ilike(search_pattern),
+                database_models.Author.author_name.ilike(search_pattern)
+            )
+        )
+    return query
+
+
+def build_listing_shape(
+    sort_mode: str,
+    filter_category: bool,
+    filter_author: bool,
+    filter_rating: bool,
+    search: bool
+):
+    """ Builds the (count, page) statements of one listing shape with bind parameters only. """
+    # --- Subquery Definitions ---
+    review_subquery = review_stats_subquery()
+    active_discount_subquery = active_discount_subquery_for(bindparam("today", type_=Date))
+
+    # --- Base query ---
+    base_query = (
+        select(
+            database_models.Book,
+            active_discount_subquery.c.active_discount_price
+        )
+        .join(database_models.Book.author) # Keep join for author name search
+        .outerjoin(review_subquery, database_models.Book.id == review_subquery.c.book_id)
+        .outerjoin(active_discount_subquery, database_models.Book.id == active_discount_subquery.c.book_id)
+    )
+
+    filtered_query = apply_listing_filters(
+        base_query, review_subquery, filter_category, filter_author, filter_rating, search
+    )
+
+    # --- Total count ---
+    count_subquery = filtered_query.with_only_columns(database_models.Book.id).distinct().subquery()
+    count_query = select(func.count()).select_from(count_subquery)
+
+    # --- sort_by="on_sale_home" filter is applied AFTER counting ---
+    if sort_mode == "on_sale_home":
+        filtered_query = filtered_query.where(
+            active_discount_subquery.c.active_discount_price != None
+        )
+
+    # --- Sorting, pagination and relationship loading ---
+    # Book.discounts is not part of schemas.Book and the active price comes from the
+    # joined subquery, so it is not loaded here (saves one statement per request)
+    page_query = (
+        join_sales_stats(filtered_query, sort_mode)
+        .order_by(*listing_order_by(sort_mode, review_subquery, active_discount_subquery))
+        .options(
+            contains_eager(database_models.Book.author), # Ensure author loaded
+            joinedload(database_models.Book.category)
+        )
+        .offset(bindparam("skip", type_=Integer))
+        .limit(bindparam("limit", type_=Integer))
+    )
+    return count_query, page_query
+
+
+def listing_shape(shape_key: Tuple[str, bool, bool, bool, bool]):
+    """ Cached (count, page) statements for a listing shape. """
+    shape = _listing_shapes.get(shape_key)
+    if shape is None:
+        shape = _listing_shapes[shape_key] = build_listing_shape(*shape_key)
+    return shape
+
+
+# (category?, author?, rating?, search?) -> facet count statement
+_facet_shapes: Dict[Tuple[bool, bool, bool, bool], object] = {}
+
+
+def build_facet_shape(filter_category: bool, filter_author: bool, filter_rating: bool, search: bool):
+    """
+    One GROUPING SETS statement counting the filtered books per category, per author
+    and per whole-star average rating (floor of the average, 0-5).
+    """
+    review_subquery = review_stats_subquery()
+    faceted = apply_listing_filters(
+        select(
+            database_models.Book.category_id,
+            database_models.Book.author_id,
+            func.floor(func.coalesce(review_subquery.c.average_rating, 0)).label("rating_bucket")
+        )
+        .join(database_models.Book.author)
+        .outerjoin(review_subquery, database_models.Book.id == review_subquery.c.book_id),
+        review_subquery, filter_category, filter_author, filter_rating, search
+    ).subquery("faceted")
+
+    return (
+        select(
+            func.grouping(faceted.c.category_id).label("without_category"),
+            func.grouping(faceted.c.author_id).label("without_author"),
+            faceted.c.category_id,
+            faceted.c.author_id,
+            faceted.c.rating_bucket,
+            func.count().label("book_count")
+        )
+        .group_by(func.grouping_sets(faceted.c.category_id, faceted.c.author_id, faceted.c.rating_bucket))
+    )
+
+
+def facet_shape(shape_key: Tuple[bool, bool, bool, bool]):
+    shape = _facet_shapes.get(shape_key)
+    if shape is None:
+        shape = _facet_shapes[shape_key] = build_facet_shape(*shape_key)
+    return shape
+
+
 class BookRepository:
     """
     Handles database operations for Book entities.
@@ -32,138 +329,112 @@ class BookRepository:
         Returns a tuple: (list_of_results, total_count)
         Each result in the list is a tuple: (Book ORM object, active_discount_price)
         """
-        today = datetime.date.today()
+        shape_key = listing_shape_key(sort_by, category_id, author_id, min_rating, search_term)
+        count_query, page_query = listing_shape(shape_key)
+        params = listing_params(skip, limit, category_id, author_id, min_rating, search_term)
 
-        # --- Subquery Definitions (remain the same) ---
-        review_subquery = (
-            select(
-                database_models.Review.book_id,
-                func.count(database_models.Review.id).label("review_count"),
-                func.avg(database_models.Review.rating_start).label("average_rating")
-            )
-            .group_by(database_models.Review.book_id)
-            .subquery("review_stats")
-        )
-        active_discount_subquery = (
-            select(
-                database_models.Discount.book_id,
-                database_models.Discount.discount_price.label("active_discount_price")
-            )
-            .where(
-                database_models.Discount.discount_start_date <= today,
-                or_(
-                    database_models.Discount.discount_end_date == None,
-                    database_models.Discount.discount_end_date >= today
-                )
-            )
-            .distinct(database_models.Discount.book_id)
-            .subquery("active_discount")
-        )
+        total_count = self.db.scalar(count_query, params)
+        results = self.db.execute(page_query, params).unique().all()
+
+        return results, total_count
+
+    def build_listing_queries(
+        self,
+        skip: int,
+        limit: int,
+        sort_by: Optional[str],
+        category_id: Optional[int],
+        author_id: Optional[int],
+        min_rating: Optional[int],
+        search_term: Optional[str] = None
+    ):
+        """
+        (count_query, page_query) of list_and_count_books with the parameter values bound,
+        without executing them. Used by the benchmark suite to capture EXPLAIN plans.
+        """
+        shape_key = listing_shape_key(sort_by, category_id, author_id, min_rating, search_term)
+        count_query, page_query = listing_shape(shape_key)
+        params = listing_params(skip, limit, category_id, author_id, min_rating, search_term)
+        return count_query.params(params), page_query.params(params)
+
+    def count_facets(
+        self,
+        category_id: Optional[int],
+        author_id: Optional[int],
+        min_rating: Optional[int],
+        search_term: Optional[str] = None
+    ) -> Tuple[Dict[int, int], Dict[int, int], Dict[int, int]]:
+        """
+        Book counts of the filtered result set per category id, per author id and per
+        rating bucket (floor of the average rating), from a single grouped statement.
+        """
+        shape_key = listing_shape_key(None, category_id, author_id, min_rating, search_term)[1:]
+        params = filter_params(category_id, author_id, min_rating, search_term)
+        by_category: Dict[int, int] = {}
+        by_author: Dict[int, int] = {}
+        by_rating_bucket: Dict[int, int] = {}
+        for row in self.db.execute(facet_shape(shape_key), params):
+            if not row.without_category:
+                by_category[row.category_id] = row.book_count
+            elif not row.without_author:
+                by_author[row.author_id] = row.book_count
+            else:
+                by_rating_bucket[int(row.rating_bucket)] = row.book_count
+        return by_category, by_author, by_rating_bucket
+
+    def build_facet_query(
+        self,
+        category_id: Optional[int],
+        author_id: Optional[int],
+        min_rating: Optional[int],
+        search_term: Optional[str] = None
+    ):
+        """ count_facets' statement with the values bound, without executing it (for EXPLAIN capture). """
+        shape_key = listing_shape_key(None, category_id, author_id, min_rating, search_term)[1:]
+        return facet_shape(shape_key).params(filter_params(category_id, author_id, min_rating, search_term))
+
+    def list_top_books_per_category(
+        self,
+        sort_by: str,
+        per_category: int
+    ) -> Sequence[Tuple[database_models.Book, Optional[Decimal]]]:
+        """
+        Top `per_category` books of every category for a sort_by mode, in one statement
+        (ROW_NUMBER() partitioned by category). Rows come back ordered by category, then rank.
+        """
+        today = datetime.date.today()
+        review_subquery = review_stats_subquery()
+        active_discount_subquery = active_discount_subquery_for(today)
 
-        # --- Base query ---
-        base_query = (
+        ranked_query = (
             select(
-                database_models.Book,
-                active_discount_subquery.c.active_discount_price
+                database_models.Book.id.label("book_id"),
+                active_discount_subquery.c.active_discount_price,
+                func.row_number().over(
+                    partition_by=database_models.Book.category_id,
+                    order_by=listing_order_by(sort_by, review_subquery, active_discount_subquery)
+                ).label("rank")
             )
-            .join(database_models.Book.author) # Keep join for author name search
             .outerjoin(review_subquery, database_models.Book.id == review_subquery.c.book_id)
             .outerjoin(active_discount_subquery, database_models.Book.id == active_discount_subquery.c.book_id)
         )
-
-        # --- Apply filters ---
-        filtered_query = base_query
-        if category_id is not None:
-            filtered_query = filtered_query.where(database_models.Book.category_id == category_id)
-        if author_id is not None:
-            filtered_query = filtered_query.where(database_models.Book.author_id == author_id)
-        if min_rating is not None:
-            filtered_query = filtered_query.where(
-                func.coalesce(review_subquery.c.average_rating, 0) >= min_rating
-            )
-
-        # --- Apply search filter --- *** CORRECTED USAGE *** ---
-        if search_term:
-            search_pattern = f"%{search_term}%"
-            filtered_query = filtered_query.where(
-                or_(
-                    # Use the .ilike() method on the column object
-                    database_models.Book.book_title.ilike(search_pattern),
-                    database_models.Author.author_name.ilike(search_pattern)
-                )
-            )
-        # --- End Search Filter ---
-
-        # --- Get total count (remains the same) ---
-        count_subquery = filtered_query.with_only_columns(database_models.Book.id).distinct().subquery()
-        count_query = select(func.count()).select_from(count_subquery)
-        total_count = self.db.scalar(count_query)
-
-        # --- Apply sort_by="on_sale_home" filter AFTER counting (remains the same) ---
+        ranked_query = join_sales_stats(ranked_query, sort_by)
         if sort_by == "on_sale_home":
-            filtered_query = filtered_query.where(
-                active_discount_subquery.c.active_discount_price != None
-            )
+            ranked_query = ranked_query.where(active_discount_subquery.c.active_discount_price != None)
+        ranked = ranked_query.subquery("ranked")
 
-        # --- Apply sorting (remains the same) ---
-        final_price = func.coalesce(
-            active_discount_subquery.c.active_discount_price,
-            database_models.Book.book_price
-        ).label("final_price")
-
-        # Sorting logic remains identical
-        if sort_by == "on_sale":
-            order_logic = [
-                desc(active_discount_subquery.c.active_discount_price.is_not(None)),
-                asc(final_price)
-            ]
-            final_query_base = filtered_query.order_by(*order_logic)
-        elif sort_by == "on_sale_home":
-            discount_amount = database_models.Book.book_price - active_discount_subquery.c.active_discount_price
-            final_query_base = filtered_query.order_by(desc(discount_amount))
-        elif sort_by == "popularity" or sort_by == "popular":
-            order_logic = [
-                desc(func.coalesce(review_subquery.c.review_count, 0)),
-                asc(final_price)
-            ]
-            final_query_base = filtered_query.order_by(*order_logic)
-        elif sort_by == "recommended":
-            order_logic = [
-                desc(func.coalesce(review_subquery.c.average_rating, 0)),
-                asc(final_price)
-            ]
-            final_query_base = filtered_query.order_by(*order_logic)
-        elif sort_by == "price_asc":
-            final_query_base = filtered_query.order_by(asc(final_price))
-        elif sort_by == "price_desc":
-            final_query_base = filtered_query.order_by(desc(final_price))
-        else: # Default case
-             order_logic = [
-                desc(active_discount_subquery.c.active_discount_price.is_not(None)),
-                asc(final_price)
-             ]
-             final_query_base = filtered_query.order_by(*order_logic)
-
-
-        # --- Apply pagination and load relationships (remains the same) ---
-        final_query = (
-            final_query_base
+        stmt = (
+            select(database_models.Book, ranked.c.active_discount_price)
+            .join(ranked, ranked.c.book_id == database_models.Book.id)
+            .where(ranked.c.rank <= per_category)
             .options(
-                contains_eager(database_models.Book.author), # Ensure author loaded
-                joinedload(database_models.Book.category),
-                selectinload(database_models.Book.discounts)
+                joinedload(database_models.Book.author),
+                joinedload(database_models.Book.category)
             )
-            .offset(skip)
-            .limit(limit)
+            .order_by(database_models.Book.category_id, ranked.c.rank)
         )
+        return self.db.execute(stmt).unique().all()
 
-        # --- Execute query (remains the same) ---
-        results = self.db.execute(final_query).unique().all()
-
-        return results, total_count
-
-
-    # --- get_book_by_id and get_books_by_ids_with_discounts remain unchanged ---
     def get_book_by_id(self, book_id: int) -> Optional[database_models.Book]:
         """ Fetches a single book by ID with author, category, and discounts loaded. """
         stmt = (
@@ -178,14 +449,98 @@ class BookRepository:
         book_orm = self.db.scalars(stmt).unique().first()
         return book_orm
 
-    def get_books_by_ids_with_discounts(self, book_ids: List[int]) -> Sequence[database_models.Book]:
-         """ Fetches multiple books by their IDs, eager loading discounts. """
-         if not book_ids:
-             return []
-         stmt = (
-             select(database_models.Book)
-             .where(database_models.Book.id.in_(book_ids))
-             .options(selectinload(database_models.Book.discounts))
-         )
-         books = self.db.scalars(stmt).unique().all()
-         return books
\ No newline at end of file
+    def existing_ids(self, book_ids: Iterable[int]) -> Set[int]:
+        """ The subset of book_ids that still exist. """
+        if not book_ids:
+            return set()
+        return set(self.db.scalars(
+            select(database_models.Book.id).where(database_models.Book.id.in_(set(book_ids)))
+        ))
+
+    def get_prices(self, book_ids: List[int], today: datetime.date) -> Dict[int, Tuple[Decimal, Optional[Decimal]]]:
+        """
+        (list price, active discount price or None) per book on the given day, in one
+        query. Missing IDs are left out. The discount is resolved like the listing's.
+        """
+        if not book_ids:
+            return {}
+        active_discount_subquery = active_discount_subquery_for(today, book_ids)
+        rows = self.db.execute(
+            select(
+                database_models.Book.id,
+                database_models.Book.book_price,
+                active_discount_subquery.c.active_discount_price
+            )
+            .outerjoin(active_discount_subquery, database_models.Book.id == active_discount_subquery.c.book_id)
+            .where(database_models.Book.id.in_(book_ids))
+        ).all()
+        return {book_id: (price, discount_price) for book_id, price, discount_price in rows}
+
+    def get_books_for_listing(self, book_ids: List[int]) -> List[database_models.Book]:
+        """
+        Fetches books by ID with author and category loaded (the fields of schemas.Book),
+        returned in the order of book_ids. Missing IDs are skipped.
+        """
+        if not book_ids:
+            return []
+        stmt = (
+            select(database_models.Book)
+            .where(database_models.Book.id.in_(book_ids))
+            .options(
+                joinedload(database_models.Book.author),
+                joinedload(database_models.Book.category)
+            )
+        )
+        books_by_id = {book.id: book for book in self.db.scalars(stmt).unique().all()}
+        return [books_by_id[book_id] for book_id in book_ids if book_id in books_by_id]
+
+    def iter_catalog_stats(self, book_ids: Optional[List[int]] = None, batch_size: int = 50_000):
+        """
+        Streams (id, category_id, author_id, book_price, active_discount_price,
+        review_count, average_rating, sold_7d, sold_30d, sold_total) for every book
+        (or only book_ids), ordered by id. Used to build the in-memory catalog snapshot.
+        """
+        sales = database_models.BookSalesStats
+        today = datetime.date.today()
+        review_subquery = review_stats_subquery()
+        active_discount_subquery = active_discount_subquery_for(today)
+        stmt = (
+            select(
+                database_models.Book.id,
+                database_models.Book.category_id,
+                database_models.Book.author_id,
+                database_models.Book.book_price,
+                active_discount_subquery.c.active_discount_price,
+                func.coalesce(review_subquery.c.review_count, 0),
+                func.coalesce(review_subquery.c.average_rating, 0),
+                func.coalesce(sales.quantity_7d, 0),
+                func.coalesce(sales.quantity_30d, 0),
+                func.coalesce(sales.quantity_total, 0)
+            )
+            .outerjoin(review_subquery, database_models.Book.id == review_subquery.c.book_id)
+            .outerjoin(active_discount_subquery, database_models.Book.id == active_discount_subquery.c.book_id)
+            .outerjoin(sales, sales.book_id == database_models.Book.id)
+            .order_by(database_models.Book.id)
+        )
+        if book_ids is not None:
+            stmt = stmt.where(database_models.Book.id.in_(book_ids))
+        result = self.db.execute(stmt.execution_options(yield_per=batch_size))
+        for partition in result.partitions():
+            yield partition
+
+    def iter_books_for_listing(self, batch_size: int = 10_000):
+        """
+        Streams every book with author and category loaded, ordered by id, in partitions.
+        Used to pre-render the shared catalog snapshot.
+        """
+        stmt = (
+            select(database_models.Book)
+            .options(
+                joinedload(database_models.Book.author),
+                joinedload(database_models.Book.category)
+            )
+            .order_by(database_models.Book.id)
+            .execution_options(yield_per=batch_size)
+        )
+        for partition in self.db.scalars(stmt).partitions():
+            yield partition
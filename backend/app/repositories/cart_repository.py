@@ -0,0 +1,106 @@
+# backend/app/repositories/cart_repository.py
+import datetime
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import select, func, delete, or_, insert as core_insert
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.models import database_models
+
+# (book_id, quantity)
+CartLine = Tuple[int, int]
+
+
+class CartRepository:
+    """
+    cart_item and its write-behind buffer (cart_buffer). A sync only upserts the user's
+    buffer row; flushing replaces the user's cart_item rows with the buffered state.
+    """
+    def __init__(self, db: Session):
+        self.db = db
+
+    def list_items(self, user_id: int) -> Sequence[database_models.CartItem]:
+        return self.db.scalars(
+            select(database_models.CartItem)
+            .where(database_models.CartItem.user_id == user_id)
+            .order_by(database_models.CartItem.id)
+        ).all()
+
+    def replace_items(self, carts: Dict[int, Sequence[CartLine]], existing: Set[int]) -> int:
+        """
+        Replaces the cart_item rows of each user with the given lines, skipping books not in
+        `existing` (see book_ids). Returns the rows written.
+        """
+        if not carts:
+            return 0
+        cart_item = database_models.CartItem
+        self.db.execute(
+            delete(cart_item)
+            .where(cart_item.user_id.in_(list(carts)))
+            .execution_options(synchronize_session=False)
+        )
+        rows = [
+            {"user_id": user_id, "book_id": book_id, "quantity": quantity}
+            for user_id, lines in carts.items()
+            # A repeated book keeps its last quantity (cart_item is unique per user and book)
+            for book_id, quantity in dict(lines).items()
+            if book_id in existing
+        ]
+        if rows:
+            self.db.execute(core_insert(cart_item), rows)
+        return len(rows)
+
+    @staticmethod
+    def book_ids(carts: Dict[int, Sequence[CartLine]]) -> Set[int]:
+        """
+        Books of the given carts, to be checked against the catalog (BookRepository.existing_ids
+        on the primary): buffered carts are written later, so a book may have been deleted since.
+        """
+        return {book_id for lines in carts.values() for book_id, _ in lines}
+
+    def buffer(self, user_id: int, lines: Sequence[CartLine]) -> None:
+        """ Stores the user's latest cart, superseding any buffered one. """
+        buffer = database_models.CartBuffer
+        stmt = insert(buffer).values(user_id=user_id, items=[list(line) for line in lines], updates=1)
+        self.db.execute(stmt.on_conflict_do_update(
+            index_elements=[buffer.user_id],
+            set_={"items": stmt.excluded.items, "updates": buffer.updates + 1, "updated_at": func.now()},
+        ))
+
+    def take_buffer(self, user_id: int) -> Optional[Tuple[List[CartLine], int]]:
+        """ Removes and returns the user's buffered (lines, updates), or None. """
+        buffer = database_models.CartBuffer
+        row = self.db.execute(
+            delete(buffer).where(buffer.user_id == user_id).returning(buffer.items, buffer.updates)
+        ).first()
+        if row is None:
+            return None
+        return [tuple(line) for line in row.items], row.updates
+
+    def take_due_buffers(
+        self, idle_seconds: float, max_age_seconds: float, limit: int
+    ) -> List[Tuple[int, List[CartLine], int]]:
+        """
+        Removes and returns (user_id, lines, updates) of up to `limit` buffers not updated
+        for idle_seconds or first buffered max_age_seconds ago. Buffers locked by a
+        concurrent sync or flush are skipped.
+        """
+        buffer = database_models.CartBuffer
+        due = (
+            select(buffer.user_id)
+            .where(or_(
+                buffer.updated_at < func.now() - datetime.timedelta(seconds=idle_seconds),
+                buffer.buffered_at < func.now() - datetime.timedelta(seconds=max_age_seconds),
+            ))
+            .order_by(buffer.buffered_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        rows = self.db.execute(
+            delete(buffer)
+            .where(buffer.user_id.in_(due.scalar_subquery()))
+            .returning(buffer.user_id, buffer.items, buffer.updates)
+            .execution_options(synchronize_session=False)
+        ).all()
+        return [(user_id, [tuple(line) for line in items], updates) for user_id, items, updates in rows]
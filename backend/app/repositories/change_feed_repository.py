@@ -0,0 +1,64 @@
+# backend/app/repositories/change_feed_repository.py
+import datetime
+from typing import Optional, Sequence, Tuple
+
+from sqlalchemy import select, func, delete, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.models import database_models
+
+# Position in the feed: (txid, id) of the last event read
+Cursor = Tuple[int, int]
+
+
+def _visible_below():
+    # Every transaction with a txid below the xmin of the current snapshot has finished,
+    # so no event can still appear before that point
+    return func.txid_snapshot_xmin(func.txid_current_snapshot())
+
+
+class ChangeFeedRepository:
+    """
+    SQL of the change feed (change_event, change_consumer). Events are ordered by
+    (txid, id) and only read below the snapshot xmin: ids are assigned at insert time, so
+    a transaction still running can commit events that sort before ones already visible.
+    """
+    def __init__(self, db: Session):
+        self.db = db
+
+    def head(self) -> Cursor:
+        """ Cursor after every event readable now (where a new consumer starts). """
+        return (int(self.db.scalar(select(_visible_below()))) - 1, 2**63 - 1)
+
+    def read(self, after: Cursor, limit: int) -> Sequence[database_models.ChangeEvent]:
+        event = database_models.ChangeEvent
+        return self.db.scalars(
+            select(event)
+            .where(tuple_(event.txid, event.id) > tuple_(*after), event.txid < _visible_below())
+            .order_by(event.txid, event.id)
+            .limit(limit)
+        ).all()
+
+    def get_cursor(self, consumer: str) -> Optional[Cursor]:
+        row = self.db.get(database_models.ChangeConsumer, consumer)
+        return (row.txid, row.event_id) if row is not None else None
+
+    def save_cursor(self, consumer: str, cursor: Cursor) -> None:
+        stmt = insert(database_models.ChangeConsumer).values(
+            name=consumer, txid=cursor[0], event_id=cursor[1], updated_at=func.now()
+        )
+        self.db.execute(stmt.on_conflict_do_update(
+            index_elements=["name"],
+            set_={"txid": stmt.excluded.txid, "event_id": stmt.excluded.event_id, "updated_at": func.now()},
+        ))
+
+    def prune(self, older_than: datetime.timedelta) -> int:
+        """ Deletes events past retention. Durable consumers further behind lose them. """
+        event = database_models.ChangeEvent
+        result = self.db.execute(
+            delete(event)
+            .where(event.changed_at < func.now() - older_than)
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount
@@ -0,0 +1,115 @@
+# backend/app/repositories/discount_repository.py
+import datetime
+from decimal import Decimal
+from typing import List, Optional, Sequence, Tuple
+
+from sqlalchemy import select, func, update, delete, and_, or_, exists, literal
+from sqlalchemy.orm import Session
+
+from app.models import database_models, schemas
+
+# pg advisory lock key serialising discount campaigns (overlap check + insert)
+DISCOUNT_SCHEDULE_LOCK_ID = 430_001
+
+discount = database_models.Discount
+book = database_models.Book
+
+
+def _selected_books(selection: schemas.DiscountSelection):
+    """ Ids (and prices) of the books a campaign selection covers. """
+    query = select(book.id, book.book_price)
+    if selection.book_ids is not None:
+        return query.where(book.id.in_(selection.book_ids))
+    if selection.category_id is not None:
+        return query.where(book.category_id == selection.category_id)
+    return query.where(book.author_id == selection.author_id)
+
+
+def _overlaps(start: datetime.date, end: Optional[datetime.date]):
+    """ discount rows whose [start, end] window (end NULL = open) intersects [start, end]. """
+    conditions = [or_(discount.discount_end_date == None, discount.discount_end_date >= start)]
+    if end is not None:
+        conditions.append(discount.discount_start_date <= end)
+    return and_(*conditions)
+
+
+class DiscountRepository:
+    """
+    Set-based discount scheduling: one statement per campaign step regardless of how
+    many books it covers. Campaigns take a transaction-level advisory lock, so two of
+    them cannot both pass the overlap check for the same book.
+    """
+    def __init__(self, db: Session):
+        self.db = db
+
+    def lock(self) -> None:
+        self.db.execute(select(func.pg_advisory_xact_lock(DISCOUNT_SCHEDULE_LOCK_ID)))
+
+    def find_overlaps(
+        self, selection: schemas.DiscountSelection, start: datetime.date, end: Optional[datetime.date], limit: int
+    ) -> Tuple[int, Sequence[Tuple[int, int, datetime.date, Optional[datetime.date]]]]:
+        """ (number of selected books with an overlapping discount, the first `limit` overlapping discounts). """
+        targets = _selected_books(selection).subquery("targets")
+        overlapping = (
+            select(discount.book_id, discount.id, discount.discount_start_date, discount.discount_end_date)
+            .join(targets, targets.c.id == discount.book_id)
+            .where(_overlaps(start, end))
+        )
+        count = self.db.scalar(
+            select(func.count(func.distinct(overlapping.subquery().c.book_id)))
+        )
+        rows = self.db.execute(overlapping.order_by(discount.book_id, discount.id).limit(limit)).all()
+        return count or 0, rows
+
+    def create_campaign(
+        self,
+        selection: schemas.DiscountSelection,
+        percent_off: Decimal,
+        start: datetime.date,
+        end: Optional[datetime.date],
+    ) -> List[Tuple[int, int]]:
+        """
+        Inserts one discount per selected book without an overlapping discount, priced
+        percent_off below its list price. Returns the (discount id, book id) rows created.
+        """
+        targets = _selected_books(selection).subquery("targets")
+        price = func.round(targets.c.book_price * (100 - literal(percent_off)) / 100, 2)
+        rows = (
+            select(targets.c.id, literal(start), literal(end, type_=discount.discount_end_date.type), price)
+            .where(~exists().where(discount.book_id == targets.c.id, _overlaps(start, end)))
+            .order_by(targets.c.id)
+        )
+        result = self.db.execute(
+            discount.__table__.insert()
+            .from_select(["book_id", "discount_start_date", "discount_end_date", "discount_price"], rows)
+            .returning(discount.id, discount.book_id)
+        )
+        return result.all()
+
+    def end_discounts(
+        self, selection: schemas.DiscountSelection, last_day: datetime.date
+    ) -> Tuple[List[Tuple[int, int]], List[Tuple[int, int]]]:
+        """
+        Cuts the selected books' discounts off after last_day: windows running past it
+        get it as their end, windows starting after it are deleted. Returns the
+        (discount id, book id) rows of both.
+        """
+        book_ids = _selected_books(selection).with_only_columns(book.id).scalar_subquery()
+        ended = self.db.execute(
+            update(discount)
+            .where(
+                discount.book_id.in_(book_ids),
+                discount.discount_start_date <= last_day,
+                or_(discount.discount_end_date == None, discount.discount_end_date > last_day),
+            )
+            .values(discount_end_date=last_day)
+            .returning(discount.id, discount.book_id)
+            .execution_options(synchronize_session=False)
+        ).all()
+        cancelled = self.db.execute(
+            delete(discount)
+            .where(discount.book_id.in_(book_ids), discount.discount_start_date > last_day)
+            .returning(discount.id, discount.book_id)
+            .execution_options(synchronize_session=False)
+        ).all()
+        return ended, cancelled
@@ -0,0 +1,112 @@
+# backend/app/repositories/export_repository.py
+import datetime
+from typing import Iterator, List, Optional, Tuple
+
+from sqlalchemy import Select, select
+from sqlalchemy.orm import Session
+
+from app.models import database_models
+
+order = database_models.Order
+order_item = database_models.OrderItem
+
+# Dataset -> (columns, order date column used by start/end, or None)
+EXPORT_DATASETS = {
+    "orders": (
+        (order.id, order.user_id, order.order_date, order.order_amount),
+        order.order_date,
+    ),
+    "order_items": (
+        (order_item.id, order_item.order_id, order_item.book_id, order_item.quantity, order_item.price, order_item.order_date),
+        order_item.order_date,
+    ),
+    # Catalog datasets use the columns of the bulk import, so a dump can be loaded back
+    "categories": (
+        (database_models.Category.id, database_models.Category.category_name, database_models.Category.category_desc),
+        None,
+    ),
+    "authors": (
+        (database_models.Author.id, database_models.Author.author_name, database_models.Author.author_bio),
+        None,
+    ),
+    "books": (
+        (
+            database_models.Book.id, database_models.Book.category_id, database_models.Book.author_id,
+            database_models.Book.book_title, database_models.Book.book_summary, database_models.Book.book_price,
+            database_models.Book.book_cover_photo,
+        ),
+        None,
+    ),
+    "discounts": (
+        (
+            database_models.Discount.id, database_models.Discount.book_id, database_models.Discount.discount_start_date,
+            database_models.Discount.discount_end_date, database_models.Discount.discount_price,
+        ),
+        None,
+    ),
+}
+
+
+def export_columns(dataset: str) -> List[str]:
+    return [column.key for column in EXPORT_DATASETS[dataset][0]]
+
+
+def has_date_filter(dataset: str) -> bool:
+    return EXPORT_DATASETS[dataset][1] is not None
+
+
+def export_table(dataset: str) -> str:
+    """ Table the dataset reads, which decides the databases holding it (app.db.shards). """
+    return EXPORT_DATASETS[dataset][0][0].class_.__tablename__
+
+
+class ExportRepository:
+    """
+    Full-table reads for exports, as plain row tuples in id order. Rows are fetched
+    through a server-side cursor, yield_per rows at a time, so memory does not grow
+    with the size of the table.
+    """
+    def __init__(self, db: Session):
+        self.db = db
+
+    def _select(
+        self,
+        dataset: str,
+        start: Optional[datetime.date],
+        end: Optional[datetime.date],
+        min_id: Optional[int],
+        max_id: Optional[int],
+    ) -> Select:
+        columns, date_column = EXPORT_DATASETS[dataset]
+        key = columns[0]
+        stmt = select(*columns)
+        if date_column is not None and start is not None:
+            stmt = stmt.where(date_column >= start)
+        if date_column is not None and end is not None:
+            stmt = stmt.where(date_column < end + datetime.timedelta(days=1))
+        if min_id is not None:
+            stmt = stmt.where(key >= min_id)
+        if max_id is not None:
+            stmt = stmt.where(key <= max_id)
+        return stmt.order_by(key)
+
+    def iter_slice(
+        self,
+        dataset: str,
+        after_id: Optional[int],
+        limit: int,
+        yield_per: int,
+        start: Optional[datetime.date] = None,
+        end: Optional[datetime.date] = None,
+        min_id: Optional[int] = None,
+        max_id: Optional[int] = None,
+    ) -> Iterator[Tuple]:
+        """ Up to `limit` rows with an id above after_id, streamed from the server. """
+        stmt = self._select(dataset, start, end, min_id, max_id)
+        if after_id is not None:
+            stmt = stmt.where(EXPORT_DATASETS[dataset][0][0] > after_id)
+        result = self.db.execute(
+            stmt.limit(limit).execution_options(stream_results=True, yield_per=yield_per)
+        )
+        for partition in result.partitions():
+            yield from partition
@@ -0,0 +1,86 @@
+# backend/app/repositories/import_repository.py
+import csv
+import io
+from typing import List, Sequence, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+# Tables that can be imported. Names are only ever taken from here, never from input
+IMPORT_TABLES = ("category", "author", "book", "discount")
+
+
+class ImportRepository:
+    """
+    Bulk catalog import: a batch is COPY'd into a temporary staging table shaped like
+    the target (plus the input line of each row), checked against the referenced tables
+    and merged with INSERT ... ON CONFLICT (id) DO UPDATE. Staging rows are dropped at
+    commit, so one staging table per connection serves every batch.
+    """
+    def __init__(self, db: Session):
+        self.db = db
+
+    @staticmethod
+    def _staging(table: str) -> str:
+        assert table in IMPORT_TABLES
+        return f"import_{table}"
+
+    def stage(self, table: str, columns: Sequence[str], rows: Sequence[Sequence]) -> None:
+        """ Loads (line, *columns) rows into the staging table of `table` with COPY. """
+        staging = self._staging(table)
+        self.db.execute(text(
+            f'CREATE TEMP TABLE IF NOT EXISTS {staging} (import_line bigint NOT NULL, LIKE "{table}") '
+            f"ON COMMIT DELETE ROWS"
+        ))
+        buffer = io.StringIO()
+        # None becomes an unquoted empty field, which COPY reads as NULL
+        csv.writer(buffer, lineterminator="\n").writerows(rows)
+        buffer.seek(0)
+        cursor = self.db.connection().connection.cursor()
+        try:
+            cursor.copy_expert(
+                f'COPY {staging} (import_line, {", ".join(columns)}) FROM STDIN WITH (FORMAT csv)', buffer
+            )
+        finally:
+            cursor.close()
+
+    def reject_missing_references(self, table: str, column: str, referenced: str) -> List[Tuple[int, int]]:
+        """ Removes staged rows whose `column` has no row in `referenced`; returns (line, value). """
+        assert referenced in IMPORT_TABLES
+        staging = self._staging(table)
+        return self.db.execute(text(
+            f"DELETE FROM {staging} s "
+            f'WHERE NOT EXISTS (SELECT 1 FROM "{referenced}" r WHERE r.id = s.{column}) '
+            f"RETURNING s.import_line, s.{column}"
+        )).all()
+
+    def merge(self, table: str, columns: Sequence[str]) -> Tuple[int, int]:
+        """
+        Upserts the staged rows into `table` by id; the last line wins when an id repeats.
+        Rows already identical are left alone. Returns (inserted, updated).
+        """
+        staging = self._staging(table)
+        column_list = ", ".join(columns)
+        changed = [c for c in columns if c != "id"]
+        assignments = ", ".join(f"{c} = EXCLUDED.{c}" for c in changed)
+        current = ", ".join(f"t.{c}" for c in changed)
+        incoming = ", ".join(f"EXCLUDED.{c}" for c in changed)
+        rows = self.db.execute(text(
+            f'INSERT INTO "{table}" AS t ({column_list}) '
+            f"SELECT DISTINCT ON (id) {column_list} FROM {staging} ORDER BY id, import_line DESC "
+            f"ON CONFLICT (id) DO UPDATE SET {assignments} "
+            f"WHERE ({current}) IS DISTINCT FROM ({incoming}) "
+            # xmax is 0 only for freshly inserted row versions
+            f"RETURNING (xmax = 0) AS inserted"
+        )).scalars().all()
+        inserted = sum(1 for row in rows if row)
+        return inserted, len(rows) - inserted
+
+    def advance_sequence(self, table: str) -> None:
+        """ Moves the id sequence past imported explicit ids, so later inserts do not collide. """
+        assert table in IMPORT_TABLES
+        sequence = f"pg_get_serial_sequence('\"{table}\"', 'id')"
+        # Never moves it backwards: ids handed out meanwhile may not be committed yet
+        self.db.execute(text(
+            f'SELECT setval({sequence}, GREATEST((SELECT MAX(id) FROM "{table}"), nextval({sequence})))'
+        ))
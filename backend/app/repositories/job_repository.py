@@ -0,0 +1,99 @@
+# backend/app/repositories/job_repository.py
+import datetime
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+from sqlalchemy import select, func, update, delete
+from sqlalchemy.orm import Session
+
+from app.models import database_models
+
+
+class JobRepository:
+    """
+    SQL of the job outbox (job_outbox). Claimed jobs are identified by (id, attempts),
+    so a worker whose lease expired cannot complete or reschedule a job that another
+    worker has claimed since.
+    """
+    def __init__(self, db: Session):
+        self.db = db
+
+    def add(self, job_type: str, payload: Dict[str, Any], delay_seconds: float = 0) -> database_models.JobOutbox:
+        """ Queues a job in the caller's transaction; it becomes visible when that commits. """
+        job = database_models.JobOutbox(job_type=job_type, payload=payload, status="pending")
+        if delay_seconds:
+            job.run_after = func.now() + datetime.timedelta(seconds=delay_seconds)
+        self.db.add(job)
+        # Lets app.jobs.outbox wake this process's worker once the transaction commits
+        self.db.info["jobs_enqueued"] = True
+        return job
+
+    def claim(self, limit: int) -> Sequence[Tuple[int, str, Dict[str, Any], int]]:
+        """
+        Marks up to `limit` runnable pending jobs as running and returns them as
+        (id, job_type, payload, attempts). Rows locked by other workers are skipped.
+        """
+        job = database_models.JobOutbox
+        runnable = (
+            select(job.id)
+            .where(job.status == "pending", job.run_after <= func.now())
+            .order_by(job.run_after, job.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        stmt = (
+            update(job)
+            .where(job.id.in_(runnable.scalar_subquery()))
+            .values(status="running", locked_at=func.now(), attempts=job.attempts + 1)
+            .returning(job.id, job.job_type, job.payload, job.attempts)
+            .execution_options(synchronize_session=False)
+        )
+        return self.db.execute(stmt).all()
+
+    def release_expired(self, lease_seconds: float) -> int:
+        """ Returns jobs whose worker has held them longer than the lease to the queue. """
+        job = database_models.JobOutbox
+        result = self.db.execute(
+            update(job)
+            .where(job.status == "running", job.locked_at < func.now() - datetime.timedelta(seconds=lease_seconds))
+            .values(status="pending", locked_at=None, run_after=func.now())
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount
+
+    def complete(self, job_id: int, attempts: int) -> bool:
+        """ Deletes a finished job. False if the claim was lost (the caller must roll back). """
+        job = database_models.JobOutbox
+        result = self.db.execute(
+            delete(job)
+            .where(job.id == job_id, job.attempts == attempts, job.status == "running")
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount == 1
+
+    def reschedule(self, job_id: int, attempts: int, error: str, retry_in_seconds: Optional[float]) -> None:
+        """ After a failure: back to pending after retry_in_seconds, or "failed" when None. """
+        job = database_models.JobOutbox
+        values: Dict[str, Any] = {"locked_at": None, "last_error": error}
+        if retry_in_seconds is None:
+            values["status"] = "failed"
+        else:
+            values["status"] = "pending"
+            values["run_after"] = func.now() + datetime.timedelta(seconds=retry_in_seconds)
+        self.db.execute(
+            update(job)
+            .where(job.id == job_id, job.attempts == attempts, job.status == "running")
+            .values(values)
+            .execution_options(synchronize_session=False)
+        )
+
+    def queue_stats(self) -> Tuple[int, int, int, float]:
+        """ (pending, running, failed, seconds the oldest runnable pending job has waited). """
+        job = database_models.JobOutbox
+        counts = dict(self.db.execute(
+            select(job.status, func.count()).group_by(job.status)
+        ).all())
+        lag = self.db.scalar(
+            select(func.extract("epoch", func.now() - func.min(job.run_after)))
+            .where(job.status == "pending", job.run_after <= func.now())
+        )
+        return counts.get("pending", 0), counts.get("running", 0), counts.get("failed", 0), float(lag or 0)
@@ -0,0 +1,71 @@
+# backend/app/repositories/maintenance_repository.py
+import datetime
+
+from sqlalchemy import select, delete
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.models import database_models
+
+
+class MaintenanceRepository:
+    """
+    Batched cleanup statements. Each call handles at most `limit` rows, picked with
+    FOR UPDATE SKIP LOCKED, so a batch never waits on (or blocks) user transactions
+    for long and the caller decides how often to commit and pause.
+    """
+    def __init__(self, db: Session):
+        self.db = db
+
+    def delete_expired_cart_items(self, older_than: datetime.datetime, limit: int) -> int:
+        """ Deletes cart lines not rewritten since older_than. """
+        cart_item = database_models.CartItem
+        expired = (
+            select(cart_item.id)
+            .where(cart_item.updated_at < older_than)
+            .order_by(cart_item.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        result = self.db.execute(
+            delete(cart_item)
+            .where(cart_item.id.in_(expired.scalar_subquery()))
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount
+
+    def archive_ended_discounts(self, ended_before: datetime.date, limit: int) -> int:
+        """ Moves discounts whose last day is before ended_before into discount_archive. """
+        discount = database_models.Discount
+        archive = database_models.DiscountArchive
+        ended = (
+            select(discount.id)
+            .where(discount.discount_end_date < ended_before)
+            .order_by(discount.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        columns = (discount.id, discount.book_id, discount.discount_start_date, discount.discount_end_date, discount.discount_price)
+        moved = (
+            delete(discount)
+            .where(discount.id.in_(ended.scalar_subquery()))
+            .returning(*columns)
+            .cte("moved")
+        )
+        # One statement: the rows leave discount and enter the archive together
+        stmt = insert(archive).from_select(
+            ["id", "book_id", "discount_start_date", "discount_end_date", "discount_price"],
+            select(moved.c.id, moved.c.book_id, moved.c.discount_start_date, moved.c.discount_end_date, moved.c.discount_price)
+        )
+        # An id archived before can come back through the bulk import; keep the latest copy
+        result = self.db.execute(stmt.on_conflict_do_update(
+            index_elements=[archive.id],
+            set_={
+                "book_id": stmt.excluded.book_id,
+                "discount_start_date": stmt.excluded.discount_start_date,
+                "discount_end_date": stmt.excluded.discount_end_date,
+                "discount_price": stmt.excluded.discount_price,
+                "archived_at": stmt.excluded.archived_at,
+            },
+        ))
+        return result.rowcount
@@ -1,11 +1,19 @@
 # backend/app/repositories/order_repository.py
+import datetime
+import logging
+import time
 from decimal import Decimal
-from typing import List, Sequence, Dict
+from typing import Dict, List, Optional, Sequence, Tuple
 
 from sqlalchemy import select, desc
-from sqlalchemy.orm import Session, selectinload
+from sqlalchemy.orm import Session, joinedload, selectinload
 
+from app.core.config import settings
+from app.db import shards
 from app.models import database_models
+from app.repositories.job_repository import JobRepository
+
+logger = logging.getLogger(__name__)
 
 class OrderRepository:
     """
@@ -18,39 +26,68 @@ class OrderRepository:
         self,
         user_id: int,
         total_amount: Decimal,
-        items_data: List[Dict] # Expects list of dicts with book_id, quantity, price
+        items_data: List[Dict], # Expects list of dicts with book_id, quantity, price
+        primary_db: Optional[Session] = None
     ) -> database_models.Order:
         """
         Creates Order and OrderItem records within a transaction.
         Handles commit, flush, and rollback.
         Returns the created Order object with items loaded.
         Raises Exception on commit failure.
+
+        primary_db is the primary database's session when self.db is another shard
+        (app.db.shards): ids then come from the primary's sequences and the order_placed
+        job is committed there first, delayed by SHARD_ORDER_SETTLE_SECONDS and retried
+        until the order shows up (SHARD_ORDER_MAX_WAIT_SECONDS).
         """
+        remote = primary_db is not None and primary_db is not self.db
         # Create the Order record
         new_order = database_models.Order(
             user_id=user_id,
             order_amount=total_amount
         )
+        if remote:
+            new_order.id = shards.next_ids(primary_db, "order", 1)[0]
         self.db.add(new_order)
         try:
-            self.db.flush() # Flush to get the new_order.id
+            self.db.flush() # Flush to get the new_order.id and order_date
 
             # Create OrderItem records
-            for item_info in items_data:
+            item_ids = shards.next_ids(primary_db, "order_item", len(items_data)) if remote else []
+            for index, item_info in enumerate(items_data):
                 order_item = database_models.OrderItem(
                     order_id=new_order.id,
+                    order_date=new_order.order_date, # Returned by the INSERT with the id
                     book_id=item_info["book_id"],
                     quantity=item_info["quantity"],
                     price=item_info["price"]
                 )
+                if remote:
+                    order_item.id = item_ids[index]
                 self.db.add(order_item)
 
+            # Sales counters, rollups and cache invalidation run in the background
+            # (app.jobs.handlers); the job is queued atomically with the order
+            # user_id finds the order's shard; placed_at bounds how long the handler waits for it
+            payload = {"order_id": new_order.id, "user_id": user_id, "placed_at": time.time()}
+            if remote:
+                # Two databases: the job goes first, and its handler retries until the order commits
+                JobRepository(primary_db).add(
+                    "order_placed", payload, delay_seconds=settings.SHARD_ORDER_SETTLE_SECONDS
+                )
+                primary_db.commit()
+            else:
+                JobRepository(self.db).add("order_placed", payload)
+
             self.db.commit()
 
             # Eager load items for the response after commit
             stmt_refresh = (
                 select(database_models.Order)
-                .where(database_models.Order.id == new_order.id)
+                .where(
+                    database_models.Order.id == new_order.id,
+                    database_models.Order.order_date == new_order.order_date # Reads a single partition
+                )
                 .options(selectinload(database_models.Order.items))
             )
             refreshed_order = self.db.scalars(stmt_refresh).first()
@@ -60,19 +97,49 @@ class OrderRepository:
 
             return refreshed_order
 
-        except Exception as e:
+        except Exception:
             self.db.rollback()
-            # Log the error e
-            print(f"Error in OrderRepository.create_order_with_items: {e}") # Replace with proper logging
+            logger.exception("Error in OrderRepository.create_order_with_items for user %s", user_id)
             raise # Re-raise the exception to be handled by the service/router
 
-    def list_orders_by_user_id(self, user_id: int) -> Sequence[database_models.Order]:
-        """ Fetches all orders for a given user, loading items. """
+    def list_orders_by_user_id(
+        self, user_id: int, since: Optional[datetime.datetime] = None
+    ) -> Sequence[database_models.Order]:
+        """
+        Fetches the orders of a given user (placed at or after `since`, if given),
+        loading items in the same statement.
+        """
+        stmt = self.build_orders_by_user_query(user_id, since)
+        orders = self.db.scalars(stmt).unique().all()
+        return orders
+
+    def build_orders_by_user_query(self, user_id: int, since: Optional[datetime.datetime] = None):
+        """ Statement used by list_orders_by_user_id (also used for EXPLAIN capture). """
         stmt = (
             select(database_models.Order)
             .where(database_models.Order.user_id == user_id)
-            .options(selectinload(database_models.Order.items)) # Eager load items
+            .options(joinedload(database_models.Order.items)) # Eager load items via JOIN (on id and order_date)
             .order_by(desc(database_models.Order.order_date))
         )
-        orders = self.db.scalars(stmt).all()
-        return orders
\ No newline at end of file
+        if since is not None:
+            # Prunes order and order_item partitions before `since`
+            stmt = stmt.where(database_models.Order.order_date >= since)
+        return stmt
+
+    def list_sold_items(self, order_id: int) -> Tuple[Optional[datetime.datetime], List[Dict]]:
+        """ (order_date, [{book_id, quantity, price}]) of an order, for the sales counters. """
+        rows = self.db.execute(
+            select(
+                database_models.Order.order_date,
+                database_models.OrderItem.book_id,
+                database_models.OrderItem.quantity,
+                database_models.OrderItem.price
+            )
+            .join(database_models.Order.items)
+            .where(database_models.Order.id == order_id)
+        ).all()
+        if not rows:
+            return None, []
+        return rows[0].order_date, [
+            {"book_id": row.book_id, "quantity": row.quantity, "price": row.price} for row in rows
+        ]
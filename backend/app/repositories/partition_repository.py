@@ -0,0 +1,90 @@
+# backend/app/repositories/partition_repository.py
+import datetime
+import re
+from dataclasses import dataclass
+from typing import List
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+# Range-partitioned table -> partition key (one partition per calendar month)
+PARTITIONED_TABLES = {"order": "order_date", "order_item": "order_date", "review": "review_date"}
+
+_BOUNDS = re.compile(r"FROM \('([^']+)'\) TO \('([^']+)'\)")
+
+
+@dataclass(frozen=True)
+class Partition:
+    schema: str
+    name: str
+    start: datetime.date # Inclusive
+    end: datetime.date # Exclusive
+    rows: int # Planner estimate
+
+
+def month_start(day: datetime.date) -> datetime.date:
+    return day.replace(day=1)
+
+
+def add_months(month: datetime.date, months: int) -> datetime.date:
+    index = month.year * 12 + month.month - 1 + months
+    return datetime.date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: datetime.date) -> str:
+    return f"{table}_p{month:%Y_%m}"
+
+
+class PartitionRepository:
+    """
+    Catalog queries and DDL for the monthly partitions of PARTITIONED_TABLES. Names and
+    bounds are generated here, never taken from input, so they are formatted into the DDL.
+    """
+    def __init__(self, db: Session):
+        self.db = db
+
+    def set_lock_timeout(self, milliseconds: int) -> None:
+        """ For the current transaction: DDL waiting longer on traffic fails instead of queueing it. """
+        self.db.execute(text(f"SET LOCAL lock_timeout = '{int(milliseconds)}ms'"))
+
+    def list_partitions(self, table: str) -> List[Partition]:
+        """ Partitions of `table` in date order, whatever schema they were moved to. """
+        rows = self.db.execute(
+            text(
+                "SELECT n.nspname, c.relname, pg_get_expr(c.relpartbound, c.oid) AS bounds, c.reltuples "
+                "FROM pg_inherits i "
+                "JOIN pg_class c ON c.oid = i.inhrelid "
+                "JOIN pg_namespace n ON n.oid = c.relnamespace "
+                "WHERE i.inhparent = CAST(:parent AS regclass)"
+            ),
+            {"parent": f'"{table}"'},
+        ).all()
+        partitions = []
+        for schema, name, bounds, rows_estimate in rows:
+            match = _BOUNDS.search(bounds or "")
+            if match is None:
+                continue
+            start, end = (datetime.date.fromisoformat(value[:10]) for value in match.groups())
+            partitions.append(Partition(schema, name, start, end, max(int(rows_estimate), 0)))
+        return sorted(partitions, key=lambda partition: partition.start)
+
+    def create_partition(self, table: str, month: datetime.date) -> str:
+        """ Creates the partition of `table` for the month starting at `month`. """
+        name = partition_name(table, month)
+        self.db.execute(text(
+            f'CREATE TABLE "{name}" PARTITION OF "{table}" '
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+        ))
+        return name
+
+    def move_partition(self, partition: Partition, schema: str) -> None:
+        """
+        Moves a partition (with its indexes) to another schema. It stays attached, so the
+        parent table still returns its rows.
+        """
+        self.db.execute(text(f'CREATE SCHEMA IF NOT EXISTS "{schema}"'))
+        self.db.execute(text(f'ALTER TABLE "{partition.schema}"."{partition.name}" SET SCHEMA "{schema}"'))
+
+    def drop_partition(self, partition: Partition) -> None:
+        """ Removes a partition and its rows for good. """
+        self.db.execute(text(f'DROP TABLE "{partition.schema}"."{partition.name}"'))
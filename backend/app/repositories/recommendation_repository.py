@@ -0,0 +1,177 @@
+# backend/app/repositories/recommendation_repository.py
+import datetime
+import io
+from typing import Iterator, List, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import select, func, delete, desc, asc, case, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session, joinedload
+
+from app.models import database_models
+from app.repositories.book_repository import active_discount_subquery_for
+from app.services.copurchase import PairCounts
+
+
+class RecommendationRepository:
+    """
+    Reads and maintains the co-purchase tables (book_copurchase / book_related) and the
+    job watermarks used to update them incrementally.
+    """
+    def __init__(self, db: Session):
+        self.db = db
+
+    # --- Request time ---
+    def list_related_books(self, book_id: int, limit: int) -> Sequence[Tuple]:
+        """
+        The precomputed neighbours of a book as (Book, active_discount_price) rows,
+        best first. One range scan of the book_related primary key.
+        """
+        active_discount_subquery = active_discount_subquery_for(datetime.date.today())
+        stmt = (
+            select(database_models.Book, active_discount_subquery.c.active_discount_price)
+            .join(database_models.BookRelated, database_models.BookRelated.related_book_id == database_models.Book.id)
+            .outerjoin(active_discount_subquery, database_models.Book.id == active_discount_subquery.c.book_id)
+            .where(database_models.BookRelated.book_id == book_id)
+            .order_by(database_models.BookRelated.rank)
+            .limit(limit)
+            .options(
+                joinedload(database_models.Book.author),
+                joinedload(database_models.Book.category)
+            )
+        )
+        return self.db.execute(stmt).unique().all()
+
+    def list_fallback_books(self, book_id: int, exclude_ids: List[int], limit: int) -> Sequence[Tuple]:
+        """
+        Same-author books, then same-category books, each best selling (30 days) first,
+        as (Book, active_discount_price) rows. Fills up books with few co-purchases.
+        """
+        book = database_models.Book
+        source = select(book.author_id, book.category_id).where(book.id == book_id).subquery("source")
+        sales = database_models.BookSalesStats
+        active_discount_subquery = active_discount_subquery_for(datetime.date.today())
+        stmt = (
+            select(book, active_discount_subquery.c.active_discount_price)
+            .join(source, (book.author_id == source.c.author_id) | (book.category_id == source.c.category_id))
+            .outerjoin(active_discount_subquery, book.id == active_discount_subquery.c.book_id)
+            .outerjoin(sales, sales.book_id == book.id)
+            .where(book.id.not_in([book_id, *exclude_ids]))
+            .order_by(
+                desc(case((book.author_id == source.c.author_id, 1), else_=0)),
+                desc(func.coalesce(sales.quantity_30d, 0)),
+                asc(book.id)
+            )
+            .limit(limit)
+            .options(
+                joinedload(book.author),
+                joinedload(book.category)
+            )
+        )
+        return self.db.execute(stmt).unique().all()
+
+    # --- Batch job ---
+    def get_watermark(self, job_name: str) -> int:
+        position = self.db.scalar(
+            select(database_models.JobWatermark.position).where(database_models.JobWatermark.job_name == job_name)
+        )
+        return position or 0
+
+    def set_watermark(self, job_name: str, position: int) -> None:
+        stmt = insert(database_models.JobWatermark).values(job_name=job_name, position=position)
+        self.db.execute(stmt.on_conflict_do_update(
+            index_elements=[database_models.JobWatermark.job_name],
+            set_={"position": stmt.excluded.position, "updated_at": func.now()},
+        ))
+
+    def settled_order_id(self, settle_seconds: float) -> int:
+        """
+        Highest order id placed at least settle_seconds ago. Orders newer than that may
+        still be committing out of id order, so incremental runs stop here.
+        """
+        order = database_models.Order
+        cutoff = func.now() - datetime.timedelta(seconds=settle_seconds)
+        return self.db.scalar(select(func.max(order.id)).where(order.order_date <= cutoff)) or 0
+
+    def iter_order_items(
+        self, after_order_id: int, up_to_order_id: int, orders_per_chunk: int
+    ) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Yields (order_ids, book_ids) arrays of order_item for orders in
+        (after_order_id, up_to_order_id], in order id ranges so no order is split.
+        """
+        order_item = database_models.OrderItem
+        low = after_order_id
+        while low < up_to_order_id:
+            high = min(low + orders_per_chunk, up_to_order_id)
+            rows = self.db.execute(
+                select(order_item.order_id, order_item.book_id)
+                .where(order_item.order_id > low, order_item.order_id <= high)
+            ).all()
+            if rows:
+                columns = np.array(rows, dtype=np.int64)
+                yield columns[:, 0], columns[:, 1]
+            low = high
+
+    def replace_pairs(self, pairs: PairCounts, top: Tuple[np.ndarray, ...]) -> None:
+        """ Full rebuild: replaces both tables with the given pair counts and top-K. """
+        self.db.execute(text("TRUNCATE book_related, book_copurchase"))
+        self._copy("book_copurchase", ("book_id", "related_book_id", "orders_together"), pairs)
+        self._copy("book_related", ("book_id", "rank", "related_book_id", "score"), top)
+
+    def add_pairs(self, pairs: PairCounts, batch_size: int = 10_000) -> None:
+        """ Incremental update: adds pair counts of newly processed orders. """
+        first, second, counts = pairs
+        table = database_models.BookCopurchase.__table__
+        # Sorted by key, so concurrent writers would lock rows in the same order
+        for start in range(0, len(first), batch_size):
+            batch = slice(start, start + batch_size)
+            rows = [
+                {"book_id": a, "related_book_id": b, "orders_together": c}
+                for a, b, c in zip(first[batch].tolist(), second[batch].tolist(), counts[batch].tolist())
+            ]
+            stmt = insert(table).values(rows)
+            self.db.execute(stmt.on_conflict_do_update(
+                index_elements=[table.c.book_id, table.c.related_book_id],
+                set_={"orders_together": table.c.orders_together + stmt.excluded.orders_together},
+            ))
+
+    def refresh_top_k(self, book_ids: List[int], k: int, batch_size: int = 1_000) -> None:
+        """ Recomputes book_related for the given books from book_copurchase. """
+        copurchase = database_models.BookCopurchase
+        related = database_models.BookRelated
+        for start in range(0, len(book_ids), batch_size):
+            batch = book_ids[start:start + batch_size]
+            ranked = (
+                select(
+                    copurchase.book_id,
+                    func.row_number().over(
+                        partition_by=copurchase.book_id,
+                        order_by=(desc(copurchase.orders_together), asc(copurchase.related_book_id))
+                    ).label("rank"),
+                    copurchase.related_book_id,
+                    copurchase.orders_together
+                )
+                .where(copurchase.book_id.in_(batch))
+                .subquery("ranked")
+            )
+            self.db.execute(delete(related).where(related.book_id.in_(batch)))
+            self.db.execute(
+                insert(related).from_select(
+                    ["book_id", "rank", "related_book_id", "score"],
+                    select(ranked).where(ranked.c.rank <= k)
+                )
+            )
+
+    def _copy(self, table: str, columns: Sequence[str], arrays: Sequence[np.ndarray], batch_size: int = 500_000) -> None:
+        """ COPY FROM STDIN of parallel integer arrays, inside the session's transaction. """
+        cursor = self.db.connection().connection.cursor()
+        try:
+            total = len(arrays[0])
+            for start in range(0, total, batch_size):
+                buffer = io.StringIO()
+                np.savetxt(buffer, np.column_stack([a[start:start + batch_size] for a in arrays]), fmt="%d", delimiter=",")
+                buffer.seek(0)
+                cursor.copy_expert(f'COPY "{table}" ({", ".join(columns)}) FROM STDIN WITH (FORMAT csv)', buffer)
+        finally:
+            cursor.close()
@@ -0,0 +1,236 @@
+# backend/app/repositories/sales_repository.py
+import datetime
+from collections import defaultdict
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import TableClause, select, func, update, delete, text, literal, Date, cast
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.models import database_models
+
+# Rolling windows kept in book_sales_stats: name -> days (including today)
+SALES_WINDOWS: Dict[str, int] = {"7d": 7, "30d": 30}
+
+
+class SalesRepository:
+    """
+    Maintains the per-book sales counters (book_sales_daily / book_sales_stats) and the
+    daily analytics rollups (sales_daily, category_sales_daily, author_sales_daily).
+    Everything is updated incrementally inside the order transaction; the rolling
+    windows are re-derived from the daily rows once per day and everything can be
+    rebuilt from order_item for backfills.
+    """
+    def __init__(self, db: Session):
+        self.db = db
+
+    def record_sales(self, items_data: Iterable[Dict], sales_date: Optional[datetime.date] = None) -> None:
+        """
+        Adds the items of an order (dicts with book_id, quantity, price) to the counters and
+        the analytics rollups, on sales_date (default today). Runs in the caller's
+        transaction and does not commit.
+        """
+        sales_date = sales_date or func.current_date()
+        totals: Dict[int, Tuple[int, Decimal]] = defaultdict(lambda: (0, Decimal("0.00")))
+        for item in items_data:
+            quantity, revenue = totals[item["book_id"]]
+            totals[item["book_id"]] = (quantity + item["quantity"], revenue + item["price"] * item["quantity"])
+        if not totals:
+            return
+        # Every table's rows are locked in key order, and the tables always in the same
+        # order, so concurrent orders cannot deadlock
+        rows = [
+            {"book_id": book_id, "quantity": quantity, "revenue": revenue}
+            for book_id, (quantity, revenue) in sorted(totals.items())
+        ]
+
+        self._increment(
+            database_models.BookSalesDaily.__table__, ("book_id", "sales_date"),
+            [dict(row, sales_date=sales_date) for row in rows], ("quantity", "revenue")
+        )
+        # A sale made today is inside every window
+        self._increment(
+            database_models.BookSalesStats.__table__, ("book_id",),
+            [
+                {
+                    "book_id": row["book_id"],
+                    "quantity_7d": row["quantity"], "revenue_7d": row["revenue"],
+                    "quantity_30d": row["quantity"], "revenue_30d": row["revenue"],
+                    "quantity_total": row["quantity"], "revenue_total": row["revenue"],
+                    "windows_as_of": func.current_date(),
+                }
+                for row in rows
+            ],
+            ("quantity_7d", "revenue_7d", "quantity_30d", "revenue_30d", "quantity_total", "revenue_total")
+        )
+        self._record_rollups(totals, sales_date)
+
+    def _record_rollups(self, totals: Dict[int, Tuple[int, Decimal]], sales_date) -> None:
+        """ One order's share of sales_daily and the per-category / per-author rollups. """
+        book = database_models.Book
+        owners = self.db.execute(
+            select(book.id, book.category_id, book.author_id).where(book.id.in_(list(totals)))
+        ).all()
+        by_category: Dict[int, Tuple[int, Decimal]] = defaultdict(lambda: (0, Decimal("0.00")))
+        by_author: Dict[int, Tuple[int, Decimal]] = defaultdict(lambda: (0, Decimal("0.00")))
+        for book_id, category_id, author_id in owners:
+            quantity, revenue = totals[book_id]
+            for grouped, key in ((by_category, category_id), (by_author, author_id)):
+                grouped_quantity, grouped_revenue = grouped[key]
+                grouped[key] = (grouped_quantity + quantity, grouped_revenue + revenue)
+
+        counters = ("order_count", "quantity", "revenue")
+        self._increment(
+            database_models.SalesDaily.__table__, ("sales_date",),
+            [{
+                "sales_date": sales_date,
+                "order_count": 1,
+                "quantity": sum(quantity for quantity, _ in totals.values()),
+                "revenue": sum(revenue for _, revenue in totals.values()),
+            }],
+            counters
+        )
+        for model, key_column, grouped in (
+            (database_models.CategorySalesDaily, "category_id", by_category),
+            (database_models.AuthorSalesDaily, "author_id", by_author),
+        ):
+            self._increment(
+                model.__table__, (key_column, "sales_date"),
+                [
+                    {key_column: key, "sales_date": sales_date, "order_count": 1, "quantity": quantity, "revenue": revenue}
+                    for key, (quantity, revenue) in sorted(grouped.items())
+                ],
+                counters
+            )
+
+    def _increment(self, table, index_columns: Sequence[str], rows: List[Dict], counters: Sequence[str]) -> None:
+        """ INSERT ... ON CONFLICT DO UPDATE adding rows' counters to the existing ones. """
+        if not rows:
+            return
+        stmt = insert(table).values(rows)
+        self.db.execute(stmt.on_conflict_do_update(
+            index_elements=[table.c[column] for column in index_columns],
+            set_={column: table.c[column] + stmt.excluded[column] for column in counters},
+        ))
+
+    def oldest_windows_as_of(self) -> Optional[datetime.date]:
+        return self.db.scalar(select(func.min(database_models.BookSalesStats.windows_as_of)))
+
+    def refresh_windows(self, today: datetime.date) -> int:
+        """
+        Recomputes the 7d/30d columns from book_sales_daily so sales that left a window
+        stop counting. Returns the number of books with sales in the 30 day window.
+        """
+        stats = database_models.BookSalesStats
+        daily = database_models.BookSalesDaily
+        self.db.execute(
+            update(stats)
+            .values(quantity_7d=0, revenue_7d=0, quantity_30d=0, revenue_30d=0, windows_as_of=today)
+            .execution_options(synchronize_session=False)
+        )
+
+        window_columns = {}
+        for name, days in SALES_WINDOWS.items():
+            in_window = daily.sales_date > today - datetime.timedelta(days=days)
+            window_columns[f"quantity_{name}"] = func.coalesce(func.sum(daily.quantity).filter(in_window), 0)
+            window_columns[f"revenue_{name}"] = func.coalesce(func.sum(daily.revenue).filter(in_window), 0)
+        windows = (
+            select(daily.book_id, *(value.label(column) for column, value in window_columns.items()))
+            .where(daily.sales_date > today - datetime.timedelta(days=max(SALES_WINDOWS.values())))
+            .group_by(daily.book_id)
+            .subquery("windows")
+        )
+        result = self.db.execute(
+            update(stats)
+            .where(stats.book_id == windows.c.book_id)
+            .values({column: windows.c[column] for column in window_columns})
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount
+
+    def lock_for_rebuild(self) -> None:
+        """ Blocks record_sales until the transaction ends (taken again by rebuild_from_orders). """
+        self.db.execute(text(
+            "LOCK TABLE book_sales_daily, book_sales_stats, sales_daily, category_sales_daily, "
+            "author_sales_daily IN EXCLUSIVE MODE"
+        ))
+
+    def rebuild_from_orders(self, today: datetime.date, items: Optional[TableClause] = None) -> int:
+        """
+        Backfill: recomputes the sales counters and analytics rollups from order_item, or
+        from `items` (a table with its order_id, order_date, book_id, quantity and price
+        columns, e.g. gathered from every shard). Takes table locks so orders placed
+        meanwhile are applied after the rebuild instead of being lost. Returns the number
+        of books with sales.
+        """
+        daily = database_models.BookSalesDaily
+        stats = database_models.BookSalesStats
+        source = items if items is not None else database_models.OrderItem.__table__
+        order_item = source.c
+        book = database_models.Book
+
+        self.lock_for_rebuild()
+        for model in (
+            daily, stats, database_models.SalesDaily, database_models.CategorySalesDaily, database_models.AuthorSalesDaily
+        ):
+            self.db.execute(delete(model))
+
+        # order_item carries its order's date, so no join with order is needed
+        sales_date = cast(order_item.order_date, Date)
+        self.db.execute(
+            insert(daily).from_select(
+                ["book_id", "sales_date", "quantity", "revenue"],
+                select(
+                    order_item.book_id,
+                    sales_date,
+                    func.sum(order_item.quantity),
+                    func.sum(order_item.quantity * order_item.price)
+                )
+                .group_by(order_item.book_id, sales_date)
+            )
+        )
+        totals = select(
+            daily.book_id,
+            func.sum(daily.quantity),
+            func.sum(daily.revenue),
+        ).group_by(daily.book_id)
+        result = self.db.execute(
+            insert(stats).from_select(
+                [
+                    "book_id", "quantity_total", "revenue_total",
+                    "quantity_7d", "revenue_7d", "quantity_30d", "revenue_30d", "windows_as_of"
+                ],
+                totals.add_columns(literal(0), literal(0), literal(0), literal(0), literal(today, Date))
+            )
+        )
+        self.refresh_windows(today)
+
+        # Rollups count orders, so they are aggregated from order_item rather than book_sales_daily
+        counters = ("order_count", "quantity", "revenue")
+        order_totals = (
+            func.count(func.distinct(order_item.order_id)),
+            func.sum(order_item.quantity),
+            func.sum(order_item.quantity * order_item.price),
+        )
+        self.db.execute(
+            insert(database_models.SalesDaily).from_select(
+                ["sales_date", *counters],
+                select(sales_date, *order_totals)
+                .group_by(sales_date)
+            )
+        )
+        for model, key_column in (
+            (database_models.CategorySalesDaily, book.category_id),
+            (database_models.AuthorSalesDaily, book.author_id),
+        ):
+            self.db.execute(
+                insert(model).from_select(
+                    [key_column.key, "sales_date", *counters],
+                    select(key_column, sales_date, *order_totals)
+                    .select_from(source)
+                    .join(book, book.id == order_item.book_id)
+                    .group_by(key_column, sales_date)
+                )
+            )
+        return result.rowcount
@@ -0,0 +1,196 @@
+# backend/app/routers/admin.py
+import csv
+import datetime
+import io
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile, status
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.db.session import get_db
+from app.core import profiling
+from app.core.config import settings
+from app.core.exceptions import DiscountConflictError, InvalidDateRangeError
+from app.core.instrumentation import InstrumentedRoute
+from app.models import schemas
+from app.routers.auth import get_current_admin_user
+from app.repositories.export_repository import EXPORT_DATASETS, has_date_filter
+from app.services import analytics_service, discount_service
+from app.services.export_service import EXPORT_FORMATS, stream_export
+from app.services.catalog_import import IMPORT_SPECS, import_records, read_records
+
+router = APIRouter(
+    prefix="/admin",
+    route_class=InstrumentedRoute,
+    dependencies=[Depends(get_current_admin_user)]
+)
+
+
+@router.get("/analytics/sales", response_model=schemas.SalesSummary)
+async def read_sales(
+    db: Session = Depends(get_db),
+    granularity: str = Query("day", enum=["day", "week", "month"]),
+    start: Optional[datetime.date] = Query(None, description="First day (defaults by granularity)"),
+    end: Optional[datetime.date] = Query(None, description="Last day (defaults to today)")
+):
+    """
+    Revenue, units, order count and average order value per day/week/month.
+    Served from the daily rollups (python -m app.jobs.sales_counters rebuild backfills them).
+    """
+    try:
+        return await analytics_service.get_sales_summary(db=db, granularity=granularity, start=start, end=end)
+    except InvalidDateRangeError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+@router.get("/analytics/top/{dimension}", response_model=schemas.TopSellers)
+async def read_top_sellers(
+    dimension: str,
+    db: Session = Depends(get_db),
+    granularity: str = Query("month", enum=["day", "week", "month"]),
+    start: Optional[datetime.date] = Query(None),
+    end: Optional[datetime.date] = Query(None),
+    metric: str = Query("revenue", enum=["revenue", "units"]),
+    limit: int = Query(10, ge=1, le=50)
+):
+    """ Top books, authors or categories of each day/week/month by revenue or units sold. """
+    if dimension not in ("book", "author", "category"):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Unknown dimension")
+    try:
+        return await analytics_service.get_top_sellers(
+            db=db,
+            dimension=dimension,
+            granularity=granularity,
+            start=start,
+            end=end,
+            limit=limit,
+            metric=metric
+        )
+    except InvalidDateRangeError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+@router.post("/discounts/campaigns", response_model=schemas.DiscountCampaignResult, status_code=status.HTTP_201_CREATED)
+async def create_discount_campaign(campaign: schemas.DiscountCampaignCreate, db: Session = Depends(get_db)):
+    """
+    Discounts a list of books, a category or an author by a percentage in one batch.
+    Fails with 409 and the overlapping discounts unless skip_conflicts is set.
+    """
+    try:
+        return await discount_service.create_campaign(db=db, campaign=campaign)
+    except DiscountConflictError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail={
+                "message": str(e),
+                "conflict_count": e.conflict_count,
+                "conflicts": [conflict.model_dump(mode="json") for conflict in e.conflicts],
+            },
+        )
+
+
+@router.post("/discounts/end", response_model=schemas.DiscountEndResult)
+async def end_discounts(request: schemas.DiscountEnd, db: Session = Depends(get_db)):
+    """ Ends the discounts of a list of books, a category or an author after last_day. """
+    return await discount_service.end_discounts(db=db, request=request)
+
+
+@router.post("/imports/{entity}", response_model=schemas.ImportReport)
+async def import_catalog(
+    entity: str,
+    file: UploadFile = File(..., description="CSV with a header row, or one JSON object per line"),
+    db: Session = Depends(get_db),
+    format: Optional[str] = Query(None, enum=["csv", "ndjson"], description="Defaults to the file extension, else csv")
+):
+    """
+    Upserts categories, authors, books or discounts by id from a supplier file.
+    Rows are validated and merged in batches; invalid rows are reported, not fatal.
+    """
+    if entity not in IMPORT_SPECS:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Unknown entity")
+    fmt = format or ("ndjson" if (file.filename or "").endswith((".ndjson", ".jsonl")) else "csv")
+    # The upload is spooled to disk, so it is read in a stream rather than into memory
+    stream = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+    try:
+        return await run_in_threadpool(import_records, db, entity, read_records(stream, fmt))
+    except (UnicodeDecodeError, csv.Error) as e:
+        # Batches before the unreadable part are already committed
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Unreadable input: {e}")
+    finally:
+        stream.detach()
+
+
+@router.get("/exports/{dataset}")
+async def export_dataset(
+    dataset: str,
+    format: str = Query("ndjson", enum=["ndjson", "csv"]),
+    start: Optional[datetime.date] = Query(None, description="First order day (orders, order_items)"),
+    end: Optional[datetime.date] = Query(None, description="Last order day (orders, order_items)"),
+    min_id: Optional[int] = Query(None, ge=1, description="Smallest id to include"),
+    max_id: Optional[int] = Query(None, ge=1, description="Largest id to include")
+):
+    """
+    Streams orders, order_items, books, authors, categories or discounts in id order
+    as NDJSON or CSV. Interrupted downloads can resume with min_id = last id + 1.
+    """
+    if dataset not in EXPORT_DATASETS:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Unknown dataset")
+    if (start is not None or end is not None) and not has_date_filter(dataset):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"{dataset} has no date filter")
+    if start is not None and end is not None and start > end:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="start must not be after end.")
+    if min_id is not None and max_id is not None and min_id > max_id:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="min_id must not exceed max_id.")
+    return StreamingResponse(
+        stream_export(dataset, format, start=start, end=end, min_id=min_id, max_id=max_id),
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="{dataset}.{format}"'},
+    )
+
+
+def _profile_summary(profile: profiling.Profile) -> schemas.ProfileSummary:
+    return schemas.ProfileSummary(
+        id=profile.id,
+        trigger=profile.trigger,
+        label=profile.label,
+        route=profile.route,
+        started_at=profile.started_at,
+        duration_ms=round(profile.duration * 1000, 2),
+        samples=profile.samples,
+        phases=profile.phases(),
+    )
+
+
+@router.get("/profiles", response_model=List[schemas.ProfileSummary])
+async def list_profiles():
+    """
+    Profiles kept by the worker serving this call, newest first. Requests are profiled
+    with `X-Profile: <PROFILING_TOKEN>` or by PROFILING_SAMPLE_RATE.
+    """
+    return [_profile_summary(profile) for profile in reversed(list(profiling.sampler.recent.values()))]
+
+
+@router.get("/profiles/{profile_id}", response_class=PlainTextResponse)
+async def read_profile(profile_id: str):
+    """ A profile as folded stacks (flamegraph.pl, inferno, speedscope); the root frame is the phase. """
+    profile = profiling.sampler.recent.get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Unknown profile (kept per worker process)")
+    return PlainTextResponse(profile.folded())
+
+
+@router.post("/profiles/worker", response_class=PlainTextResponse)
+async def profile_worker(seconds: float = Query(10, gt=0)):
+    """ Samples every thread of the worker serving this call for `seconds` and returns its folded stacks. """
+    if not settings.PROFILING_ENABLED:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profiling is disabled")
+    if seconds > settings.PROFILING_MAX_SECONDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=f"seconds must not exceed {settings.PROFILING_MAX_SECONDS:g}."
+        )
+    profile = await profiling.profile_worker(seconds)
+    if profile is None:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Too many profiles running")
+    return PlainTextResponse(profile.folded(), headers={"X-Profile-Id": profile.id})
@@ -2,17 +2,19 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 from typing import Annotated, Optional
 from jose import JWTError, jwt
 from datetime import timedelta
 
 from app.db.session import get_db
+from app.core.instrumentation import InstrumentedRoute, timed_span
 from app.models import database_models, schemas
 from app.core import security  # Import the security module
 from app.core.config import settings
 from sqlalchemy import select
 
-router = APIRouter()
+router = APIRouter(route_class=InstrumentedRoute)
 
 # OAuth2 scheme definition
 oauth2_scheme = OAuth2PasswordBearer(
@@ -23,10 +25,13 @@ oauth2_scheme = OAuth2PasswordBearer(
 def authenticate_user(db: Session, email: str, password: str) -> Optional[database_models.User]:
     """Find user by email and verify password."""
     stmt = select(database_models.User).where(database_models.User.email == email)
-    user = db.scalars(stmt).first()
+    with timed_span("auth_lookup"):
+        user = db.scalars(stmt).first()
     if not user:
         return None
-    if not security.verify_password(password, user.password):  # Now using the security module correctly
+    with timed_span("password_verify"):
+        password_ok = security.verify_password(password, user.password)  # Now using the security module correctly
+    if not password_ok:
         return None
     return user
 
@@ -51,7 +56,8 @@ async def get_current_user(
         raise credentials_exception
 
     stmt = select(database_models.User).where(database_models.User.email == token_data.email)
-    user = db.scalars(stmt).first()
+    with timed_span("auth_lookup"):
+        user = db.scalars(stmt).first()
     if user is None:
         raise credentials_exception
     return user
@@ -63,6 +69,13 @@ async def get_current_active_user(current_user: Annotated[database_models.User,
     #     raise HTTPException(status_code=400, detail="Inactive user")
     return current_user
 
+# --- Dependency for Admin-only Endpoints ---
+async def get_current_admin_user(current_user: Annotated[database_models.User, Depends(get_current_active_user)]):
+    """Allow only users with the admin flag."""
+    if not current_user.admin:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin privileges required")
+    return current_user
+
 
 # --- Token Endpoint ---
 @router.post("/token", response_model=schemas.Token)
@@ -70,7 +83,8 @@ async def login_for_access_token(
     form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
     db: Session = Depends(get_db)
 ):
-    user = authenticate_user(db, email=form_data.username, password=form_data.password)
+    # bcrypt is CPU-bound: run it off the event loop so other requests keep being served
+    user = await run_in_threadpool(authenticate_user, db, email=form_data.username, password=form_data.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
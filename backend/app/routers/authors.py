@@ -1,18 +1,25 @@
 # backend/app/routers/authors.py
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Response
 from sqlalchemy.orm import Session
 from typing import List
 from app.db.session import get_db
+from app.core.instrumentation import InstrumentedRoute
 from app.models import database_models, schemas
 from sqlalchemy import select
+from app.services.catalog_snapshot import catalog_engine
 
-router = APIRouter()
+router = APIRouter(route_class=InstrumentedRoute)
 
 @router.get("/authors", response_model=List[schemas.Author])
 def read_authors(db: Session = Depends(get_db), skip: int = 0, limit: int = 100):
     """
     Retrieve all authors.
     """
+    # Pre-rendered by the shared catalog snapshot when CATALOG_ENGINE=shared
+    rendered = catalog_engine.render_list("authors", skip, limit)
+    if rendered is not None:
+        return Response(content=rendered, media_type="application/json")
+
     stmt = select(database_models.Author).offset(skip).limit(limit)
     authors = db.scalars(stmt).all()
     return authors
\ No newline at end of file
@@ -1,13 +1,14 @@
 # backend/app/routers/books.py
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.orm import Session
 from typing import List, Optional
 
 from app.db.session import get_db
+from app.core.instrumentation import InstrumentedRoute
 from app.models import database_models, schemas
 from app.services import book_service
 
-router = APIRouter()
+router = APIRouter(route_class=InstrumentedRoute)
 
 @router.get("/books", response_model=schemas.BookListResponse)
 async def read_books(
@@ -16,7 +17,8 @@ async def read_books(
     limit: int = Query(25, ge=1, le=100),
     sort_by: Optional[str] = Query("on_sale", enum=[
         "on_sale", "on_sale_home", "popularity", "popular",
-        "price_asc", "price_desc", "recommended"
+        "price_asc", "price_desc", "recommended",
+        "best_selling", "best_selling_7d", "best_selling_all"
     ]),
     category_id: Optional[int] = Query(None),
     author_id: Optional[int] = Query(None),
@@ -27,6 +29,19 @@ async def read_books(
     Retrieve books with pagination, filtering, sorting, and optional search.
     Delegates logic to the book service.
     """
+    # Served from the shared catalog snapshot when available (CATALOG_ENGINE=shared)
+    rendered = await book_service.render_book_list(
+        skip=skip,
+        limit=limit,
+        sort_by=sort_by,
+        category_id=category_id,
+        author_id=author_id,
+        min_rating=min_rating,
+        search_term=search
+    )
+    if rendered is not None:
+        return Response(content=rendered, media_type="application/json")
+
     # Call the service function, passing the search term
     book_list_response = await book_service.list_books(
         db=db,
@@ -40,6 +55,40 @@ async def read_books(
     )
     return book_list_response
 
+# Declared before /books/{book_id} so "facets" is not parsed as a book id
+@router.get("/books/facets", response_model=schemas.BookFacets)
+async def read_book_facets(
+    category_id: Optional[int] = Query(None),
+    author_id: Optional[int] = Query(None),
+    min_rating: Optional[int] = Query(None, ge=1, le=5),
+    search: Optional[str] = Query(None, min_length=1, max_length=100)
+):
+    """
+    Per-category, per-author and per-rating counts of the books matching the same
+    filters and search as GET /books, for the shop sidebar.
+    """
+    return await book_service.get_book_facets(
+        category_id=category_id,
+        author_id=author_id,
+        min_rating=min_rating,
+        search_term=search
+    )
+
+@router.get("/books/{book_id}/related", response_model=List[schemas.Book])
+async def read_related_books(
+    book_id: int,
+    limit: int = Query(8, ge=1, le=20)
+):
+    """
+    "Customers also bought": the books most often ordered together with this one,
+    topped up with books by the same author and then in the same category.
+    """
+    related = await book_service.get_related_books(book_id=book_id, limit=limit)
+    if related is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                            detail="Book not found")
+    return related
+
 # --- read_book endpoint remains unchanged ---
 @router.get("/books/{book_id}", response_model=schemas.Book)
 async def read_book(book_id: int, db: Session = Depends(get_db)):
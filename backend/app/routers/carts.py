@@ -3,22 +3,20 @@ from sqlalchemy.orm import Session
 from typing import List, Annotated
 
 from app.db.session import get_db
+from app.core.instrumentation import InstrumentedRoute
 from app.models import database_models, schemas
 from app.routers.auth import get_current_active_user
+from app.services import cart_service
 
-router = APIRouter()
+router = APIRouter(route_class=InstrumentedRoute)
 
 @router.get("/cart", response_model=List[schemas.CartItem])
 async def get_user_cart(
     current_user: Annotated[database_models.User, Depends(get_current_active_user)],
     db: Session = Depends(get_db),
 ):
-    """Get the current user's cart items"""
-    cart_items = db.query(database_models.CartItem).filter(
-        database_models.CartItem.user_id == current_user.id
-    ).all()
-    
-    return cart_items
+    """Get the current user's cart items (including changes not yet flushed)"""
+    return cart_service.get_cart(db, current_user.id)
 
 @router.post("/cart", status_code=status.HTTP_201_CREATED)
 async def update_user_cart(
@@ -27,19 +25,14 @@ async def update_user_cart(
     db: Session = Depends(get_db),
 ):
     """Update the current user's cart items"""
-    # Clear existing cart items
-    db.query(database_models.CartItem).filter(
-        database_models.CartItem.user_id == current_user.id
-    ).delete()
-    
-    # Add new cart items
-    for item in cart_items:
-        db_item = database_models.CartItem(
-            user_id=current_user.id,
-            book_id=item.book_id,
-            quantity=item.quantity
-        )
-        db.add(db_item)
-    
-    db.commit()
-    return {"message": "Cart updated successfully"}
\ No newline at end of file
+    # Replaces the whole cart; buffered briefly so rapid updates collapse into one write
+    cart_service.sync_cart(db, current_user.id, [(item.book_id, item.quantity) for item in cart_items])
+    return {"message": "Cart updated successfully"}
+
+@router.post("/cart/quote", response_model=schemas.CartQuoteResponse)
+async def quote_carts(
+    request: schemas.CartQuoteRequest,
+    db: Session = Depends(get_db),
+):
+    """Price one or more carts exactly as checkout would (checkout preview)"""
+    return await cart_service.quote_carts(db=db, request=request)
@@ -1,18 +1,25 @@
 # backend/app/routers/categories.py
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
 from typing import List
 from app.db.session import get_db
+from app.core.instrumentation import InstrumentedRoute
 from app.models import database_models, schemas # Import both model types
 from sqlalchemy import select # Use select for SQLAlchemy 2.0 style
+from app.services.catalog_snapshot import catalog_engine
 
-router = APIRouter()
+router = APIRouter(route_class=InstrumentedRoute)
 
 @router.get("/categories", response_model=List[schemas.Category])
 def read_categories(db: Session = Depends(get_db), skip: int = 0, limit: int = 100):
     """
     Retrieve all categories.
     """
+    # Pre-rendered by the shared catalog snapshot when CATALOG_ENGINE=shared
+    rendered = catalog_engine.render_list("categories", skip, limit)
+    if rendered is not None:
+        return Response(content=rendered, media_type="application/json")
+
     # SQLAlchemy 2.0 style query
     stmt = select(database_models.Category).offset(skip).limit(limit)
     categories = db.scalars(stmt).all()
@@ -0,0 +1,18 @@
+# backend/app/routers/home.py
+from fastapi import APIRouter, Query, Response
+from typing import Optional
+
+from app.core.instrumentation import InstrumentedRoute
+from app.models import schemas
+from app.services import home_service
+
+router = APIRouter(route_class=InstrumentedRoute)
+
+@router.get("/home", response_model=schemas.HomeRails)
+async def read_home(category_id: Optional[int] = Query(None)):
+    """
+    On-sale, popular and recommended rails for the home page in one response.
+    Served from the precomputed rails; no catalog queries run on the request path.
+    """
+    content = await home_service.get_home_rails(category_id=category_id)
+    return Response(content=content, media_type="application/json")
@@ -1,10 +1,14 @@
 # backend/app/routers/orders.py
-from fastapi import APIRouter, Depends, HTTPException, status
+import datetime
+import logging
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
-from typing import List, Annotated
+from typing import List, Annotated, Optional
 # Removed unused imports like Decimal, datetime, select
 
 from app.db.session import get_db
+from app.core.instrumentation import InstrumentedRoute
 from app.models import database_models, schemas
 from app.routers.auth import get_current_active_user
 # Import the service
@@ -13,7 +17,8 @@ from app.services import order_service # Import order_service
 from app.core.exceptions import OrderCreationError, EmptyOrderError, ItemUnavailableError, InvalidQuantityError
 
 
-router = APIRouter()
+router = APIRouter(route_class=InstrumentedRoute)
+logger = logging.getLogger(__name__)
 
 @router.post("/orders", response_model=schemas.Order, status_code=status.HTTP_201_CREATED)
 async def create_order(
@@ -47,7 +52,7 @@ async def create_order(
     except OrderCreationError as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
     except Exception as e:
-        print(f"Unexpected error in create_order router: {e}")
+        logger.exception("Unexpected error in create_order router: %s", e)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                             detail="An unexpected error occurred.")
 
@@ -55,13 +60,14 @@ async def create_order(
 @router.get("/orders", response_model=List[schemas.Order])
 async def get_orders(
     current_user: Annotated[database_models.User, Depends(get_current_active_user)],
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    since: Optional[datetime.date] = Query(None, description="Only orders placed on or after this day")
 ):
     """
-    Get all orders for the current user.
+    Get all orders for the current user, or the recent ones with `since`.
     Delegates logic to the order service.
     """
     # Call the service function to get orders
-    orders = await order_service.get_user_orders(db=db, user_id=current_user.id)
+    orders = await order_service.get_user_orders(db=db, user_id=current_user.id, since=since)
     # FastAPI handles the conversion from List[ORM Order] to List[schemas.Order]
     return orders
\ No newline at end of file
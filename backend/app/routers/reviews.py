@@ -5,12 +5,14 @@ from typing import List, Annotated, Optional
 from sqlalchemy import select, desc, asc
 
 from app.db.session import get_db
+from app.core.instrumentation import InstrumentedRoute
 from app.models import database_models, schemas
 from app.routers.auth import get_current_active_user
 
 router = APIRouter(
     prefix="/books",
-    tags=["Reviews"]
+    tags=["Reviews"],
+    route_class=InstrumentedRoute
 )
 
 # Public endpoints (no authentication required)
@@ -93,7 +95,10 @@ async def create_review_for_book(
         # Reload with user relationship for response
         refreshed_review = db.scalar(
             select(database_models.Review)
-            .where(database_models.Review.id == db_review.id)
+            .where(
+                database_models.Review.id == db_review.id,
+                database_models.Review.review_date == db_review.review_date # Single partition
+            )
             .options(joinedload(database_models.Review.user))
         )
         return refreshed_review
@@ -0,0 +1,89 @@
+# backend/app/services/analytics_service.py
+import datetime
+from decimal import Decimal
+from typing import Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.models import schemas
+from app.core.exceptions import InvalidDateRangeError
+from app.repositories.analytics_repository import AnalyticsRepository
+
+# Range shown when the dashboard does not pass one
+DEFAULT_RANGE_DAYS = {"day": 30, "week": 12 * 7, "month": 365}
+# Longest range accepted, to keep day-level responses bounded
+MAX_RANGE_DAYS = 3 * 366
+
+CENTS = Decimal("0.01")
+
+
+def resolve_range(
+    granularity: str, start: Optional[datetime.date], end: Optional[datetime.date]
+) -> Tuple[datetime.date, datetime.date]:
+    """ Fills in the default range for the granularity and validates it. """
+    end = end or datetime.date.today()
+    start = start or end - datetime.timedelta(days=DEFAULT_RANGE_DAYS[granularity] - 1)
+    if start > end:
+        raise InvalidDateRangeError("start must not be after end.")
+    if (end - start).days >= MAX_RANGE_DAYS:
+        raise InvalidDateRangeError(f"The range may span at most {MAX_RANGE_DAYS} days.")
+    return start, end
+
+
+def _average_order_value(revenue: Decimal, order_count: int) -> Decimal:
+    if not order_count:
+        return Decimal("0.00")
+    return (Decimal(revenue) / order_count).quantize(CENTS)
+
+
+async def get_sales_summary(
+    db: Session,
+    granularity: str,
+    start: Optional[datetime.date],
+    end: Optional[datetime.date]
+) -> schemas.SalesSummary:
+    """ Orders, units, revenue and average order value per period and over the whole range. """
+    start, end = resolve_range(granularity, start, end)
+    rows = AnalyticsRepository(db).sales_by_period(granularity, start, end)
+    periods = [
+        schemas.SalesPeriod(
+            period=period,
+            order_count=order_count,
+            units=units,
+            revenue=revenue,
+            average_order_value=_average_order_value(revenue, order_count)
+        )
+        for period, order_count, units, revenue in rows
+    ]
+    order_count = sum(period.order_count for period in periods)
+    revenue = sum((period.revenue for period in periods), Decimal("0.00"))
+    return schemas.SalesSummary(
+        granularity=granularity,
+        start=start,
+        end=end,
+        periods=periods,
+        order_count=order_count,
+        units=sum(period.units for period in periods),
+        revenue=revenue,
+        average_order_value=_average_order_value(revenue, order_count)
+    )
+
+
+async def get_top_sellers(
+    db: Session,
+    dimension: str,
+    granularity: str,
+    start: Optional[datetime.date],
+    end: Optional[datetime.date],
+    limit: int,
+    metric: str
+) -> schemas.TopSellers:
+    """ Best books, authors or categories of each period. """
+    start, end = resolve_range(granularity, start, end)
+    rows = AnalyticsRepository(db).top_sellers(dimension, granularity, start, end, limit, metric)
+    periods = []
+    for period, key_id, name, units, revenue in rows:
+        if not periods or periods[-1].period != period:
+            periods.append(schemas.TopSellersPeriod(period=period))
+        periods[-1].items.append(schemas.TopSeller(id=key_id, name=name, units=units, revenue=revenue))
+    return schemas.TopSellers(dimension=dimension, granularity=granularity, metric=metric, periods=periods)
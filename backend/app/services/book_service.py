@@ -4,24 +4,122 @@ from decimal import Decimal
 from typing import List, Optional, Tuple, Sequence # Added Sequence
 
 from sqlalchemy.orm import Session # Keep Session for type hinting
+from starlette.concurrency import run_in_threadpool
 
 from app.models import database_models, schemas
+from app.core.coalescing import CoalescingCache
+from app.core.config import settings
+from app.core.exceptions import BookNotFoundError
+from app.core.instrumentation import timed_span
+from app.db.session import SessionLocal
 # Import the repository
 from app.repositories.book_repository import BookRepository
+from app.repositories.recommendation_repository import RecommendationRepository
+from app.services.catalog_snapshot import catalog_engine
 
 # Helper function definition - MUST be present in this file
 def get_active_discount_price(book_row: database_models.Book) -> Optional[Decimal]:
     """Get active discount price from a book ORM instance."""
     today = datetime.date.today()
-    active_discount_price = None
+    active_discount = None
     # Check if discounts were loaded, handle if not
     if book_row.discounts:
         for discount in book_row.discounts:
             if (discount.discount_start_date <= today and
                     (discount.discount_end_date is None or discount.discount_end_date >= today)):
-                active_discount_price = discount.discount_price
-                break # Found the active discount
-    return active_discount_price
+                # Overlapping windows: the latest start wins, then the newest row (as in the SQL listing)
+                if active_discount is None or (discount.discount_start_date, discount.id) > (
+                        active_discount.discount_start_date, active_discount.id):
+                    active_discount = discount
+    return active_discount.discount_price if active_discount is not None else None
+
+def book_schema_from_row(row) -> dict:
+    """ Converts a (Book ORM object, active_discount_price) repository row into schemas.Book data. """
+    book_data = schemas.Book.model_validate(row[0]).model_dump()
+    book_data['discount_price'] = row[1]
+    return book_data
+
+# Shared by concurrent identical /books requests (see LISTING_* settings)
+listing_cache = CoalescingCache(
+    "book_listing",
+    ttl=settings.LISTING_CACHE_TTL_SECONDS,
+    stale_ttl=settings.LISTING_CACHE_STALE_SECONDS,
+    max_entries=settings.LISTING_CACHE_MAX_ENTRIES,
+)
+
+# sort_by values that produce the same listing
+_SORT_BY_ALIASES = {None: "on_sale", "popular": "popularity"}
+
+
+def listing_cache_key(
+    skip: int,
+    limit: int,
+    sort_by: Optional[str],
+    category_id: Optional[int],
+    author_id: Optional[int],
+    min_rating: Optional[int],
+    search_term: Optional[str]
+) -> tuple:
+    """
+    Normalized listing parameters; requests with equal keys get the same response.
+    search_term must already be normalized (normalize_search_term), as the SQL sees it.
+    """
+    return (skip, limit, _SORT_BY_ALIASES.get(sort_by, sort_by), category_id, author_id, min_rating, search_term)
+
+
+def normalize_search_term(search_term: Optional[str]) -> Optional[str]:
+    """ The search term as matched by SQL: surrounding whitespace removed, blank = no search. """
+    if search_term is None:
+        return None
+    return search_term.strip() or None
+
+
+def query_book_list(
+    db: Session,
+    skip: int,
+    limit: int,
+    sort_by: Optional[str],
+    category_id: Optional[int],
+    author_id: Optional[int],
+    min_rating: Optional[int],
+    search_term: Optional[str] = None
+) -> schemas.BookListResponse:
+    """ Runs the SQL listing (list_and_count_books) and builds the response. """
+    book_repo = BookRepository(db)
+
+    # Call the repository method, passing the search term
+    with timed_span("list_books"):
+        results, total_count = book_repo.list_and_count_books(
+            skip=skip,
+            limit=limit,
+            sort_by=sort_by,
+            category_id=category_id,
+            author_id=author_id,
+            min_rating=min_rating,
+            search_term=search_term # Pass search_term
+        )
+
+    # --- Process results from repository ---
+    result_books_schema = []
+    with timed_span("book_schema"):
+        for row in results:
+            # Book ORM object validated with the schema, discount price taken from the query
+            result_books_schema.append(book_schema_from_row(row))
+
+    return schemas.BookListResponse(
+        items=result_books_schema,
+        total_count=total_count
+    )
+
+
+def _load_book_list(**params) -> schemas.BookListResponse:
+    # Coalesced computations outlive the request that started them, so they use their own session
+    db = SessionLocal()
+    try:
+        return query_book_list(db, **params)
+    finally:
+        db.close()
+
 
 async def list_books(
     db: Session,
@@ -37,37 +135,178 @@ async def list_books(
     Service function to retrieve a paginated, filtered, sorted, and searched list of books.
     Delegates database operations to BookRepository.
     """
-    book_repo = BookRepository(db)
+    # One value for the snapshot check, the cache key and the SQL pattern
+    search_term = normalize_search_term(search_term)
+    # The in-memory snapshot answers filtering, sorting and counting; only the page's
+    # display rows are read from the database. Searches always use SQL.
+    if not search_term and catalog_engine.ready():
+        book_repo = BookRepository(db)
+        with timed_span("list_books_snapshot"):
+            page = catalog_engine.snapshot.query(
+                skip=skip,
+                limit=limit,
+                sort_by=sort_by,
+                category_id=category_id,
+                author_id=author_id,
+                min_rating=min_rating
+            )
+            books = book_repo.get_books_for_listing(page.book_ids)
+        discount_by_id = dict(zip(page.book_ids, page.discount_prices))
+        with timed_span("book_schema"):
+            result_books_schema = [
+                book_schema_from_row((book, discount_by_id[book.id])) for book in books
+            ]
+        return schemas.BookListResponse(items=result_books_schema, total_count=page.total_count)
 
-    # Call the repository method, passing the search term
-    results, total_count = book_repo.list_and_count_books(
+    params = dict(
         skip=skip,
         limit=limit,
         sort_by=sort_by,
         category_id=category_id,
         author_id=author_id,
         min_rating=min_rating,
-        search_term=search_term # Pass search_term
+        search_term=search_term
+    )
+    if not settings.LISTING_COALESCING_ENABLED:
+        return query_book_list(db, **params)
+    # Identical concurrent requests wait for one execution (and share its count query)
+    return await listing_cache.get(
+        listing_cache_key(**params),
+        lambda: run_in_threadpool(_load_book_list, **params)
     )
 
-    # --- Process results from repository ---
-    result_books_schema = []
-    for row in results:
-        book_orm = row[0] # Book ORM object
-        joined_discount_price = row[1] # Active discount price from query
 
-        # Validate ORM object with Pydantic schema
-        book_data = schemas.Book.model_validate(book_orm).model_dump()
-        # Assign the discount price obtained from the repository query
-        book_data['discount_price'] = joined_discount_price
-        result_books_schema.append(book_data)
+# --- Sidebar facets ---
+facets_cache = CoalescingCache(
+    "book_facets",
+    ttl=settings.FACETS_CACHE_TTL_SECONDS,
+    stale_ttl=settings.FACETS_CACHE_STALE_SECONDS,
+    max_entries=settings.LISTING_CACHE_MAX_ENTRIES,
+)
 
-    return schemas.BookListResponse(
-        items=result_books_schema,
-        total_count=total_count
+
+def facets_from_counts(by_category: dict, by_author: dict, by_rating_bucket: dict) -> schemas.BookFacets:
+    """ Builds the response; rating buckets (floor of the average) become "N stars & up" counts. """
+    return schemas.BookFacets(
+        categories=[{"id": key, "count": count} for key, count in sorted(by_category.items())],
+        authors=[{"id": key, "count": count} for key, count in sorted(by_author.items())],
+        ratings=[
+            {"min_rating": stars, "count": sum(count for bucket, count in by_rating_bucket.items() if bucket >= stars)}
+            for stars in range(5, 0, -1)
+        ],
+        total_count=sum(by_rating_bucket.values()),
+    )
+
+
+def _load_book_facets(
+    category_id: Optional[int],
+    author_id: Optional[int],
+    min_rating: Optional[int],
+    search_term: Optional[str]
+) -> schemas.BookFacets:
+    if not search_term and catalog_engine.ready():
+        with timed_span("book_facets_snapshot"):
+            counts = catalog_engine.snapshot.facet_counts(category_id, author_id, min_rating)
+        return facets_from_counts(*counts)
+
+    db = SessionLocal()
+    try:
+        with timed_span("book_facets"):
+            counts = BookRepository(db).count_facets(category_id, author_id, min_rating, search_term)
+        return facets_from_counts(*counts)
+    finally:
+        db.close()
+
+
+async def get_book_facets(
+    category_id: Optional[int],
+    author_id: Optional[int],
+    min_rating: Optional[int],
+    search_term: Optional[str] = None
+) -> schemas.BookFacets:
+    """
+    Category, author and rating counts of the books matching the /books filters.
+    Cached and coalesced per filter signature (FACETS_CACHE_* settings).
+    """
+    # One value for the cache key and the counts
+    search_term = normalize_search_term(search_term)
+    return await facets_cache.get(
+        ("facets", category_id, author_id, min_rating, search_term),
+        lambda: run_in_threadpool(_load_book_facets, category_id, author_id, min_rating, search_term)
     )
 
 
+# "Customers also bought" lists; the model itself only changes when app.jobs.copurchase runs
+related_cache = CoalescingCache(
+    "book_related",
+    ttl=settings.RELATED_CACHE_TTL_SECONDS,
+    stale_ttl=settings.RELATED_CACHE_TTL_SECONDS,
+    max_entries=settings.LISTING_CACHE_MAX_ENTRIES,
+)
+
+
+def _load_related_books(book_id: int, limit: int) -> List[schemas.Book]:
+    db = SessionLocal()
+    try:
+        # Raised rather than returned, so unknown ids are not cached
+        if not BookRepository(db).existing_ids([book_id]):
+            raise BookNotFoundError(book_id)
+        recommendation_repo = RecommendationRepository(db)
+        with timed_span("related_books"):
+            rows = list(recommendation_repo.list_related_books(book_id, limit))
+        if len(rows) < limit:
+            # Too few co-purchases yet: fill up with the same author, then the same category
+            with timed_span("related_books_fallback"):
+                rows += recommendation_repo.list_fallback_books(
+                    book_id, [row[0].id for row in rows], limit - len(rows)
+                )
+        return [schemas.Book.model_validate(book_schema_from_row(row)) for row in rows]
+    finally:
+        db.close()
+
+
+async def get_related_books(book_id: int, limit: int) -> Optional[List[schemas.Book]]:
+    """
+    Books most often bought together with book_id, topped up with same-author/category books.
+    None if the book does not exist.
+    """
+    try:
+        return await related_cache.get(
+            ("related", book_id, limit),
+            lambda: run_in_threadpool(_load_related_books, book_id, limit)
+        )
+    except BookNotFoundError:
+        return None
+
+
+async def render_book_list(
+    skip: int,
+    limit: int,
+    sort_by: Optional[str],
+    category_id: Optional[int],
+    author_id: Optional[int],
+    min_rating: Optional[int],
+    search_term: Optional[str] = None
+) -> Optional[bytes]:
+    """
+    Ready-to-send BookListResponse JSON built entirely from the shared catalog snapshot
+    (no database access), or None when the snapshot cannot answer and list_books must be used.
+    """
+    snapshot = catalog_engine.snapshot
+    if normalize_search_term(search_term) or not catalog_engine.ready() or snapshot.blobs is None:
+        return None
+    with timed_span("list_books_snapshot"):
+        page = snapshot.query(
+            skip=skip,
+            limit=limit,
+            sort_by=sort_by,
+            category_id=category_id,
+            author_id=author_id,
+            min_rating=min_rating
+        )
+        return snapshot.render_page(page)
+
+
 async def get_book_details(db: Session, book_id: int) -> Optional[schemas.Book]:
     """
     Service function to retrieve detailed information for a single book.
@@ -0,0 +1,32 @@
+# backend/app/services/cache_invalidation.py
+import logging
+from typing import Sequence
+
+from app.models import database_models
+from app.services import book_service, home_service
+from app.services.catalog_snapshot import catalog_engine
+
+logger = logging.getLogger(__name__)
+
+# Changes that can reorder or relabel many books at once
+FULL_REBUILD_ENTITIES = {"author", "category", "sales_windows", "catalog_import"}
+# Changes that can move the category/author/rating counts
+FACET_ENTITIES = {"book", "review", "author", "category", "catalog_import"}
+
+
+def apply_changes(events: Sequence[database_models.ChangeEvent]) -> None:
+    """
+    Refreshes this process's caches after a batch of change feed events: the catalog
+    snapshot (per book, or fully), listings, facets, related books and the home rails.
+    """
+    entities = {event.entity for event in events}
+    if entities & FULL_REBUILD_ENTITIES:
+        catalog_engine.request_full_rebuild()
+    else:
+        for book_id in {event.book_id for event in events if event.book_id is not None}:
+            catalog_engine.mark_book_changed(book_id)
+    book_service.listing_cache.expire()
+    book_service.related_cache.expire()
+    if entities & FACET_ENTITIES:
+        book_service.facets_cache.expire()
+    home_service.rails_cache.mark_stale()
@@ -0,0 +1,140 @@
+# backend/app/services/cart_service.py
+import datetime
+import logging
+from typing import Optional, Sequence
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.metrics import REGISTRY
+from app.db import shards
+from app.db.session import SessionLocal
+from app.models import database_models, schemas
+from app.repositories.book_repository import BookRepository
+from app.repositories.cart_repository import CartLine, CartRepository
+from app.services import pricing
+
+logger = logging.getLogger(__name__)
+
+CART_SYNCS = REGISTRY.counter("cart_syncs_total", "POST /api/cart calls received.")
+CART_FLUSHES = REGISTRY.counter(
+    "cart_flushes_total", "Buffered carts written to cart_item, by trigger (due, read, checkout).", ("reason",)
+)
+CART_SYNCS_COALESCED = REGISTRY.counter(
+    "cart_syncs_coalesced_total", "Cart syncs superseded in the buffer, i.e. cart_item rewrites avoided."
+)
+
+
+def _flushed(reason: str, updates: int) -> None:
+    CART_FLUSHES.inc(reason=reason)
+    CART_SYNCS_COALESCED.inc(updates - 1)
+
+
+def _replace_items(shard_db: Session, catalog_db: Session, carts) -> int:
+    """ Writes carts to cart_item on shard_db, keeping only books the catalog (primary) still has. """
+    repo = CartRepository(shard_db)
+    return repo.replace_items(carts, BookRepository(catalog_db).existing_ids(repo.book_ids(carts)))
+
+
+def sync_cart(db: Session, user_id: int, lines: Sequence[CartLine]) -> None:
+    """
+    Saves the user's whole cart. With CART_WRITE_BEHIND_ENABLED it only lands in the
+    cart buffer, and rapid successive syncs collapse into one cart_item rewrite.
+    """
+    CART_SYNCS.inc()
+    with shards.user_session(db, user_id, write=True) as shard_db:
+        try:
+            if settings.CART_WRITE_BEHIND_ENABLED:
+                CartRepository(shard_db).buffer(user_id, lines)
+            else:
+                _replace_items(shard_db, db, {user_id: lines})
+            shard_db.commit()
+        except Exception:
+            shard_db.rollback()
+            raise
+
+
+def flush_user(db: Session, user_id: int, reason: str, catalog_db: Optional[Session] = None) -> bool:
+    """
+    Writes the user's buffered cart to cart_item in db's transaction (no commit). db is
+    the user's shard; catalog_db the primary, when that is another session.
+    """
+    repo = CartRepository(db)
+    buffered = repo.take_buffer(user_id)
+    if buffered is None:
+        return False
+    lines, updates = buffered
+    _replace_items(db, catalog_db or db, {user_id: lines})
+    _flushed(reason, updates)
+    return True
+
+
+def get_cart(db: Session, user_id: int) -> Sequence[database_models.CartItem]:
+    """ The user's cart, including changes still in the buffer. """
+    with shards.user_session(db, user_id, write=True) as shard_db:
+        if flush_user(shard_db, user_id, "read", catalog_db=db):
+            shard_db.commit()
+        return CartRepository(shard_db).list_items(user_id)
+
+
+def flush_due(limit: Optional[int] = None) -> int:
+    """
+    Flushes buffers idle for CART_FLUSH_DELAY_SECONDS or older than
+    CART_FLUSH_MAX_DELAY_SECONDS, on every shard. Returns the number of carts written.
+    """
+    flushed = 0
+    catalog_db = SessionLocal()
+    try:
+        for factory in shards.factories_for("cart_buffer"):
+            db = factory()
+            try:
+                repo = CartRepository(db)
+                buffered = repo.take_due_buffers(
+                    settings.CART_FLUSH_DELAY_SECONDS, settings.CART_FLUSH_MAX_DELAY_SECONDS,
+                    limit or settings.CART_FLUSH_BATCH
+                )
+                _replace_items(db, catalog_db, {user_id: lines for user_id, lines, _ in buffered})
+                catalog_db.rollback()
+                db.commit()
+            except Exception:
+                db.rollback()
+                raise
+            finally:
+                db.close()
+            for _, _, updates in buffered:
+                _flushed("due", updates)
+            flushed += len(buffered)
+    finally:
+        catalog_db.close()
+    return flushed
+
+
+async def quote_carts(db: Session, request: schemas.CartQuoteRequest) -> schemas.CartQuoteResponse:
+    """ Prices every cart of the request in one pass with the engine place_order uses. """
+    today = datetime.date.today()
+    priced = pricing.price_carts(
+        db, [[(item.book_id, item.quantity) for item in cart.items] for cart in request.carts], today
+    )
+    return schemas.CartQuoteResponse(
+        carts=[
+            schemas.CartQuote(
+                items=[
+                    schemas.QuotedLine(
+                        book_id=line.book_id,
+                        quantity=line.quantity,
+                        list_price=line.list_price,
+                        unit_price=line.unit_price,
+                        line_total=line.line_total,
+                        savings=line.savings
+                    )
+                    for line in cart.lines
+                ],
+                unavailable_book_ids=cart.unavailable_ids,
+                subtotal=cart.subtotal,
+                savings=cart.savings,
+                total=cart.total
+            )
+            for cart in priced
+        ],
+        priced_on=today
+    )
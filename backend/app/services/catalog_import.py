@@ -0,0 +1,274 @@
+# backend/app/services/catalog_import.py
+import csv
+import datetime
+import json
+import logging
+import time
+from dataclasses import dataclass
+from decimal import Decimal, InvalidOperation
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, TextIO, Tuple, Union
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.metrics import REGISTRY
+from app.db.change_capture import record_changes
+from app.models import schemas
+from app.repositories.import_repository import ImportRepository
+
+logger = logging.getLogger(__name__)
+
+IMPORT_ROWS = REGISTRY.counter(
+    "catalog_import_rows_total", "Imported catalog rows by outcome (inserted, updated, unchanged, rejected).",
+    ("entity", "outcome"),
+)
+
+IMPORT_FORMATS = ("csv", "ndjson")
+
+
+# --- Field Parsers ---
+# Each takes a CSV string or a JSON value and returns the column value or raises ValueError
+
+def _blank(value: Any) -> bool:
+    return value is None or (isinstance(value, str) and not value.strip())
+
+
+def _integer(value: Any) -> int:
+    if isinstance(value, bool):
+        raise ValueError("expected an integer")
+    try:
+        parsed = value if isinstance(value, int) else int(str(value).strip())
+    except ValueError:
+        raise ValueError("expected an integer")
+    if not 0 < parsed < 2**63:
+        raise ValueError("must be a positive integer")
+    return parsed
+
+
+def _text(max_length: Optional[int] = None) -> Callable[[Any], str]:
+    def parse(value: Any) -> str:
+        if not isinstance(value, str):
+            raise ValueError("expected text")
+        value = value.strip()
+        if "\x00" in value:
+            raise ValueError("contains a NUL character")
+        if max_length is not None and len(value) > max_length:
+            raise ValueError(f"longer than {max_length} characters")
+        return value
+    return parse
+
+
+def _price(value: Any) -> Decimal:
+    # Numeric(5, 2) columns
+    if isinstance(value, bool):
+        raise ValueError("expected a decimal number")
+    try:
+        parsed = Decimal(str(value).strip())
+    except InvalidOperation:
+        raise ValueError("expected a decimal number")
+    if not parsed.is_finite() or parsed.as_tuple().exponent < -2:
+        raise ValueError("expected at most 2 decimal places")
+    if not Decimal("0") <= parsed <= Decimal("999.99"):
+        raise ValueError("must be between 0 and 999.99")
+    return parsed
+
+
+def _date(value: Any) -> datetime.date:
+    if not isinstance(value, str):
+        raise ValueError("expected an ISO date (YYYY-MM-DD)")
+    return datetime.date.fromisoformat(value.strip())
+
+
+@dataclass(frozen=True)
+class ImportField:
+    name: str
+    parse: Callable[[Any], Any]
+    required: bool = True
+
+
+@dataclass(frozen=True)
+class ImportSpec:
+    """ Columns of an importable table, and which of them reference other tables. """
+    table: str
+    fields: Tuple[ImportField, ...]
+    references: Tuple[Tuple[str, str], ...] = () # (column, referenced table)
+    check: Optional[Callable[[Dict[str, Any]], None]] = None # Cross-field validation
+
+    @property
+    def columns(self) -> List[str]:
+        return [field.name for field in self.fields]
+
+    def parse(self, record: Dict[str, Any]) -> Tuple:
+        """ Validated column values of one input record, in column order. """
+        values = {}
+        for field in self.fields:
+            raw = record.get(field.name)
+            if _blank(raw):
+                if field.required:
+                    raise ValueError(f"{field.name}: required")
+                values[field.name] = None
+                continue
+            try:
+                values[field.name] = field.parse(raw)
+            except ValueError as e:
+                raise ValueError(f"{field.name}: {e}")
+        if self.check is not None:
+            self.check(values)
+        return tuple(values[name] for name in self.columns)
+
+
+def _check_discount(values: Dict[str, Any]) -> None:
+    end = values["discount_end_date"]
+    if end is not None and end < values["discount_start_date"]:
+        raise ValueError("discount_end_date: before discount_start_date")
+
+
+IMPORT_SPECS: Dict[str, ImportSpec] = {
+    "category": ImportSpec("category", (
+        ImportField("id", _integer),
+        ImportField("category_name", _text(120)),
+        ImportField("category_desc", _text(255), required=False),
+    )),
+    "author": ImportSpec("author", (
+        ImportField("id", _integer),
+        ImportField("author_name", _text(255)),
+        ImportField("author_bio", _text(), required=False),
+    )),
+    "book": ImportSpec("book", (
+        ImportField("id", _integer),
+        ImportField("category_id", _integer),
+        ImportField("author_id", _integer),
+        ImportField("book_title", _text(255)),
+        ImportField("book_summary", _text(), required=False),
+        ImportField("book_price", _price),
+        ImportField("book_cover_photo", _text(20), required=False),
+    ), references=(("category_id", "category"), ("author_id", "author"))),
+    "discount": ImportSpec("discount", (
+        ImportField("id", _integer),
+        ImportField("book_id", _integer),
+        ImportField("discount_start_date", _date),
+        ImportField("discount_end_date", _date, required=False),
+        ImportField("discount_price", _price),
+    ), references=(("book_id", "book"),), check=_check_discount),
+}
+
+
+# (input line, record) or (input line, the reason it could not be read)
+Record = Tuple[int, Union[Dict[str, Any], ValueError]]
+
+
+def read_records(stream: TextIO, fmt: str) -> Iterator[Record]:
+    """ Streams records from CSV (with a header row) or newline-delimited JSON objects. """
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        for record in reader:
+            # Fields beyond the header are collected under None
+            if None in record:
+                yield reader.line_num, ValueError("more fields than the header")
+            else:
+                yield reader.line_num, record
+        return
+    for line, raw in enumerate(stream, start=1):
+        if not raw.strip():
+            continue
+        try:
+            record = json.loads(raw)
+        except ValueError:
+            yield line, ValueError("invalid JSON")
+            continue
+        if not isinstance(record, dict):
+            yield line, ValueError("expected a JSON object")
+        else:
+            yield line, record
+
+
+class _Report:
+    def __init__(self, entity: str):
+        self.entity = entity
+        self.rows_read = self.inserted = self.updated = self.unchanged = self.rejected = 0
+        self.rejects: List[schemas.ImportReject] = []
+        self.started = time.perf_counter()
+
+    def reject(self, line: int, error: str) -> None:
+        self.rejected += 1
+        if len(self.rejects) < settings.IMPORT_MAX_REPORTED_REJECTS:
+            self.rejects.append(schemas.ImportReject(line=line, error=error))
+
+    def result(self) -> schemas.ImportReport:
+        return schemas.ImportReport(
+            entity=self.entity,
+            rows_read=self.rows_read,
+            inserted=self.inserted,
+            updated=self.updated,
+            unchanged=self.unchanged,
+            rejected=self.rejected,
+            rejects=self.rejects,
+            seconds=round(time.perf_counter() - self.started, 3),
+        )
+
+
+def _merge_batch(db: Session, spec: ImportSpec, batch: Sequence[Tuple], report: _Report) -> None:
+    """ Stages, checks and merges one batch, then commits it. """
+    repo = ImportRepository(db)
+    repo.stage(spec.table, spec.columns, batch)
+    staged = len(batch)
+    for column, referenced in spec.references:
+        for line, value in repo.reject_missing_references(spec.table, column, referenced):
+            report.reject(line, f"{column}: {referenced} {value} does not exist")
+            staged -= 1
+    inserted, updated = repo.merge(spec.table, spec.columns)
+    if inserted:
+        repo.advance_sequence(spec.table)
+    if inserted or updated:
+        # Upserts bypass the ORM hook; one event makes every process rebuild its catalog caches
+        record_changes(db, "catalog_import", [0])
+    db.commit()
+    report.inserted += inserted
+    report.updated += updated
+    # Includes ids repeated within the batch, of which only the last line is applied
+    report.unchanged += staged - inserted - updated
+    IMPORT_ROWS.inc(inserted, entity=spec.table, outcome="inserted")
+    IMPORT_ROWS.inc(updated, entity=spec.table, outcome="updated")
+
+
+def import_records(
+    db: Session, entity: str, records: Iterable[Record], batch_rows: Optional[int] = None
+) -> schemas.ImportReport:
+    """
+    Validates and upserts records into the entity's table in batches of IMPORT_BATCH_ROWS,
+    each committed on its own (a failed import can simply be run again). Memory use
+    depends on the batch size only. Invalid rows are counted and reported, not fatal.
+    """
+    spec = IMPORT_SPECS[entity]
+    batch_rows = batch_rows or settings.IMPORT_BATCH_ROWS
+    report = _Report(entity)
+    batch: List[Tuple] = []
+    try:
+        for line, record in records:
+            report.rows_read += 1
+            if isinstance(record, ValueError):
+                report.reject(line, str(record))
+                continue
+            try:
+                batch.append((line,) + spec.parse(record))
+            except ValueError as e:
+                report.reject(line, str(e))
+                continue
+            if len(batch) >= batch_rows:
+                _merge_batch(db, spec, batch, report)
+                batch = []
+        if batch:
+            _merge_batch(db, spec, batch, report)
+    except Exception:
+        db.rollback()
+        logger.exception("Import of %s failed after %d rows", entity, report.rows_read)
+        raise
+    finally:
+        IMPORT_ROWS.inc(report.rejected, entity=entity, outcome="rejected")
+    result = report.result()
+    IMPORT_ROWS.inc(result.unchanged, entity=entity, outcome="unchanged")
+    logger.info(
+        "Imported %s: %d read, %d inserted, %d updated, %d rejected in %.1fs",
+        entity, result.rows_read, result.inserted, result.updated, result.rejected, result.seconds,
+    )
+    return result
@@ -0,0 +1,474 @@
+# backend/app/services/catalog_snapshot.py
+import asyncio
+import datetime
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.metrics import REGISTRY
+from app.db.session import SessionLocal
+from app.models import database_models, schemas
+from app.repositories.book_repository import BookRepository
+from app.services.catalog_store import Generation, SnapshotStore, next_generation
+
+try:
+    import numpy as np
+except ImportError:  # Optional dependency: without NumPy the SQL listing path is always used
+    np = None
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_BOOKS = REGISTRY.gauge("catalog_snapshot_books", "Books held in the in-memory catalog snapshot.")
+SNAPSHOT_BUILDS = REGISTRY.counter(
+    "catalog_snapshot_builds_total", "Catalog snapshot builds.", ("kind",)
+)
+SNAPSHOT_QUERIES = REGISTRY.counter(
+    "catalog_snapshot_queries_total", "Book listings answered from the snapshot.", ("sort_by",)
+)
+SNAPSHOT_GENERATION = REGISTRY.gauge(
+    "catalog_snapshot_generation", "Shared catalog snapshot generation attached by this worker."
+)
+
+# sort_by aliases of the listing (see routers/books.read_books)
+_SORT_ALIASES = {"popular": "popularity", None: "on_sale"}
+
+_NO_DISCOUNT = -1
+
+# Snapshot columns, in the order of BookRepository.iter_catalog_stats rows
+COLUMNS = (
+    "ids", "category_ids", "author_ids", "base_cents", "discount_cents", "review_counts", "average_ratings",
+    "sold_7d", "sold_30d", "sold_total",
+)
+_DTYPES = ("int64", "int64", "int64", "int64", "int64", "int64", "float64", "int64", "int64", "int64")
+
+
+def _cents(value) -> int:
+    return int(Decimal(value) * 100)
+
+
+def _price(cents: int) -> Decimal:
+    # Two decimal places, like the Numeric(5, 2) price columns
+    return Decimal(cents).scaleb(-2)
+
+
+def render_book(book: database_models.Book) -> bytes:
+    """ schemas.Book JSON without discount_price; that last field is spliced in per response. """
+    return schemas.Book.model_validate(book).model_dump_json(exclude={"discount_price"}).encode()
+
+
+def _with_discount(rendered_book: bytes, discount_price: Optional[Decimal]) -> bytes:
+    value = b"null" if discount_price is None else b'"' + str(discount_price).encode() + b'"'
+    return rendered_book[:-1] + b',"discount_price":' + value + b"}"
+
+
+@dataclass
+class CatalogPage:
+    """ One page of a listing answered from the snapshot. """
+    book_ids: List[int]
+    discount_prices: List[Optional[Decimal]]
+    total_count: int
+    rows: List[int] # Snapshot row positions of book_ids
+
+
+class CatalogSnapshot:
+    """
+    Immutable column arrays of the listing-relevant book fields, plus one precomputed
+    ordering per sort_by mode. A query is a boolean mask over the filters applied to a
+    precomputed ordering, so no sorting happens on the request path.
+    Prices are held as integer cents so comparisons and ties match the SQL path exactly.
+    """
+    def __init__(
+        self,
+        columns: Dict[str, "np.ndarray"],
+        as_of: datetime.date,
+        derived: Optional[Dict[str, "np.ndarray"]] = None,
+        blobs: Optional[dict] = None,
+    ):
+        for name in COLUMNS:
+            setattr(self, name, columns[name])
+        self.as_of = as_of # Day the active discounts were resolved for
+        # Pre-rendered JSON items when attached to a shared generation
+        self.blobs = blobs
+
+        if derived is None:
+            self.has_discount = self.discount_cents != _NO_DISCOUNT
+            self.final_cents = np.where(self.has_discount, self.discount_cents, self.base_cents)
+            self.orders = self._build_orders()
+        else:
+            # Arrays published by the builder process (memory-mapped, shared by all workers)
+            self.has_discount = derived["has_discount"]
+            self.final_cents = derived["final_cents"]
+            self.orders = {
+                name[len("order_"):]: values for name, values in derived.items() if name.startswith("order_")
+            }
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _build_orders(self) -> Dict[str, "np.ndarray"]:
+        """
+        Row-index permutations for every sort mode. Sorts are stable over id-ordered rows,
+        so ties are broken by ascending book id.
+        """
+        final = self.final_cents
+        discounted = np.flatnonzero(self.has_discount)
+        savings = self.base_cents[discounted] - self.discount_cents[discounted]
+        return {
+            # Discounted books first, then cheapest first
+            "on_sale": np.lexsort((final, ~self.has_discount)),
+            # Only discounted books, biggest saving first
+            "on_sale_home": discounted[np.argsort(-savings, kind="stable")],
+            "popularity": np.lexsort((final, -self.review_counts)),
+            "recommended": np.lexsort((final, -self.average_ratings)),
+            "price_asc": np.argsort(final, kind="stable"),
+            "price_desc": np.argsort(-final, kind="stable"),
+            "best_selling": np.lexsort((final, -self.sold_30d)),
+            "best_selling_7d": np.lexsort((final, -self.sold_7d)),
+            "best_selling_all": np.lexsort((final, -self.sold_total)),
+        }
+
+    @classmethod
+    def from_rows(cls, partitions: Iterable[list], as_of: datetime.date) -> "CatalogSnapshot":
+        """ Builds a snapshot from BookRepository.iter_catalog_stats partitions. """
+        values: List[list] = [[] for _ in COLUMNS]
+        for rows in partitions:
+            for row in rows:
+                values[0].append(row[0])
+                values[1].append(row[1])
+                values[2].append(row[2])
+                values[3].append(_cents(row[3]))
+                values[4].append(_NO_DISCOUNT if row[4] is None else _cents(row[4]))
+                values[5].append(row[5])
+                values[6].append(float(row[6]))
+                values[7].append(row[7])
+                values[8].append(row[8])
+                values[9].append(row[9])
+        return cls(
+            {name: np.asarray(column, dtype=dtype) for name, column, dtype in zip(COLUMNS, values, _DTYPES)},
+            as_of,
+        )
+
+    def arrays(self) -> Dict[str, "np.ndarray"]:
+        """ Every column and derived array, as published to the shared store. """
+        arrays = {name: getattr(self, name) for name in COLUMNS}
+        arrays["has_discount"] = self.has_discount
+        arrays["final_cents"] = self.final_cents
+        arrays.update({f"order_{mode}": order for mode, order in self.orders.items()})
+        return arrays
+
+    def with_updates(self, changed: "CatalogSnapshot", removed_ids: Iterable[int] = ()) -> "CatalogSnapshot":
+        """
+        Returns a new snapshot with the rows of `changed` upserted and `removed_ids` dropped.
+        The current snapshot keeps serving readers while the new one is built.
+        """
+        keep = ~np.isin(self.ids, np.concatenate([changed.ids, np.asarray(list(removed_ids), dtype=np.int64)]))
+        merged = {name: np.concatenate([getattr(self, name)[keep], getattr(changed, name)]) for name in COLUMNS}
+        order = np.argsort(merged["ids"], kind="stable")
+        return CatalogSnapshot({name: values[order] for name, values in merged.items()}, self.as_of)
+
+    def filter_mask(
+        self,
+        category_id: Optional[int],
+        author_id: Optional[int],
+        min_rating: Optional[int]
+    ) -> Optional["np.ndarray"]:
+        """ Boolean row mask for the listing filters, or None when nothing is filtered. """
+        mask = None
+        if category_id is not None:
+            mask = self.category_ids == category_id
+        if author_id is not None:
+            condition = self.author_ids == author_id
+            mask = condition if mask is None else mask & condition
+        if min_rating is not None:
+            condition = self.average_ratings >= min_rating
+            mask = condition if mask is None else mask & condition
+        return mask
+
+    def facet_counts(
+        self,
+        category_id: Optional[int],
+        author_id: Optional[int],
+        min_rating: Optional[int]
+    ) -> Tuple[Dict[int, int], Dict[int, int], Dict[int, int]]:
+        """ Same result as BookRepository.count_facets without a search term. """
+        mask = self.filter_mask(category_id, author_id, min_rating)
+        category_ids = self.category_ids if mask is None else self.category_ids[mask]
+        author_ids = self.author_ids if mask is None else self.author_ids[mask]
+        ratings = self.average_ratings if mask is None else self.average_ratings[mask]
+
+        by_category = dict(zip(*(values.tolist() for values in np.unique(category_ids, return_counts=True))))
+        by_author = dict(zip(*(values.tolist() for values in np.unique(author_ids, return_counts=True))))
+        buckets = np.bincount(np.clip(np.floor(ratings), 0, 5).astype(np.int64), minlength=6)
+        by_rating_bucket = {bucket: int(count) for bucket, count in enumerate(buckets.tolist()) if count}
+        return by_category, by_author, by_rating_bucket
+
+    def query(
+        self,
+        skip: int,
+        limit: int,
+        sort_by: Optional[str],
+        category_id: Optional[int],
+        author_id: Optional[int],
+        min_rating: Optional[int]
+    ) -> CatalogPage:
+        """ Same semantics as BookRepository.list_and_count_books without a search term. """
+        mode = _SORT_ALIASES.get(sort_by, sort_by)
+        if mode not in self.orders:
+            mode = "on_sale"
+        order = self.orders[mode]
+        mask = self.filter_mask(category_id, author_id, min_rating)
+
+        # The total is counted before the on_sale_home discount filter, like the SQL path
+        if mask is None:
+            total_count = len(self.ids)
+            selected = order
+        else:
+            total_count = int(np.count_nonzero(mask))
+            selected = order[mask[order]]
+
+        rows = selected[skip:skip + limit]
+        SNAPSHOT_QUERIES.inc(sort_by=mode)
+        return CatalogPage(
+            book_ids=self.ids[rows].tolist(),
+            discount_prices=[
+                None if cents == _NO_DISCOUNT else _price(cents)
+                for cents in self.discount_cents[rows].tolist()
+            ],
+            total_count=total_count,
+            rows=rows.tolist(),
+        )
+
+    def render_page(self, page: CatalogPage) -> bytes:
+        """ schemas.BookListResponse JSON for a page, built from the pre-rendered book items. """
+        books = self.blobs["books"]
+        items = b",".join(
+            _with_discount(books.get(row), discount_price)
+            for row, discount_price in zip(page.rows, page.discount_prices)
+        )
+        return b'{"items":[' + items + b'],"total_count":' + str(page.total_count).encode() + b"}"
+
+
+class CatalogEngine:
+    """
+    Owns the current CatalogSnapshot. Writes call mark_book_changed(); the refresher
+    re-reads only those books and swaps in an updated snapshot, and rebuilds everything
+    every CATALOG_SNAPSHOT_REFRESH_SECONDS or when the day (and so the active discounts) changes.
+
+    With CATALOG_ENGINE=shared the snapshot lives in CATALOG_SNAPSHOT_DIR instead: a single
+    builder process publishes generations (including pre-rendered /books, /categories and
+    /authors items) and every worker memory-maps the current one, so catalog memory per
+    host does not grow with the worker count and new workers start warm.
+    """
+    def __init__(self):
+        self.snapshot: Optional[CatalogSnapshot] = None
+        self._changed_ids: Set[int] = set()
+        self._changed_lock = threading.Lock()
+        self._built_at = 0.0
+        self._store: Optional[SnapshotStore] = None
+        self._generation: Optional[Generation] = None
+
+    @property
+    def enabled(self) -> bool:
+        return settings.CATALOG_ENGINE in ("memory", "shared") and np is not None
+
+    @property
+    def shared(self) -> bool:
+        return settings.CATALOG_ENGINE == "shared"
+
+    @property
+    def store(self) -> SnapshotStore:
+        if self._store is None:
+            self._store = SnapshotStore(settings.CATALOG_SNAPSHOT_DIR)
+            self._store.ensure_layout()
+        return self._store
+
+    def ready(self) -> bool:
+        return self.enabled and self.snapshot is not None
+
+    def mark_book_changed(self, book_id: int) -> None:
+        if not self.enabled:
+            return
+        if self.shared:
+            try:
+                self.store.mark_dirty(book_id)
+            except OSError:
+                logger.exception("Could not mark book %s changed in the shared catalog snapshot", book_id)
+            return
+        with self._changed_lock:
+            self._changed_ids.add(book_id)
+
+    def request_full_rebuild(self) -> None:
+        """ For changes that touch many books at once (e.g. sales window roll-over). """
+        if not self.enabled:
+            return
+        if self.shared:
+            try:
+                self.store.request_full_rebuild()
+            except OSError:
+                logger.exception("Could not request a shared catalog snapshot rebuild")
+            return
+        self._built_at = 0.0
+
+    def render_list(self, name: str, skip: int, limit: int) -> Optional[bytes]:
+        """ JSON array of pre-rendered categories/authors (id order), or None without a shared snapshot. """
+        snapshot = self.snapshot
+        if not self.enabled or snapshot is None or snapshot.blobs is None:
+            return None
+        items = snapshot.blobs[name]
+        start = min(max(skip, 0), len(items))
+        return items.join(range(start, min(start + max(limit, 0), len(items))))
+
+    # --- Per-process snapshot ("memory") ---
+    def rebuild(self, db: Session) -> CatalogSnapshot:
+        started = time.perf_counter()
+        with self._changed_lock:
+            self._changed_ids.clear()
+        snapshot = CatalogSnapshot.from_rows(BookRepository(db).iter_catalog_stats(), datetime.date.today())
+        self.snapshot = snapshot
+        self._built_at = time.monotonic()
+        SNAPSHOT_BUILDS.inc(kind="full")
+        SNAPSHOT_BOOKS.set(len(snapshot))
+        logger.info("Catalog snapshot built: %d books in %.2fs", len(snapshot), time.perf_counter() - started)
+        return snapshot
+
+    def apply_changes(self, db: Session) -> None:
+        """ Re-reads the books marked as changed and swaps in an updated snapshot. """
+        with self._changed_lock:
+            changed_ids, self._changed_ids = self._changed_ids, set()
+        if not changed_ids or self.snapshot is None:
+            return
+        self.snapshot = self._updated(BookRepository(db), self.snapshot, changed_ids)
+        SNAPSHOT_BUILDS.inc(kind="incremental")
+        SNAPSHOT_BOOKS.set(len(self.snapshot))
+
+    @staticmethod
+    def _updated(book_repo: BookRepository, current: CatalogSnapshot, changed_ids: Set[int]) -> CatalogSnapshot:
+        changed = CatalogSnapshot.from_rows(
+            book_repo.iter_catalog_stats(book_ids=sorted(changed_ids)), current.as_of
+        )
+        removed = changed_ids - set(changed.ids.tolist())
+        return current.with_updates(changed, removed)
+
+    def _refresh(self) -> None:
+        db = SessionLocal()
+        try:
+            snapshot = self.snapshot
+            stale = (
+                snapshot is None
+                or snapshot.as_of != datetime.date.today()
+                or time.monotonic() - self._built_at >= settings.CATALOG_SNAPSHOT_REFRESH_SECONDS
+            )
+            if stale:
+                self.rebuild(db)
+            else:
+                self.apply_changes(db)
+        finally:
+            db.close()
+
+    # --- Shared snapshot ("shared") ---
+    def _attach_current(self) -> None:
+        """ Maps the generation the builder published last, if it is not attached yet. """
+        name = self.store.current_name()
+        if name is None or (self._generation is not None and self._generation.name == name):
+            return
+        generation = self.store.attach(name)
+        # One assignment, so a request never mixes arrays and items of two generations
+        self.snapshot = CatalogSnapshot(generation.arrays, generation.as_of, derived=generation.arrays, blobs=generation.blobs)
+        self._generation = generation
+        SNAPSHOT_GENERATION.set(generation.meta["generation"])
+        SNAPSHOT_BOOKS.set(generation.meta["books"])
+        logger.info("Attached catalog snapshot %s", name)
+
+    def _publish(self, db: Session) -> None:
+        """ Builder only: publishes a full or incremental generation when one is due. """
+        generation = self._generation
+        stale = (
+            generation is None
+            or generation.as_of != datetime.date.today()
+            or time.time() - generation.meta["built_at"] >= settings.CATALOG_SNAPSHOT_REFRESH_SECONDS
+        )
+        changed_ids, full_rebuild = self.store.take_dirty()
+        stale = stale or full_rebuild
+        if not stale and not changed_ids:
+            return
+
+        started = time.perf_counter()
+        # Stats, books, categories and authors must all come from one database snapshot
+        db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+        book_repo = BookRepository(db)
+        if stale:
+            snapshot = CatalogSnapshot.from_rows(book_repo.iter_catalog_stats(), datetime.date.today())
+            book_items = (render_book(book) for books in book_repo.iter_books_for_listing() for book in books)
+        else:
+            snapshot = self._updated(book_repo, self.snapshot, changed_ids)
+            book_items = self._merged_book_items(book_repo, snapshot, changed_ids)
+
+        blobs = {
+            "books": book_items,
+            "categories": (
+                schemas.Category.model_validate(category).model_dump_json().encode()
+                for category in db.scalars(select(database_models.Category).order_by(database_models.Category.id))
+            ),
+            "authors": (
+                schemas.Author.model_validate(author).model_dump_json().encode()
+                for author in db.scalars(select(database_models.Author).order_by(database_models.Author.id))
+            ),
+        }
+        try:
+            name = self.store.publish(snapshot.arrays(), blobs, snapshot.as_of, next_generation(generation))
+        except Exception:
+            for book_id in changed_ids: # Keep the marks for the next attempt
+                self.store.mark_dirty(book_id)
+            if full_rebuild:
+                self.store.request_full_rebuild()
+            raise
+        SNAPSHOT_BUILDS.inc(kind="full" if stale else "incremental")
+        logger.info(
+            "Published catalog snapshot %s: %d books in %.2fs", name, len(snapshot), time.perf_counter() - started
+        )
+
+    def _merged_book_items(self, book_repo: BookRepository, snapshot: CatalogSnapshot, changed_ids: Set[int]):
+        """ Rendered book items for an incremental generation: changed books re-rendered, the rest copied. """
+        current = self.snapshot
+        previous_items = current.blobs["books"]
+        changed_books = {book.id: book for book in book_repo.get_books_for_listing(sorted(changed_ids))}
+        previous_rows = np.searchsorted(current.ids, snapshot.ids)
+        for book_id, previous_row in zip(snapshot.ids.tolist(), previous_rows.tolist()):
+            book = changed_books.get(book_id)
+            yield render_book(book) if book is not None else previous_items.get(previous_row)
+
+    def _refresh_shared(self) -> None:
+        self._attach_current()
+        if not self.store.try_become_builder():
+            return
+        db = SessionLocal()
+        try:
+            self._publish(db)
+        finally:
+            db.close()
+        self._attach_current()
+
+    async def run_refresher(self) -> None:
+        """ Background loop started from the application lifespan (no-op unless enabled). """
+        if not self.enabled:
+            if settings.CATALOG_ENGINE in ("memory", "shared"):
+                logger.warning("CATALOG_ENGINE=%s requires numpy; using the SQL listing path", settings.CATALOG_ENGINE)
+            return
+        refresh = self._refresh_shared if self.shared else self._refresh
+        while True:
+            try:
+                await run_in_threadpool(refresh)
+            except Exception:
+                logger.exception("Catalog snapshot refresh failed")
+            await asyncio.sleep(settings.CATALOG_SNAPSHOT_POLL_SECONDS)
+
+
+catalog_engine = CatalogEngine()
@@ -0,0 +1,211 @@
+# backend/app/services/catalog_store.py
+"""
+File-backed catalog snapshot shared by every worker process on a host.
+
+One process (whoever holds build.lock) publishes immutable generations; all workers
+memory-map the current one read-only, so the page cache holds a single copy however
+many workers run. Layout of CATALOG_SNAPSHOT_DIR:
+
+    current -> gen-<n>       symlink, replaced atomically on publish
+    gen-<n>/meta.json        generation number, as_of day, build time, book count
+    gen-<n>/<array>.npy      snapshot columns and precomputed orderings
+    gen-<n>/<blob>.bin       pre-rendered JSON items (books, categories, authors)
+    gen-<n>/<blob>.idx.npy   item offsets into <blob>.bin
+    dirty/<book_id>          books changed by any worker since the last publish
+    dirty/full               a full rebuild was requested
+    build.lock               flock held by the builder process
+"""
+import datetime
+import json
+import logging
+import mmap
+import os
+import shutil
+import time
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Non-POSIX platforms: every process builds for itself
+    fcntl = None
+
+try:
+    import numpy as np
+except ImportError:  # Only needed when CATALOG_ENGINE is memory/shared
+    np = None
+
+logger = logging.getLogger(__name__)
+
+CURRENT_LINK = "current"
+DIRTY_DIR = "dirty"
+FULL_REBUILD_MARK = "full"
+LOCK_FILE = "build.lock"
+KEEP_GENERATIONS = 3 # Older generations may still be mapped by slow workers
+
+
+class BlobColumn:
+    """ Read-only sequence of pre-rendered JSON items backed by a memory-mapped file. """
+    def __init__(self, data, offsets: "np.ndarray"):
+        self._data = data
+        self._offsets = offsets
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def get(self, index: int) -> bytes:
+        return self._data[int(self._offsets[index]):int(self._offsets[index + 1])]
+
+    def join(self, indices: Iterable[int]) -> bytes:
+        """ JSON array of the items at indices. """
+        return b"[" + b",".join(self.get(index) for index in indices) + b"]"
+
+
+class Generation:
+    """ One attached (memory-mapped) snapshot generation. """
+    def __init__(self, path: str):
+        self.path = path
+        self.name = os.path.basename(path)
+        with open(os.path.join(path, "meta.json")) as f:
+            self.meta = json.load(f)
+        self.as_of = datetime.date.fromisoformat(self.meta["as_of"])
+        self.arrays: Dict[str, "np.ndarray"] = {
+            name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r")
+            for name in self.meta["arrays"]
+        }
+        self.blobs: Dict[str, BlobColumn] = {name: self._map_blob(name) for name in self.meta["blobs"]}
+
+    def _map_blob(self, name: str) -> BlobColumn:
+        offsets = np.load(os.path.join(self.path, f"{name}.idx.npy"), mmap_mode="r")
+        with open(os.path.join(self.path, f"{name}.bin"), "rb") as f:
+            # mmap cannot map empty files; the mapping outlives the descriptor
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if offsets[-1] else b""
+        return BlobColumn(data, offsets)
+
+
+class SnapshotStore:
+    """ Publishing, attaching and change marking for one snapshot directory. """
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._lock_file = None
+
+    def _path(self, *parts: str) -> str:
+        return os.path.join(self.directory, *parts)
+
+    def ensure_layout(self) -> None:
+        os.makedirs(self._path(DIRTY_DIR), exist_ok=True)
+
+    # --- Builder election ---
+    def try_become_builder(self) -> bool:
+        """ Non-blocking; the lock is kept until the process exits, then another worker takes over. """
+        if self._lock_file is not None:
+            return True
+        if fcntl is None:
+            return True
+        lock_file = open(self._path(LOCK_FILE), "a")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            lock_file.close()
+            return False
+        self._lock_file = lock_file
+        logger.info("Process %d is the catalog snapshot builder", os.getpid())
+        return True
+
+    # --- Change marks (any worker) ---
+    def mark_dirty(self, book_id: int) -> None:
+        open(self._path(DIRTY_DIR, str(book_id)), "a").close()
+
+    def request_full_rebuild(self) -> None:
+        open(self._path(DIRTY_DIR, FULL_REBUILD_MARK), "a").close()
+
+    def take_dirty(self) -> Tuple[Set[int], bool]:
+        """
+        Removes and returns the pending marks as (book ids, full rebuild requested);
+        marks added meanwhile stay for the next call.
+        """
+        book_ids = set()
+        full_rebuild = False
+        for name in os.listdir(self._path(DIRTY_DIR)):
+            try:
+                os.unlink(self._path(DIRTY_DIR, name))
+            except FileNotFoundError:
+                continue
+            if name.isdigit():
+                book_ids.add(int(name))
+            elif name == FULL_REBUILD_MARK:
+                full_rebuild = True
+        return book_ids, full_rebuild
+
+    # --- Generations ---
+    def current_name(self) -> Optional[str]:
+        try:
+            return os.readlink(self._path(CURRENT_LINK))
+        except FileNotFoundError:
+            return None
+
+    def attach(self, name: str) -> Generation:
+        return Generation(self._path(name))
+
+    def publish(
+        self,
+        arrays: Dict[str, "np.ndarray"],
+        blobs: Dict[str, Iterable[bytes]],
+        as_of: datetime.date,
+        generation: int,
+    ) -> str:
+        """ Writes a complete generation next to the current one and swaps the link to it. """
+        name = f"gen-{generation}"
+        staging = self._path(f"{name}.tmp-{os.getpid()}")
+        os.makedirs(staging)
+        try:
+            for array_name, values in arrays.items():
+                np.save(os.path.join(staging, f"{array_name}.npy"), np.ascontiguousarray(values))
+            for blob_name, items in blobs.items():
+                self._write_blob(staging, blob_name, items)
+            with open(os.path.join(staging, "meta.json"), "w") as f:
+                json.dump({
+                    "generation": generation,
+                    "as_of": as_of.isoformat(),
+                    "built_at": time.time(),
+                    "books": int(len(arrays["ids"])),
+                    "arrays": sorted(arrays),
+                    "blobs": sorted(blobs),
+                }, f)
+            if os.path.exists(self._path(name)):
+                shutil.rmtree(self._path(name)) # Left behind by an interrupted publish
+            os.rename(staging, self._path(name))
+        except BaseException:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+
+        link = self._path(f"{CURRENT_LINK}.tmp-{os.getpid()}")
+        if os.path.lexists(link):
+            os.unlink(link)
+        os.symlink(name, link)
+        os.replace(link, self._path(CURRENT_LINK)) # Atomic swap for every reader
+        self._prune(keep=name)
+        return name
+
+    @staticmethod
+    def _write_blob(directory: str, name: str, items: Iterable[bytes]) -> None:
+        offsets = [0]
+        with open(os.path.join(directory, f"{name}.bin"), "wb") as f:
+            for item in items:
+                f.write(item)
+                offsets.append(offsets[-1] + len(item))
+        np.save(os.path.join(directory, f"{name}.idx.npy"), np.asarray(offsets, dtype=np.int64))
+
+    def _prune(self, keep: str) -> None:
+        generations = sorted(
+            (entry for entry in os.listdir(self.directory) if entry.startswith("gen-") and ".tmp-" not in entry),
+            key=lambda entry: int(entry.split("-", 1)[1]),
+        )
+        # Unlinking is safe for workers that still map an old generation
+        for entry in generations[:-KEEP_GENERATIONS]:
+            if entry != keep:
+                shutil.rmtree(self._path(entry), ignore_errors=True)
+
+
+def next_generation(current: Optional[Generation]) -> int:
+    return 1 if current is None else int(current.meta["generation"]) + 1
+
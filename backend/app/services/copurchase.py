@@ -0,0 +1,118 @@
+# backend/app/services/copurchase.py
+"""
+Item-to-item co-purchase model, computed with NumPy over (order_id, book_id) arrays.
+
+Pairs are counted as a sparse matrix in COO form: each directed pair (a, b) is encoded
+as one int64 key a * width + b and duplicates are summed with np.unique, so no Python
+loop runs per order or per pair. Orders are grouped by their number of distinct books
+and all pairs of a group are produced with one fancy-indexing step.
+"""
+from typing import Iterable, Optional, Tuple
+
+import numpy as np
+
+# (book_ids, related_book_ids, orders_together), one entry per directed pair
+PairCounts = Tuple[np.ndarray, np.ndarray, np.ndarray]
+
+
+def _empty() -> PairCounts:
+    return np.empty(0, np.int64), np.empty(0, np.int64), np.empty(0, np.int64)
+
+
+def count_pairs(order_ids: np.ndarray, book_ids: np.ndarray, max_items: int) -> PairCounts:
+    """
+    Counts, for every ordered pair of distinct books, the orders containing both.
+    Repeated (order, book) rows count once; orders with more than max_items distinct
+    books are skipped (bulk purchases say little about what goes together).
+    """
+    if len(order_ids) == 0:
+        return _empty()
+    order_ids = np.asarray(order_ids, dtype=np.int64)
+    book_ids = np.asarray(book_ids, dtype=np.int64)
+
+    order = np.lexsort((book_ids, order_ids))
+    order_ids, book_ids = order_ids[order], book_ids[order]
+    distinct = np.ones(len(order_ids), dtype=bool)
+    distinct[1:] = (order_ids[1:] != order_ids[:-1]) | (book_ids[1:] != book_ids[:-1])
+    order_ids, book_ids = order_ids[distinct], book_ids[distinct]
+
+    _, starts, sizes = np.unique(order_ids, return_index=True, return_counts=True)
+    firsts, seconds = [], []
+    for size in np.unique(sizes):
+        if size < 2 or size > max_items:
+            continue
+        # (orders of this size, size) matrix of book ids, one row per order
+        positions = starts[sizes == size][:, None] + np.arange(size)
+        books = book_ids[positions]
+        upper_first, upper_second = np.triu_indices(size, 1)
+        firsts.append(books[:, upper_first].ravel())
+        seconds.append(books[:, upper_second].ravel())
+    if not firsts:
+        return _empty()
+
+    first, second = np.concatenate(firsts), np.concatenate(seconds)
+    # Both directions, so every book sees all of its neighbours
+    first, second = np.concatenate((first, second)), np.concatenate((second, first))
+    return _sum_pairs(first, second, np.ones(len(first), dtype=np.int64))
+
+
+def _sum_pairs(first: np.ndarray, second: np.ndarray, counts: np.ndarray) -> PairCounts:
+    width = int(second.max()) + 1
+    keys, inverse = np.unique(first * width + second, return_inverse=True)
+    totals = np.bincount(inverse.ravel(), weights=counts, minlength=len(keys)).astype(np.int64)
+    return keys // width, keys % width, totals
+
+
+def merge_pairs(parts: Iterable[PairCounts]) -> PairCounts:
+    """ Sums pair counts computed over separate chunks of orders. """
+    parts = [part for part in parts if len(part[0])]
+    if not parts:
+        return _empty()
+    if len(parts) == 1:
+        return parts[0]
+    return _sum_pairs(*(np.concatenate(column) for column in zip(*parts)))
+
+
+class PairAccumulator:
+    """
+    Sums pair counts over a stream of order chunks, merging once the pending chunks
+    hold more than merge_every pairs so memory stays close to the number of distinct pairs.
+    """
+    def __init__(self, merge_every: int = 5_000_000):
+        self.merge_every = merge_every
+        self._merged: Optional[PairCounts] = None
+        self._pending = []
+        self._pending_size = 0
+
+    def add(self, pairs: PairCounts) -> None:
+        self._pending.append(pairs)
+        self._pending_size += len(pairs[0])
+        if self._pending_size > self.merge_every:
+            self._merge()
+
+    def result(self) -> PairCounts:
+        self._merge()
+        return self._merged if self._merged is not None else _empty()
+
+    def _merge(self) -> None:
+        parts = ([self._merged] if self._merged is not None else []) + self._pending
+        self._merged = merge_pairs(parts)
+        self._pending, self._pending_size = [], 0
+
+
+def top_k(pairs: PairCounts, k: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Keeps the k most co-purchased neighbours of every book, ties broken by the lower
+    related id. Returns (book_ids, ranks starting at 1, related_book_ids, orders_together).
+    """
+    first, second, counts = pairs
+    if len(first) == 0:
+        return first, np.empty(0, np.int64), second, counts
+    order = np.lexsort((second, -counts, first))
+    first, second, counts = first[order], second[order], counts[order]
+    group_start = np.ones(len(first), dtype=bool)
+    group_start[1:] = first[1:] != first[:-1]
+    start_positions = np.flatnonzero(group_start)
+    ranks = np.arange(len(first)) - np.repeat(start_positions, np.diff(np.append(start_positions, len(first)))) + 1
+    keep = ranks <= k
+    return first[keep], ranks[keep], second[keep], counts[keep]
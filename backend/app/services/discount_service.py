@@ -0,0 +1,67 @@
+# backend/app/services/discount_service.py
+import datetime
+import logging
+
+from sqlalchemy.orm import Session
+
+from app.core.exceptions import DiscountConflictError
+from app.db.change_capture import record_changes
+from app.models import schemas
+from app.repositories.discount_repository import DiscountRepository
+
+logger = logging.getLogger(__name__)
+
+# Overlapping discounts listed in a campaign response or error
+MAX_REPORTED_CONFLICTS = 100
+
+
+def _record(db: Session, rows, kind: str) -> None:
+    # Set-based writes bypass the ORM change capture hook
+    if rows:
+        record_changes(db, "discount", [row[0] for row in rows], kind, [row[1] for row in rows])
+
+
+async def create_campaign(db: Session, campaign: schemas.DiscountCampaignCreate) -> schemas.DiscountCampaignResult:
+    """
+    Gives every selected book a discount of percent_off over the campaign window.
+    Books that already have a discount overlapping it fail the whole campaign
+    (DiscountConflictError), or are left out with skip_conflicts.
+    """
+    repo = DiscountRepository(db)
+    try:
+        repo.lock()
+        conflict_count, overlapping = repo.find_overlaps(
+            campaign, campaign.discount_start_date, campaign.discount_end_date, MAX_REPORTED_CONFLICTS
+        )
+        conflicts = [
+            schemas.DiscountConflict(book_id=book_id, discount_id=discount_id, discount_start_date=start, discount_end_date=end)
+            for book_id, discount_id, start, end in overlapping
+        ]
+        if conflict_count and not campaign.skip_conflicts:
+            raise DiscountConflictError(conflict_count, conflicts)
+        created = repo.create_campaign(
+            campaign, campaign.percent_off, campaign.discount_start_date, campaign.discount_end_date
+        )
+        _record(db, created, "insert")
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    logger.info("Discount campaign created %d discounts, skipped %d books", len(created), conflict_count)
+    return schemas.DiscountCampaignResult(created=len(created), skipped=conflict_count, conflicts=conflicts)
+
+
+async def end_discounts(db: Session, request: schemas.DiscountEnd) -> schemas.DiscountEndResult:
+    """ Ends the selected books' discounts after last_day (default: yesterday, i.e. now). """
+    last_day = request.last_day or datetime.date.today() - datetime.timedelta(days=1)
+    repo = DiscountRepository(db)
+    try:
+        repo.lock()
+        ended, cancelled = repo.end_discounts(request, last_day)
+        _record(db, ended, "update")
+        _record(db, cancelled, "delete")
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return schemas.DiscountEndResult(ended=len(ended), cancelled=len(cancelled))
@@ -0,0 +1,128 @@
+# backend/app/services/home_service.py
+import asyncio
+import datetime
+import logging
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models import schemas
+from app.repositories.book_repository import BookRepository
+from app.services.book_service import book_schema_from_row
+
+logger = logging.getLogger(__name__)
+
+# Rail name -> (sort_by mode of the book listing, number of books)
+RAILS: Dict[str, Tuple[str, int]] = {
+    "on_sale": ("on_sale_home", 10),
+    "popular": ("popularity", 8),
+    "recommended": ("recommended", 8),
+    "best_selling": ("best_selling", 8),
+}
+
+
+def _render(rails: Dict[str, List[dict]], category_id: Optional[int], generated_at: datetime.datetime) -> bytes:
+    return schemas.HomeRails(
+        **rails, category_id=category_id, generated_at=generated_at
+    ).model_dump_json().encode()
+
+
+class HomeRailsCache:
+    """
+    Precomputed home page rails (global and per category), kept as ready-to-send JSON.
+    Rebuilt in the background every HOME_RAILS_REFRESH_SECONDS, and shortly after
+    mark_stale() is called by writes that affect the rankings.
+    """
+    def __init__(self):
+        # (global rails, rails per category id), swapped as a whole after each rebuild
+        self._rendered: Optional[Tuple[bytes, Dict[int, bytes]]] = None
+        self._generated_at: Optional[datetime.datetime] = None
+        self._stale = True
+        self._built_at = 0.0
+        self._rebuild_lock = threading.Lock()
+
+    def mark_stale(self) -> None:
+        """ Requests a rebuild on the next refresher poll. """
+        self._stale = True
+
+    def get(self, category_id: Optional[int] = None) -> Optional[bytes]:
+        """ Rendered rails, or None until the first build has finished. """
+        rendered = self._rendered
+        if rendered is None:
+            return None
+        global_rails, by_category = rendered
+        if category_id is None:
+            return global_rails
+        # Categories without books get empty rails
+        return by_category.get(category_id) or _render({}, category_id, self._generated_at)
+
+    def rebuild(self, db: Session) -> None:
+        """ Recomputes every rail: one listing query per rail plus one per-category ranking query. """
+        book_repo = BookRepository(db)
+        generated_at = datetime.datetime.now()
+        global_rails: Dict[str, List[dict]] = {}
+        category_rails: Dict[int, Dict[str, List[dict]]] = {}
+
+        for rail, (sort_by, size) in RAILS.items():
+            results, _ = book_repo.list_and_count_books(
+                skip=0, limit=size, sort_by=sort_by,
+                category_id=None, author_id=None, min_rating=None
+            )
+            global_rails[rail] = [book_schema_from_row(row) for row in results]
+            for row in book_repo.list_top_books_per_category(sort_by=sort_by, per_category=size):
+                rails = category_rails.setdefault(row[0].category_id, {name: [] for name in RAILS})
+                rails[rail].append(book_schema_from_row(row))
+
+        self._rendered = (
+            _render(global_rails, None, generated_at),
+            {category_id: _render(rails, category_id, generated_at) for category_id, rails in category_rails.items()},
+        )
+        self._generated_at = generated_at
+        self._built_at = time.monotonic()
+
+    def rebuild_now(self) -> None:
+        """ Rebuilds with a dedicated session; concurrent callers wait for the running build. """
+        built_before = self._built_at
+        with self._rebuild_lock:
+            if self._built_at != built_before and not self._stale:
+                return # Another caller finished a build while we waited
+            self._stale = False
+            db = SessionLocal()
+            try:
+                self.rebuild(db)
+            except Exception:
+                self._stale = True
+                raise
+            finally:
+                db.close()
+
+    async def run_refresher(self) -> None:
+        """ Background loop started from the application lifespan. """
+        while True:
+            due = self._stale or time.monotonic() - self._built_at >= settings.HOME_RAILS_REFRESH_SECONDS
+            if due:
+                try:
+                    await run_in_threadpool(self.rebuild_now)
+                except Exception:
+                    logger.exception("Home rails refresh failed")
+            await asyncio.sleep(settings.HOME_RAILS_POLL_SECONDS)
+
+
+rails_cache = HomeRailsCache()
+
+
+async def get_home_rails(category_id: Optional[int] = None) -> bytes:
+    """
+    Service function returning the rendered rails. Only the very first request after
+    startup (before the refresher's first build) computes them inline.
+    """
+    rendered = rails_cache.get(category_id)
+    if rendered is None:
+        await run_in_threadpool(rails_cache.rebuild_now)
+        rendered = rails_cache.get(category_id)
+    return rendered
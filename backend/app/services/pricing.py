@@ -0,0 +1,74 @@
+# backend/app/services/pricing.py
+import datetime
+from dataclasses import dataclass, field
+from decimal import Decimal
+from typing import List, Optional, Sequence, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.repositories.book_repository import BookRepository
+
+# (book_id, quantity)
+Line = Tuple[int, int]
+
+
+@dataclass(frozen=True)
+class PricedLine:
+    book_id: int
+    quantity: int
+    list_price: Decimal
+    unit_price: Decimal # Active discount price, else the list price
+
+    @property
+    def line_total(self) -> Decimal:
+        return self.unit_price * self.quantity
+
+    @property
+    def savings(self) -> Decimal:
+        return (self.list_price - self.unit_price) * self.quantity
+
+
+@dataclass
+class PricedCart:
+    lines: List[PricedLine] = field(default_factory=list)
+    unavailable_ids: List[int] = field(default_factory=list) # Books that do not exist
+
+    @property
+    def subtotal(self) -> Decimal:
+        """ At list prices. """
+        return sum((line.list_price * line.quantity for line in self.lines), Decimal("0.00"))
+
+    @property
+    def savings(self) -> Decimal:
+        return sum((line.savings for line in self.lines), Decimal("0.00"))
+
+    @property
+    def total(self) -> Decimal:
+        return sum((line.line_total for line in self.lines), Decimal("0.00"))
+
+
+def price_carts(db: Session, carts: Sequence[Sequence[Line]], today: Optional[datetime.date] = None) -> List[PricedCart]:
+    """
+    Prices any number of carts with a single query for all their books. Used by both
+    the cart quote and place_order, so a preview and the order it leads to agree.
+    """
+    today = today or datetime.date.today()
+    book_ids = sorted({book_id for cart in carts for book_id, _ in cart})
+    prices = BookRepository(db).get_prices(book_ids, today)
+    priced = []
+    for cart in carts:
+        priced_cart = PricedCart()
+        for book_id, quantity in cart:
+            price = prices.get(book_id)
+            if price is None:
+                priced_cart.unavailable_ids.append(book_id)
+                continue
+            list_price, discount_price = price
+            priced_cart.lines.append(PricedLine(
+                book_id=book_id,
+                quantity=quantity,
+                list_price=list_price,
+                unit_price=discount_price if discount_price is not None else list_price,
+            ))
+        priced.append(priced_cart)
+    return priced
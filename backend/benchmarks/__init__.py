@@ -0,0 +1,22 @@
+# backend/benchmarks/__init__.py
+"""
+Synthetic data and load-test tooling for the Bookworm API.
+
+Run from the backend/ directory against a local database and server:
+
+    alembic upgrade head                                    # create the schema
+    python -m benchmarks.seed --scale small --truncate      # fill a local database
+    uvicorn app.main:app --port 8000 --workers 4            # start the API
+    python -m benchmarks.run --base-url http://localhost:8000 --concurrency 16
+    python -m benchmarks.run ... --save-baseline            # store the result as the new baseline
+
+Baselines live in benchmarks/baselines/<name>.json and each run is compared against
+the matching baseline; a run that regresses beyond the tolerance exits non-zero.
+benchmarks.explain captures EXPLAIN plans of the same query shapes (see its docstring),
+benchmarks.catalog_engine compares the SQL and in-memory /books listing engines,
+benchmarks.statement_cache measures CPU saved by the cached listing statements,
+benchmarks.worker_memory reports per-worker memory of a running server,
+benchmarks.copurchase times the co-purchase model build,
+benchmarks.catalog_import measures bulk import throughput and
+benchmarks.partitioning compares order/review query latency as history grows.
+"""
@@ -0,0 +1,107 @@
+# backend/benchmarks/catalog_engine.py
+"""
+Compares the two /books listing engines in-process against the same database:
+the SQL path (BookRepository.list_and_count_books) and the in-memory NumPy snapshot
+(CatalogSnapshot.query plus BookRepository.get_books_for_listing).
+
+    python -m benchmarks.catalog_engine --iterations 200
+
+For every query shape it reports p50/p95 latency of both engines and checks that the
+total counts and the page's sort keys agree (ties may be ordered differently by SQL).
+"""
+import argparse
+import datetime
+import random
+import time
+from typing import Any, Dict, List, Sequence
+
+from app.db.session import SessionLocal
+from app.repositories.book_repository import BookRepository
+from app.services.catalog_snapshot import CatalogSnapshot, np
+from benchmarks.run import BOOK_SORT_MODES, _percentile
+
+
+def _shapes(snapshot: CatalogSnapshot, rng: random.Random) -> Dict[str, Dict[str, Any]]:
+    categories = np.unique(snapshot.category_ids).tolist() or [1]
+    authors = np.unique(snapshot.author_ids).tolist() or [1]
+    base = {"skip": 0, "limit": 25, "sort_by": "on_sale", "category_id": None, "author_id": None, "min_rating": None}
+    shapes = {f"sort_{mode}": dict(base, sort_by=mode) for mode in BOOK_SORT_MODES}
+    shapes.update({
+        "sort_popularity_page_5": dict(base, sort_by="popularity", skip=100),
+        "filter_category": dict(base, category_id=rng.choice(categories)),
+        "filter_author": dict(base, author_id=rng.choice(authors)),
+        "filter_rating": dict(base, sort_by="recommended", min_rating=4),
+    })
+    return shapes
+
+
+def _page_keys(snapshot: CatalogSnapshot, sort_by: str, book_ids: List[int]) -> List[Any]:
+    """ The values a page is ordered by, to compare engines independently of tie order. """
+    rows = np.searchsorted(snapshot.ids, book_ids)
+    if sort_by in ("popularity", "popular"):
+        return list(zip(snapshot.review_counts[rows].tolist(), snapshot.final_cents[rows].tolist()))
+    if sort_by == "recommended":
+        return list(zip(snapshot.average_ratings[rows].round(6).tolist(), snapshot.final_cents[rows].tolist()))
+    if sort_by.startswith("best_selling"):
+        sold = {"best_selling": snapshot.sold_30d, "best_selling_7d": snapshot.sold_7d}.get(sort_by, snapshot.sold_total)
+        return list(zip(sold[rows].tolist(), snapshot.final_cents[rows].tolist()))
+    if sort_by == "on_sale_home":
+        return (snapshot.base_cents[rows] - snapshot.discount_cents[rows]).tolist()
+    return snapshot.final_cents[rows].tolist()
+
+
+def _timed(fn, iterations: int) -> List[float]:
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return sorted(samples)
+
+
+def main(argv: Sequence[str] = None) -> None:
+    parser = argparse.ArgumentParser(description="Compare the SQL and in-memory /books listing engines.")
+    parser.add_argument("--iterations", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    if np is None:
+        raise SystemExit("numpy is required for the in-memory catalog engine")
+
+    db = SessionLocal()
+    try:
+        book_repo = BookRepository(db)
+        started = time.perf_counter()
+        snapshot = CatalogSnapshot.from_rows(book_repo.iter_catalog_stats(), datetime.date.today())
+        print(f"snapshot: {len(snapshot)} books built in {time.perf_counter() - started:.2f}s")
+
+        print(f"{'shape':<28} {'sql p50':>9} {'sql p95':>9} {'mem p50':>9} {'mem p95':>9}  match")
+        for name, params in _shapes(snapshot, random.Random(args.seed)).items():
+            def run_sql():
+                return book_repo.list_and_count_books(**params)
+
+            def run_memory():
+                page = snapshot.query(**params)
+                return page, book_repo.get_books_for_listing(page.book_ids)
+
+            sql_results, sql_total = run_sql()
+            page, _ = run_memory()
+            match = (
+                sql_total == page.total_count
+                and _page_keys(snapshot, params["sort_by"], [row[0].id for row in sql_results])
+                == _page_keys(snapshot, params["sort_by"], page.book_ids)
+            )
+
+            sql_ms = _timed(run_sql, args.iterations)
+            memory_ms = _timed(run_memory, args.iterations)
+            print(
+                f"{name:<28} {_percentile(sql_ms, 50):>9.2f} {_percentile(sql_ms, 95):>9.2f}"
+                f" {_percentile(memory_ms, 50):>9.2f} {_percentile(memory_ms, 95):>9.2f}  {'ok' if match else 'MISMATCH'}"
+            )
+            db.rollback()
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
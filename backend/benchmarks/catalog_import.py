@@ -0,0 +1,89 @@
+# backend/benchmarks/catalog_import.py
+"""
+Throughput of the bulk catalog import (app.services.catalog_import).
+
+    python -m benchmarks.catalog_import --rows 1000000               # parsing and validation only
+    python -m benchmarks.catalog_import --rows 1000000 --database    # full import into the seeded DB
+    python -m benchmarks.catalog_import ... --database --update      # re-import existing ids (updates)
+
+Generates a books feed shaped like a supplier file and streams it through the same
+reader, validation and batching as the CLI. Without --database only the Python side
+is timed; with it, rows are COPY'd, checked and merged into the database. New books
+reference the seeded categories and authors. The target is 100k+ rows/s locally.
+"""
+import argparse
+import json
+import random
+import time
+from typing import Iterator, Sequence
+
+from sqlalchemy import func, select
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models import database_models
+from app.services.catalog_import import IMPORT_FORMATS, IMPORT_SPECS, import_records, read_records
+
+_WORDS = "shadow river night garden silent empire glass winter secret city storm ocean iron paper crown".split()
+
+
+def _feed(fmt: str, rows: int, first_id: int, categories: int, authors: int, seed: int) -> Iterator[str]:
+    """ Lines of a synthetic books file, generated lazily. """
+    rng = random.Random(seed)
+    columns = IMPORT_SPECS["book"].columns
+    if fmt == "csv":
+        yield ",".join(columns) + "\n"
+    for book_id in range(first_id, first_id + rows):
+        row = [
+            book_id, rng.randint(1, categories), rng.randint(1, authors),
+            " ".join(rng.choice(_WORDS) for _ in range(3)).title(), "Imported summary",
+            f"{rng.randint(199, 9999) / 100:.2f}", f"book{book_id % 10}",
+        ]
+        if fmt == "csv":
+            yield ",".join(str(value) for value in row) + "\n"
+        else:
+            yield json.dumps(dict(zip(columns, row))) + "\n"
+
+
+def main(argv: Sequence[str] = None) -> None:
+    parser = argparse.ArgumentParser(description="Bulk catalog import throughput.")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--format", choices=IMPORT_FORMATS, default="csv")
+    parser.add_argument("--batch-rows", type=int, default=settings.IMPORT_BATCH_ROWS)
+    parser.add_argument("--database", action="store_true", help="Import into the database")
+    parser.add_argument("--update", action="store_true", help="Use existing book ids 1..rows instead of new ones")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    db = SessionLocal()
+    try:
+        if args.database:
+            categories = db.scalar(select(func.max(database_models.Category.id))) or 1
+            authors = db.scalar(select(func.max(database_models.Author.id))) or 1
+            last_book = db.scalar(select(func.max(database_models.Book.id))) or 0
+            db.rollback()
+        else:
+            categories, authors, last_book = 1_000, 100_000, 0
+        first_id = 1 if args.update else last_book + 1
+        lines = _feed(args.format, args.rows, first_id, categories, authors, args.seed)
+
+        started = time.perf_counter()
+        if args.database:
+            report = import_records(db, "book", read_records(lines, args.format), args.batch_rows)
+            print(
+                f"inserted {report.inserted:,}, updated {report.updated:,}, "
+                f"unchanged {report.unchanged:,}, rejected {report.rejected:,}"
+            )
+        else:
+            spec = IMPORT_SPECS["book"]
+            for line, record in read_records(lines, args.format):
+                spec.parse(record)
+        elapsed = time.perf_counter() - started
+    finally:
+        db.close()
+    mode = "import (db)" if args.database else "parse only"
+    print(f"{mode:<12} {args.rows:>12,} rows in {elapsed:7.1f}s ({args.rows / max(elapsed, 1e-9):,.0f} rows/s)")
+
+
+if __name__ == "__main__":
+    main()
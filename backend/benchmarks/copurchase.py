@@ -0,0 +1,79 @@
+# backend/benchmarks/copurchase.py
+"""
+Build time of the co-purchase model (app.services.copurchase).
+
+    python -m benchmarks.copurchase --orders 1000000 --books 1000000
+    python -m benchmarks.copurchase --database       # full app.jobs.copurchase build against the seeded DB
+
+The in-memory mode generates order items with the same shape as benchmarks.seed
+(1-4 distinct books per order, half of them Pareto-skewed towards popular books) and
+times pair counting, merging across chunks and top-K selection separately, so the
+cost of the model is measured without database I/O. --database times the whole job.
+"""
+import argparse
+import time
+from typing import Sequence, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.services import copurchase
+
+
+def _synthetic_orders(orders: int, books: int, seed: int) -> Tuple[np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    sizes = rng.integers(1, 5, size=orders)
+    order_ids = np.repeat(np.arange(1, orders + 1, dtype=np.int64), sizes)
+    skewed = np.minimum(rng.pareto(1.2, size=len(order_ids)).astype(np.int64), books - 1)
+    uniform = rng.integers(0, books, size=len(order_ids))
+    book_ids = np.where(rng.random(len(order_ids)) < 0.5, skewed, uniform) + 1
+    return order_ids, book_ids
+
+
+def _time(label: str, started: float) -> float:
+    elapsed = time.perf_counter() - started
+    print(f"{label:<14} {elapsed:8.2f}s")
+    return elapsed
+
+
+def main(argv: Sequence[str] = None) -> None:
+    parser = argparse.ArgumentParser(description="Co-purchase model build time.")
+    parser.add_argument("--orders", type=int, default=1_000_000)
+    parser.add_argument("--books", type=int, default=1_000_000)
+    parser.add_argument("--chunk", type=int, default=100_000, help="Orders per chunk, as in the job")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--database", action="store_true", help="Run the full build job against the database")
+    args = parser.parse_args(argv)
+
+    if args.database:
+        from app.jobs import copurchase as copurchase_job
+        started = time.perf_counter()
+        books = copurchase_job.build()
+        _time("build (db)", started)
+        print(f"{books:,} books with neighbours")
+        return
+
+    started = time.perf_counter()
+    order_ids, book_ids = _synthetic_orders(args.orders, args.books, args.seed)
+    _time("generate", started)
+    print(f"{args.orders:,} orders, {len(order_ids):,} items, {args.books:,} books")
+
+    total = 0.0
+    started = time.perf_counter()
+    accumulator = copurchase.PairAccumulator()
+    bounds = np.searchsorted(order_ids, np.arange(0, args.orders + args.chunk, args.chunk), side="right")
+    for low, high in zip(bounds[:-1], bounds[1:]):
+        accumulator.add(copurchase.count_pairs(order_ids[low:high], book_ids[low:high], settings.COPURCHASE_MAX_ORDER_ITEMS))
+    total += _time("count pairs", started)
+    started = time.perf_counter()
+    pairs = accumulator.result()
+    total += _time("merge", started)
+    started = time.perf_counter()
+    top = copurchase.top_k(pairs, settings.COPURCHASE_TOP_K)
+    total += _time("top-k", started)
+    print(f"{'total':<14} {total:8.2f}s")
+    print(f"{len(pairs[0]):,} directed pairs, {len(top[0]):,} neighbours for {len(np.unique(top[0])):,} books")
+
+
+if __name__ == "__main__":
+    main()
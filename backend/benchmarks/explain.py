@@ -0,0 +1,113 @@
+# backend/benchmarks/explain.py
+"""
+Captures EXPLAIN (ANALYZE, BUFFERS) plans for the application's hot query shapes, so
+index changes can be compared before and after a migration:
+
+    python -m benchmarks.explain --label before
+    alembic upgrade head
+    python -m benchmarks.explain --label after
+    diff -r benchmarks/results/explain-before benchmarks/results/explain-after
+
+The statements are built by the repositories themselves, so the plans always match
+what the endpoints execute.
+"""
+import argparse
+import datetime
+import os
+from typing import Callable, Dict, List, Sequence, Tuple
+
+from sqlalchemy import desc, select
+from sqlalchemy.orm import Session, joinedload
+
+from app.db.session import SessionLocal
+from app.models import database_models
+from app.repositories.book_repository import BookRepository
+from app.repositories.order_repository import OrderRepository
+from benchmarks.run import BOOK_SORT_MODES, RESULTS_DIR
+
+
+def _listing(db: Session, **filters) -> List[Tuple[str, object]]:
+    count_query, page_query = BookRepository(db).build_listing_queries(
+        skip=filters.pop("skip", 0),
+        limit=filters.pop("limit", 25),
+        sort_by=filters.pop("sort_by", "on_sale"),
+        category_id=filters.pop("category_id", None),
+        author_id=filters.pop("author_id", None),
+        min_rating=filters.pop("min_rating", None),
+        search_term=filters.pop("search_term", None),
+    )
+    return [("count", count_query), ("page", page_query)]
+
+
+def query_shapes(db: Session) -> Dict[str, Callable[[], List[Tuple[str, object]]]]:
+    """ Named query shapes -> callables returning [(part, statement)]. """
+    shapes: Dict[str, Callable[[], List[Tuple[str, object]]]] = {
+        f"books_sort_{mode}": (lambda mode=mode: _listing(db, sort_by=mode)) for mode in BOOK_SORT_MODES
+    }
+    shapes.update({
+        "books_filter_category": lambda: _listing(db, category_id=1),
+        "books_filter_author": lambda: _listing(db, author_id=1),
+        "books_filter_rating": lambda: _listing(db, min_rating=4, sort_by="recommended"),
+        "books_search": lambda: _listing(db, search_term="river"),
+        "books_facets": lambda: [(
+            "facets",
+            BookRepository(db).build_facet_query(category_id=None, author_id=None, min_rating=4, search_term=None),
+        )],
+        "orders_by_user": lambda: [("orders", OrderRepository(db).build_orders_by_user_query(1))],
+        "orders_by_user_recent": lambda: [(
+            "orders",
+            OrderRepository(db).build_orders_by_user_query(1, datetime.datetime.now() - datetime.timedelta(days=90)),
+        )],
+        "reviews_by_book": lambda: [(
+            "reviews",
+            select(database_models.Review)
+            .where(database_models.Review.book_id == 1)
+            .options(joinedload(database_models.Review.user))
+            .order_by(desc(database_models.Review.review_date))
+            .limit(10),
+        )],
+        "cart_by_user": lambda: [(
+            "cart",
+            select(database_models.CartItem).where(database_models.CartItem.user_id == 1),
+        )],
+    })
+    return shapes
+
+
+def explain(db: Session, statement, analyze: bool = True) -> str:
+    connection = db.connection()
+    compiled = statement.compile(dialect=connection.dialect)
+    options = "ANALYZE, BUFFERS" if analyze else "COSTS"
+    rows = connection.exec_driver_sql(f"EXPLAIN ({options}) {compiled}", compiled.params).all()
+    return "\n".join(row[0] for row in rows)
+
+
+def main(argv: Sequence[str] = None) -> None:
+    parser = argparse.ArgumentParser(description="Capture EXPLAIN plans of the hot query shapes.")
+    parser.add_argument("--label", required=True, help="Output directory suffix, e.g. before / after")
+    parser.add_argument("--no-analyze", action="store_true", help="Plan only, do not execute")
+    parser.add_argument("--only", nargs="*")
+    args = parser.parse_args(argv)
+
+    out_dir = os.path.join(RESULTS_DIR, f"explain-{args.label}")
+    os.makedirs(out_dir, exist_ok=True)
+
+    db = SessionLocal()
+    try:
+        for name, build in query_shapes(db).items():
+            if args.only and name not in args.only:
+                continue
+            sections = []
+            for part, statement in build():
+                sections.append(f"-- {part}\n{explain(db, statement, analyze=not args.no_analyze)}")
+            with open(os.path.join(out_dir, f"{name}.txt"), "w") as f:
+                f.write("\n\n".join(sections) + "\n")
+            print(f"{name}: captured")
+        db.rollback()
+    finally:
+        db.close()
+    print(f"Plans written to {out_dir}")
+
+
+if __name__ == "__main__":
+    main()
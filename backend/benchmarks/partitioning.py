@@ -0,0 +1,192 @@
+# backend/benchmarks/partitioning.py
+"""
+Latency of the order and review queries as history grows, with order, order_item and
+review partitioned by month (app.jobs.partitions).
+
+    python -m benchmarks.partitioning --growth 10          # measure, add 9x older history, measure again
+    python -m benchmarks.partitioning --growth 10 --keep   # leave the added history in place
+
+Runs against the seeded database (benchmarks.seed). The added history copies the
+seeded orders, items and reviews with their dates shifted back by whole multiples of
+the seeded span into new partitions, which are then moved to the archive schema, so
+the tables grow `growth` times while the recent months stay the same. Every query
+shape runs --repeat times over a seeded spread of users / books and p50 / p95 are
+printed before and after. The date-bounded shapes should stay flat; orders_all (every
+order of a user) grows with the history by design. Without --keep the history
+partitions are dropped afterwards, which is also how history is removed for good.
+"""
+import argparse
+import datetime
+import random
+import time
+from typing import Callable, Dict, List, Sequence
+
+from sqlalchemy import desc, func, select, text
+from sqlalchemy.orm import Session, joinedload
+
+from app.db.session import SessionLocal
+from app.jobs import partitions
+from app.models import database_models
+from app.repositories.order_repository import OrderRepository
+from app.repositories.partition_repository import PARTITIONED_TABLES, PartitionRepository, add_months, month_start
+
+# Shifted copies of the seeded rows, per table: (columns, select list with :id_offset / :order_offset / :months)
+_COPIES = {
+    "order": (
+        "id, user_id, order_date, order_amount",
+        "id + :id_offset, user_id, order_date - make_interval(months => :months), order_amount",
+    ),
+    "order_item": (
+        "id, order_id, order_date, book_id, quantity, price",
+        "id + :id_offset, order_id + :order_offset, order_date - make_interval(months => :months), book_id, quantity, price",
+    ),
+    "review": (
+        "id, book_id, user_id, review_title, review_details, rating_start, review_date",
+        "id + :id_offset, book_id, user_id, review_title, review_details, rating_start, "
+        "review_date - make_interval(months => :months)",
+    ),
+}
+
+
+def _shapes(db: Session, users: int, books: int) -> Dict[str, Callable[[random.Random], object]]:
+    """ Query shape -> callable running it once for a random user / book. """
+    orders = OrderRepository(db)
+
+    def reviews_latest(rng: random.Random):
+        return db.scalars(
+            select(database_models.Review)
+            .where(database_models.Review.book_id == rng.randint(1, books))
+            .options(joinedload(database_models.Review.user))
+            .order_by(desc(database_models.Review.review_date))
+            .limit(10)
+        ).unique().all()
+
+    return {
+        "orders_recent": lambda rng: orders.list_orders_by_user_id(
+            rng.randint(1, users), datetime.datetime.now() - datetime.timedelta(days=90)
+        ),
+        "reviews_latest": reviews_latest,
+        "orders_all": lambda rng: orders.list_orders_by_user_id(rng.randint(1, users)),
+    }
+
+
+def _measure(repeat: int, seed: int) -> Dict[str, List[float]]:
+    db = SessionLocal()
+    try:
+        users = db.scalar(select(func.max(database_models.User.id))) or 1
+        books = db.scalar(select(func.max(database_models.Book.id))) or 1
+        timings = {}
+        for name, run in _shapes(db, users, books).items():
+            rng = random.Random(seed)
+            samples = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                run(rng)
+                samples.append((time.perf_counter() - started) * 1000)
+                db.expunge_all()
+            db.rollback()
+            timings[name] = sorted(samples)
+        return timings
+    finally:
+        db.close()
+
+
+def _percentile(samples: List[float], fraction: float) -> float:
+    return samples[min(int(len(samples) * fraction), len(samples) - 1)]
+
+
+def _add_history(growth: int) -> datetime.date:
+    """ Adds growth - 1 shifted copies of the seeded rows. Returns the first month of the seeded data. """
+    db = SessionLocal()
+    try:
+        oldest = db.scalar(select(func.least(
+            select(func.min(database_models.Order.order_date)).scalar_subquery(),
+            select(func.min(database_models.Review.review_date)).scalar_subquery(),
+        )))
+        first = month_start(oldest.date())
+        current = month_start(datetime.date.today())
+        span = (current.year - first.year) * 12 + current.month - first.month + 1
+        max_ids = {
+            table: db.scalar(text(f'SELECT COALESCE(MAX(id), 0) FROM "{table}"')) for table in PARTITIONED_TABLES
+        }
+        db.commit()
+    finally:
+        db.close()
+
+    partitions.create_months(add_months(first, -span * (growth - 1)), add_months(first, -1))
+    for copy in range(1, growth):
+        started = time.perf_counter()
+        db = SessionLocal()
+        try:
+            for table, (columns, select_list) in _COPIES.items():
+                db.execute(
+                    text(f'INSERT INTO "{table}" ({columns}) SELECT {select_list} FROM "{table}" WHERE id <= :max_id'),
+                    {
+                        "id_offset": copy * max_ids[table],
+                        "order_offset": copy * max_ids["order"],
+                        "months": copy * span,
+                        "max_id": max_ids[table],
+                    },
+                )
+            db.commit()
+        finally:
+            db.close()
+        print(f"history copy {copy}: {span} months in {time.perf_counter() - started:.1f}s")
+
+    db = SessionLocal()
+    try:
+        for table in PARTITIONED_TABLES:
+            # Keep the id sequences past the copies in case they are kept
+            db.execute(text(
+                f"SELECT setval(pg_get_serial_sequence('\"{table}\"', 'id'), (SELECT MAX(id) FROM \"{table}\"))"
+            ))
+            db.execute(text(f'ANALYZE "{table}"'))
+        db.commit()
+    finally:
+        db.close()
+    partitions.archive_before(first)
+    return first
+
+
+def _drop_history(first: datetime.date) -> None:
+    db = SessionLocal()
+    try:
+        repo = PartitionRepository(db)
+        # Items first: they reference the order partitions
+        for table in ("order_item", "order", "review"):
+            for partition in repo.list_partitions(table):
+                if partition.end <= first:
+                    repo.drop_partition(partition)
+        db.commit()
+    finally:
+        db.close()
+
+
+def main(argv: Sequence[str] = None) -> None:
+    parser = argparse.ArgumentParser(description="Query latency as the partitioned history grows.")
+    parser.add_argument("--growth", type=int, default=10, help="History multiplier")
+    parser.add_argument("--repeat", type=int, default=200, help="Runs per query shape")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--keep", action="store_true", help="Keep the added history")
+    args = parser.parse_args(argv)
+
+    before = _measure(args.repeat, args.seed)
+    first = _add_history(args.growth)
+    try:
+        after = _measure(args.repeat, args.seed)
+    finally:
+        if not args.keep:
+            _drop_history(first)
+
+    print(f"{'shape':<16} {'p50 1x':>9} {'p50 ' + str(args.growth) + 'x':>9} {'p95 1x':>9} {'p95 ' + str(args.growth) + 'x':>9} {'p50 ratio':>10}")
+    for name in before:
+        p50_before, p50_after = _percentile(before[name], 0.5), _percentile(after[name], 0.5)
+        print(
+            f"{name:<16} {p50_before:8.2f}ms {p50_after:8.2f}ms "
+            f"{_percentile(before[name], 0.95):8.2f}ms {_percentile(after[name], 0.95):8.2f}ms "
+            f"{p50_after / max(p50_before, 1e-9):9.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,306 @@
+# backend/benchmarks/run.py
+"""
+Repeatable load test for every router endpoint.
+
+Each scenario is run at a fixed concurrency for a fixed number of requests against a
+running server (seeded with benchmarks.seed) and reported as p50/p95/p99 latency and
+throughput. Results are compared with the stored baseline of the same name.
+
+    python -m benchmarks.run --base-url http://localhost:8000 --concurrency 16 --requests 2000
+    python -m benchmarks.run --only books_sort_popularity --save-baseline
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import random
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import httpx
+
+from benchmarks.seed import BENCH_EMAIL_DOMAIN, BENCH_PASSWORD, SCALES
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BASELINE_DIR = os.path.join(BENCH_DIR, "baselines")
+RESULTS_DIR = os.path.join(BENCH_DIR, "results")
+
+# Mirrors the sort_by enum of routers/books.read_books
+BOOK_SORT_MODES = [
+    "on_sale", "on_sale_home", "popularity", "popular", "price_asc", "price_desc", "recommended",
+    "best_selling", "best_selling_7d", "best_selling_all",
+]
+
+
+@dataclass
+class Scenario:
+    """ One benchmarked request shape. `build` returns httpx.request kwargs per request. """
+    name: str
+    build: Callable[[random.Random], Dict[str, Any]]
+    auth: bool = False
+    admin: bool = False # Authenticate as the seeded admin (user 1)
+
+
+@dataclass
+class ScenarioResult:
+    name: str
+    requests: int
+    errors: int
+    concurrency: int
+    duration_s: float
+    throughput_rps: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    max_ms: float
+    status_codes: Dict[str, int] = field(default_factory=dict)
+
+
+def _percentile(sorted_values: Sequence[float], pct: float) -> float:
+    """ Nearest-rank percentile of an already sorted sequence. """
+    if not sorted_values:
+        return 0.0
+    rank = math.ceil(pct / 100 * len(sorted_values))
+    return sorted_values[max(0, min(rank, len(sorted_values)) - 1)]
+
+
+def _get(path: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    return {"method": "GET", "url": path, "params": params}
+
+
+def _post(path: str, json: Any = None, data: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+    return {"method": "POST", "url": path, "json": json, "data": data}
+
+
+def build_scenarios(counts: Dict[str, int]) -> List[Scenario]:
+    books, categories, authors = counts["books"], counts["categories"], counts["authors"]
+
+    def book_id(rng: random.Random) -> int:
+        return rng.randint(1, books)
+
+    scenarios = [
+        Scenario(
+            f"books_sort_{mode}",
+            lambda rng, mode=mode: _get("/books", {"sort_by": mode, "skip": rng.choice([0, 0, 25, 100]), "limit": 25}),
+        )
+        for mode in BOOK_SORT_MODES
+    ]
+    scenarios += [
+        # Every request identical: measures coalescing of concurrent equal listings
+        Scenario("books_hot_page", lambda rng: _get("/books", {"sort_by": "popularity", "limit": 25})),
+        Scenario("books_filter_category", lambda rng: _get("/books", {"category_id": rng.randint(1, categories), "limit": 25})),
+        Scenario("books_filter_author", lambda rng: _get("/books", {"author_id": rng.randint(1, authors), "limit": 25})),
+        Scenario("books_filter_rating", lambda rng: _get("/books", {"min_rating": rng.randint(1, 5), "sort_by": "recommended", "limit": 25})),
+        Scenario("books_search", lambda rng: _get("/books", {"search": rng.choice(["river", "night", "gold", "star", "lost"]), "limit": 25})),
+        Scenario("books_facets", lambda rng: _get("/books/facets", rng.choice([{}, {"category_id": rng.randint(1, categories)}, {"min_rating": 4}]))),
+        Scenario("book_detail", lambda rng: _get(f"/books/{book_id(rng)}")),
+        Scenario("book_related", lambda rng: _get(f"/books/{book_id(rng)}/related", {"limit": 8})),
+        Scenario("book_reviews", lambda rng: _get(f"/books/{book_id(rng)}/reviews", {"sort_by": "date_desc"})),
+        Scenario("categories", lambda rng: _get("/categories")),
+        Scenario("authors", lambda rng: _get("/authors")),
+        Scenario("users_me", lambda rng: _get("/users/me"), auth=True),
+        Scenario("orders_list", lambda rng: _get("/orders"), auth=True),
+        Scenario("cart_get", lambda rng: _get("/api/cart"), auth=True),
+        Scenario(
+            "cart_update",
+            lambda rng: _post("/api/cart", json=[{"book_id": book_id(rng), "quantity": rng.randint(1, 3)}]),
+            auth=True,
+        ),
+        Scenario(
+            "order_create",
+            lambda rng: _post("/orders", json={"items": [{"book_id": book_id(rng), "quantity": 1}]}),
+            auth=True,
+        ),
+        Scenario(
+            "admin_sales",
+            lambda rng: _get("/admin/analytics/sales", {"granularity": rng.choice(["day", "week", "month"])}),
+            admin=True,
+        ),
+        Scenario(
+            "admin_top_books",
+            lambda rng: _get("/admin/analytics/top/book", {"granularity": "month", "metric": rng.choice(["revenue", "units"])}),
+            admin=True,
+        ),
+        Scenario(
+            "token",
+            lambda rng: _post("/token", data={
+                "username": f"user{rng.randint(1, min(100, counts['users']))}@{BENCH_EMAIL_DOMAIN}",
+                "password": BENCH_PASSWORD,
+            }),
+        ),
+    ]
+    return scenarios
+
+
+async def _login(client: httpx.AsyncClient, user_id: int) -> str:
+    response = await client.post(
+        "/token",
+        data={"username": f"user{user_id}@{BENCH_EMAIL_DOMAIN}", "password": BENCH_PASSWORD},
+    )
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    scenario: Scenario,
+    concurrency: int,
+    total_requests: int,
+    warmup: int,
+    seed: int,
+    tokens: List[str],
+) -> ScenarioResult:
+    rng = random.Random(f"{seed}:{scenario.name}")
+    plans = [scenario.build(rng) for _ in range(warmup + total_requests)]
+    latencies: List[float] = []
+    status_codes: Dict[str, int] = {}
+    errors = 0
+    cursor = 0
+
+    async def send(index: int) -> None:
+        nonlocal errors
+        token = tokens[0] if scenario.admin else tokens[index % len(tokens)] if scenario.auth else None
+        headers = {"Authorization": f"Bearer {token}"} if token else None
+        started = time.perf_counter()
+        try:
+            response = await client.request(headers=headers, **plans[index])
+            code = str(response.status_code)
+            if response.status_code >= 400:
+                errors += 1
+        except httpx.HTTPError:
+            code = "error"
+            errors += 1
+        if index >= warmup:
+            latencies.append(time.perf_counter() - started)
+            status_codes[code] = status_codes.get(code, 0) + 1
+
+    async def worker() -> None:
+        nonlocal cursor
+        while cursor < len(plans):
+            index = cursor
+            cursor += 1
+            await send(index)
+
+    # Warm-up requests are sent (serially) but not measured
+    for index in range(warmup):
+        await send(index)
+    cursor = warmup
+    errors = 0
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    duration = time.perf_counter() - started
+
+    ordered = sorted(latencies)
+    return ScenarioResult(
+        name=scenario.name,
+        requests=len(ordered),
+        errors=errors,
+        concurrency=concurrency,
+        duration_s=round(duration, 3),
+        throughput_rps=round(len(ordered) / duration, 1) if duration else 0.0,
+        p50_ms=round(_percentile(ordered, 50) * 1000, 2),
+        p95_ms=round(_percentile(ordered, 95) * 1000, 2),
+        p99_ms=round(_percentile(ordered, 99) * 1000, 2),
+        max_ms=round(ordered[-1] * 1000, 2) if ordered else 0.0,
+        status_codes=status_codes,
+    )
+
+
+def compare(result: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """ Returns human readable regressions of `result` against `baseline`. """
+    regressions = []
+    baseline_by_name = {s["name"]: s for s in baseline.get("scenarios", [])}
+    for scenario in result["scenarios"]:
+        previous = baseline_by_name.get(scenario["name"])
+        if previous is None:
+            continue
+        for metric in ("p50_ms", "p95_ms", "p99_ms"):
+            if previous[metric] and scenario[metric] > previous[metric] * (1 + tolerance):
+                regressions.append(
+                    f"{scenario['name']}: {metric} {previous[metric]:.1f} -> {scenario[metric]:.1f}"
+                )
+        if previous["throughput_rps"] and scenario["throughput_rps"] < previous["throughput_rps"] * (1 - tolerance):
+            regressions.append(
+                f"{scenario['name']}: throughput {previous['throughput_rps']:.0f} -> {scenario['throughput_rps']:.0f} rps"
+            )
+    return regressions
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    counts = SCALES[args.scale]
+    scenarios = [s for s in build_scenarios(counts) if not args.only or s.name in args.only]
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=args.timeout) as client:
+        tokens = []
+        if any(s.auth or s.admin for s in scenarios):
+            tokens = [await _login(client, user_id) for user_id in range(1, min(args.users, counts["users"]) + 1)]
+        results = []
+        for scenario in scenarios:
+            result = await run_scenario(
+                client, scenario, args.concurrency, args.requests, args.warmup, args.seed, tokens
+            )
+            results.append(asdict(result))
+            print(
+                f"{result.name:<26} p50 {result.p50_ms:8.2f}  p95 {result.p95_ms:8.2f}  "
+                f"p99 {result.p99_ms:8.2f} ms  {result.throughput_rps:8.1f} rps  errors {result.errors}"
+            )
+    return {
+        "name": args.name,
+        "scale": args.scale,
+        "concurrency": args.concurrency,
+        "requests": args.requests,
+        "seed": args.seed,
+        "python": platform.python_version(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "scenarios": results,
+    }
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark every API endpoint at fixed concurrency.")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--name", default="default", help="Result / baseline name")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small", help="Scale the database was seeded with")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=1000, help="Measured requests per scenario")
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--users", type=int, default=20, help="Distinct users to log in for authenticated scenarios")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--only", nargs="*", help="Scenario names to run")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="Allowed relative regression")
+    parser.add_argument("--save-baseline", action="store_true")
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(run(args))
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    result_path = os.path.join(RESULTS_DIR, f"{args.name}-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    with open(result_path, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {result_path}")
+
+    baseline_path = os.path.join(BASELINE_DIR, f"{args.name}.json")
+    if args.save_baseline:
+        os.makedirs(BASELINE_DIR, exist_ok=True)
+        with open(baseline_path, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline saved to {baseline_path}")
+        return
+    if os.path.exists(baseline_path):
+        with open(baseline_path) as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        if regressions:
+            print("Regressions against baseline:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print("No regressions against baseline.")
+
+
+if __name__ == "__main__":
+    main()
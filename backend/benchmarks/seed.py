@@ -0,0 +1,323 @@
+# backend/benchmarks/seed.py
+"""
+Seeded synthetic catalog generator.
+
+Streams generated rows straight into PostgreSQL with COPY, so scales of millions of
+books and tens of millions of reviews load without building ORM objects or holding
+the data in memory. The same --seed always produces the same database.
+
+    python -m benchmarks.seed --scale small --truncate
+    python -m benchmarks.seed --books 1000000 --reviews 10000000 --orders 1000000 --truncate
+"""
+import argparse
+import csv
+import datetime
+import io
+import random
+import time
+from array import array
+from typing import Dict, Iterator, List, Sequence
+
+from app.core.security import get_password_hash
+from app.db.session import engine
+from app.jobs import copurchase, partitions, sales_counters
+from app.repositories.partition_repository import add_months, month_start
+
+# Preset sizes; any count can be overridden on the command line
+SCALES: Dict[str, Dict[str, int]] = {
+    "small": dict(books=10_000, authors=500, categories=20, users=2_000, reviews=100_000, orders=20_000),
+    "medium": dict(books=100_000, authors=5_000, categories=50, users=20_000, reviews=1_000_000, orders=200_000),
+    "large": dict(books=1_000_000, authors=50_000, categories=100, users=100_000, reviews=10_000_000, orders=1_000_000),
+}
+
+# Every seeded user shares this password (see generate_hash.py)
+BENCH_PASSWORD = "password123"
+BENCH_EMAIL_DOMAIN = "bench.local"
+
+# Tables in dependency order; truncated in reverse
+TABLES = ["category", "author", "book", "discount", "user", "review", "order", "order_item", "cart_item"]
+
+_WORDS = (
+    "shadow river night garden silent empire glass winter secret city storm ocean iron "
+    "paper crown forest memory star letter house summer broken golden last lost hidden "
+    "dream fire stone island journey song road machine light history mountain"
+).split()
+
+TODAY = datetime.date.today()
+NOW = datetime.datetime.now().replace(microsecond=0)
+
+# Seeded reviews and orders are spread over this much history
+REVIEW_HISTORY_DAYS = 3 * 365
+ORDER_HISTORY_DAYS = 2 * 365
+
+
+class _ChunkStream(io.TextIOBase):
+    """ Minimal readable text stream over an iterator of CSV chunks (for COPY FROM STDIN). """
+    def __init__(self, chunks: Iterator[str]):
+        self._chunks = chunks
+        self._buffer = ""
+
+    def readable(self) -> bool:
+        return True
+
+    def read(self, size: int = -1) -> str:
+        while size < 0 or len(self._buffer) < size:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                break
+            self._buffer += chunk
+        if size < 0:
+            data, self._buffer = self._buffer, ""
+        else:
+            data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+
+def _csv_chunks(rows: Iterator[Sequence], batch_size: int = 5_000) -> Iterator[str]:
+    """ Formats rows as CSV in batches (None becomes an unquoted empty field, i.e. NULL). """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    pending = 0
+    for row in rows:
+        writer.writerow(row)
+        pending += 1
+        if pending >= batch_size:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    if pending:
+        yield buffer.getvalue()
+
+
+def _title(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(_WORDS) for _ in range(words)).title()
+
+
+def _skewed_index(rng: random.Random, size: int) -> int:
+    """ Pareto-skewed index in [0, size): a few items get most of the activity. """
+    return min(int(rng.paretovariate(1.2)) - 1, size - 1) if rng.random() < 0.5 else rng.randrange(size)
+
+
+class CatalogGenerator:
+    """ Generates rows for every table from a single seed. """
+    def __init__(self, seed: int, counts: Dict[str, int]):
+        self.seed = seed
+        self.counts = counts
+        # Book prices are needed again for discounts, orders and carts
+        self.book_prices = array("d")
+
+    def _rng(self, table: str) -> random.Random:
+        # Independent stream per table so changing one count does not reshuffle the others
+        return random.Random(f"{self.seed}:{table}")
+
+    def categories(self) -> Iterator[Sequence]:
+        rng = self._rng("category")
+        for i in range(1, self.counts["categories"] + 1):
+            yield (i, f"{_title(rng, 1)} {i}", _title(rng, 6))
+
+    def authors(self) -> Iterator[Sequence]:
+        rng = self._rng("author")
+        for i in range(1, self.counts["authors"] + 1):
+            yield (i, f"{_title(rng, 2)} {i}", _title(rng, 20))
+
+    def books(self) -> Iterator[Sequence]:
+        rng = self._rng("book")
+        self.book_prices = array("d")
+        for i in range(1, self.counts["books"] + 1):
+            price = round(rng.uniform(4.99, 99.99), 2)
+            self.book_prices.append(price)
+            yield (
+                i,
+                rng.randint(1, self.counts["categories"]),
+                _skewed_index(rng, self.counts["authors"]) + 1,
+                _title(rng, rng.randint(1, 5)),
+                _title(rng, 30),
+                f"{price:.2f}",
+                f"book{rng.randint(1, 10)}",
+            )
+
+    def discounts(self) -> Iterator[Sequence]:
+        """ ~30% of books get a discount: mostly active, some ended, some scheduled. """
+        rng = self._rng("discount")
+        discount_id = 0
+        for book_id in range(1, self.counts["books"] + 1):
+            if rng.random() >= 0.3:
+                continue
+            price = self.book_prices[book_id - 1]
+            kind = rng.random()
+            if kind < 0.6:    # active, some open-ended
+                start = TODAY - datetime.timedelta(days=rng.randint(0, 60))
+                end = None if rng.random() < 0.3 else TODAY + datetime.timedelta(days=rng.randint(0, 60))
+            elif kind < 0.85: # ended
+                start = TODAY - datetime.timedelta(days=rng.randint(60, 720))
+                end = start + datetime.timedelta(days=rng.randint(1, 50))
+            else:             # scheduled
+                start = TODAY + datetime.timedelta(days=rng.randint(1, 60))
+                end = start + datetime.timedelta(days=rng.randint(1, 30))
+            discount_id += 1
+            yield (discount_id, book_id, start, end, f"{price * rng.uniform(0.5, 0.95):.2f}")
+
+    def users(self) -> Iterator[Sequence]:
+        rng = self._rng("user")
+        hashed = get_password_hash(BENCH_PASSWORD) # bcrypt once, shared by every user
+        for i in range(1, self.counts["users"] + 1):
+            yield (i, _title(rng, 1), _title(rng, 1), f"user{i}@{BENCH_EMAIL_DOMAIN}", hashed, i == 1)
+
+    def reviews(self) -> Iterator[Sequence]:
+        rng = self._rng("review")
+        books, users = self.counts["books"], self.counts["users"]
+        for i in range(1, self.counts["reviews"] + 1):
+            rating = min(5, max(1, int(rng.gauss(3.8, 1.1) + 0.5)))
+            yield (
+                i,
+                _skewed_index(rng, books) + 1,
+                rng.randint(1, users),
+                _title(rng, rng.randint(2, 6)),
+                _title(rng, 25) if rng.random() < 0.7 else None,
+                rating,
+                NOW - datetime.timedelta(seconds=rng.randint(0, REVIEW_HISTORY_DAYS * 86400)),
+            )
+
+    def _orders_with_items(self) -> Iterator[tuple]:
+        rng = self._rng("order")
+        books, users = self.counts["books"], self.counts["users"]
+        item_id = 0
+        for order_id in range(1, self.counts["orders"] + 1):
+            lines = []
+            amount = 0.0
+            for book_index in sorted({_skewed_index(rng, books) for _ in range(rng.randint(1, 4))}):
+                quantity = rng.randint(1, 3)
+                price = self.book_prices[book_index]
+                amount += price * quantity
+                lines.append((book_index + 1, quantity, f"{price:.2f}"))
+            user_id = rng.randint(1, users)
+            order_date = NOW - datetime.timedelta(seconds=rng.randint(0, ORDER_HISTORY_DAYS * 86400))
+            order = (order_id, user_id, order_date, f"{amount:.2f}")
+            items = []
+            for book_id, quantity, price in lines:
+                item_id += 1
+                items.append((item_id, order_id, order_date, book_id, quantity, price))
+            yield order, items
+
+    def orders(self) -> Iterator[Sequence]:
+        for order, _ in self._orders_with_items():
+            yield order
+
+    def order_items(self) -> Iterator[Sequence]:
+        # Replays the same seeded stream rather than buffering millions of items
+        for _, items in self._orders_with_items():
+            yield from items
+
+    def cart_items(self) -> Iterator[Sequence]:
+        """ ~10% of users have an open cart. """
+        rng = self._rng("cart_item")
+        item_id = 0
+        for user_id in range(1, self.counts["users"] + 1):
+            if rng.random() >= 0.1:
+                continue
+            for book_id in {rng.randint(1, self.counts["books"]) for _ in range(rng.randint(1, 3))}:
+                item_id += 1
+                yield (item_id, user_id, book_id, rng.randint(1, 3))
+
+
+def _copy(cursor, table: str, columns: Sequence[str], rows: Iterator[Sequence]) -> int:
+    counted = _Counted(rows)
+    column_list = ", ".join(columns)
+    cursor.copy_expert(
+        f'COPY "{table}" ({column_list}) FROM STDIN WITH (FORMAT csv)',
+        _ChunkStream(_csv_chunks(counted)),
+    )
+    return counted.count
+
+
+class _Counted:
+    """ Iterator wrapper counting the rows that went through it. """
+    def __init__(self, rows: Iterator[Sequence]):
+        self._rows = iter(rows)
+        self.count = 0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        row = next(self._rows)
+        self.count += 1
+        return row
+
+
+def seed(counts: Dict[str, int], seed_value: int, truncate: bool) -> None:
+    generator = CatalogGenerator(seed_value, counts)
+    # Reviews and orders go to monthly partitions, which must exist for the whole history
+    partitions.create_months(
+        TODAY - datetime.timedelta(days=max(REVIEW_HISTORY_DAYS, ORDER_HISTORY_DAYS) + 1),
+        add_months(month_start(TODAY), 1)
+    )
+    raw = engine.raw_connection()
+    try:
+        cursor = raw.cursor()
+        cursor.execute('SELECT EXISTS (SELECT 1 FROM book)')
+        if cursor.fetchone()[0] and not truncate:
+            raise SystemExit("Database already has books; pass --truncate to replace them.")
+        if truncate:
+            cursor.execute("TRUNCATE " + ", ".join(f'"{t}"' for t in reversed(TABLES)) + " RESTART IDENTITY CASCADE")
+
+        steps: List[tuple] = [
+            ("category", ("id", "category_name", "category_desc"), generator.categories),
+            ("author", ("id", "author_name", "author_bio"), generator.authors),
+            ("book", ("id", "category_id", "author_id", "book_title", "book_summary", "book_price", "book_cover_photo"), generator.books),
+            ("discount", ("id", "book_id", "discount_start_date", "discount_end_date", "discount_price"), generator.discounts),
+            ("user", ("id", "first_name", "last_name", "email", "password", "admin"), generator.users),
+            ("review", ("id", "book_id", "user_id", "review_title", "review_details", "rating_start", "review_date"), generator.reviews),
+            ("order", ("id", "user_id", "order_date", "order_amount"), generator.orders),
+            ("order_item", ("id", "order_id", "order_date", "book_id", "quantity", "price"), generator.order_items),
+            ("cart_item", ("id", "user_id", "book_id", "quantity"), generator.cart_items),
+        ]
+        for table, columns, rows in steps:
+            started = time.perf_counter()
+            loaded = _copy(cursor, table, columns, rows())
+            elapsed = time.perf_counter() - started
+            print(f"{table:<12} {loaded:>12,} rows in {elapsed:7.1f}s ({loaded / max(elapsed, 1e-9):,.0f} rows/s)")
+
+        # Explicit ids were loaded, so move the sequences past them
+        for table in TABLES:
+            cursor.execute(
+                f"SELECT setval(pg_get_serial_sequence('\"{table}\"', 'id'), "
+                f"COALESCE((SELECT MAX(id) FROM \"{table}\"), 0) + 1, false)"
+            )
+        cursor.execute("ANALYZE")
+        raw.commit()
+    except BaseException:
+        raw.rollback()
+        raise
+    finally:
+        raw.close()
+
+    # Orders were copied past the application, so derive the best-seller counters from them
+    started = time.perf_counter()
+    books = sales_counters.rebuild()
+    print(f"{'sales':<12} {books:>12,} books in {time.perf_counter() - started:7.1f}s")
+    started = time.perf_counter()
+    books = copurchase.build()
+    print(f"{'copurchase':<12} {books:>12,} books in {time.perf_counter() - started:7.1f}s")
+
+
+def main(argv: Sequence[str] = None) -> None:
+    parser = argparse.ArgumentParser(description="Fill the database with a seeded synthetic catalog.")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--truncate", action="store_true", help="Empty the seeded tables first")
+    for name in SCALES["small"]:
+        parser.add_argument(f"--{name}", type=int, help=f"Override the number of {name}")
+    args = parser.parse_args(argv)
+
+    counts = dict(SCALES[args.scale])
+    for name in counts:
+        if getattr(args, name) is not None:
+            counts[name] = getattr(args, name)
+    print(f"Seeding with seed={args.seed}: " + ", ".join(f"{k}={v:,}" for k, v in counts.items()))
+    seed(counts, args.seed, args.truncate)
+
+
+if __name__ == "__main__":
+    main()
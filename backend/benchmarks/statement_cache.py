@@ -0,0 +1,81 @@
+# backend/benchmarks/statement_cache.py
+"""
+Measures what the cached listing statement shapes save per /books request, in-process
+against a seeded database:
+
+    python -m benchmarks.statement_cache --iterations 500
+
+For each listing shape it runs list_and_count_books' two statements N times with
+  - rebuilt:  the statements constructed again for every call (the previous behaviour);
+  - cached:   the per-process shape from book_repository.listing_shape;
+and reports client CPU time per request (time.process_time, so database time is
+excluded) together with SQLAlchemy's compiled-cache hit rate for each variant.
+"""
+import argparse
+import time
+from typing import Callable, Dict, Sequence, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core.instrumentation import DB_COMPILED_CACHE
+from app.db.session import SessionLocal
+from app.repositories.book_repository import (
+    LISTING_SORT_MODES, build_listing_shape, listing_params, listing_shape, listing_shape_key
+)
+
+# (sort_by, category_id, author_id, min_rating, search_term)
+SHAPES: Dict[str, Tuple] = {
+    **{f"sort_{mode}": (mode, None, None, None, None) for mode in LISTING_SORT_MODES},
+    "filter_category": ("on_sale", 1, None, None, None),
+    "filter_author_rating": ("recommended", None, 1, 4, None),
+    "search": ("popularity", None, None, None, "river"),
+}
+
+
+def _cache_counts() -> Dict[str, float]:
+    return {result: DB_COMPILED_CACHE.value(result=result) for result in ("cache_hit", "cache_miss")}
+
+
+def _run(db: Session, statements: Callable[[], Tuple[object, object]], params: dict, iterations: int):
+    before = _cache_counts()
+    started = time.process_time()
+    for _ in range(iterations):
+        count_query, page_query = statements()
+        db.scalar(count_query, params)
+        db.execute(page_query, params).unique().all()
+        db.expunge_all()
+    cpu_ms = (time.process_time() - started) * 1000 / iterations
+    after = _cache_counts()
+    hits = after["cache_hit"] - before["cache_hit"]
+    misses = after["cache_miss"] - before["cache_miss"]
+    return cpu_ms, hits / max(hits + misses, 1)
+
+
+def main(argv: Sequence[str] = None) -> None:
+    parser = argparse.ArgumentParser(description="CPU per request of rebuilt vs cached listing statements.")
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args(argv)
+
+    db = SessionLocal()
+    try:
+        print(f"{'shape':<24} {'rebuilt cpu ms':>15} {'hit %':>6} {'cached cpu ms':>14} {'hit %':>6} {'saved':>7}")
+        for name, (sort_by, category_id, author_id, min_rating, search_term) in SHAPES.items():
+            shape_key = listing_shape_key(sort_by, category_id, author_id, min_rating, search_term)
+            params = listing_params(0, 25, category_id, author_id, min_rating, search_term)
+
+            # Warm both variants so the first compilation is not counted
+            _run(db, lambda: listing_shape(shape_key), params, 1)
+            rebuilt_ms, rebuilt_hits = _run(db, lambda: build_listing_shape(*shape_key), params, args.iterations)
+            cached_ms, cached_hits = _run(db, lambda: listing_shape(shape_key), params, args.iterations)
+            saved = (1 - cached_ms / rebuilt_ms) * 100 if rebuilt_ms else 0.0
+            print(
+                f"{name:<24} {rebuilt_ms:>15.3f} {rebuilt_hits * 100:>6.1f}"
+                f" {cached_ms:>14.3f} {cached_hits * 100:>6.1f} {saved:>6.1f}%"
+            )
+        db.rollback()
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+# backend/benchmarks/worker_memory.py
+"""
+Reports the memory of a running uvicorn master and its worker processes (Linux only),
+to check that catalog memory stays flat as workers are added:
+
+    CATALOG_ENGINE=shared uvicorn app.main:app --workers 8 &
+    python -m benchmarks.worker_memory --pid <uvicorn master pid>
+
+RSS counts shared pages once per process; PSS splits them between the processes mapping
+them, so the PSS total is what the host actually pays. With the shared snapshot the
+total should grow by roughly the interpreter size per extra worker, not the catalog size.
+"""
+import argparse
+import os
+from typing import Dict, List, Sequence
+
+
+def _children(pid: int) -> List[int]:
+    children = []
+    task_dir = f"/proc/{pid}/task"
+    for task in os.listdir(task_dir):
+        with open(os.path.join(task_dir, task, "children")) as f:
+            children.extend(int(child) for child in f.read().split())
+    return children
+
+
+def _memory_kb(pid: int) -> Dict[str, int]:
+    """ Rss, Pss and Shared_* fields of /proc/<pid>/smaps_rollup, in kB. """
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                values[parts[0].rstrip(":")] = int(parts[1])
+    return values
+
+
+def main(argv: Sequence[str] = None) -> None:
+    parser = argparse.ArgumentParser(description="Memory of a uvicorn master and its workers.")
+    parser.add_argument("--pid", type=int, required=True, help="uvicorn master process id")
+    args = parser.parse_args(argv)
+
+    pids = [args.pid] + _children(args.pid)
+    total_rss = total_pss = 0
+    print(f"{'pid':>8} {'rss MiB':>9} {'pss MiB':>9} {'shared MiB':>11}")
+    for pid in pids:
+        memory = _memory_kb(pid)
+        shared = memory.get("Shared_Clean", 0) + memory.get("Shared_Dirty", 0)
+        total_rss += memory.get("Rss", 0)
+        total_pss += memory.get("Pss", 0)
+        print(f"{pid:>8} {memory.get('Rss', 0) / 1024:>9.1f} {memory.get('Pss', 0) / 1024:>9.1f} {shared / 1024:>11.1f}")
+    print(f"{'total':>8} {total_rss / 1024:>9.1f} {total_pss / 1024:>9.1f}")
+    print(f"{len(pids) - 1} workers, PSS per worker {total_pss / 1024 / max(len(pids) - 1, 1):.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
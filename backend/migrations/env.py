@@ -0,0 +1,41 @@
+# backend/migrations/env.py
+from logging.config import fileConfig
+
+from alembic import context
+
+from app.core.config import settings
+from app.db.session import Base, engine
+# Import the models so every table is registered on Base.metadata
+from app.models import database_models  # noqa: F401
+
+config = context.config
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+
+def run_migrations_offline() -> None:
+    """ Emit SQL to stdout instead of running it (alembic upgrade head --sql). """
+    context.configure(
+        url=settings.DATABASE_URL,
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    """ Run migrations with the application's engine. """
+    with engine.connect() as connection:
+        context.configure(connection=connection, target_metadata=target_metadata)
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,123 @@
+"""initial schema
+
+Tables as they existed before migrations were introduced. Databases created by hand
+from the ERD should be marked as already at this revision with:
+
+    alembic stamp 0001
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "category",
+        sa.Column("id", sa.BigInteger(), primary_key=True),
+        sa.Column("category_name", sa.String(120), nullable=False),
+        sa.Column("category_desc", sa.String(255)),
+    )
+    op.create_index("ix_category_id", "category", ["id"])
+    op.create_index("ix_category_category_name", "category", ["category_name"])
+
+    op.create_table(
+        "author",
+        sa.Column("id", sa.BigInteger(), primary_key=True),
+        sa.Column("author_name", sa.String(255), nullable=False),
+        sa.Column("author_bio", sa.Text()),
+    )
+    op.create_index("ix_author_id", "author", ["id"])
+    op.create_index("ix_author_author_name", "author", ["author_name"])
+
+    op.create_table(
+        "book",
+        sa.Column("id", sa.BigInteger(), primary_key=True),
+        sa.Column("category_id", sa.BigInteger(), sa.ForeignKey("category.id"), nullable=False),
+        sa.Column("author_id", sa.BigInteger(), sa.ForeignKey("author.id"), nullable=False),
+        sa.Column("book_title", sa.String(255), nullable=False),
+        sa.Column("book_summary", sa.Text()),
+        sa.Column("book_price", sa.Numeric(5, 2), nullable=False),
+        sa.Column("book_cover_photo", sa.String(20)),
+    )
+    op.create_index("ix_book_id", "book", ["id"])
+    op.create_index("ix_book_book_title", "book", ["book_title"])
+
+    op.create_table(
+        "discount",
+        sa.Column("id", sa.BigInteger(), primary_key=True),
+        sa.Column("book_id", sa.BigInteger(), sa.ForeignKey("book.id"), nullable=False),
+        sa.Column("discount_start_date", sa.Date(), nullable=False),
+        sa.Column("discount_end_date", sa.Date()),
+        sa.Column("discount_price", sa.Numeric(5, 2), nullable=False),
+    )
+    op.create_index("ix_discount_id", "discount", ["id"])
+    op.create_index("ix_discount_book_id", "discount", ["book_id"])
+
+    op.create_table(
+        "user",
+        sa.Column("id", sa.BigInteger(), primary_key=True),
+        sa.Column("first_name", sa.String(50), nullable=False),
+        sa.Column("last_name", sa.String(50), nullable=False),
+        sa.Column("email", sa.String(70), nullable=False),
+        sa.Column("password", sa.String(255), nullable=False),
+        sa.Column("admin", sa.Boolean()),
+    )
+    op.create_index("ix_user_id", "user", ["id"])
+    op.create_index("ix_user_email", "user", ["email"], unique=True)
+
+    op.create_table(
+        "order",
+        sa.Column("id", sa.BigInteger(), primary_key=True),
+        sa.Column("user_id", sa.BigInteger(), sa.ForeignKey("user.id"), nullable=False),
+        sa.Column("order_date", sa.TIMESTAMP(timezone=False), server_default=sa.func.now()),
+        sa.Column("order_amount", sa.Numeric(8, 2), nullable=False),
+    )
+    op.create_index("ix_order_id", "order", ["id"])
+
+    op.create_table(
+        "order_item",
+        sa.Column("id", sa.BigInteger(), primary_key=True),
+        sa.Column("order_id", sa.BigInteger(), sa.ForeignKey("order.id"), nullable=False),
+        sa.Column("book_id", sa.BigInteger(), sa.ForeignKey("book.id"), nullable=False),
+        sa.Column("quantity", sa.SmallInteger(), nullable=False),
+        sa.Column("price", sa.Numeric(5, 2), nullable=False),
+    )
+    op.create_index("ix_order_item_id", "order_item", ["id"])
+
+    op.create_table(
+        "review",
+        sa.Column("id", sa.BigInteger(), primary_key=True),
+        sa.Column("book_id", sa.BigInteger(), sa.ForeignKey("book.id"), nullable=False),
+        sa.Column("user_id", sa.BigInteger(), sa.ForeignKey("user.id"), nullable=False),
+        sa.Column("review_title", sa.String(120), nullable=False),
+        sa.Column("review_details", sa.Text()),
+        sa.Column("rating_start", sa.SmallInteger(), nullable=False),
+        sa.Column("review_date", sa.TIMESTAMP(timezone=False), server_default=sa.func.now()),
+    )
+    op.create_index("ix_review_id", "review", ["id"])
+    op.create_index("ix_review_book_id", "review", ["book_id"])
+    op.create_index("ix_review_user_id", "review", ["user_id"])
+
+    op.create_table(
+        "cart_item",
+        sa.Column("id", sa.BigInteger(), primary_key=True),
+        sa.Column("user_id", sa.BigInteger(), sa.ForeignKey("user.id"), nullable=False),
+        sa.Column("book_id", sa.BigInteger(), sa.ForeignKey("book.id"), nullable=False),
+        sa.Column("quantity", sa.Integer(), nullable=False),
+        sa.UniqueConstraint("user_id", "book_id", name="uq_cart_item_user_book"),
+    )
+    op.create_index("ix_cart_item_id", "cart_item", ["id"])
+
+
+def downgrade() -> None:
+    for table in ("cart_item", "review", "order_item", "order", "user", "discount", "book", "author", "category"):
+        op.drop_table(table)
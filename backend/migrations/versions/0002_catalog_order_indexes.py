@@ -0,0 +1,109 @@
+"""catalog and ordering hot-path indexes
+
+Indexes shaped after the queries the application actually runs:
+
+* book(category_id), book(author_id): category/author filters of /books and FK joins.
+* discount: per-book (book_id, start, end) INCLUDE price replaces ix_discount_book_id;
+  (end_date, book_id) plus a partial open-ended index let the active-discount subquery
+  ("end IS NULL OR end >= today") skip the ever-growing set of ended discounts.
+* order(user_id, order_date DESC): OrderRepository.list_orders_by_user_id.
+* order_item(order_id), order_item(book_id): loading order items, book FK.
+* review(book_id, rating_start) replaces ix_review_book_id and makes the per-book
+  count/average aggregate index-only; review(book_id, review_date) serves the
+  sorted review listing.
+* pg_trgm GIN indexes on book_title / author_name for the ILIKE '%term%' search.
+
+cart_item(user_id) is already served by uq_cart_item_user_book, whose leading column is user_id.
+
+Indexes are built CONCURRENTLY so the migration can run against a live database.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    with op.get_context().autocommit_block():
+        op.create_index("ix_book_category_id", "book", ["category_id"], postgresql_concurrently=True)
+        op.create_index("ix_book_author_id", "book", ["author_id"], postgresql_concurrently=True)
+        op.create_index(
+            "ix_book_book_title_trgm", "book", ["book_title"],
+            postgresql_using="gin", postgresql_ops={"book_title": "gin_trgm_ops"},
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_author_author_name_trgm", "author", ["author_name"],
+            postgresql_using="gin", postgresql_ops={"author_name": "gin_trgm_ops"},
+            postgresql_concurrently=True,
+        )
+
+        op.create_index(
+            "ix_discount_book_id_dates", "discount",
+            ["book_id", "discount_start_date", "discount_end_date"],
+            postgresql_include=["discount_price"],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_discount_end_date", "discount", ["discount_end_date", "book_id"],
+            postgresql_include=["discount_start_date", "discount_price"],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_discount_open_ended", "discount", ["book_id"],
+            postgresql_include=["discount_start_date", "discount_price"],
+            postgresql_where=sa.text("discount_end_date IS NULL"),
+            postgresql_concurrently=True,
+        )
+        op.drop_index("ix_discount_book_id", table_name="discount", postgresql_concurrently=True)
+
+        op.create_index(
+            "ix_order_user_id_order_date", "order", ["user_id", sa.text("order_date DESC")],
+            postgresql_concurrently=True,
+        )
+        op.create_index("ix_order_item_order_id", "order_item", ["order_id"], postgresql_concurrently=True)
+        op.create_index("ix_order_item_book_id", "order_item", ["book_id"], postgresql_concurrently=True)
+
+        op.create_index(
+            "ix_review_book_id_rating", "review", ["book_id", "rating_start"],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_review_book_id_review_date", "review", ["book_id", "review_date"],
+            postgresql_concurrently=True,
+        )
+        op.drop_index("ix_review_book_id", table_name="review", postgresql_concurrently=True)
+
+    for table in ("book", "author", "discount", "order", "order_item", "review"):
+        op.execute(f'ANALYZE "{table}"')
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index("ix_review_book_id", "review", ["book_id"], postgresql_concurrently=True)
+        op.create_index("ix_discount_book_id", "discount", ["book_id"], postgresql_concurrently=True)
+        for name, table in (
+            ("ix_review_book_id_review_date", "review"),
+            ("ix_review_book_id_rating", "review"),
+            ("ix_order_item_book_id", "order_item"),
+            ("ix_order_item_order_id", "order_item"),
+            ("ix_order_user_id_order_date", "order"),
+            ("ix_discount_open_ended", "discount"),
+            ("ix_discount_end_date", "discount"),
+            ("ix_discount_book_id_dates", "discount"),
+            ("ix_author_author_name_trgm", "author"),
+            ("ix_book_book_title_trgm", "book"),
+            ("ix_book_author_id", "book"),
+            ("ix_book_category_id", "book"),
+        ):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
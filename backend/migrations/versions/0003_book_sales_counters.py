@@ -0,0 +1,82 @@
+"""book sales counters
+
+Tables behind the best_selling sort modes and home rail:
+
+* book_sales_daily(book_id, sales_date): units and revenue per book and day.
+* book_sales_stats(book_id): rolling 7d/30d windows and all-time totals.
+
+Both are incremented inside the order transaction (SalesRepository.record_sales);
+the windows are rolled forward daily by app.jobs.sales_counters. The upgrade backfills
+them from existing orders, the same thing `python -m app.jobs.sales_counters rebuild` does.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "book_sales_daily",
+        sa.Column("book_id", sa.BigInteger(), sa.ForeignKey("book.id"), primary_key=True),
+        sa.Column("sales_date", sa.Date(), primary_key=True),
+        sa.Column("quantity", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("revenue", sa.Numeric(12, 2), nullable=False, server_default="0"),
+    )
+    op.create_index("ix_book_sales_daily_sales_date", "book_sales_daily", ["sales_date"])
+
+    op.create_table(
+        "book_sales_stats",
+        sa.Column("book_id", sa.BigInteger(), sa.ForeignKey("book.id"), primary_key=True),
+        sa.Column("quantity_7d", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("revenue_7d", sa.Numeric(12, 2), nullable=False, server_default="0"),
+        sa.Column("quantity_30d", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("revenue_30d", sa.Numeric(12, 2), nullable=False, server_default="0"),
+        sa.Column("quantity_total", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.Column("revenue_total", sa.Numeric(14, 2), nullable=False, server_default="0"),
+        sa.Column("windows_as_of", sa.Date(), nullable=False),
+    )
+
+    op.execute(
+        """
+        INSERT INTO book_sales_daily (book_id, sales_date, quantity, revenue)
+        SELECT oi.book_id, o.order_date::date, sum(oi.quantity), sum(oi.quantity * oi.price)
+        FROM order_item oi JOIN "order" o ON o.id = oi.order_id
+        GROUP BY oi.book_id, o.order_date::date
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO book_sales_stats (
+            book_id, quantity_7d, revenue_7d, quantity_30d, revenue_30d,
+            quantity_total, revenue_total, windows_as_of
+        )
+        SELECT
+            book_id,
+            coalesce(sum(quantity) FILTER (WHERE sales_date > current_date - 7), 0),
+            coalesce(sum(revenue) FILTER (WHERE sales_date > current_date - 7), 0),
+            coalesce(sum(quantity) FILTER (WHERE sales_date > current_date - 30), 0),
+            coalesce(sum(revenue) FILTER (WHERE sales_date > current_date - 30), 0),
+            sum(quantity),
+            sum(revenue),
+            current_date
+        FROM book_sales_daily
+        GROUP BY book_id
+        """
+    )
+    for table in ("book_sales_daily", "book_sales_stats"):
+        op.execute(f'ANALYZE "{table}"')
+
+
+def downgrade() -> None:
+    op.drop_table("book_sales_stats")
+    op.drop_index("ix_book_sales_daily_sales_date", table_name="book_sales_daily")
+    op.drop_table("book_sales_daily")
@@ -0,0 +1,50 @@
+"""co-purchase recommendations
+
+Tables behind GET /books/{book_id}/related:
+
+* book_copurchase(book_id, related_book_id): orders containing both books, both directions.
+* book_related(book_id, rank): the top-K neighbours per book, read with one PK range scan.
+* job_watermark(job_name): last order id folded in by incremental batch jobs.
+
+The tables start empty; fill them with `python -m app.jobs.copurchase build`.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "book_copurchase",
+        sa.Column("book_id", sa.BigInteger(), sa.ForeignKey("book.id"), primary_key=True),
+        sa.Column("related_book_id", sa.BigInteger(), sa.ForeignKey("book.id"), primary_key=True),
+        sa.Column("orders_together", sa.Integer(), nullable=False),
+    )
+    op.create_table(
+        "book_related",
+        sa.Column("book_id", sa.BigInteger(), sa.ForeignKey("book.id"), primary_key=True),
+        sa.Column("rank", sa.SmallInteger(), primary_key=True),
+        sa.Column("related_book_id", sa.BigInteger(), sa.ForeignKey("book.id"), nullable=False),
+        sa.Column("score", sa.Integer(), nullable=False),
+    )
+    op.create_table(
+        "job_watermark",
+        sa.Column("job_name", sa.String(64), primary_key=True),
+        sa.Column("position", sa.BigInteger(), nullable=False),
+        sa.Column("updated_at", sa.TIMESTAMP(timezone=False), nullable=False, server_default=sa.func.now()),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("job_watermark")
+    op.drop_table("book_related")
+    op.drop_table("book_copurchase")
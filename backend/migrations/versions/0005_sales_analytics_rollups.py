@@ -0,0 +1,79 @@
+"""sales analytics rollups
+
+Daily rollups behind the /admin/analytics endpoints, so reports never scan order/order_item:
+
+* sales_daily(sales_date): orders, units and revenue per day (average order value).
+* category_sales_daily / author_sales_daily (key, sales_date): the same per category and author.
+
+Top books reuse book_sales_daily (0003). All are incremented when an order is placed
+(SalesRepository.record_sales); the upgrade backfills them from existing orders, as
+`python -m app.jobs.sales_counters rebuild` does.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def _counter_columns():
+    return [
+        sa.Column("order_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("quantity", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("revenue", sa.Numeric(14, 2), nullable=False, server_default="0"),
+    ]
+
+
+def upgrade() -> None:
+    op.create_table(
+        "sales_daily",
+        sa.Column("sales_date", sa.Date(), primary_key=True),
+        *_counter_columns(),
+    )
+    for table, key, parent in (
+        ("category_sales_daily", "category_id", "category"),
+        ("author_sales_daily", "author_id", "author"),
+    ):
+        op.create_table(
+            table,
+            sa.Column(key, sa.BigInteger(), sa.ForeignKey(f"{parent}.id"), primary_key=True),
+            sa.Column("sales_date", sa.Date(), primary_key=True),
+            *_counter_columns(),
+        )
+        op.create_index(f"ix_{table}_sales_date", table, ["sales_date"])
+
+    op.execute(
+        """
+        INSERT INTO sales_daily (sales_date, order_count, quantity, revenue)
+        SELECT o.order_date::date, count(DISTINCT oi.order_id), sum(oi.quantity), sum(oi.quantity * oi.price)
+        FROM order_item oi JOIN "order" o ON o.id = oi.order_id
+        GROUP BY o.order_date::date
+        """
+    )
+    for table, key in (("category_sales_daily", "category_id"), ("author_sales_daily", "author_id")):
+        op.execute(
+            f"""
+            INSERT INTO {table} ({key}, sales_date, order_count, quantity, revenue)
+            SELECT b.{key}, o.order_date::date, count(DISTINCT oi.order_id), sum(oi.quantity), sum(oi.quantity * oi.price)
+            FROM order_item oi
+            JOIN "order" o ON o.id = oi.order_id
+            JOIN book b ON b.id = oi.book_id
+            GROUP BY b.{key}, o.order_date::date
+            """
+        )
+    for table in ("sales_daily", "category_sales_daily", "author_sales_daily"):
+        op.execute(f'ANALYZE "{table}"')
+
+
+def downgrade() -> None:
+    for table in ("author_sales_daily", "category_sales_daily"):
+        op.drop_index(f"ix_{table}_sales_date", table_name=table)
+        op.drop_table(table)
+    op.drop_table("sales_daily")
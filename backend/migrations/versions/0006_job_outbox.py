@@ -0,0 +1,53 @@
+"""job outbox
+
+Durable queue of background side effects (app.jobs.outbox). Jobs are inserted in the
+transaction of the order/review that caused them and deleted when their handler commits.
+
+* ix_job_outbox_pending (partial, status = 'pending'): claiming runnable jobs in order.
+* ix_job_outbox_running (partial, status = 'running'): re-queueing expired leases.
+
+Orders placed before this revision already updated their sales counters inline, so
+nothing needs to be backfilled.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "job_outbox",
+        sa.Column("id", sa.BigInteger(), primary_key=True),
+        sa.Column("job_type", sa.String(64), nullable=False),
+        sa.Column("payload", postgresql.JSONB(), nullable=False),
+        sa.Column("status", sa.String(16), nullable=False, server_default="pending"),
+        sa.Column("attempts", sa.SmallInteger(), nullable=False, server_default="0"),
+        sa.Column("run_after", sa.TIMESTAMP(timezone=False), nullable=False, server_default=sa.func.now()),
+        sa.Column("created_at", sa.TIMESTAMP(timezone=False), nullable=False, server_default=sa.func.now()),
+        sa.Column("locked_at", sa.TIMESTAMP(timezone=False)),
+        sa.Column("last_error", sa.Text()),
+    )
+    op.create_index(
+        "ix_job_outbox_pending", "job_outbox", ["run_after", "id"],
+        postgresql_where=sa.text("status = 'pending'"),
+    )
+    op.create_index(
+        "ix_job_outbox_running", "job_outbox", ["locked_at"],
+        postgresql_where=sa.text("status = 'running'"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_job_outbox_running", table_name="job_outbox")
+    op.drop_index("ix_job_outbox_pending", table_name="job_outbox")
+    op.drop_table("job_outbox")
@@ -0,0 +1,53 @@
+"""change feed
+
+Catalog changes captured by app.db.change_capture and read by app.jobs.change_feed.
+
+* change_event.txid defaults to txid_current(), the writing transaction, so readers can
+  hold back events of transactions that were still running when later ones committed.
+* ix_change_event_txid_id: reading the feed in (txid, id) order from a cursor.
+* ix_change_event_changed_at: pruning past the retention window.
+* change_consumer: cursors of durable consumers.
+
+The feed starts empty; consumers begin at its head.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "change_event",
+        sa.Column("id", sa.BigInteger(), primary_key=True),
+        sa.Column("txid", sa.BigInteger(), nullable=False, server_default=sa.text("txid_current()")),
+        sa.Column("entity", sa.String(32), nullable=False),
+        sa.Column("entity_id", sa.BigInteger(), nullable=False),
+        sa.Column("kind", sa.String(8), nullable=False),
+        sa.Column("book_id", sa.BigInteger()),
+        sa.Column("changed_at", sa.TIMESTAMP(timezone=False), nullable=False, server_default=sa.func.now()),
+    )
+    op.create_index("ix_change_event_txid_id", "change_event", ["txid", "id"])
+    op.create_index("ix_change_event_changed_at", "change_event", ["changed_at"])
+    op.create_table(
+        "change_consumer",
+        sa.Column("name", sa.String(64), primary_key=True),
+        sa.Column("txid", sa.BigInteger(), nullable=False),
+        sa.Column("event_id", sa.BigInteger(), nullable=False),
+        sa.Column("updated_at", sa.TIMESTAMP(timezone=False), nullable=False, server_default=sa.func.now()),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("change_consumer")
+    op.drop_index("ix_change_event_changed_at", table_name="change_event")
+    op.drop_index("ix_change_event_txid_id", table_name="change_event")
+    op.drop_table("change_event")
@@ -0,0 +1,41 @@
+"""cart buffer
+
+Write-behind buffer of cart syncs (app.services.cart_service). UNLOGGED, so buffered
+updates write no WAL; a crash empties the table, losing at most
+CART_FLUSH_MAX_DELAY_SECONDS of cart changes. Unlogged tables are not replicated.
+
+* ix_cart_buffer_updated_at / ix_cart_buffer_buffered_at: the flusher's due buffers.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "cart_buffer",
+        sa.Column("user_id", sa.BigInteger(), sa.ForeignKey("user.id"), primary_key=True),
+        sa.Column("items", postgresql.JSONB(), nullable=False),
+        sa.Column("updates", sa.Integer(), nullable=False, server_default="1"),
+        sa.Column("buffered_at", sa.TIMESTAMP(timezone=False), nullable=False, server_default=sa.func.now()),
+        sa.Column("updated_at", sa.TIMESTAMP(timezone=False), nullable=False, server_default=sa.func.now()),
+        prefixes=["UNLOGGED"],
+    )
+    op.create_index("ix_cart_buffer_updated_at", "cart_buffer", ["updated_at"])
+    op.create_index("ix_cart_buffer_buffered_at", "cart_buffer", ["buffered_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_cart_buffer_buffered_at", table_name="cart_buffer")
+    op.drop_index("ix_cart_buffer_updated_at", table_name="cart_buffer")
+    op.drop_table("cart_buffer")
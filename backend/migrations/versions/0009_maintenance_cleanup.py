@@ -0,0 +1,45 @@
+"""maintenance cleanup
+
+Supports the batched cleanup in app.jobs.maintenance.
+
+* cart_item.updated_at (+ ix_cart_item_updated_at): age of a cart line. Existing lines
+  get the migration time, so they are kept for a full CART_RETENTION_DAYS.
+* discount_archive: ended discounts moved out of discount, keeping their ids.
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0009"
+down_revision = "0008"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "cart_item",
+        sa.Column("updated_at", sa.TIMESTAMP(timezone=False), nullable=False, server_default=sa.func.now()),
+    )
+    op.create_index("ix_cart_item_updated_at", "cart_item", ["updated_at"])
+    op.create_table(
+        "discount_archive",
+        sa.Column("id", sa.BigInteger(), primary_key=True),
+        sa.Column("book_id", sa.BigInteger(), nullable=False),
+        sa.Column("discount_start_date", sa.Date(), nullable=False),
+        sa.Column("discount_end_date", sa.Date(), nullable=False),
+        sa.Column("discount_price", sa.Numeric(5, 2), nullable=False),
+        sa.Column("archived_at", sa.TIMESTAMP(timezone=False), nullable=False, server_default=sa.func.now()),
+    )
+    op.create_index("ix_discount_archive_book_id", "discount_archive", ["book_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_discount_archive_book_id", table_name="discount_archive")
+    op.drop_table("discount_archive")
+    op.drop_index("ix_cart_item_updated_at", table_name="cart_item")
+    op.drop_column("cart_item", "updated_at")
@@ -0,0 +1,216 @@
+"""time partitioning of order, order_item and review
+
+Rebuilds the three tables as monthly range partitions on order_date / review_date
+(app.jobs.partitions keeps the coming months created and moves old ones to the
+archive schema).
+
+* The partition key joins the primary key: order(id, order_date),
+  order_item(id, order_date), review(id, review_date). Ids still come from the
+  existing sequences.
+* order_item gets order_date, copied from its order, and references
+  order(id, order_date), so items live in the same month as their order.
+* order_date / review_date become NOT NULL (rows without one are dated now()).
+* ix_order_id, ix_order_item_id and ix_review_id are dropped: the primary keys lead
+  with id.
+* Partitions cover the months of the existing rows through PARTITION_MONTHS_AHEAD
+  (3) months from now; there is no default partition.
+
+The rows are copied into the new tables, so the tables are locked for the length of
+the copy: run it in a maintenance window.
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-19
+"""
+import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0010"
+down_revision = "0009"
+branch_labels = None
+depends_on = None
+
+MONTHS_AHEAD = 3
+
+# table -> (partition key, columns in order)
+TABLES = {
+    "order": ("order_date", ("id", "user_id", "order_date", "order_amount")),
+    "order_item": ("order_date", ("id", "order_id", "order_date", "book_id", "quantity", "price")),
+    "review": ("review_date", ("id", "book_id", "user_id", "review_title", "review_details", "rating_start", "review_date")),
+}
+
+
+def _add_months(month: datetime.date, months: int) -> datetime.date:
+    index = month.year * 12 + month.month - 1 + months
+    return datetime.date(index // 12, index % 12 + 1, 1)
+
+
+def _id_column() -> sa.Column:
+    return sa.Column("id", sa.BigInteger(), nullable=False)
+
+
+def _create_partitioned_tables() -> None:
+    op.create_table(
+        "order",
+        _id_column(),
+        sa.Column("user_id", sa.BigInteger(), sa.ForeignKey("user.id"), nullable=False),
+        sa.Column("order_date", sa.TIMESTAMP(timezone=False), nullable=False, server_default=sa.func.now()),
+        sa.Column("order_amount", sa.Numeric(8, 2), nullable=False),
+        sa.PrimaryKeyConstraint("id", "order_date", name="order_pkey"),
+        postgresql_partition_by="RANGE (order_date)",
+    )
+    op.create_table(
+        "order_item",
+        _id_column(),
+        sa.Column("order_id", sa.BigInteger(), nullable=False),
+        sa.Column("order_date", sa.TIMESTAMP(timezone=False), nullable=False),
+        sa.Column("book_id", sa.BigInteger(), sa.ForeignKey("book.id"), nullable=False),
+        sa.Column("quantity", sa.SmallInteger(), nullable=False),
+        sa.Column("price", sa.Numeric(5, 2), nullable=False),
+        sa.PrimaryKeyConstraint("id", "order_date", name="order_item_pkey"),
+        sa.ForeignKeyConstraint(["order_id", "order_date"], ["order.id", "order.order_date"]),
+        postgresql_partition_by="RANGE (order_date)",
+    )
+    op.create_table(
+        "review",
+        _id_column(),
+        sa.Column("book_id", sa.BigInteger(), sa.ForeignKey("book.id"), nullable=False),
+        sa.Column("user_id", sa.BigInteger(), sa.ForeignKey("user.id"), nullable=False),
+        sa.Column("review_title", sa.String(120), nullable=False),
+        sa.Column("review_details", sa.Text()),
+        sa.Column("rating_start", sa.SmallInteger(), nullable=False),
+        sa.Column("review_date", sa.TIMESTAMP(timezone=False), nullable=False, server_default=sa.func.now()),
+        sa.PrimaryKeyConstraint("id", "review_date", name="review_pkey"),
+        postgresql_partition_by="RANGE (review_date)",
+    )
+
+
+def _create_indexes() -> None:
+    # Created on the parents, so every partition (present and future) gets them
+    op.create_index("ix_order_user_id_order_date", "order", ["user_id", sa.text("order_date DESC")])
+    op.create_index("ix_order_item_order_id", "order_item", ["order_id"])
+    op.create_index("ix_order_item_book_id", "order_item", ["book_id"])
+    op.create_index("ix_review_user_id", "review", ["user_id"])
+    op.create_index("ix_review_book_id_rating", "review", ["book_id", "rating_start"])
+    op.create_index("ix_review_book_id_review_date", "review", ["book_id", "review_date"])
+
+
+def _create_partitions(table: str, first: datetime.date, last: datetime.date) -> None:
+    # Same naming as app.repositories.partition_repository.partition_name
+    month = first
+    while month <= last:
+        following = _add_months(month, 1)
+        op.execute(
+            f'CREATE TABLE "{table}_p{month:%Y_%m}" PARTITION OF "{table}" '
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{following.isoformat()}')"
+        )
+        month = following
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    op.execute('CREATE SCHEMA IF NOT EXISTS "archive"')
+
+    for table in TABLES:
+        op.execute(f'ALTER TABLE "{table}" RENAME TO "{table}_unpartitioned"')
+        op.execute(f'ALTER TABLE "{table}_unpartitioned" RENAME CONSTRAINT "{table}_pkey" TO "{table}_unpartitioned_pkey"')
+    _create_partitioned_tables()
+
+    # Months of the existing rows through MONTHS_AHEAD months from now
+    current = datetime.date.today().replace(day=1)
+    last = _add_months(current, MONTHS_AHEAD)
+    oldest = bind.execute(sa.text(
+        "SELECT LEAST("
+        "(SELECT MIN(order_date) FROM order_unpartitioned), "
+        "(SELECT MIN(review_date) FROM review_unpartitioned))"
+    )).scalar()
+    first = min(oldest.date().replace(day=1), current) if oldest is not None else current
+    for table in TABLES:
+        _create_partitions(table, first, last)
+
+    op.execute(
+        'INSERT INTO "order" (id, user_id, order_date, order_amount) '
+        "SELECT id, user_id, COALESCE(order_date, now()), order_amount FROM order_unpartitioned"
+    )
+    op.execute(
+        "INSERT INTO order_item (id, order_id, order_date, book_id, quantity, price) "
+        "SELECT i.id, i.order_id, o.order_date, i.book_id, i.quantity, i.price "
+        'FROM order_item_unpartitioned i JOIN "order" o ON o.id = i.order_id'
+    )
+    op.execute(
+        "INSERT INTO review (id, book_id, user_id, review_title, review_details, rating_start, review_date) "
+        "SELECT id, book_id, user_id, review_title, review_details, rating_start, COALESCE(review_date, now()) "
+        "FROM review_unpartitioned"
+    )
+
+    # Hand the id sequences to the new tables before dropping the old ones
+    for table in TABLES:
+        op.execute(f"ALTER TABLE \"{table}\" ALTER COLUMN id SET DEFAULT nextval('{table}_id_seq')")
+        op.execute(f'ALTER SEQUENCE "{table}_id_seq" OWNED BY "{table}".id')
+    op.execute('DROP TABLE "order_item_unpartitioned", "order_unpartitioned", "review_unpartitioned"')
+
+    _create_indexes()
+    for table in TABLES:
+        op.execute(f'ANALYZE "{table}"')
+
+
+def downgrade() -> None:
+    # Archived partitions are still attached, so they are copied back and dropped with their parent
+    for table in TABLES:
+        op.execute(f'ALTER TABLE "{table}" RENAME TO "{table}_partitioned"')
+        op.execute(f'ALTER TABLE "{table}_partitioned" RENAME CONSTRAINT "{table}_pkey" TO "{table}_partitioned_pkey"')
+        op.execute(f'ALTER SEQUENCE "{table}_id_seq" RENAME TO "{table}_partitioned_id_seq"')
+    for name in (
+        "ix_order_user_id_order_date", "ix_order_item_order_id", "ix_order_item_book_id",
+        "ix_review_user_id", "ix_review_book_id_rating", "ix_review_book_id_review_date",
+    ):
+        op.execute(f'ALTER INDEX "{name}" RENAME TO "{name}_partitioned"')
+
+    op.create_table(
+        "order",
+        sa.Column("id", sa.BigInteger(), primary_key=True),
+        sa.Column("user_id", sa.BigInteger(), sa.ForeignKey("user.id"), nullable=False),
+        sa.Column("order_date", sa.TIMESTAMP(timezone=False), server_default=sa.func.now()),
+        sa.Column("order_amount", sa.Numeric(8, 2), nullable=False),
+    )
+    op.create_table(
+        "order_item",
+        sa.Column("id", sa.BigInteger(), primary_key=True),
+        sa.Column("order_id", sa.BigInteger(), sa.ForeignKey("order.id"), nullable=False),
+        sa.Column("book_id", sa.BigInteger(), sa.ForeignKey("book.id"), nullable=False),
+        sa.Column("quantity", sa.SmallInteger(), nullable=False),
+        sa.Column("price", sa.Numeric(5, 2), nullable=False),
+    )
+    op.create_table(
+        "review",
+        sa.Column("id", sa.BigInteger(), primary_key=True),
+        sa.Column("book_id", sa.BigInteger(), sa.ForeignKey("book.id"), nullable=False),
+        sa.Column("user_id", sa.BigInteger(), sa.ForeignKey("user.id"), nullable=False),
+        sa.Column("review_title", sa.String(120), nullable=False),
+        sa.Column("review_details", sa.Text()),
+        sa.Column("rating_start", sa.SmallInteger(), nullable=False),
+        sa.Column("review_date", sa.TIMESTAMP(timezone=False), server_default=sa.func.now()),
+    )
+    for table, (_, columns) in TABLES.items():
+        kept = [column for column in columns if not (table == "order_item" and column == "order_date")]
+        column_list = ", ".join(kept)
+        op.execute(f'INSERT INTO "{table}" ({column_list}) SELECT {column_list} FROM "{table}_partitioned"')
+
+    for table in TABLES:
+        # The new tables got new sequences; continue where the old ones (dropped with their tables) were
+        op.execute(f"SELECT setval('{table}_id_seq', (SELECT last_value FROM \"{table}_partitioned_id_seq\"))")
+    op.execute('DROP TABLE "order_item_partitioned", "order_partitioned", "review_partitioned"')
+    op.execute('DROP SCHEMA IF EXISTS "archive"')
+
+    op.create_index("ix_order_id", "order", ["id"])
+    op.create_index("ix_order_user_id_order_date", "order", ["user_id", sa.text("order_date DESC")])
+    op.create_index("ix_order_item_id", "order_item", ["id"])
+    op.create_index("ix_order_item_order_id", "order_item", ["order_id"])
+    op.create_index("ix_order_item_book_id", "order_item", ["book_id"])
+    op.create_index("ix_review_id", "review", ["id"])
+    op.create_index("ix_review_user_id", "review", ["user_id"])
+    op.create_index("ix_review_book_id_rating", "review", ["book_id", "rating_start"])
+    op.create_index("ix_review_book_id_review_date", "review", ["book_id", "review_date"])
@@ -0,0 +1,37 @@
+"""shard buckets
+
+Bucket -> shard map of the per-user tables (app.db.shards). Every bucket starts on
+shard 0, the primary database, so existing data stays where it is until
+`python -m app.jobs.shards rebalance` moves buckets to the shards in SHARD_DATABASE_URLS.
+
+* shard_bucket: one row per bucket (user_id % 1024, app.db.shards.SHARD_BUCKETS).
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0011"
+down_revision = "0010"
+branch_labels = None
+depends_on = None
+
+# app.db.shards.SHARD_BUCKETS
+SHARD_BUCKETS = 1024
+
+
+def upgrade() -> None:
+    op.create_table(
+        "shard_bucket",
+        sa.Column("bucket", sa.Integer(), primary_key=True, autoincrement=False),
+        sa.Column("shard", sa.SmallInteger(), nullable=False, server_default="0"),
+        sa.Column("moved_at", sa.TIMESTAMP(timezone=False)),
+    )
+    op.execute(f"INSERT INTO shard_bucket (bucket) SELECT generate_series(0, {SHARD_BUCKETS - 1})")
+
+
+def downgrade() -> None:
+    op.drop_table("shard_bucket")
@@ -0,0 +1,54 @@
+# backend/tests/conftest.py
+"""
+Shared test setup. Unit tests need no database; tests using the `client` fixture run
+against TEST_DATABASE_URL (a migrated, seeded bookstore database) and are skipped without it.
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# The engine is created at import time but only connects when used
+os.environ.setdefault("DATABASE_URL", os.getenv("TEST_DATABASE_URL", "postgresql://localhost/bookstore_test"))
+
+
+@pytest.fixture
+def database_url() -> str:
+    url = os.getenv("TEST_DATABASE_URL")
+    if not url:
+        pytest.skip("TEST_DATABASE_URL is not set")
+    return url
+
+
+@pytest.fixture
+def client(database_url):
+    """
+    TestClient outside a `with` block: the lifespan does not run, so no background loop
+    issues SQL next to the request and the catalog snapshot stays unloaded.
+    """
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    return TestClient(app)
+
+
+@pytest.fixture
+def auth_headers(client):
+    """ Bearer token of the first customer in the test database. """
+    from sqlalchemy import select
+
+    from app.core.security import create_access_token
+    from app.db.session import SessionLocal
+    from app.models import database_models
+
+    db = SessionLocal()
+    try:
+        email = db.scalars(
+            select(database_models.User.email).order_by(database_models.User.id).limit(1)
+        ).first()
+    finally:
+        db.close()
+    if email is None:
+        pytest.skip("the test database has no users")
+    return {"Authorization": f"Bearer {create_access_token({'sub': email})}"}
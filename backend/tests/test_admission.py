@@ -0,0 +1,133 @@
+# backend/tests/test_admission.py
+""" Admission control (app.core.admission): queueing, priorities and shedding. """
+import asyncio
+
+import pytest
+
+from app.core import admission
+from app.core.admission import AdmissionController, AdmissionMiddleware, RouteClass
+
+
+def _controller(total_limit=10, **limits):
+    """ Classes named after `limits` (name=(priority, limit, queue_size, timeout)). """
+    classes = {name: RouteClass(name, *spec) for name, spec in limits.items()}
+    return AdmissionController(classes, total_limit)
+
+
+async def _settle():
+    # Lets queued acquire() calls run up to their wait
+    for _ in range(3):
+        await asyncio.sleep(0)
+
+
+def test_full_queue_is_shed():
+    async def scenario():
+        controller = _controller(search=(0, 1, 1, 5.0))
+        search = controller.classes["search"]
+        assert await controller.acquire(search) is None
+        queued = asyncio.create_task(controller.acquire(search))
+        await _settle()
+        assert await controller.acquire(search) == "queue_full"
+
+        controller.release(search)
+        assert await queued is None
+        assert search.in_flight == 1 and not search.waiters
+    asyncio.run(scenario())
+
+
+def test_queue_timeout_is_shed():
+    async def scenario():
+        controller = _controller(search=(0, 1, 5, 0.05))
+        search = controller.classes["search"]
+        assert await controller.acquire(search) is None
+        assert await controller.acquire(search) == "timeout"
+        assert search.in_flight == 1 and not search.waiters
+    asyncio.run(scenario())
+
+
+def test_freed_slots_go_to_the_highest_priority_class():
+    async def scenario():
+        controller = _controller(total_limit=1, checkout=(3, 1, 5, 5.0), search=(0, 1, 5, 5.0))
+        checkout, search = controller.classes["checkout"], controller.classes["search"]
+        assert await controller.acquire(search) is None
+        queued_search = asyncio.create_task(controller.acquire(search))
+        await _settle()
+        queued_checkout = asyncio.create_task(controller.acquire(checkout))
+        await _settle()
+
+        # The checkout queued last but is admitted first
+        controller.release(search)
+        assert await queued_checkout is None
+        assert not queued_search.done()
+        controller.release(checkout)
+        assert await queued_search is None
+        assert controller.in_flight == 1
+    asyncio.run(scenario())
+
+
+def test_cancelled_waiter_leaves_the_queue():
+    async def scenario():
+        controller = _controller(search=(0, 1, 5, 5.0))
+        search = controller.classes["search"]
+        assert await controller.acquire(search) is None
+        queued = asyncio.create_task(controller.acquire(search))
+        await _settle()
+        queued.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await queued
+        assert not search.waiters
+
+        controller.release(search)
+        assert search.in_flight == 0 and controller.in_flight == 0
+    asyncio.run(scenario())
+
+
+@pytest.mark.parametrize("method, path, query, expected", [
+    ("POST", "/orders", b"", "checkout"),
+    ("POST", "/token", b"", "auth"),
+    ("GET", "/books", b"search=river&limit=10", "search"),
+    ("GET", "/books/facets", b"search=river", "search"),
+    ("GET", "/books", b"search=&limit=10", "default"),
+    ("GET", "/books", b"sort_by=popularity", "default"),
+    ("GET", "/metrics", b"", None),
+    ("GET", "/", b"", None),
+])
+def test_route_classes(method, path, query, expected):
+    assert admission.route_class_name({"method": method, "path": path, "query_string": query}) == expected
+
+
+def test_middleware_sheds_with_retry_after(monkeypatch):
+    monkeypatch.setattr(admission.settings, "ADMISSION_ENABLED", True)
+    monkeypatch.setattr(admission.settings, "ADMISSION_RETRY_AFTER_SECONDS", 7)
+
+    async def scenario():
+        running = asyncio.Event()
+
+        async def app(scope, receive, send):
+            await running.wait()
+            await send({"type": "http.response.start", "status": 200, "headers": []})
+            await send({"type": "http.response.body", "body": b""})
+
+        controller = _controller(search=(0, 1, 0, 5.0), default=(2, 1, 0, 5.0))
+        middleware = AdmissionMiddleware(app, controller)
+
+        async def request(query):
+            sent = []
+
+            async def send(message):
+                sent.append(message)
+            scope = {"type": "http", "method": "GET", "path": "/books", "query_string": query}
+            await middleware(scope, None, send)
+            return sent[0]["status"], dict(sent[0]["headers"])
+
+        first = asyncio.create_task(request(b"search=river"))
+        await _settle()
+        # The search class is full and has no queue; other classes are unaffected
+        status, headers = await request(b"search=moon")
+        assert status == 429 and headers[b"retry-after"] == b"7"
+        other = asyncio.create_task(request(b""))
+        running.set()
+        assert (await first)[0] == 200
+        assert (await other)[0] == 200
+        assert controller.in_flight == 0
+    asyncio.run(scenario())
@@ -0,0 +1,97 @@
+# backend/tests/test_change_feed.py
+""" Change feed delivery order (app.jobs.change_feed), against TEST_DATABASE_URL. """
+import pytest
+from sqlalchemy import delete
+
+from app.db.change_capture import record_changes
+from app.jobs.change_feed import ChangeFeedConsumer
+from app.models import database_models
+
+ENTITY = "test_feed"
+CONSUMER = "test_feed_consumer"
+
+
+@pytest.fixture
+def session_factory(database_url):
+    from app.db.session import SessionLocal
+
+    yield SessionLocal
+    db = SessionLocal()
+    db.execute(delete(database_models.ChangeEvent).where(database_models.ChangeEvent.entity == ENTITY))
+    db.execute(delete(database_models.ChangeConsumer).where(database_models.ChangeConsumer.name == CONSUMER))
+    db.commit()
+    db.close()
+
+
+def _consumer(received, durable=False):
+    def handle(events):
+        received.extend(event.entity_id for event in events if event.entity == ENTITY)
+    return ChangeFeedConsumer(CONSUMER, handle, durable=durable)
+
+
+def _drain(consumer):
+    while consumer.poll():
+        pass
+
+
+def _write(db, *entity_ids):
+    record_changes(db, ENTITY, entity_ids)
+
+
+def test_events_are_delivered_in_commit_safe_order(session_factory):
+    received = []
+    consumer = _consumer(received)
+    _drain(consumer) # Start at the head
+
+    first, second = session_factory(), session_factory()
+    try:
+        # `first` takes the lower txid but commits after `second`
+        _write(first, 1)
+        _write(second, 2)
+        second.commit()
+        _drain(consumer)
+        # Event 2 is held back while a transaction that may sort before it is running
+        assert received == []
+
+        first.commit()
+        _drain(consumer)
+        assert received == [1, 2]
+    finally:
+        first.close()
+        second.close()
+
+
+def test_rolled_back_events_are_never_delivered(session_factory):
+    received = []
+    consumer = _consumer(received)
+    _drain(consumer)
+
+    db = session_factory()
+    try:
+        _write(db, 1)
+        db.rollback()
+        _write(db, 2, 3)
+        db.commit()
+    finally:
+        db.close()
+    _drain(consumer)
+    assert received == [2, 3]
+
+
+def test_durable_consumer_resumes_after_its_cursor(session_factory):
+    received = []
+    consumer = _consumer(received, durable=True)
+    _drain(consumer) # No saved cursor yet: starts at the head
+
+    db = session_factory()
+    try:
+        _write(db, 1, 2)
+        db.commit()
+        _drain(consumer) # Saves its cursor after event 2
+        _write(db, 3)
+        db.commit()
+    finally:
+        db.close()
+    # A new instance (as after a restart) continues where the last one stopped
+    _drain(_consumer(received, durable=True))
+    assert received == [1, 2, 3]
@@ -0,0 +1,146 @@
+# backend/tests/test_job_outbox.py
+""" Claiming and retrying outbox jobs (app.jobs.outbox), against TEST_DATABASE_URL. """
+import pytest
+from sqlalchemy import delete, func, select
+
+from app.jobs import outbox
+from app.models import database_models
+from app.repositories.job_repository import JobRepository
+
+JOB_TYPE = "test_job"
+JobOutbox = database_models.JobOutbox
+
+
+@pytest.fixture
+def db(database_url):
+    from app.db.session import SessionLocal
+
+    session = SessionLocal()
+    runnable = session.scalar(
+        select(func.count()).select_from(JobOutbox)
+        .where(JobOutbox.status == "pending", JobOutbox.job_type != JOB_TYPE)
+    )
+    if runnable:
+        pytest.skip("the test database has pending jobs of its own")
+    yield session
+    session.rollback()
+    session.execute(delete(JobOutbox).where(JobOutbox.job_type == JOB_TYPE))
+    session.commit()
+    session.close()
+
+
+@pytest.fixture
+def handler(monkeypatch):
+    """ The test job's handler: raises while `failures` is positive, counting down. """
+    calls = {"runs": 0, "failures": 0}
+
+    def run(db, payload):
+        calls["runs"] += 1
+        if calls["failures"] > 0:
+            calls["failures"] -= 1
+            raise RuntimeError("boom")
+        return None
+
+    monkeypatch.setitem(outbox._handlers, JOB_TYPE, run)
+    return calls
+
+
+def _enqueue(db, count, delay_seconds=0):
+    jobs = [JobRepository(db).add(JOB_TYPE, {"n": n}, delay_seconds=delay_seconds) for n in range(count)]
+    db.commit()
+    return [job.id for job in jobs]
+
+
+def test_concurrent_claims_are_disjoint(db):
+    from app.db.session import SessionLocal
+
+    ids = _enqueue(db, 4)
+    other = SessionLocal()
+    try:
+        # The first claim's row locks are held until it commits; the second skips them
+        first = JobRepository(db).claim(2)
+        second = JobRepository(other).claim(10)
+        assert len(first) == 2 and len(second) == 2
+        assert {job[0] for job in first} | {job[0] for job in second} == set(ids)
+        # Oldest first, and each claim counts as an attempt
+        assert [job[0] for job in first] == ids[:2]
+        assert all(job[3] == 1 for job in first + second)
+        other.commit()
+    finally:
+        other.close()
+    db.commit()
+    assert JobRepository(db).claim(10) == []
+
+
+def test_delayed_jobs_are_not_claimed_early(db):
+    _enqueue(db, 1, delay_seconds=3600)
+    assert JobRepository(db).claim(10) == []
+
+
+def test_failed_job_is_retried_with_backoff(db, handler, monkeypatch):
+    monkeypatch.setattr(outbox.settings, "JOB_MAX_ATTEMPTS", 3)
+    monkeypatch.setattr(outbox.settings, "JOB_RETRY_BASE_SECONDS", 60)
+    handler["failures"] = 1
+    [job_id] = _enqueue(db, 1)
+    [job] = JobRepository(db).claim(1)
+    db.commit()
+
+    assert outbox.run_job(*job) == "retried"
+    row = db.get(JobOutbox, job_id)
+    assert row.status == "pending" and row.attempts == 1 and "boom" in row.last_error
+    # Not runnable again before the backoff has passed
+    assert db.scalar(select(JobOutbox.run_after - JobOutbox.created_at).where(JobOutbox.id == job_id)).total_seconds() >= 59
+    assert JobRepository(db).claim(1) == []
+
+    # Once due, the next attempt succeeds and deletes the job
+    db.execute(JobOutbox.__table__.update().where(JobOutbox.id == job_id).values(run_after=func.now()))
+    db.commit()
+    [job] = JobRepository(db).claim(1)
+    db.commit()
+    assert job[3] == 2
+    assert outbox.run_job(*job) == "done"
+    db.expire_all()
+    assert db.get(JobOutbox, job_id) is None
+    assert handler["runs"] == 2
+
+
+def test_job_fails_after_max_attempts(db, handler, monkeypatch):
+    monkeypatch.setattr(outbox.settings, "JOB_MAX_ATTEMPTS", 1)
+    handler["failures"] = 1
+    [job_id] = _enqueue(db, 1)
+    [job] = JobRepository(db).claim(1)
+    db.commit()
+
+    assert outbox.run_job(*job) == "failed"
+    row = db.get(JobOutbox, job_id)
+    assert row.status == "failed" and row.attempts == 1
+    assert JobRepository(db).claim(1) == []
+
+
+def test_lost_claim_does_not_complete(db, handler):
+    [job_id] = _enqueue(db, 1)
+    [job] = JobRepository(db).claim(1)
+    db.commit()
+    # Lease expired and another worker claimed the job again
+    db.execute(JobOutbox.__table__.update().where(JobOutbox.id == job_id).values(attempts=JobOutbox.attempts + 1))
+    db.commit()
+
+    assert outbox.run_job(*job) == "lost"
+    db.expire_all()
+    assert db.get(JobOutbox, job_id).status == "running"
+
+
+def test_retry_later_outlasts_max_attempts(db, monkeypatch):
+    monkeypatch.setattr(outbox.settings, "JOB_MAX_ATTEMPTS", 1)
+
+    def not_ready(db, payload):
+        raise outbox.RetryLater("not there yet", 60)
+
+    monkeypatch.setitem(outbox._handlers, JOB_TYPE, not_ready)
+    [job_id] = _enqueue(db, 1)
+    [job] = JobRepository(db).claim(1)
+    db.commit()
+
+    assert outbox.run_job(*job) == "retried"
+    row = db.get(JobOutbox, job_id)
+    assert row.status == "pending" and row.attempts == 1
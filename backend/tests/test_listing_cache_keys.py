@@ -0,0 +1,82 @@
+# backend/tests/test_listing_cache_keys.py
+""" /books requests that share a listing cache key must get the same rows. """
+import asyncio
+
+import pytest
+
+from app.services import book_service
+
+TITLES = ["River Song", "The river", "Moon Rivers", "Dust"]
+
+PARAMS = dict(skip=0, limit=25, sort_by="on_sale", category_id=None, author_id=None, min_rating=None)
+
+
+def _fake_query(db, search_term=None, **params):
+    # Same matching as the SQL listing: ILIKE '%term%' on the term it is given
+    return [title for title in TITLES if not search_term or search_term.lower() in title.lower()]
+
+
+@pytest.fixture
+def listing(monkeypatch):
+    """ list_books through the coalescing cache, with SQL replaced by _fake_query. """
+    monkeypatch.setattr(book_service.catalog_engine, "ready", lambda: False)
+    monkeypatch.setattr(book_service.settings, "LISTING_COALESCING_ENABLED", True)
+    monkeypatch.setattr(book_service, "query_book_list", _fake_query)
+    monkeypatch.setattr(book_service, "_load_book_list", lambda **params: _fake_query(None, **params))
+    monkeypatch.setattr(book_service.listing_cache, "ttl", 60)
+    book_service.listing_cache.clear()
+
+    def list_books(search_term, cached=True):
+        if not cached:
+            book_service.listing_cache.clear()
+        return asyncio.run(book_service.list_books(None, search_term=search_term, **PARAMS))
+    return list_books
+
+
+def _key(search_term):
+    return book_service.listing_cache_key(search_term=book_service.normalize_search_term(search_term), **PARAMS)
+
+
+@pytest.mark.parametrize("first, second", [
+    (" river", "river"),
+    ("river ", " river"),
+    (" ", None),
+    ("", " "),
+])
+def test_padded_and_blank_terms_share_a_key(first, second):
+    assert _key(first) == _key(second)
+
+
+def test_equal_keys_return_equal_rows(listing):
+    terms = [None, "", " ", "river", " river", "river ", "River", "x", " x"]
+    # What each request gets on its own, without the cache
+    uncached = {term: listing(term, cached=False) for term in terms}
+    for first in terms:
+        for second in terms:
+            if _key(first) != _key(second):
+                continue
+            assert uncached[first] == uncached[second], (first, second)
+            # The second request served from the entry the first one filled
+            book_service.listing_cache.clear()
+            assert listing(first) == listing(second) == uncached[first], (first, second)
+
+
+def test_blank_search_is_unfiltered(listing):
+    assert listing(" ") == TITLES
+    assert listing(" river") == ["River Song", "The river", "Moon Rivers"]
+
+
+def test_blank_facet_search_uses_the_unfiltered_counts(monkeypatch):
+    loaded = []
+
+    def fake_load(category_id, author_id, min_rating, search_term):
+        loaded.append(search_term)
+        return search_term
+
+    monkeypatch.setattr(book_service, "_load_book_facets", fake_load)
+    monkeypatch.setattr(book_service.facets_cache, "ttl", 60)
+    book_service.facets_cache.clear()
+    for term in [" ", None, "river", " river", "river "]:
+        asyncio.run(book_service.get_book_facets(None, None, None, search_term=term))
+    # Each key was loaded once, with the term it is keyed on
+    assert loaded == [None, "river"]
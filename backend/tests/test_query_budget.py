@@ -0,0 +1,36 @@
+# backend/tests/test_query_budget.py
+""" Statement budgets of the hot endpoints (app.db.query_guard), against TEST_DATABASE_URL. """
+import pytest
+
+from app.db.query_guard import assert_max_statements
+from app.services import book_service
+
+
+@pytest.fixture(autouse=True)
+def no_cached_listings():
+    # A cached listing would pass with zero statements
+    book_service.listing_cache.clear()
+    yield
+    book_service.listing_cache.clear()
+
+
+@pytest.mark.parametrize("query", [
+    "",
+    "?sort_by=popularity&limit=10",
+    "?sort_by=price_asc&min_rating=3",
+    "?search=the",
+])
+def test_book_listing_budget(client, query):
+    client.get("/books" + query) # Warm-up: first connection and statement compilation
+    book_service.listing_cache.clear()
+    with assert_max_statements(2):
+        response = client.get("/books" + query)
+    assert response.status_code == 200
+
+
+def test_orders_budget(client, auth_headers):
+    client.get("/orders", headers=auth_headers)
+    # The user lookup, then orders with their items in one statement
+    with assert_max_statements(2):
+        response = client.get("/orders", headers=auth_headers)
+    assert response.status_code == 200
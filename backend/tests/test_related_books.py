@@ -0,0 +1,20 @@
+# backend/tests/test_related_books.py
+""" Related books of an unknown book: None (404), and nothing cached. """
+import asyncio
+
+from app.core.exceptions import BookNotFoundError
+from app.services import book_service
+
+
+def test_unknown_book_is_not_cached(monkeypatch):
+    loads = []
+
+    def fake_load(book_id, limit):
+        loads.append(book_id)
+        raise BookNotFoundError(book_id)
+
+    monkeypatch.setattr(book_service, "_load_related_books", fake_load)
+    book_service.related_cache.clear()
+    assert asyncio.run(book_service.get_related_books(book_id=999, limit=8)) is None
+    assert asyncio.run(book_service.get_related_books(book_id=999, limit=8)) is None
+    assert loads == [999, 999]
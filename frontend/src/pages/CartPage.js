@@ -1,5 +1,5 @@
 // src/pages/CartPage.js
-import React, { useState } from 'react';
+import React, { useEffect, useState } from 'react';
 import { useCart } from '../contexts/CartContext';
 import { useAuth } from '../contexts/AuthContext';
 import { Link, useNavigate } from 'react-router-dom';
@@ -26,6 +26,27 @@ function CartPage() {
     const [error, setError] = useState(''); // Place order error
     // Add state for sign-in modal
     const [showSignInModal, setShowSignInModal] = useState(false);
+    // Server quote of the cart (the prices place_order will charge); null until loaded
+    const [quote, setQuote] = useState(null);
+
+    useEffect(() => {
+        if (!cartItems || cartItems.length === 0) {
+            setQuote(null);
+            return;
+        }
+        let cancelled = false;
+        const items = cartItems.map(item => ({ book_id: item.id, quantity: item.quantity }));
+        apiService.quoteCart(items)
+            .then(response => { if (!cancelled) setQuote(response.data.carts[0]); })
+            .catch(err => {
+                console.error("Cart quote failed:", err);
+                if (!cancelled) setQuote(null); // Fall back to the prices stored in the cart
+            });
+        return () => { cancelled = true; };
+    }, [cartItems]);
+
+    const quotedLines = {};
+    (quote?.items || []).forEach(line => { quotedLines[line.book_id] = line; });
 
     // Handler for +/- quantity buttons
     const handleQuantityChange = (itemId, currentQuantity, change) => {
@@ -38,8 +59,10 @@ function CartPage() {
         removeFromCart(itemId);
     };
 
-    // Calculates the total price for a single cart item line
+    // Calculates the total price for a single cart item line (server quote when available)
     const calculateLineTotal = (item) => {
+        const quoted = quotedLines[item?.id];
+        if (quoted && quoted.quantity === item.quantity) return parseFloat(quoted.line_total);
         if (!item || typeof item.quantity === 'undefined' || typeof item.price === 'undefined') return 0;
         const originalPrice = parseFloat(item.price) || 0;
         const discountPrice = item.discountPrice ? parseFloat(item.discountPrice) : null;
@@ -100,7 +123,8 @@ function CartPage() {
     };
 
     const totalItemsInCart = getCartItemCount();
-    const cartTotalAmount = getCartTotal();
+    const cartTotalAmount = quote ? parseFloat(quote.total) : getCartTotal();
+    const cartSavings = quote ? parseFloat(quote.savings) : 0;
 
     // Render empty cart message
     if (cartItems.length === 0 && !isLoading) {
@@ -158,8 +182,10 @@ function CartPage() {
                                             <div className="col-6 col-md-2 text-md-center">
                                                 <span className="d-md-none small text-muted">Price: </span>
                                                 <PriceDisplay
-                                                    originalPrice={item.price}
-                                                    discountPrice={item.discountPrice}
+                                                    originalPrice={quotedLines[item.id]?.list_price ?? item.price}
+                                                    discountPrice={quotedLines[item.id]
+                                                        ? (quotedLines[item.id].unit_price !== quotedLines[item.id].list_price ? quotedLines[item.id].unit_price : null)
+                                                        : item.discountPrice}
                                                     className="justify-content-center justify-content-md-center price-display"
                                                     vertical={true}
                                                 />
@@ -203,6 +229,12 @@ function CartPage() {
                             <span>Subtotal</span>
                             <span className="fw-bold">${(cartTotalAmount || 0).toFixed(2)}</span>
                         </div>
+                        {cartSavings > 0 && (
+                            <div className="d-flex justify-content-between mb-3 text-success">
+                                <span>You save</span>
+                                <span>${cartSavings.toFixed(2)}</span>
+                            </div>
+                        )}
                         <div className="d-grid">
                             <Button variant="success" size="lg" onClick={handlePlaceOrder} disabled={isLoading || cartItems.length === 0}>
                                 {isLoading ? (
@@ -10,35 +10,36 @@ function HomePage() {
   const [onSaleBooks, setOnSaleBooks] = useState([]);
   const [recommendedBooks, setRecommendedBooks] = useState([]);
   const [popularBooks, setPopularBooks] = useState([]);
+  const [bestSellingBooks, setBestSellingBooks] = useState([]);
   const [activeFeaturedTab, setActiveFeaturedTab] = useState('recommended');
   const [loadingSale, setLoadingSale] = useState(true);
   const [loadingRecommended, setLoadingRecommended] = useState(true);
   const [loadingPopular, setLoadingPopular] = useState(true);
+  const [loadingBestSelling, setLoadingBestSelling] = useState(true);
 
   const navigate = useNavigate();
   const onSaleSliderRef = useRef(null);
 
   useEffect(() => {
-    // Fetch On Sale Books
+    // Fetch all rails (On Sale, Recommended, Popular, Best Selling) in one request
     setLoadingSale(true);
-    apiService.getBooks({ sort_by: 'on_sale_home', limit: 10 })
-      .then(response => setOnSaleBooks(response.data.items))
-      .catch(error => console.error("Error fetching on sale books:", error))
-      .finally(() => setLoadingSale(false));
-
-    // Fetch Recommended Books
     setLoadingRecommended(true);
-    apiService.getBooks({ sort_by: 'recommended', limit: 8 })
-      .then(response => setRecommendedBooks(response.data.items))
-      .catch(error => console.error("Error fetching recommended books:", error))
-      .finally(() => setLoadingRecommended(false));
-
-    // Fetch Popular Books
     setLoadingPopular(true);
-    apiService.getBooks({ sort_by: 'popularity', limit: 8 })
-      .then(response => setPopularBooks(response.data.items))
-      .catch(error => console.error("Error fetching popular books:", error))
-      .finally(() => setLoadingPopular(false));
+    setLoadingBestSelling(true);
+    apiService.getHomeRails()
+      .then(response => {
+        setOnSaleBooks(response.data.on_sale);
+        setRecommendedBooks(response.data.recommended);
+        setPopularBooks(response.data.popular);
+        setBestSellingBooks(response.data.best_selling || []);
+      })
+      .catch(error => console.error("Error fetching home page books:", error))
+      .finally(() => {
+        setLoadingSale(false);
+        setLoadingRecommended(false);
+        setLoadingPopular(false);
+        setLoadingBestSelling(false);
+      });
   }, []);
 
   const handleViewAllClick = (sortType = 'on_sale_home') => {
@@ -61,8 +62,13 @@ function HomePage() {
     ]
   };
 
-  const featuredBooksToDisplay = activeFeaturedTab === 'recommended' ? recommendedBooks : popularBooks;
-  const isLoadingFeatured = activeFeaturedTab === 'recommended' ? loadingRecommended : loadingPopular;
+  // Featured tab -> (books, loading, sort used by View All)
+  const featuredTabs = {
+    recommended: [recommendedBooks, loadingRecommended, 'recommended'],
+    popular: [popularBooks, loadingPopular, 'popularity'],
+    best_selling: [bestSellingBooks, loadingBestSelling, 'best_selling'],
+  };
+  const [featuredBooksToDisplay, isLoadingFeatured, featuredSort] = featuredTabs[activeFeaturedTab];
 
   const renderBookGrid = (books) => (
     <div className="row row-cols-1 row-cols-sm-2 row-cols-md-3 row-cols-lg-4 g-4">
@@ -137,11 +143,19 @@ function HomePage() {
               Popular
             </button>
           </li>
+          <li className="nav-item mx-1">
+            <button
+              className={`nav-link px-4 ${activeFeaturedTab === 'best_selling' ? 'active' : ''}`}
+              onClick={() => setActiveFeaturedTab('best_selling')}
+            >
+              Best Selling
+            </button>
+          </li>
         </ul>
 
         <div className="d-flex justify-content-end mb-3">
           <button 
-            onClick={() => handleViewAllClick(activeFeaturedTab === 'recommended' ? 'recommended' : 'popularity')} 
+            onClick={() => handleViewAllClick(featuredSort)} 
             className="btn btn-outline-primary btn-sm view-all-button-custom"
           >
             View All <span className="arrow">▸</span>
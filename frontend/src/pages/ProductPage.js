@@ -8,6 +8,7 @@ import ReviewCard from '../components/ReviewCard'; // Component to display a sin
 import ReviewForm from '../components/ReviewForm'; // Component for submitting a new review
 import StarRating from '../components/StarRating'; // Component to display star ratings visually
 import PriceDisplay from '../components/PriceDisplay'; // Reusable price component
+import BookCard from '../components/BookCard'; // Cards for the related books row
 
 // Import necessary Bootstrap components for UI elements
 import Spinner from 'react-bootstrap/Spinner'; // Loading indicator
@@ -34,6 +35,7 @@ export default function ProductPage() {
     const [errorBook, setErrorBook] = useState(null);
     const [quantity, setQuantity] = useState(1);
     const [addCartSuccessMessage, setAddCartSuccessMessage] = useState('');
+    const [relatedBooks, setRelatedBooks] = useState([]);
 
     const [reviews, setReviews] = useState([]);
     const [loadingReviews, setLoadingReviews] = useState(true);
@@ -61,6 +63,14 @@ export default function ProductPage() {
             .finally(() => setLoadingBook(false));
     }, [bookId]);
 
+    useEffect(() => {
+        // Fetch "customers also bought"; the section is simply hidden if this fails
+        setRelatedBooks([]);
+        apiService.getRelatedBooks(bookId, { limit: 4 })
+            .then(response => setRelatedBooks(response.data))
+            .catch(err => console.error("Error fetching related books:", err));
+    }, [bookId]);
+
     const fetchReviews = useCallback(() => {
         // Fetch reviews
         setLoadingReviews(true); setErrorReviews(null);
@@ -240,6 +250,20 @@ export default function ProductPage() {
                  </div>
             </div>
 
+            {/* Customers Also Bought */}
+            {relatedBooks.length > 0 && (
+                <section className="related-books-section-custom border-top pt-4 mb-5">
+                    <h2>Customers Also Bought</h2>
+                    <div className="row row-cols-1 row-cols-sm-2 row-cols-md-4 g-4">
+                        {relatedBooks.map(related => (
+                            <div className="col" key={related.id}>
+                                <BookCard book={related} />
+                            </div>
+                        ))}
+                    </div>
+                </section>
+            )}
+
             {/* Reviews Section */}
             <section className="customer-reviews-section-custom border-top pt-4">
                  <h2> Customer Reviews {selectedRatingFilter !== null && ( <small className="text-muted ms-2 active-filter-text">(Filtered by {selectedRatingFilter} star)</small> )} </h2>
@@ -24,6 +24,7 @@ function ShopPage() {
   const [totalBooks, setTotalBooks] = useState(0);
   const [categories, setCategories] = useState([]);
   const [authors, setAuthors] = useState([]);
+  const [facets, setFacets] = useState(null);
   const [loading, setLoading] = useState(true);
   const [loadingFilters, setLoadingFilters] = useState(true);
   const [error, setError] = useState(null);
@@ -77,6 +78,42 @@ function ShopPage() {
       .finally(() => setLoading(false));
   }, [sortBy, selectedCategory, selectedAuthor, selectedRating, currentPage, itemsPerPage, searchTermFromUrl]);
 
+  // --- Fetch Facet Counts Effect ---
+  const fetchFacets = useCallback(() => {
+    const params = {
+      category_id: selectedCategory,
+      author_id: selectedAuthor,
+      min_rating: selectedRating,
+      search: searchTermFromUrl || undefined,
+    };
+    Object.keys(params).forEach(key => {
+      if (params[key] == null || params[key] === '') {
+        delete params[key];
+      }
+    });
+
+    apiService.getBookFacets(params)
+      .then(response => {
+        const toMap = (counts, key) => Object.fromEntries(counts.map(entry => [entry[key], entry.count]));
+        setFacets({
+          categories: toMap(response.data.categories, 'id'),
+          authors: toMap(response.data.authors, 'id'),
+          ratings: toMap(response.data.ratings, 'min_rating'),
+        });
+      })
+      .catch(error => {
+        console.error("Error fetching facet counts:", error);
+        setFacets(null); // Counts are optional, the filters still work without them
+      });
+  }, [selectedCategory, selectedAuthor, selectedRating, searchTermFromUrl]);
+
+  // Counts only depend on the filters, not on sorting or paging
+  useEffect(() => {
+    fetchFacets();
+  }, [fetchFacets]);
+
+  const facetCount = (group, key) => (facets ? ` (${facets[group][key] || 0})` : '');
+
   // --- Fetch Filter Options Effect ---
   const fetchFilterOptions = useCallback(() => {
     setLoadingFilters(true);
@@ -169,7 +206,7 @@ function ShopPage() {
                         tabIndex={0}
                         onKeyPress={(e) => e.key === 'Enter' && handleCategoryChange(category.id)}
                       >
-                        {category.category_name}
+                        {category.category_name}{facetCount('categories', category.id)}
                       </div>
                     ))
                   )}
@@ -191,7 +228,7 @@ function ShopPage() {
                         tabIndex={0} 
                         onKeyPress={(e) => e.key === 'Enter' && handleAuthorChange(author.id)}
                       >
-                        {author.author_name}
+                        {author.author_name}{facetCount('authors', author.id)}
                       </div>
                     ))
                   )}
@@ -212,7 +249,7 @@ function ShopPage() {
                       tabIndex={0}
                       onKeyPress={(e) => e.key === 'Enter' && handleRatingChange(rating)}
                     >
-                      {rating}+ Stars
+                      {rating}+ Stars{facetCount('ratings', rating)}
                     </div>
                   ))}
                 </Accordion.Body>
@@ -243,6 +280,7 @@ function ShopPage() {
                 <option value="on_sale">Sort by: On Sale</option>
                 <option value="popularity">Sort by: Popularity</option>
                 <option value="recommended">Sort by: Recommended</option>
+                <option value="best_selling">Sort by: Best Selling</option>
                 <option value="price_asc">Sort by: Price Low to High</option>
                 <option value="price_desc">Sort by: Price High to Low</option>
               </Form.Select>
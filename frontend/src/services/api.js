@@ -62,9 +62,17 @@ const getBooks = (params = {}) => {
   return apiClient.get('/books', { params });
 };
 
+// Sidebar counts for the same filters/search as getBooks (no paging or sorting)
+const getBookFacets = (params = {}) => apiClient.get('/books/facets', { params });
+
+// Home page rails (on sale, popular, recommended) in one precomputed response
+const getHomeRails = (params = {}) => apiClient.get('/home', { params });
+
 const getCategories = () => apiClient.get('/categories');
 const getAuthors = () => apiClient.get('/authors');
 const getBookById = (bookId) => apiClient.get(`/books/${bookId}`);
+// "Customers also bought" for the product page
+const getRelatedBooks = (bookId, params = {}) => apiClient.get(`/books/${bookId}/related`, { params });
 
 // Review Functions (remain the same)
 const getReviewsForBook = (bookId, params = {}) => {
@@ -109,6 +117,8 @@ const createOrder = (orderData) => {
 // Cart Functions (remain the same)
 const getUserCart = () => apiClient.get('/cart');
 const updateUserCart = (cartItems) => apiClient.post('/cart', cartItems);
+// Server-side prices of the cart, exactly as checkout would charge them
+const quoteCart = (items) => apiClient.post('/api/cart/quote', { carts: [{ items }] });
 
 // Add searchBooks function that uses getBooks with search parameter
 const searchBooks = (query, params = {}) => {
@@ -118,9 +128,12 @@ const searchBooks = (query, params = {}) => {
 // Export all functions
 const apiService = {
  getBooks,
+ getBookFacets,
+ getHomeRails,
  getCategories,
  getAuthors,
  getBookById,
+ getRelatedBooks,
  loginUser,
  getCurrentUser,
  refreshToken, // Ensure refreshToken is exported if used in AuthContext
@@ -131,6 +144,7 @@ const apiService = {
  // deleteReview,
  getUserCart,
  updateUserCart,
+ quoteCart,
  searchBooks, // Add searchBooks to exports
 };
 